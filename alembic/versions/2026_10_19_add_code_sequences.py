@@ -0,0 +1,42 @@
+"""add_code_sequences
+
+Revision ID: 2026_10_19_code_sequences
+Revises: 2026_10_19_scheduler_leases
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "2026_10_19_code_sequences"
+down_revision: Union[str, None] = "2026_10_19_scheduler_leases"
+branch_labels = None
+depends_on = None
+
+
+def _table_exists(table_name: str) -> bool:
+    return sa.inspect(op.get_bind()).has_table(table_name)
+
+
+def upgrade() -> None:
+    # Önek başına kod sayacı; satır ilk ayırmada mevcut en yüksek koddan başlatılır
+    if not _table_exists("code_sequences"):
+        op.create_table(
+            "code_sequences",
+            sa.Column("prefix", sa.String(), primary_key=True),
+            sa.Column("last_value", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column(
+                "updated_at",
+                sa.TIMESTAMP(timezone=True),
+                server_default=sa.func.now(),
+                nullable=True,
+            ),
+        )
+
+
+def downgrade() -> None:
+    if _table_exists("code_sequences"):
+        op.drop_table("code_sequences")
@@ -0,0 +1,48 @@
+"""add_compliance_batch_jobs
+
+Revision ID: 2026_10_19_compliance_batch_jobs
+Revises: 2026_10_19_llm_response_cache
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "2026_10_19_compliance_batch_jobs"
+down_revision: Union[str, None] = "2026_10_19_llm_response_cache"
+branch_labels = None
+depends_on = None
+
+
+def _table_exists(table_name: str) -> bool:
+    return sa.inspect(op.get_bind()).has_table(table_name)
+
+
+def upgrade() -> None:
+    # Toplu uyumluluk işleri (app/compliance/batch_runner.py); worker'lar arası ortak durum
+    if not _table_exists("compliance_batch_jobs"):
+        op.create_table(
+            "compliance_batch_jobs",
+            sa.Column("id", sa.String(length=32), primary_key=True),
+            sa.Column("status", sa.String(), nullable=False),
+            sa.Column("total_orders", sa.Integer(), nullable=False),
+            sa.Column("completed", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("strict_mode", sa.Boolean(), nullable=False),
+            sa.Column("rules_version", sa.Integer(), nullable=False),
+            sa.Column("results", sa.Text(), nullable=True),
+            sa.Column("error", sa.Text(), nullable=True),
+            sa.Column("created_at", sa.TIMESTAMP(timezone=True), nullable=False),
+            sa.Column("updated_at", sa.TIMESTAMP(timezone=True), nullable=False),
+            sa.Column("finished_at", sa.TIMESTAMP(timezone=True), nullable=True),
+        )
+        op.create_index(
+            "ix_compliance_batch_jobs_finished_at", "compliance_batch_jobs", ["finished_at"]
+        )
+
+
+def downgrade() -> None:
+    if _table_exists("compliance_batch_jobs"):
+        op.drop_table("compliance_batch_jobs")
@@ -0,0 +1,89 @@
+"""add_customer_phone_suffix
+
+Revision ID: 2026_10_19_customer_phone_suffix
+Revises: 2026_10_19_token_revocation
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+import re
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "2026_10_19_customer_phone_suffix"
+down_revision: Union[str, None] = "2026_10_19_token_revocation"
+branch_labels = None
+depends_on = None
+
+
+def _inspector() -> sa.Inspector:
+    return sa.inspect(op.get_bind())
+
+
+def _table_exists(table_name: str) -> bool:
+    return _inspector().has_table(table_name)
+
+
+def _column_exists(table_name: str, column_name: str) -> bool:
+    if not _table_exists(table_name):
+        return False
+    return any(col.get("name") == column_name for col in _inspector().get_columns(table_name))
+
+
+def _index_exists(table_name: str, index_name: str) -> bool:
+    if not _table_exists(table_name):
+        return False
+    return any(idx.get("name") == index_name for idx in _inspector().get_indexes(table_name))
+
+
+def _phone_suffix_key(phone: str) -> str:
+    # app.utils.text_normalize.phone_suffix_key ile aynı; migration uygulama koduna bağlı kalmasın
+    digits = re.sub(r"\D", "", phone or "")
+    if len(digits) == 12 and digits.startswith("90"):
+        digits = digits[2:]
+    elif len(digits) == 11 and digits.startswith("0"):
+        digits = digits[1:]
+    return digits[::-1]
+
+
+def upgrade() -> None:
+    if not _table_exists("customers"):
+        return
+    if not _column_exists("customers", "phone_suffix"):
+        op.add_column("customers", sa.Column("phone_suffix", sa.String(), nullable=True))
+    if not _index_exists("customers", "ix_customers_phone_suffix"):
+        op.create_index("ix_customers_phone_suffix", "customers", ["phone_suffix"])
+
+    bind = op.get_bind()
+    customers = sa.table(
+        "customers",
+        sa.column("id", sa.Integer),
+        sa.column("phone", sa.String),
+        sa.column("phone_suffix", sa.String),
+    )
+    rows = bind.execute(
+        sa.select(customers.c.id, customers.c.phone).where(
+            customers.c.phone.isnot(None), customers.c.phone_suffix.is_(None)
+        )
+    ).fetchall()
+    updates = [
+        {"customer_id": row.id, "suffix": suffix}
+        for row in rows
+        if (suffix := _phone_suffix_key(row.phone))
+    ]
+    if updates:
+        bind.execute(
+            customers.update()
+            .where(customers.c.id == sa.bindparam("customer_id"))
+            .values(phone_suffix=sa.bindparam("suffix")),
+            updates,
+        )
+
+
+def downgrade() -> None:
+    if _index_exists("customers", "ix_customers_phone_suffix"):
+        op.drop_index("ix_customers_phone_suffix", table_name="customers")
+    if _column_exists("customers", "phone_suffix"):
+        op.drop_column("customers", "phone_suffix")
@@ -0,0 +1,56 @@
+"""add_email_messages
+
+Revision ID: 2026_10_19_email_messages
+Revises: 2026_10_19_material_spec_tokens
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "2026_10_19_email_messages"
+down_revision: Union[str, None] = "2026_10_19_material_spec_tokens"
+branch_labels = None
+depends_on = None
+
+
+def _table_exists(table_name: str) -> bool:
+    return sa.inspect(op.get_bind()).has_table(table_name)
+
+
+def upgrade() -> None:
+    # Giden e-posta kuyruğu (email_dispatcher tarafından gönderilir)
+    if not _table_exists("email_messages"):
+        op.create_table(
+            "email_messages",
+            sa.Column("id", sa.String(), primary_key=True),
+            sa.Column("to_email", sa.String(), nullable=False),
+            sa.Column("subject", sa.String(), nullable=False),
+            sa.Column("template", sa.String(), nullable=True),
+            sa.Column("raw_message", sa.Text(), nullable=True),
+            sa.Column("status", sa.String(), nullable=False, server_default="PENDING"),
+            sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("next_attempt_at", sa.TIMESTAMP(timezone=True), nullable=True),
+            sa.Column(
+                "created_at",
+                sa.TIMESTAMP(timezone=True),
+                server_default=sa.func.now(),
+                nullable=True,
+            ),
+            sa.Column("sent_at", sa.TIMESTAMP(timezone=True), nullable=True),
+            sa.Column("error", sa.Text(), nullable=True),
+        )
+        op.create_index("ix_email_messages_id", "email_messages", ["id"])
+        op.create_index(
+            "ix_email_message_status_next_attempt",
+            "email_messages",
+            ["status", "next_attempt_at"],
+        )
+
+
+def downgrade() -> None:
+    if _table_exists("email_messages"):
+        op.drop_table("email_messages")
@@ -0,0 +1,54 @@
+"""add_llm_response_cache
+
+Revision ID: 2026_10_19_llm_response_cache
+Revises: 2026_10_19_email_messages
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "2026_10_19_llm_response_cache"
+down_revision: Union[str, None] = "2026_10_19_email_messages"
+branch_labels = None
+depends_on = None
+
+
+def _table_exists(table_name: str) -> bool:
+    return sa.inspect(op.get_bind()).has_table(table_name)
+
+
+def upgrade() -> None:
+    # İçerik adresli LLM yanıt önbelleği (app/services/llm_cache.py)
+    if not _table_exists("llm_response_cache"):
+        op.create_table(
+            "llm_response_cache",
+            sa.Column("key", sa.String(length=64), primary_key=True),
+            sa.Column("provider", sa.String(), nullable=False),
+            sa.Column("model", sa.String(), nullable=False),
+            sa.Column("value", sa.Text(), nullable=False),
+            sa.Column("size_bytes", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("hit_count", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column(
+                "created_at",
+                sa.TIMESTAMP(timezone=True),
+                server_default=sa.func.now(),
+                nullable=True,
+            ),
+            sa.Column("expires_at", sa.TIMESTAMP(timezone=True), nullable=False),
+            sa.Column("last_used_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        )
+        op.create_index(
+            "ix_llm_response_cache_expires_at", "llm_response_cache", ["expires_at"]
+        )
+        op.create_index(
+            "ix_llm_response_cache_last_used_at", "llm_response_cache", ["last_used_at"]
+        )
+
+
+def downgrade() -> None:
+    if _table_exists("llm_response_cache"):
+        op.drop_table("llm_response_cache")
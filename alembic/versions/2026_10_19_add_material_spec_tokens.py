@@ -0,0 +1,45 @@
+"""add_material_spec_tokens
+
+Revision ID: 2026_10_19_material_spec_tokens
+Revises: 2026_10_19_code_sequences
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "2026_10_19_material_spec_tokens"
+down_revision: Union[str, None] = "2026_10_19_code_sequences"
+branch_labels = None
+depends_on = None
+
+
+def _table_exists(table_name: str) -> bool:
+    return sa.inspect(op.get_bind()).has_table(table_name)
+
+
+def upgrade() -> None:
+    # Kelimeler uygulama açılışında (ensure_spec_search_index) spec'lerden doldurulur
+    if not _table_exists("material_spec_tokens"):
+        op.create_table(
+            "material_spec_tokens",
+            sa.Column(
+                "spec_id",
+                sa.Integer(),
+                sa.ForeignKey("material_specs.id", ondelete="CASCADE"),
+                primary_key=True,
+            ),
+            sa.Column("token", sa.String(), primary_key=True),
+        )
+        op.create_index(
+            "ix_material_spec_tokens_token", "material_spec_tokens", ["token", "spec_id"]
+        )
+
+
+def downgrade() -> None:
+    if _table_exists("material_spec_tokens"):
+        op.drop_index("ix_material_spec_tokens_token", table_name="material_spec_tokens")
+        op.drop_table("material_spec_tokens")
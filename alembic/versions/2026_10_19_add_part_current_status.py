@@ -0,0 +1,71 @@
+"""add_part_current_status
+
+Revision ID: 2026_10_19_part_current_status
+Revises: 2026_10_19_whatsapp_dispatch
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "2026_10_19_part_current_status"
+down_revision: Union[str, None] = "2026_10_19_whatsapp_dispatch"
+branch_labels = None
+depends_on = None
+
+
+def _inspector() -> sa.Inspector:
+    return sa.inspect(op.get_bind())
+
+
+def _table_exists(table_name: str) -> bool:
+    return _inspector().has_table(table_name)
+
+
+def _index_exists(table_name: str, index_name: str) -> bool:
+    if not _table_exists(table_name):
+        return False
+    return any(idx.get("name") == index_name for idx in _inspector().get_indexes(table_name))
+
+
+def upgrade() -> None:
+    if not _table_exists("status_logs"):
+        return
+    if not _index_exists("status_logs", "ix_status_log_part_created"):
+        op.create_index("ix_status_log_part_created", "status_logs", ["part_id", "created_at"])
+    if _table_exists("part_current_status"):
+        return
+    op.create_table(
+        "part_current_status",
+        sa.Column("part_id", sa.Integer(), sa.ForeignKey("parts.id"), primary_key=True),
+        sa.Column("status_log_id", sa.Integer(), nullable=False),
+        sa.Column("station_id", sa.Integer(), sa.ForeignKey("stations.id"), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("changed_at", sa.TIMESTAMP(timezone=True), nullable=True),
+    )
+    # Parça başına en yeni StatusLog ile doldur
+    op.execute(
+        """
+        INSERT INTO part_current_status (part_id, status_log_id, station_id, status, changed_at)
+        SELECT part_id, id, station_id, status, created_at
+        FROM (
+            SELECT part_id, id, station_id, status, created_at,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY part_id ORDER BY created_at DESC, id DESC
+                   ) AS rn
+            FROM status_logs
+            WHERE part_id IS NOT NULL
+        ) ranked
+        WHERE rn = 1
+        """
+    )
+
+
+def downgrade() -> None:
+    if _table_exists("part_current_status"):
+        op.drop_table("part_current_status")
+    if _index_exists("status_logs", "ix_status_log_part_created"):
+        op.drop_index("ix_status_log_part_created", table_name="status_logs")
@@ -0,0 +1,65 @@
+"""add_price_job_content_hash
+
+Revision ID: 2026_10_19_price_job_content_hash
+Revises: 2026_10_19_part_current_status
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "2026_10_19_price_job_content_hash"
+down_revision: Union[str, None] = "2026_10_19_part_current_status"
+branch_labels = None
+depends_on = None
+
+
+def _inspector() -> sa.Inspector:
+    return sa.inspect(op.get_bind())
+
+
+def _table_exists(table_name: str) -> bool:
+    return _inspector().has_table(table_name)
+
+
+def _column_exists(table_name: str, column_name: str) -> bool:
+    if not _table_exists(table_name):
+        return False
+    return any(col.get("name") == column_name for col in _inspector().get_columns(table_name))
+
+
+def _index_exists(table_name: str, index_name: str) -> bool:
+    if not _table_exists(table_name):
+        return False
+    return any(idx.get("name") == index_name for idx in _inspector().get_indexes(table_name))
+
+
+def upgrade() -> None:
+    if not _table_exists("price_upload_jobs"):
+        return
+    if not _column_exists("price_upload_jobs", "rows_processed"):
+        op.add_column(
+            "price_upload_jobs",
+            sa.Column("rows_processed", sa.Integer(), nullable=True, server_default="0"),
+        )
+    if not _column_exists("price_upload_jobs", "content_hash"):
+        op.add_column(
+            "price_upload_jobs",
+            sa.Column("content_hash", sa.String(length=64), nullable=True),
+        )
+    if not _index_exists("price_upload_jobs", "ix_price_upload_jobs_content_hash"):
+        op.create_index(
+            "ix_price_upload_jobs_content_hash", "price_upload_jobs", ["content_hash"]
+        )
+
+
+def downgrade() -> None:
+    if _index_exists("price_upload_jobs", "ix_price_upload_jobs_content_hash"):
+        op.drop_index("ix_price_upload_jobs_content_hash", table_name="price_upload_jobs")
+    if _column_exists("price_upload_jobs", "content_hash"):
+        op.drop_column("price_upload_jobs", "content_hash")
+    if _column_exists("price_upload_jobs", "rows_processed"):
+        op.drop_column("price_upload_jobs", "rows_processed")
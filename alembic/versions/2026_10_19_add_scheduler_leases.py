@@ -0,0 +1,38 @@
+"""add_scheduler_leases
+
+Revision ID: 2026_10_19_scheduler_leases
+Revises: 2026_10_19_search_documents
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "2026_10_19_scheduler_leases"
+down_revision: Union[str, None] = "2026_10_19_search_documents"
+branch_labels = None
+depends_on = None
+
+
+def _table_exists(table_name: str) -> bool:
+    return sa.inspect(op.get_bind()).has_table(table_name)
+
+
+def upgrade() -> None:
+    # Zamanlayıcı lider kirası: tekil işleri yalnız kirayı tutan API süreci çalıştırır
+    if not _table_exists("scheduler_leases"):
+        op.create_table(
+            "scheduler_leases",
+            sa.Column("name", sa.String(), primary_key=True),
+            sa.Column("holder", sa.String(), nullable=False),
+            sa.Column("expires_at", sa.TIMESTAMP(timezone=True), nullable=False),
+            sa.Column("renewed_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        )
+
+
+def downgrade() -> None:
+    if _table_exists("scheduler_leases"):
+        op.drop_table("scheduler_leases")
@@ -0,0 +1,72 @@
+"""add_search_documents
+
+Revision ID: 2026_10_19_search_documents
+Revises: 2026_10_19_price_job_content_hash
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "2026_10_19_search_documents"
+down_revision: Union[str, None] = "2026_10_19_price_job_content_hash"
+branch_labels = None
+depends_on = None
+
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5("
+    "search_text, content='search_documents', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS search_documents_ai AFTER INSERT ON search_documents BEGIN "
+    "INSERT INTO search_fts(rowid, search_text) VALUES (new.id, new.search_text); END",
+    "CREATE TRIGGER IF NOT EXISTS search_documents_ad AFTER DELETE ON search_documents BEGIN "
+    "INSERT INTO search_fts(search_fts, rowid, search_text) "
+    "VALUES ('delete', old.id, old.search_text); END",
+    "CREATE TRIGGER IF NOT EXISTS search_documents_au AFTER UPDATE ON search_documents BEGIN "
+    "INSERT INTO search_fts(search_fts, rowid, search_text) "
+    "VALUES ('delete', old.id, old.search_text); "
+    "INSERT INTO search_fts(rowid, search_text) VALUES (new.id, new.search_text); END",
+]
+
+POSTGRES_DDL = [
+    "ALTER TABLE search_documents ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    "GENERATED ALWAYS AS (to_tsvector('simple', search_text)) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_search_documents_vector "
+    "ON search_documents USING GIN (search_vector)",
+]
+
+
+def _table_exists(table_name: str) -> bool:
+    return sa.inspect(op.get_bind()).has_table(table_name)
+
+
+def upgrade() -> None:
+    # Dokümanlar uygulama açılışında (ensure_search_index) kaynak tablolardan doldurulur
+    if not _table_exists("search_documents"):
+        op.create_table(
+            "search_documents",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("entity_type", sa.String(length=16), nullable=False),
+            sa.Column("entity_id", sa.String(length=64), nullable=False),
+            sa.Column("title", sa.String(), nullable=False),
+            sa.Column("summary", sa.String(), nullable=True),
+            sa.Column("search_text", sa.Text(), nullable=False),
+            sa.UniqueConstraint("entity_type", "entity_id", name="uq_search_documents_entity"),
+        )
+    dialect_name = op.get_bind().dialect.name
+    if dialect_name == "sqlite":
+        for statement in SQLITE_DDL:
+            op.execute(statement)
+    elif dialect_name == "postgresql":
+        for statement in POSTGRES_DDL:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "sqlite":
+        op.execute("DROP TABLE IF EXISTS search_fts")
+    if _table_exists("search_documents"):
+        op.drop_table("search_documents")
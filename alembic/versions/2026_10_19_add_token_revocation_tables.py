@@ -0,0 +1,72 @@
+"""add_token_revocation_tables
+
+Revision ID: 2026_10_19_token_revocation
+Revises: 2026_03_03_add_order_notes
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "2026_10_19_token_revocation"
+down_revision: Union[str, None] = "2026_03_03_add_order_notes"
+branch_labels = None
+depends_on = None
+
+
+def _inspector() -> sa.Inspector:
+    return sa.inspect(op.get_bind())
+
+
+def _table_exists(table_name: str) -> bool:
+    return _inspector().has_table(table_name)
+
+
+def _index_exists(table_name: str, index_name: str) -> bool:
+    if not _table_exists(table_name):
+        return False
+    return any(idx.get("name") == index_name for idx in _inspector().get_indexes(table_name))
+
+
+def upgrade() -> None:
+    if not _table_exists("revoked_tokens"):
+        op.create_table(
+            "revoked_tokens",
+            sa.Column("jti", sa.String(), nullable=False),
+            sa.Column("token_type", sa.String(), nullable=True),
+            sa.Column("expires_at", sa.TIMESTAMP(timezone=True), nullable=False),
+            sa.Column("revoked_at", sa.TIMESTAMP(timezone=True), nullable=False),
+            sa.PrimaryKeyConstraint("jti"),
+        )
+    if not _index_exists("revoked_tokens", "ix_revoked_tokens_expires_at"):
+        op.create_index("ix_revoked_tokens_expires_at", "revoked_tokens", ["expires_at"])
+    if not _index_exists("revoked_tokens", "ix_revoked_tokens_revoked_at"):
+        op.create_index("ix_revoked_tokens_revoked_at", "revoked_tokens", ["revoked_at"])
+
+    if not _table_exists("auth_attempts"):
+        op.create_table(
+            "auth_attempts",
+            sa.Column("key", sa.String(), nullable=False),
+            sa.Column("count", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("locked_until", sa.TIMESTAMP(timezone=True), nullable=True),
+            sa.Column("updated_at", sa.TIMESTAMP(timezone=True), nullable=False),
+            sa.PrimaryKeyConstraint("key"),
+        )
+    if not _index_exists("auth_attempts", "ix_auth_attempts_updated_at"):
+        op.create_index("ix_auth_attempts_updated_at", "auth_attempts", ["updated_at"])
+
+
+def downgrade() -> None:
+    if _index_exists("auth_attempts", "ix_auth_attempts_updated_at"):
+        op.drop_index("ix_auth_attempts_updated_at", table_name="auth_attempts")
+    if _table_exists("auth_attempts"):
+        op.drop_table("auth_attempts")
+    if _index_exists("revoked_tokens", "ix_revoked_tokens_revoked_at"):
+        op.drop_index("ix_revoked_tokens_revoked_at", table_name="revoked_tokens")
+    if _index_exists("revoked_tokens", "ix_revoked_tokens_expires_at"):
+        op.drop_index("ix_revoked_tokens_expires_at", table_name="revoked_tokens")
+    if _table_exists("revoked_tokens"):
+        op.drop_table("revoked_tokens")
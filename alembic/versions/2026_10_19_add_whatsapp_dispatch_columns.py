@@ -0,0 +1,67 @@
+"""add_whatsapp_dispatch_columns
+
+Revision ID: 2026_10_19_whatsapp_dispatch
+Revises: 2026_10_19_customer_phone_suffix
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "2026_10_19_whatsapp_dispatch"
+down_revision: Union[str, None] = "2026_10_19_customer_phone_suffix"
+branch_labels = None
+depends_on = None
+
+
+def _inspector() -> sa.Inspector:
+    return sa.inspect(op.get_bind())
+
+
+def _table_exists(table_name: str) -> bool:
+    return _inspector().has_table(table_name)
+
+
+def _column_exists(table_name: str, column_name: str) -> bool:
+    if not _table_exists(table_name):
+        return False
+    return any(col.get("name") == column_name for col in _inspector().get_columns(table_name))
+
+
+def _index_exists(table_name: str, index_name: str) -> bool:
+    if not _table_exists(table_name):
+        return False
+    return any(idx.get("name") == index_name for idx in _inspector().get_indexes(table_name))
+
+
+def upgrade() -> None:
+    if not _table_exists("whatsapp_messages"):
+        return
+    if not _column_exists("whatsapp_messages", "attempts"):
+        op.add_column(
+            "whatsapp_messages",
+            sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        )
+    if not _column_exists("whatsapp_messages", "next_attempt_at"):
+        op.add_column(
+            "whatsapp_messages",
+            sa.Column("next_attempt_at", sa.TIMESTAMP(timezone=True), nullable=True),
+        )
+    if not _index_exists("whatsapp_messages", "ix_whatsapp_message_status_next_attempt"):
+        op.create_index(
+            "ix_whatsapp_message_status_next_attempt",
+            "whatsapp_messages",
+            ["status", "next_attempt_at"],
+        )
+
+
+def downgrade() -> None:
+    if _index_exists("whatsapp_messages", "ix_whatsapp_message_status_next_attempt"):
+        op.drop_index("ix_whatsapp_message_status_next_attempt", table_name="whatsapp_messages")
+    if _column_exists("whatsapp_messages", "next_attempt_at"):
+        op.drop_column("whatsapp_messages", "next_attempt_at")
+    if _column_exists("whatsapp_messages", "attempts"):
+        op.drop_column("whatsapp_messages", "attempts")
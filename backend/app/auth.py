@@ -10,12 +10,16 @@ import logging
 import os
 import secrets
 import sys
+import threading
+import time
 from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
 
 from fastapi import Depends, Request
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
 
 try:
     import bcrypt
@@ -27,7 +31,8 @@ logger = logging.getLogger(__name__)
 from app.database import get_db
 from app.exceptions import AuthenticationError, AuthorizationError
 from app.models.core import User
-from app.permissions import Permission, has_permission
+from app.permissions import Permission, get_permission_set, has_permission
+from app.services.token_store import token_store
 
 
 def _resolve_secret_key() -> str:
@@ -111,21 +116,136 @@ def create_access_token(data: dict) -> str:
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
+# ─── Kimlik doğrulama önbellekleri ───
+# Dashboard/istasyon tabletleri sürekli polling yaptığı için her istekte JWT decode
+# ve User sorgusu yapılmaz. Doğrulanmış token claim'leri token süresi boyunca,
+# kullanıcı anlık görüntüsü kısa bir TTL ile süreç içinde tutulur.
+TOKEN_CLAIMS_CACHE_SIZE = 4096
+USER_SNAPSHOT_TTL_SECONDS = 30
+USER_SNAPSHOT_CACHE_SIZE = 1024
+
+
+class _ExpiringCache:
+    """Thread-safe, boyut sınırlı {key: (expires_at, value)} önbelleği."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._data: Dict[Any, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self._data[key]
+                return None
+            return entry[1]
+
+    def set(self, key: Any, value: Any, expires_at: float) -> None:
+        with self._lock:
+            if key not in self._data and len(self._data) >= self.max_size:
+                now = time.time()
+                expired = [k for k, (exp, _) in self._data.items() if exp <= now]
+                for k in expired:
+                    del self._data[k]
+                if len(self._data) >= self.max_size:
+                    # En erken dolacak kaydı çıkar
+                    del self._data[min(self._data, key=lambda k: self._data[k][0])]
+            self._data[key] = (expires_at, value)
+
+    def discard_where(self, predicate) -> int:
+        with self._lock:
+            keys = [k for k, (_, v) in self._data.items() if predicate(k, v)]
+            for k in keys:
+                del self._data[k]
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+_token_claims_cache = _ExpiringCache(TOKEN_CLAIMS_CACHE_SIZE)
+_user_snapshot_cache = _ExpiringCache(USER_SNAPSHOT_CACHE_SIZE)
+
+
+def _token_cache_key(token: str) -> str:
+    # İmza doğrulanmadan claim okunamayacağı için anahtar token'ın tamamından türetilir
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def verify_token_claims(token: str) -> dict:
+    """JWT doğrula; doğrulanmış claim'leri token süresi dolana kadar önbellekte tut."""
+    cache_key = _token_cache_key(token)
+    payload = _token_claims_cache.get(cache_key)
+    if payload is None:
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except JWTError:
+            raise AuthenticationError("Geçersiz token")
+
+        exp = payload.get("exp")
+        if isinstance(exp, (int, float)):
+            _token_claims_cache.set(cache_key, payload, float(exp))
+
+    # İptal kontrolü önbellekten bağımsız yapılır (Bloom filtresi ile O(1))
+    if payload.get("jti") and token_store.is_revoked(payload["jti"]):
+        raise AuthenticationError("Token geçersiz kılındı")
+    return payload
+
+
+def _snapshot_user(user: User) -> User:
+    """Oturumdan bağımsız, yalnız kolon değerlerini taşıyan User kopyası üret."""
+    values = {attr.key: getattr(user, attr.key) for attr in sa_inspect(User).column_attrs}
+    snapshot = User(**values)
+    make_transient_to_detached(snapshot)
+    return snapshot
+
+
+def _load_active_user(db: Session, user_id: Any) -> Optional[User]:
+    """Kullanıcıyı kısa TTL'li anlık görüntüden, yoksa veritabanından getir."""
+    cache_key = (id(db.get_bind()), str(user_id))
+    snapshot = _user_snapshot_cache.get(cache_key)
+    if snapshot is not None:
+        # load=False: SELECT atmadan oturuma bağlı bir kopya üretir
+        return db.merge(snapshot, load=False)
+
+    user = db.query(User).filter(User.id == user_id).first()
+    if user is None or not user.is_active:
+        return None
+    _user_snapshot_cache.set(
+        cache_key, _snapshot_user(user), time.time() + USER_SNAPSHOT_TTL_SECONDS
+    )
+    return user
+
+
+def invalidate_user_cache(user_id: Any = None) -> None:
+    """Kullanıcı güncelleme, rol değişikliği veya oturum sonlandırmada önbelleği temizle.
+
+    ``user_id`` verilmezse tüm kullanıcıların anlık görüntüleri ve claim'leri silinir.
+    """
+    if user_id is None:
+        _user_snapshot_cache.clear()
+        _token_claims_cache.clear()
+        return
+    target = str(user_id)
+    _user_snapshot_cache.discard_where(lambda key, _: key[1] == target)
+    _token_claims_cache.discard_where(lambda _, claims: str(claims.get("sub")) == target)
+
+
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db),
 ) -> User:
-    token = credentials.credentials
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id = payload.get("sub")
-        if user_id is None:
-            raise AuthenticationError("Geçersiz token")
-    except JWTError:
+    payload = verify_token_claims(credentials.credentials)
+    user_id = payload.get("sub")
+    if user_id is None:
         raise AuthenticationError("Geçersiz token")
 
-    user = db.query(User).filter(User.id == user_id).first()
-    if user is None or not user.is_active:
+    user = _load_active_user(db, user_id)
+    if user is None:
         raise AuthenticationError("Kullanıcı bulunamadı")
     return user
 
@@ -145,13 +265,13 @@ def get_current_user_or_internal(
     # 1) JWT token varsa normal akış
     if credentials and credentials.credentials:
         try:
-            payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
+            payload = verify_token_claims(credentials.credentials)
             user_id = payload.get("sub")
             if user_id:
-                user = db.query(User).filter(User.id == user_id).first()
-                if user and user.is_active:
+                user = _load_active_user(db, user_id)
+                if user is not None:
                     return user
-        except JWTError:
+        except AuthenticationError:
             pass
 
     # 2) Internal API key kontrolü
@@ -187,8 +307,9 @@ def require_permissions(*required: Permission):
         if not role:
             raise AuthorizationError("Yetersiz yetki")
 
+        granted = get_permission_set(role)
         for perm in required:
-            if not has_permission(role, perm):
+            if perm not in granted:
                 raise AuthorizationError("Yetersiz yetki")
 
         return current_user
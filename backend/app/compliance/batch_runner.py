@@ -0,0 +1,294 @@
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from app.models import ComplianceBatchJob
+from sqlalchemy import delete, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from .rule_engine import CompiledRules
+
+logger = logging.getLogger(__name__)
+
+BATCH_WORKERS = int(os.getenv("COMPLIANCE_BATCH_WORKERS", "0")) or min(4, os.cpu_count() or 1)
+BATCH_JOB_TTL_SECONDS = 3600  # Biten işler bu süre sonra tablodan silinir
+BATCH_MAX_RUNNING = int(os.getenv("COMPLIANCE_BATCH_MAX_RUNNING", "2"))  # Süreç başına yürüyen iş
+BATCH_PROGRESS_INTERVAL = 1.0  # İlerleme satırı en fazla bu sıklıkla yazılır (saniye)
+BATCH_JOB_STALE_SECONDS = 300  # Bu süre ilerleme yazmayan "running" iş yarıda kalmış sayılır
+
+# İş tablosuna erişim; None ise app.database.SessionLocal kullanılır
+session_factory: Optional[Callable[[], Session]] = None
+
+
+def order_result(index: int, result: Dict[str, Any]) -> Dict[str, Any]:
+    """Tek siparişin toplu kontrol satırı."""
+    return {
+        "order_index": index,
+        "ok": result["ok"],
+        "violation_count": len([r for r in result.get("report", []) if r.get("status") == "FAIL"]),
+    }
+
+
+def _check_order(rules: CompiledRules, index: int, order: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        return order_result(index, rules.run(order))
+    except Exception as e:  # Bozuk taslak tüm partiyi düşürmesin
+        logger.warning("Uyumluluk kontrolü başarısız (sipariş %d): %s", index, e)
+        return {"order_index": index, "ok": False, "violation_count": 0, "error": str(e)}
+
+
+def iter_batch_results(
+    rules: CompiledRules, orders: Sequence[Dict[str, Any]], workers: int = BATCH_WORKERS
+) -> Iterator[Dict[str, Any]]:
+    """Siparişleri işçi havuzuna dağıtır; sonuçları tamamlanma sırasıyla verir."""
+    if workers <= 1 or len(orders) <= 1:
+        for index, order in enumerate(orders):
+            yield _check_order(rules, index, order)
+        return
+
+    pool = ThreadPoolExecutor(max_workers=min(workers, len(orders)), thread_name_prefix="compliance")
+    try:
+        futures = [pool.submit(_check_order, rules, i, order) for i, order in enumerate(orders)]
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        # Akış yarıda kapanırsa (istemci koptu) bekleyen siparişler işlenmez
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def summarize_batch(
+    results: Sequence[Dict[str, Any]], total_orders: int, strict_mode: bool = False
+) -> Dict[str, Any]:
+    """Toplu kontrol özeti; sonuçlar tamamlanma sırasından bağımsız olarak order_index sıralıdır."""
+    ordered = sorted(results, key=lambda r: r["order_index"])
+    failed_count = sum(1 for r in ordered if not r["ok"])
+    return {
+        "checked_at": datetime.now(UTC).isoformat(),
+        "total_orders": total_orders,
+        "passed": total_orders - failed_count,
+        "failed": failed_count,
+        "results": ordered,
+        "strict_mode": strict_mode,
+    }
+
+
+def iter_batch_ndjson(
+    rules: CompiledRules,
+    orders: Sequence[Dict[str, Any]],
+    strict_mode: bool = False,
+    workers: int = BATCH_WORKERS,
+) -> Iterator[str]:
+    """NDJSON akışı: tamamlanan her sipariş için bir ``result`` satırı, en sonda ``summary``."""
+    results = []
+    for result in iter_batch_results(rules, orders, workers):
+        results.append(result)
+        yield json.dumps({"type": "result", **result}) + "\n"
+    summary = summarize_batch(results, len(orders), strict_mode)
+    yield json.dumps({"type": "summary", **summary}) + "\n"
+
+
+class BatchCapacityError(RuntimeError):
+    """Bu süreçte çalışan toplu iş sayısı ``BATCH_MAX_RUNNING`` sınırında."""
+
+
+def _session() -> Session:
+    global session_factory
+    if session_factory is None:
+        from app.database import SessionLocal
+
+        session_factory = SessionLocal
+    return session_factory()
+
+
+def _aware(value: Optional[datetime]) -> Optional[datetime]:
+    # SQLite zaman damgalarını saat dilimsiz döndürür; hepsi UTC yazılır
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=UTC)
+    return value
+
+
+@dataclass
+class BatchJob:
+    """Arka planda yürüyen toplu kontrol; durumu ``snapshot`` ile sorgulanır."""
+
+    id: str
+    total_orders: int
+    strict_mode: bool = False
+    rules_version: int = 0
+    status: str = "running"  # running | done | failed
+    results: List[Dict[str, Any]] = field(default_factory=list)
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=lambda: datetime.now(UTC))
+    finished_at: Optional[datetime] = None
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            data = {
+                "job_id": self.id,
+                "status": self.status,
+                "total_orders": self.total_orders,
+                "completed": len(self.results),
+                "rules_version": self.rules_version,
+                "created_at": self.created_at.isoformat(),
+                "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+                "error": self.error,
+            }
+            if self.status == "done":
+                data["summary"] = summarize_batch(self.results, self.total_orders, self.strict_mode)
+        return data
+
+    def _persist(self, final: bool = False) -> None:
+        """İlerlemeyi (bitince sonuçları da) ``compliance_batch_jobs`` satırına yazar."""
+        with self._lock:
+            values = {
+                "status": self.status,
+                "completed": len(self.results),
+                "error": self.error,
+                "updated_at": datetime.now(UTC),
+                "finished_at": self.finished_at,
+            }
+            if final:
+                values["results"] = json.dumps(self.results)
+        try:
+            with _session() as db:
+                db.execute(
+                    update(ComplianceBatchJob).where(ComplianceBatchJob.id == self.id).values(**values)
+                )
+                db.commit()
+        except SQLAlchemyError as e:
+            logger.warning("Toplu uyumluluk işi kaydedilemedi (%s): %s", self.id, e)
+
+    def _run(
+        self,
+        rules: CompiledRules,
+        orders: Sequence[Dict[str, Any]],
+        workers: int,
+        slot: threading.BoundedSemaphore,
+    ) -> None:
+        try:
+            last_write = time.monotonic()
+            try:
+                for result in iter_batch_results(rules, orders, workers):
+                    with self._lock:
+                        self.results.append(result)
+                    if time.monotonic() - last_write >= BATCH_PROGRESS_INTERVAL:
+                        self._persist()
+                        last_write = time.monotonic()
+                status, error = "done", None
+            except Exception as e:
+                logger.exception("Toplu uyumluluk işi başarısız: %s", self.id)
+                status, error = "failed", str(e)
+            with self._lock:
+                self.status = status
+                self.error = error
+                self.finished_at = datetime.now(UTC)
+            self._persist(final=True)
+        finally:
+            with _jobs_lock:
+                _jobs.pop(self.id, None)
+            slot.release()
+
+
+# Bu süreçte yürüyen işler; bitenler yalnız tablodan okunur
+_jobs: Dict[str, BatchJob] = {}
+_jobs_lock = threading.Lock()
+_running = threading.BoundedSemaphore(BATCH_MAX_RUNNING)
+
+
+def _row_snapshot(row: ComplianceBatchJob) -> Dict[str, Any]:
+    status, error = row.status, row.error
+    updated_at = _aware(row.updated_at)
+    if status == "running" and datetime.now(UTC) - updated_at > timedelta(seconds=BATCH_JOB_STALE_SECONDS):
+        # İşi yürüten worker durmuş; satır bir daha güncellenmeyecek
+        status, error = "failed", "İş yarıda kaldı (worker durdu)"
+    finished_at = _aware(row.finished_at)
+    data = {
+        "job_id": row.id,
+        "status": status,
+        "total_orders": row.total_orders,
+        "completed": row.completed,
+        "rules_version": row.rules_version,
+        "created_at": _aware(row.created_at).isoformat(),
+        "finished_at": finished_at.isoformat() if finished_at else None,
+        "error": error,
+    }
+    if status == "done":
+        results = json.loads(row.results or "[]")
+        data["summary"] = summarize_batch(results, row.total_orders, row.strict_mode)
+    return data
+
+
+def start_batch_job(
+    rules: CompiledRules,
+    orders: Sequence[Dict[str, Any]],
+    strict_mode: bool = False,
+    workers: int = BATCH_WORKERS,
+) -> BatchJob:
+    """
+    Toplu kontrolü arka plan thread'inde başlatır ve iş tutamacını döndürür.
+
+    Süreçte ``BATCH_MAX_RUNNING`` iş yürüyorsa ``BatchCapacityError`` verir.
+    """
+    slot = _running
+    if not slot.acquire(blocking=False):
+        raise BatchCapacityError(f"En fazla {BATCH_MAX_RUNNING} toplu kontrol işi aynı anda çalışabilir")
+    job = BatchJob(
+        id=uuid.uuid4().hex,
+        total_orders=len(orders),
+        strict_mode=strict_mode,
+        rules_version=rules.version,
+    )
+    try:
+        with _session() as db:
+            db.execute(
+                delete(ComplianceBatchJob).where(
+                    ComplianceBatchJob.finished_at < job.created_at - timedelta(seconds=BATCH_JOB_TTL_SECONDS)
+                )
+            )
+            db.add(
+                ComplianceBatchJob(
+                    id=job.id,
+                    status=job.status,
+                    total_orders=job.total_orders,
+                    completed=0,
+                    strict_mode=strict_mode,
+                    rules_version=job.rules_version,
+                    created_at=job.created_at,
+                    updated_at=job.created_at,
+                )
+            )
+            db.commit()
+        with _jobs_lock:
+            _jobs[job.id] = job
+        threading.Thread(
+            target=job._run,
+            args=(rules, orders, workers, slot),
+            name=f"compliance-batch-{job.id[:8]}",
+            daemon=True,
+        ).start()
+    except BaseException:
+        with _jobs_lock:
+            _jobs.pop(job.id, None)
+        slot.release()
+        raise
+    return job
+
+
+def get_batch_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """İşin anlık durumu; bu süreçte yürüyorsa bellekten, değilse tablodan okunur."""
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+    if job is not None:
+        return job.snapshot()
+    with _session() as db:
+        row = db.get(ComplianceBatchJob, job_id)
+        return _row_snapshot(row) if row is not None else None
@@ -0,0 +1,265 @@
+import logging
+import re
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Derlenmiş kontrol: (parça sırası, parça) -> bulgu listesi; parçayı yerinde düzeltebilir
+Check = Callable[[int, Dict[str, Any]], List[Dict[str, Any]]]
+
+EDGE_BANDING_FIELDS = ("edge_banding_u1", "edge_banding_u2", "edge_banding_k1", "edge_banding_k2")
+
+# OptiPlanning tane kodları ("0"-"3") ve eşleme yönlerinin karşılığı
+GRAIN_CODES = {"0": 0, "1": 1, "2": 2, "3": 3}
+GRAIN_DIRECTION_CODES = {"LENGTHWISE": "1", "WIDTHWISE": "2"}
+
+_STATUS_BY_SEVERITY = {"ERROR": "FAIL", "WARN": "WARNING", "INFO": "PASS"}
+
+
+def _finding(
+    severity: str, message: str, rule: str, index: int, field: Optional[str] = None
+) -> Dict[str, Any]:
+    """``Finding.to_dict`` alanları + rapor alanları (rule/status/field/part_index)."""
+    return {
+        "severity": severity,
+        "message": message,
+        "id": f"{rule}:{index}",
+        "rule": rule,
+        "status": _STATUS_BY_SEVERITY.get(severity, "WARNING"),
+        "field": field,
+        "part_index": index,
+    }
+
+
+def _arkalik_edge_banding(index: int, part: Dict[str, Any]) -> List[Dict[str, Any]]:
+    get = part.get
+    if not (
+        get("edge_banding_u1") or get("edge_banding_u2") or get("edge_banding_k1") or get("edge_banding_k2")
+    ):
+        return []
+    for field in EDGE_BANDING_FIELDS:
+        part[field] = None
+    return [
+        _finding("WARN", "Edge banding removed for ARKALIK part.", "ARKALIK_NO_EDGE_BANDING", index)
+    ]
+
+
+def _arkalik_drilling(index: int, part: Dict[str, Any]) -> List[Dict[str, Any]]:
+    if not part.get("drilling_operations"):
+        return []
+    return [
+        _finding(
+            "ERROR",
+            "Drilling operations not allowed for ARKALIK parts.",
+            "ARKALIK_NO_DRILLING",
+            index,
+            "drilling_operations",
+        )
+    ]
+
+
+# Kod içinde sabit kalan parça grubu kuralları (PartTypeRulesAgent ile aynı davranış)
+BUILTIN_GROUP_CHECKS: Dict[str, Tuple[Check, ...]] = {
+    "ARKALIK": (_arkalik_edge_banding, _arkalik_drilling),
+}
+
+
+def _required_fields_check(rule: Any) -> Check:
+    """PartTypeRule -> zorunlu alan + (varsa) regex kontrolü; regex bir kez derlenir."""
+    fields = tuple(rule.required_fields or ())
+    pattern = re.compile(rule.validation_regex) if rule.validation_regex else None
+    rule_code = rule.rule_code
+    message = rule.error_message
+
+    def check(index: int, part: Dict[str, Any]) -> List[Dict[str, Any]]:
+        findings = []
+        for field in fields:
+            value = part.get(field)
+            if value is None or value == "":
+                findings.append(_finding("ERROR", message, rule_code, index, field))
+            elif pattern is not None and not pattern.match(str(value)):
+                findings.append(_finding("ERROR", message, rule_code, index, field))
+        return findings
+
+    return check
+
+
+def _lookup_key(value: Any) -> str:
+    """İstemciden gelen alanın arama anahtarı; skaler olmayan değerler hiçbir kurala uymaz."""
+    if isinstance(value, (str, int, float)):
+        return str(value).upper()
+    return ""
+
+
+def _mapping_key(material: Any, thickness: Any) -> Optional[Tuple[str, float]]:
+    material_key = _lookup_key(material)
+    if not material_key or thickness == "" or not isinstance(thickness, (str, int, float)):
+        return None
+    try:
+        return material_key, float(thickness)
+    except ValueError:
+        return None
+
+
+class CompiledRules:
+    """
+    Kurallar sürümünün derlenmiş hali.
+
+    ``group_checks`` parça grubu/tipi -> kontrol demeti, ``grain_mappings``
+    (malzeme, kalınlık) -> eşleme tablosudur; ``evaluate`` parça listesini
+    tek geçişte bu tablolardan sözlük aramasıyla değerlendirir.
+    """
+
+    def __init__(
+        self,
+        version: int,
+        group_checks: Dict[str, Tuple[Check, ...]],
+        grain_mappings: Dict[Tuple[str, float], Any],
+    ):
+        self.version = version
+        self.group_checks = group_checks
+        self.grain_mappings = grain_mappings
+
+    def _checks_for(self, group: Any, part_type: Any) -> Tuple[Check, ...]:
+        group_key = _lookup_key(group)
+        type_key = _lookup_key(part_type)
+        checks = self.group_checks.get(group_key, ()) if group_key else ()
+        if type_key and type_key != group_key:
+            checks += self.group_checks.get(type_key, ())
+        return checks
+
+    def _mapping_for(self, material: Any, thickness: Any) -> Optional[Tuple[Any, Any]]:
+        """(eşleme, sabit tane kodu); sabit kod yalnızca döndürmeye izin verilmeyen yönlerde dolu."""
+        mapping = self.grain_mappings.get(_mapping_key(material, thickness))
+        if mapping is None:
+            return None
+        expected = GRAIN_DIRECTION_CODES.get(mapping.grain_direction)
+        return mapping, None if mapping.rotation_allowed else expected
+
+    def _grain(self, index: int, part: Dict[str, Any], grain: Any, mapping: Any) -> List[Dict[str, Any]]:
+        """Eşleme kaynaklı ya da geçersiz tane durumları (olağan yol ``evaluate`` içinde)."""
+        expected = GRAIN_DIRECTION_CODES.get(mapping.grain_direction) if mapping else None
+
+        if grain is None:
+            if expected is None:
+                return [_finding("ERROR", "Grain direction is missing.", "GRAIN_REQUIRED", index, "grain")]
+            part["grain"] = expected
+            part["grain_opti"] = GRAIN_CODES[expected]
+            return [
+                _finding(
+                    "WARN",
+                    f"Grain direction set to {expected} from {mapping.material_type} "
+                    f"{mapping.thickness_mm:g}mm mapping.",
+                    "GRAIN_MAPPING",
+                    index,
+                    "grain",
+                )
+            ]
+        if not isinstance(grain, str) or grain not in GRAIN_CODES:
+            return [_finding("ERROR", f"Invalid grain direction: {grain}.", "GRAIN_CODE", index, "grain")]
+        if expected is not None and not mapping.rotation_allowed and grain != expected:
+            return [
+                _finding(
+                    "ERROR",
+                    f"Grain direction {grain} conflicts with {mapping.material_type} "
+                    f"{mapping.thickness_mm:g}mm mapping ({mapping.grain_direction}).",
+                    "GRAIN_MAPPING",
+                    index,
+                    "grain",
+                )
+            ]
+        part["grain_opti"] = GRAIN_CODES[grain]  # Map to integer for OptiPlanning
+        return []
+
+    def evaluate(self, parts: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Parçaları tek geçişte kontrol eder; düzeltmeler parçalara yerinde uygulanır."""
+        checks_for = self._checks_for
+        mapping_for = self._mapping_for if self.grain_mappings else None
+        grain_codes = GRAIN_CODES
+        findings: List[Dict[str, Any]] = []
+        for index, part in enumerate(parts):
+            get = part.get
+            for check in checks_for(get("part_group"), get("part_type")):
+                found = check(index, part)
+                if found:
+                    findings.extend(found)
+
+            grain = get("grain")
+            entry = None
+            if mapping_for is not None:
+                entry = mapping_for(get("material_type"), get("thickness_mm"))
+            valid = isinstance(grain, str) and grain in grain_codes
+            if valid and (entry is None or entry[1] in (None, grain)):
+                part["grain_opti"] = grain_codes[grain]  # Map to integer for OptiPlanning
+            else:
+                findings.extend(self._grain(index, part, grain, entry[0] if entry else None))
+        return findings
+
+    def run(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """``AgentOrchestrator.run`` ile aynı sonuç şekli."""
+        findings = self.evaluate(data.get("parts", []))
+        if any(f["severity"] == "ERROR" for f in findings):
+            return {"ok": False, "compliant_order": None, "report": findings}
+        return {"ok": True, "compliant_order": data, "report": findings}
+
+
+def compile_rules(
+    part_type_rules: Iterable[Any], grain_mappings: Iterable[Any], version: int = 0
+) -> CompiledRules:
+    """Aktif parça tipi kuralları ve tane eşlemelerinden arama tablolarını kurar."""
+    group_checks: Dict[str, List[Check]] = {
+        group: list(checks) for group, checks in BUILTIN_GROUP_CHECKS.items()
+    }
+    for rule in part_type_rules:
+        if not rule.is_active:
+            continue
+        try:
+            check = _required_fields_check(rule)
+        except re.error as e:
+            # Derlenemeyen desen tek kuralı devre dışı bırakır, tüm kontrolü değil
+            logger.warning("Kural %s atlandı; validation_regex derlenemedi: %s", rule.rule_code, e)
+            continue
+        group_checks.setdefault(rule.part_type.upper(), []).append(check)
+
+    mappings: Dict[Tuple[str, float], Any] = {}
+    for mapping in grain_mappings:
+        key = _mapping_key(mapping.material_type, mapping.thickness_mm)
+        if mapping.is_active and key is not None:
+            mappings.setdefault(key, mapping)  # İlk tanımlı eşleme geçerli (suggest ile aynı)
+
+    return CompiledRules(
+        version,
+        {group: tuple(checks) for group, checks in group_checks.items()},
+        mappings,
+    )
+
+
+# Kural sürümü: oluşturma/güncelleme/silme sonrası artırılır, derleme tembel yapılır
+_lock = threading.Lock()
+_version = 0
+_compiled: Optional[CompiledRules] = None
+
+
+def rules_version() -> int:
+    return _version
+
+
+def invalidate_rules() -> int:
+    """Kural kümesi değişti; bir sonraki ``get_compiled_rules`` yeniden derler."""
+    global _version
+    with _lock:
+        _version += 1
+        return _version
+
+
+def get_compiled_rules(
+    loader: Callable[[], Tuple[Iterable[Any], Iterable[Any]]]
+) -> CompiledRules:
+    """Geçerli sürümün derlenmiş kurallarını döndürür; sürüm değiştiyse ``loader`` ile yeniden derler."""
+    global _compiled
+    with _lock:
+        if _compiled is None or _compiled.version != _version:
+            part_type_rules, grain_mappings = loader()
+            _compiled = compile_rules(part_type_rules, grain_mappings, version=_version)
+        return _compiled
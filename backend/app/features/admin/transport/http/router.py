@@ -19,7 +19,7 @@ from datetime import datetime, timedelta, timezone
 from typing import List, Optional
 
 from app import mikro_db
-from app.auth import get_current_user, hash_password, require_admin
+from app.auth import get_current_user, hash_password, invalidate_user_cache, require_admin
 from app.database import get_db
 from app.exceptions import BusinessRuleError, ConflictError, NotFoundError, ValidationError
 from app.middleware.cache_middleware import cached_response
@@ -533,6 +533,8 @@ def update_user(
 
         list_users.invalidate()
 
+        invalidate_user_cache(user.id)
+
     return _to_user_out(user)
 
 
@@ -573,6 +575,8 @@ def delete_user(
 
     username = user.username
 
+    user_pk = user.id
+
     db.delete(user)
 
     create_audit_log(db, admin.id, "DELETE_USER", f"Kullanıcı silindi: {username}", None)
@@ -581,6 +585,8 @@ def delete_user(
 
     list_users.invalidate()
 
+    invalidate_user_cache(user_pk)
+
     return {"ok": True}
 
 
@@ -613,6 +619,8 @@ def reset_user_password(
 
     db.commit()
 
+    invalidate_user_cache(user.id)
+
     return {"ok": True}
 
 
@@ -1626,6 +1634,8 @@ def terminate_session(
 
     db.commit()
 
+    invalidate_user_cache(session.user_id)
+
     return {"status": "terminated"}
 
 
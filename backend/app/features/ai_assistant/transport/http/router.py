@@ -37,10 +37,16 @@ from app.exceptions import BusinessRuleError, ValidationError
 from app.models import User
 
 
+from app.services.ai_assistant_service import SMART_SEARCH_TOP_K, get_ai_assistant_service
+
+
 from app.services.gemini_service import get_gemini_service
 
 
-from fastapi import APIRouter, Depends, File, Form, UploadFile
+from app.services.search_index_service import SEARCH_MAX_LIMIT
+
+
+from fastapi import APIRouter, Depends, File, Form, Query, UploadFile
 
 
 from pydantic import BaseModel, Field
@@ -865,6 +871,87 @@ async def analyze_image(
 
 
 
+@router.get("/assistant/search", tags=["ai-assistant"])
+
+
+async def smart_search(
+
+
+    q: str = Query(..., min_length=1, max_length=200),
+
+
+    scope: str = Query("all", pattern="^(all|orders|customers|products)$"),
+
+
+    limit: int = Query(SMART_SEARCH_TOP_K, ge=1, le=SEARCH_MAX_LIMIT),
+
+
+    use_llm: Optional[bool] = Query(None),
+
+
+    current_user: User = Depends(get_current_user),
+
+
+    db: Session = Depends(get_db),
+
+
+):
+
+
+    """
+
+
+    Sipariş, müşteri ve stoklarda akıllı arama
+
+
+
+
+
+    Sonuçlar yerel tam metin indeksinden gelir; ``use_llm`` açıksa ilk
+
+
+    ``limit`` aday LLM ile yeniden sıralanır.
+
+
+    """
+
+
+    result = await get_ai_assistant_service().smart_search(
+
+
+        str(current_user.id), q, search_scope=scope, limit=limit, use_llm=use_llm, db=db
+
+
+    )
+
+
+    if not result.get("success"):
+
+
+        raise BusinessRuleError(f"Arama hatası: {result.get('error')}")
+
+
+    return {
+
+
+        "success": True,
+
+
+        "data": result["search_results"],
+
+
+        "source": result["source"],
+
+
+    }
+
+
+
+
+
+
+
+
 @router.get("/assistant/models", tags=["ai-assistant"])
 
 
@@ -3,18 +3,31 @@ OptiPlan 360 — Compliance Router (Genişletilmiş)
 Uyumluluk kuralları, parça tipi kuralları ve tane haritalama endpoint'leri.
 """
 
+import re
 from datetime import UTC, datetime
 from typing import Any, Dict, List, Optional
 
 from app.auth import get_current_user, require_admin
-from app.compliance.agent_orchestrator import AgentOrchestrator
-from app.compliance.grain_mapping_agent import GrainMappingAgent
-from app.compliance.part_type_rules_agent import PartTypeRulesAgent
+from app.compliance.batch_runner import (
+    BatchCapacityError,
+    get_batch_job,
+    iter_batch_ndjson,
+    iter_batch_results,
+    start_batch_job,
+    summarize_batch,
+)
+from app.compliance.rule_engine import (
+    CompiledRules,
+    get_compiled_rules,
+    invalidate_rules,
+    rules_version,
+)
 from app.database import get_db
-from app.exceptions import NotFoundError
+from app.exceptions import AppError, NotFoundError
 from app.models import User
 from fastapi import APIRouter, Depends, Query
-from pydantic import BaseModel, Field
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, field_validator
 from sqlalchemy.orm import Session
 
 router = APIRouter(prefix="/api/compliance", tags=["Compliance"])
@@ -65,6 +78,16 @@ class PartTypeRuleCreate(BaseModel):
     error_message: str = "Validation failed"
     is_active: bool = True
 
+    @field_validator("validation_regex")
+    @classmethod
+    def validate_regex(cls, v: Optional[str]) -> Optional[str]:
+        if v:
+            try:
+                re.compile(v)
+            except re.error as e:
+                raise ValueError(f"validation_regex geçersiz: {e}")
+        return v
+
 
 class GrainMappingEntry(BaseModel):
     id: str
@@ -105,14 +128,7 @@ def compile_order(
     """
     Siparişi uyumluluk kurallarına göre derle ve kontrol et.
     """
-    orchestrator = AgentOrchestrator(
-        [
-            PartTypeRulesAgent(),
-            GrainMappingAgent(),
-        ]
-    )
-
-    result = orchestrator.run(order.dict())
+    result = _compiled_rules().run(order.dict())
 
     # Audit log
     from app.utils import create_audit_log
@@ -234,6 +250,7 @@ def create_part_type_rule(rule: PartTypeRuleCreate, admin: User = Depends(requir
 
     new_rule = PartTypeRule(id=f"rule-{uuid.uuid4().hex[:8]}", **rule.dict())
     _part_type_rules.append(new_rule)
+    invalidate_rules()
     return new_rule
 
 
@@ -246,6 +263,7 @@ def update_part_type_rule(
         if rule.id == rule_id:
             updated = PartTypeRule(id=rule_id, **updates.dict(), created_at=rule.created_at)
             _part_type_rules[i] = updated
+            invalidate_rules()
             return updated
     raise NotFoundError("Kural")
 
@@ -258,6 +276,7 @@ def delete_part_type_rule(rule_id: str, admin: User = Depends(require_admin)):
     _part_type_rules = [r for r in _part_type_rules if r.id != rule_id]
     if len(_part_type_rules) == original_count:
         raise NotFoundError("Kural")
+    invalidate_rules()
     return {"ok": True, "deleted": rule_id}
 
 
@@ -294,6 +313,11 @@ _grain_mappings: List[GrainMappingEntry] = [
 ]
 
 
+def _compiled_rules() -> CompiledRules:
+    """Yönetilen kural/eşleme listelerinin derlenmiş hali (sürüm değişince yeniden derlenir)."""
+    return get_compiled_rules(lambda: (_part_type_rules, _grain_mappings))
+
+
 @router.get("/grain-mappings", response_model=List[GrainMappingEntry])
 def list_grain_mappings(
     material_type: Optional[str] = Query(None),
@@ -316,6 +340,7 @@ def create_grain_mapping(mapping: GrainMappingCreate, admin: User = Depends(requ
 
     new_mapping = GrainMappingEntry(id=f"grain-{uuid.uuid4().hex[:8]}", **mapping.dict())
     _grain_mappings.append(new_mapping)
+    invalidate_rules()
     return new_mapping
 
 
@@ -328,6 +353,7 @@ def update_grain_mapping(
         if mapping.id == mapping_id:
             updated = GrainMappingEntry(id=mapping_id, **updates.dict())
             _grain_mappings[i] = updated
+            invalidate_rules()
             return updated
     raise NotFoundError("Haritalama")
 
@@ -340,6 +366,7 @@ def delete_grain_mapping(mapping_id: str, admin: User = Depends(require_admin)):
     _grain_mappings = [m for m in _grain_mappings if m.id != mapping_id]
     if len(_grain_mappings) == original_count:
         raise NotFoundError("Haritalama")
+    invalidate_rules()
     return {"ok": True, "deleted": mapping_id}
 
 
@@ -424,30 +451,47 @@ def batch_compliance_check(
     current_user: User = Depends(get_current_user),
 ):
     """Birden fazla siparişi toplu olarak kontrol et."""
-    orchestrator = AgentOrchestrator([PartTypeRulesAgent(), GrainMappingAgent()])
-
-    results = []
-    for i, order in enumerate(orders):
-        result = orchestrator.run(order.dict())
-        results.append(
-            {
-                "order_index": i,
-                "ok": result["ok"],
-                "violation_count": len(
-                    [r for r in result.get("report", []) if r.get("status") == "FAIL"]
-                ),
-            }
-        )
+    rules = _compiled_rules()  # Tüm siparişler aynı kural sürümüyle değerlendirilir
+    drafts = [order.dict() for order in orders]
+    results = list(iter_batch_results(rules, drafts))
+    return summarize_batch(results, len(drafts), strict_mode)
 
-    failed_count = sum(1 for r in results if not r["ok"])
-    return {
-        "checked_at": datetime.now(UTC).isoformat(),
-        "total_orders": len(orders),
-        "passed": len(orders) - failed_count,
-        "failed": failed_count,
-        "results": results,
-        "strict_mode": strict_mode,
-    }
+
+@router.post("/batch-check/stream")
+def batch_compliance_check_stream(
+    orders: List[OrderDraft],
+    strict_mode: bool = False,
+    current_user: User = Depends(get_current_user),
+):
+    """Toplu kontrol, sipariş sonuçları tamamlandıkça NDJSON satırı olarak akar; son satır özettir."""
+    drafts = [order.dict() for order in orders]
+    return StreamingResponse(
+        iter_batch_ndjson(_compiled_rules(), drafts, strict_mode),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.post("/batch-check/jobs", status_code=202)
+def start_batch_compliance_job(
+    orders: List[OrderDraft],
+    strict_mode: bool = False,
+    current_user: User = Depends(get_current_user),
+):
+    """Büyük partiler için arka plan işi başlat; durum ``GET /batch-check/jobs/{job_id}`` ile izlenir."""
+    try:
+        job = start_batch_job(_compiled_rules(), [order.dict() for order in orders], strict_mode)
+    except BatchCapacityError as e:
+        raise AppError(429, "TOO_MANY_BATCH_JOBS", str(e))
+    return job.snapshot()
+
+
+@router.get("/batch-check/jobs/{job_id}")
+def get_batch_compliance_job(job_id: str, _: User = Depends(get_current_user)):
+    """Toplu kontrol işinin ilerlemesi; iş bittiğinde order_index sıralı özet döner."""
+    job = get_batch_job(job_id)
+    if job is None:
+        raise NotFoundError("Toplu kontrol işi")
+    return job
 
 
 @router.get("/health")
@@ -458,6 +502,7 @@ def compliance_health_check():
         "agents": {"part_type_rules": "active", "grain_mapping": "active"},
         "rules_loaded": len(_part_type_rules),
         "mappings_loaded": len(_grain_mappings),
+        "rules_version": rules_version(),
         "checked_at": datetime.now(UTC).isoformat(),
     }
 
@@ -261,11 +261,16 @@ def clear_system_cache(cache_type: Optional[str] = "all", admin: User = Depends(
     # Şimdilik sadece loglama yapıyoruz
     logger.info(f"Cache temizleme isteği: {cache_type}")
 
-    return {
+    result = {
         "success": True,
         "cleared_cache": cache_type,
         "timestamp": datetime.now(UTC).isoformat(),
     }
+    if cache_type in ("all", "llm"):
+        from app.services.llm_cache import llm_cache
+
+        result["llm_entries_removed"] = llm_cache.clear()
+    return result
 
 
 @router.get("/cache/stats")
@@ -284,6 +289,30 @@ def get_cache_stats(_: User = Depends(require_admin)):
     }
 
 
+@router.get("/cache/llm")
+def get_llm_cache_stats(_: User = Depends(require_admin)):
+    """LLM yanıt önbelleği isabet/ıskalama sayaçları ve doluluk."""
+    from app.services.llm_cache import llm_cache
+
+    return llm_cache.metrics()
+
+
+@router.get("/websockets/stats")
+def get_websocket_stats(_: User = Depends(require_admin)):
+    """WebSocket bağlantı başına gönderim kuyruğu ve gecikme metrikleri."""
+    from app.services.websocket_manager import manager as channel_manager
+    from app.websockets import manager as live_manager
+
+    connections = live_manager.stats() + channel_manager.stats()
+    return {
+        "total_connections": len(connections),
+        "total_queued": sum(c["queue_depth"] for c in connections),
+        "total_dropped": sum(c["dropped"] for c in connections),
+        "max_lag_seconds": max((c["lag_seconds"] for c in connections), default=0.0),
+        "connections": connections,
+    }
+
+
 # ═══════════════════════════════════════════════════
 # SİSTEM SAĞLIK KONTROLÜ
 # ═══════════════════════════════════════════════════
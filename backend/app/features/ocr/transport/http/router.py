@@ -80,7 +80,7 @@ from app.services.ocr_order_mapper import OcrOrderMapper
 from app.services.order_service import OrderService
 from app.services.orchestrator_service import OrchestratorService
 from app.services.azure_service import AzureService
-from app.utils import normalize_phone
+from app.utils import normalize_phone, phone_suffix_key
 from fastapi import APIRouter, BackgroundTasks, Depends, File, Form, UploadFile
 
 
@@ -866,56 +866,33 @@ def _match_customer_by_phone(db: Session, phone: str) -> Optional[Customer]:
 
         return customer
 
-    # Kısmi eşleşme (son 7 hane)
-
-    digits_only = normalized.removeprefix("+90")
-    if len(digits_only) >= 7:
-
-        partial = digits_only[-7:]
-
-
-
-
-
-        customers = db.query(Customer).all()
-
-
-
-
-
-
-
-
-
-        for c in customers:
-
-
-
-
-
-
-
-
-
-            if c.phone and c.phone.endswith(partial):
-
-
-
-
-
-
-
-
-
-                return c
-
-
+    # Farklı yazımla kaydedilmiş aynı numara (boşluk, tire, ülke kodu)
+    suffix_key = phone_suffix_key(normalized)
+    customer = (
+        db.query(Customer)
+        .filter(Customer.phone_suffix == suffix_key)
+        .order_by(Customer.id)
+        .first()
+    )
 
+    if customer:
 
+        return customer
 
+    # Kısmi eşleşme (son 7 hane): ters çevrilmiş anahtarın öneki, indeksli aralık sorgusu
+    if len(suffix_key) >= 7:
 
+        partial = suffix_key[:7]
+        customer = (
+            db.query(Customer)
+            .filter(Customer.phone_suffix >= partial, Customer.phone_suffix < partial + ":")
+            .order_by(Customer.id)
+            .first()
+        )
 
+        if customer:
 
+            return customer
 
     return None
 
@@ -33,12 +33,12 @@ from app.schemas import (
     ValidationResult,
 )
 from app.services.export import generate_xlsx_for_job
+from app.services.opti_xlsx_writer import OptiSheetTemplate, write_opti_workbook
 from app.services.order_service import OrderService
 from app.utils import create_audit_log, normalize_text, sanitize_filename
 from fastapi import APIRouter, Depends, File, Form, Query, Request, UploadFile
 from fastapi.responses import FileResponse
-from openpyxl import Workbook, load_workbook
-from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+from openpyxl import load_workbook
 from sqlalchemy.orm import Session, joinedload, subqueryload
 
 logger = logging.getLogger(__name__)
@@ -309,46 +309,31 @@ def _order_to_out(order: Order) -> OrderOut:
     return OrderService.order_to_out(order)
 
 
+# Tablo header satır 4'te; L kolonu metadata taşması için
+_OPTI_SHEET_TEMPLATE = OptiSheetTemplate(
+    title="OptiPlan",
+    header=("Boy", "En", "Adet", "Grain", "U1", "U2", "K1", "K2", "Açıklama", "Delik1", "Delik2"),
+    header_style="opti_table_header",
+    cell_style="opti_table_cell",
+    widths=(12, 12, 8, 14, 5, 5, 5, 5, 20, 12, 12, 14),
+)
+
+
 def _create_opti_xlsx(path: str, rows: list, order: Order, part_group: str = "GOVDE"):
     """OptiPlanning uyumlu xlsx oluştur — metadata + parça tablosu. rows: get_export_rows() çıktısı (Grain §0.3 uygulanmış)."""
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "OptiPlan"
-
-    # Stiller
-    label_font = Font(bold=True, size=10, color="1F4E79")
-    label_fill = PatternFill(start_color="D6E4F0", end_color="D6E4F0", fill_type="solid")
-    value_font = Font(size=10)
-    header_font = Font(bold=True, size=10, color="FFFFFF")
-    header_fill = PatternFill(start_color="2E75B6", end_color="2E75B6", fill_type="solid")
-    thin_border = Border(
-        left=Side(style="thin"),
-        right=Side(style="thin"),
-        top=Side(style="thin"),
-        bottom=Side(style="thin"),
-    )
+    label, value = "opti_meta_label", "opti_meta_value"
 
     # ─── Satır 1: Sipariş bilgileri ───
-    meta_labels_1 = [
+    meta_1 = [
         ("Sipariş", order.ts_code),
         ("Müşteri", order.crm_name_snapshot),
         ("Tarih", datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M")),
     ]
-    col = 1
-    for label, value in meta_labels_1:
-        c = ws.cell(row=1, column=col, value=label)
-        c.font = label_font
-        c.fill = label_fill
-        c.border = thin_border
-        c = ws.cell(row=1, column=col + 1, value=value)
-        c.font = value_font
-        c.border = thin_border
-        col += 2
 
     # ─── Satır 2: Malzeme / Plaka bilgileri ───
     thickness = order.thickness_mm if part_group == "GOVDE" else 5
     band_display = f"{order.band_mm} mm" if order.band_mm and part_group == "GOVDE" else "-"
-    meta_labels_2 = [
+    meta_2 = [
         ("Malzeme", order.material_name),
         ("Kalınlık", f"{thickness} mm"),
         ("Plaka", f"{order.plate_w_mm} x {order.plate_h_mm}"),
@@ -356,50 +341,30 @@ def _create_opti_xlsx(path: str, rows: list, order: Order, part_group: str = "GO
         ("Bant", band_display),
         ("Grup", part_group),
     ]
-    col = 1
-    for label, value in meta_labels_2:
-        c = ws.cell(row=2, column=col, value=label)
-        c.font = label_font
-        c.fill = label_fill
-        c.border = thin_border
-        c = ws.cell(row=2, column=col + 1, value=value)
-        c.font = value_font
-        c.border = thin_border
-        col += 2
-
-    # ─── Satır 3: Boş ayırıcı ───
-
-    # ─── Satır 4: Tablo header ───
-    headers = ["Boy", "En", "Adet", "Grain", "U1", "U2", "K1", "K2", "Açıklama", "Delik1", "Delik2"]
-    for ci, h in enumerate(headers, 1):
-        c = ws.cell(row=4, column=ci, value=h)
-        c.font = header_font
-        c.fill = header_fill
-        c.alignment = Alignment(horizontal="center")
-        c.border = thin_border
+    preamble = [
+        [cell for name, val in meta for cell in ((name, label), (val, value))]
+        for meta in (meta_1, meta_2)
+    ]
+    preamble.append([])  # Satır 3: Boş ayırıcı; satır 4: tablo header
 
     # ─── Satır 5+: Parça verileri (ExportRow — grain §0.3 normalize, @437/@433 metadata) ───
-    for row_idx, p in enumerate(rows, 5):
-        ws.cell(row=row_idx, column=1, value=p.boy_mm).border = thin_border
-        ws.cell(row=row_idx, column=2, value=p.en_mm).border = thin_border
-        ws.cell(row=row_idx, column=3, value=p.adet).border = thin_border
-        ws.cell(row=row_idx, column=4, value=p.grain_code).border = thin_border
-        ws.cell(row=row_idx, column=5, value=1 if p.u1 else 0).border = thin_border
-        ws.cell(row=row_idx, column=6, value=1 if p.u2 else 0).border = thin_border
-        ws.cell(row=row_idx, column=7, value=1 if p.k1 else 0).border = thin_border
-        ws.cell(row=row_idx, column=8, value=1 if p.k2 else 0).border = thin_border
-        ws.cell(row=row_idx, column=9, value=(p.part_desc or "")).border = thin_border
-        ws.cell(row=row_idx, column=10, value=(p.drill_code_1 or "")).border = thin_border
-        ws.cell(row=row_idx, column=11, value=(p.drill_code_2 or "")).border = thin_border
-
-    # Kolon genişlikleri
-    widths = [12, 12, 8, 14, 5, 5, 5, 5, 20, 12, 12]
-    for i, w in enumerate(widths):
-        ws.column_dimensions[chr(65 + i)].width = w
-    # L kolonu (metadata overflow)
-    ws.column_dimensions["L"].width = 14
-
-    wb.save(path)
+    data = [
+        [
+            p.boy_mm,
+            p.en_mm,
+            p.adet,
+            p.grain_code,
+            1 if p.u1 else 0,
+            1 if p.u2 else 0,
+            1 if p.k1 else 0,
+            1 if p.k2 else 0,
+            p.part_desc or "",
+            p.drill_code_1 or "",
+            p.drill_code_2 or "",
+        ]
+        for p in rows
+    ]
+    write_opti_workbook(path, _OPTI_SHEET_TEMPLATE, data, preamble=preamble)
 
 
 # ═══════════════════════════════════════════════════
@@ -475,6 +475,15 @@ def get_payment_statistics(
     return payment_service.get_payment_statistics(db, account_id)
 
 
+@router.get("/statistics/by-account")
+def get_payment_statistics_by_account(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_permissions(Permission.PAYMENT_VIEW)),
+):
+    """Tum cari hesaplar icin tahsilat istatistikleri (account_id -> istatistik)"""
+    return payment_service.get_payment_statistics_by_account(db)
+
+
 @router.get("/aging-report")
 def get_aging_report(
     account_id: Optional[str] = None,
@@ -483,3 +492,12 @@ def get_aging_report(
 ):
     """Yaşlandırma raporu"""
     return payment_service.get_aging_report(db, account_id)
+
+
+@router.get("/aging-report/by-account")
+def get_aging_report_by_account(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_permissions(Permission.PAYMENT_VIEW)),
+):
+    """Tum cari hesaplar icin yaslandirma raporu (account_id -> rapor)"""
+    return payment_service.get_aging_report_by_account(db)
@@ -160,8 +160,9 @@ def search_specs(
                 "thickness_mm": float(spec.thickness_mm) if spec.thickness_mm else 0,
                 "width_cm": float(spec.width_cm) if spec.width_cm else 0,
                 "height_cm": float(spec.height_cm) if spec.height_cm else 0,
-                "spec_hash": spec.spec_hash or "",
+                "spec_code": spec.spec_code or "",
                 "match_status": r["match_status"],
+                "score": r["score"],
                 "supplier_items": [
                     {
                         "id": si.id,
@@ -211,6 +212,17 @@ def create_item(
     )
 
 
+@router.post("/items/bulk", response_model=List[ItemOut], status_code=201)
+def create_items_bulk(
+    body: List[ItemCreate],
+    db: Session = Depends(get_db),
+    _: User = Depends(require_permissions(Permission.PRODUCT_CREATE)),
+):
+    """Toplu SKU oluşturma; stok kodları tek seferde blok halinde ayrılır."""
+    svc = ProductService(db)
+    return svc.create_items([row.model_dump() for row in body])
+
+
 # ── Incoming Specs ──────────────────────────────────────
 @router.post("/incoming", response_model=IncomingSpecOut, status_code=201)
 def process_incoming(
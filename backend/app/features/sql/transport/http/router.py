@@ -4,13 +4,14 @@ Veritabanı tabloları görüntüleme, sorgu çalıştırma, veri yönetimi
 """
 
 from datetime import datetime, timezone
-from typing import Any, List, Optional
+from typing import Any, List, Literal, Optional
 from uuid import uuid4
 
 from app.auth import require_admin
 from app.database import engine, get_db
 from app.exceptions import BusinessRuleError, NotFoundError
 from app.models import AuditLog, User
+from app.services.query_export_service import open_query_export
 from app.utils import create_audit_log
 from fastapi import APIRouter, Depends
 from pydantic import BaseModel, ConfigDict
@@ -41,6 +42,12 @@ class QueryResult(BaseModel):
     truncated: bool
 
 
+class ExportStreamRequest(BaseModel):
+    sql: str
+    format: Literal["csv", "xlsx"] = "csv"
+    max_rows: Optional[int] = None  # None: sınırsız
+
+
 class TableDataResult(BaseModel):
     table: str
     columns: List[str]
@@ -435,6 +442,36 @@ def export_query_result(
         media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         headers={"Content-Disposition": f"attachment; filename*=UTF-8''{encoded_filename}"},
     )
+
+
+@router.post("/export/stream")
+def export_query_stream(
+    body: ExportStreamRequest,
+    db: Session = Depends(get_db),
+    admin: User = Depends(require_admin),
+):
+    """Sorgu sonucunu satır sınırı olmadan akış halinde indir (CSV / XLSX)"""
+    if not _is_safe_query(body.sql):
+        raise BusinessRuleError("Güvenli olmayan sorgu")
+
+    # Audit log akıştan önce: açık okuma cursor'ı SQLite yazımını kilitlemesin
+    create_audit_log(db, admin.id, "SQL_EXPORT", body.sql[:200], None)
+    db.commit()
+
+    sql_query = body.sql.strip().rstrip(";")
+    try:
+        stream = open_query_export(db.get_bind(), sql_query, body.format, max_rows=body.max_rows)
+    except Exception as e:
+        raise BusinessRuleError(f"SQL Hatası: {str(e)}")
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    encoded_filename = urllib.parse.quote(f"export_{timestamp}.{body.format}")
+
+    return StreamingResponse(
+        stream,
+        media_type=stream.media_type,
+        headers={"Content-Disposition": f"attachment; filename*=UTF-8''{encoded_filename}"},
+    )
 
 
 
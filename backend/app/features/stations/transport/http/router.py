@@ -19,6 +19,7 @@ from app.auth import get_current_user, require_admin
 from app.database import SessionLocal
 from app.exceptions import BusinessRuleError, ConflictError, NotFoundError, StatusTransitionError
 from app.models import Station, StatusLog
+from app.services.part_status_service import get_current_status
 
 router = APIRouter(prefix="/api/v1", tags=["stations"])
 
@@ -195,12 +196,8 @@ def transition_station(
     db: Session = Depends(get_db),
     _=Depends(get_current_user),
 ):
-    current_log = (
-        db.query(StatusLog)
-        .filter(StatusLog.part_id == part_id)
-        .order_by(StatusLog.created_at.desc())
-        .first()
-    )
+    # part_current_status: son StatusLog'un projeksiyonu, PK okuması
+    current_log = get_current_status(db, part_id)
 
     if current_log:
         current_station = db.query(Station).filter(Station.id == current_log.station_id).first()
@@ -271,12 +268,7 @@ def scan_barcode(
             parsed_part_id = None
 
     if parsed_part_id is not None:
-        current_log = (
-            db.query(StatusLog)
-            .filter(StatusLog.part_id == parsed_part_id)
-            .order_by(StatusLog.created_at.desc())
-            .first()
-        )
+        current_log = get_current_status(db, parsed_part_id)
         if current_log:
             prev_station = db.query(Station).filter(Station.id == current_log.station_id).first()
             prev_name = prev_station.name if prev_station else ""
@@ -285,7 +277,7 @@ def scan_barcode(
                 raise StatusTransitionError(prev_name, station.name, allowed)
 
             if _requires_second_scan_wait(prev_name, station.name):
-                last_scan_time = _ensure_aware(current_log.created_at)
+                last_scan_time = _ensure_aware(current_log.changed_at)
                 if last_scan_time is not None:
                     elapsed_minutes = int(
                         (datetime.now(timezone.utc) - last_scan_time).total_seconds() / 60
@@ -0,0 +1,203 @@
+"""
+OptiPlan360 — Sahte SMTP Sunucusu
+EHLO / AUTH PLAIN / MAIL / RCPT / DATA / RSET / NOOP / QUIT komutlarını
+destekleyen küçük bir SMTP ucu. E-posta dispatcher'ının bağlantı yeniden
+kullanımını, parti gönderimini ve yeniden deneme davranışını gerçek sunucuya
+dokunmadan yerelde ölçmek için kullanılır (STARTTLS yoktur; SMTP_STARTTLS=0).
+
+Çalıştır:
+    python -m app.integrations.smtp_fake --port 2525 --fail-first 1
+    SMTP_HOST=127.0.0.1 SMTP_PORT=2525 SMTP_STARTTLS=0 ile dispatcher bu uca yönlenir.
+
+Testlerde ``FakeSMTPServer(state).start()`` ile arka planda, rastgele portta açılır.
+"""
+
+import argparse
+import base64
+import socketserver
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+
+class FakeSMTPState:
+    """Sahte sunucunun davranış ayarları ve gözlenen oturumlar."""
+
+    def __init__(
+        self,
+        username: str = "user",
+        password: str = "secret",
+        fail_first: int = 0,
+        reject: Optional[Dict[str, Tuple[int, str]]] = None,
+        drop_after: Optional[int] = None,
+    ):
+        self.username = username
+        self.password = password
+        self.fail_first = fail_first  # Her alıcı için ilk N RCPT geçici hata (451)
+        self.reject = reject or {}  # alıcı -> (kod, mesaj); or. {"x@y": (550, "No such user")}
+        self.drop_after = drop_after  # Bağlantı başına N mesajdan sonra bağlantıyı kopar
+
+        self.connections = 0
+        self.logins = 0
+        self.attempts: Counter = Counter()
+        self.messages: List[Tuple[str, List[str], bytes]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def delivered(self) -> List[str]:
+        return [rcpt for _sender, rcpts, _data in self.messages for rcpt in rcpts]
+
+    def stats(self) -> dict:
+        return {
+            "connections": self.connections,
+            "logins": self.logins,
+            "delivered": len(self.messages),
+            "rcpt_attempts": sum(self.attempts.values()),
+        }
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def _reply(self, line: str) -> None:
+        self.wfile.write(line.encode("ascii") + b"\r\n")
+
+    def handle(self) -> None:
+        state: FakeSMTPState = self.server.state
+        with state._lock:
+            state.connections += 1
+        self._reply("220 fake.smtp ESMTP")
+        authenticated = False
+        sender: Optional[str] = None
+        rcpts: List[str] = []
+        delivered = 0
+
+        while True:
+            raw = self.rfile.readline()
+            if not raw:
+                return
+            line = raw.decode("utf-8", "replace").rstrip("\r\n")
+            verb, _, arg = line.partition(" ")
+            verb = verb.upper()
+
+            if verb in ("EHLO", "HELO"):
+                if verb == "EHLO":
+                    self._reply("250-fake.smtp")
+                    self._reply("250-8BITMIME")
+                    self._reply("250 AUTH PLAIN")
+                else:
+                    self._reply("250 fake.smtp")
+            elif verb == "AUTH":
+                mechanism, _, token = arg.partition(" ")
+                try:
+                    _authz, user, password = base64.b64decode(token).decode().split("\0")
+                except ValueError:
+                    user = password = None
+                if mechanism.upper() == "PLAIN" and (user, password) == (state.username, state.password):
+                    authenticated = True
+                    with state._lock:
+                        state.logins += 1
+                    self._reply("235 2.7.0 Authentication successful")
+                else:
+                    self._reply("535 5.7.8 Authentication credentials invalid")
+            elif verb == "MAIL":
+                if not authenticated:
+                    self._reply("530 5.7.0 Authentication required")
+                    continue
+                sender, rcpts = arg.split(":", 1)[1].strip().strip("<>"), []
+                self._reply("250 OK")
+            elif verb == "RCPT":
+                rcpt = arg.split(":", 1)[1].strip().strip("<>")
+                with state._lock:
+                    state.attempts[rcpt] += 1
+                    attempt = state.attempts[rcpt]
+                if rcpt in state.reject:
+                    code, message = state.reject[rcpt]
+                    self._reply(f"{code} {message}")
+                elif attempt <= state.fail_first:
+                    self._reply("451 4.3.0 Try again later")
+                else:
+                    rcpts.append(rcpt)
+                    self._reply("250 OK")
+            elif verb == "DATA":
+                if sender is None or not rcpts:
+                    self._reply("503 5.5.1 Bad sequence of commands")
+                    continue
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                while True:
+                    chunk = self.rfile.readline()
+                    if not chunk or chunk in (b".\r\n", b".\n"):
+                        break
+                    lines.append(chunk[1:] if chunk.startswith(b"..") else chunk)
+                with state._lock:
+                    state.messages.append((sender, rcpts, b"".join(lines)))
+                sender, rcpts = None, []
+                delivered += 1
+                self._reply("250 OK queued")
+                if state.drop_after is not None and delivered >= state.drop_after:
+                    return  # Sunucu tarafı bağlantı kopması taklidi
+            elif verb == "RSET":
+                sender, rcpts = None, []
+                self._reply("250 OK")
+            elif verb == "NOOP":
+                self._reply("250 OK")
+            elif verb == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 5.5.2 Command not recognized")
+
+
+class FakeSMTPServer(socketserver.ThreadingTCPServer):
+    """Arka plan thread'inde çalışan sahte SMTP sunucusu; durum ``state`` üzerindedir."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, state: Optional[FakeSMTPState] = None, host: str = "127.0.0.1", port: int = 0):
+        self.state = state or FakeSMTPState()
+        super().__init__((host, port), _SMTPHandler)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def start(self) -> "FakeSMTPServer":
+        self._thread = threading.Thread(target=self.serve_forever, name="fake-smtp", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sahte SMTP sunucusu")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=2525)
+    parser.add_argument("--username", default="user")
+    parser.add_argument("--password", default="secret")
+    parser.add_argument("--fail-first", type=int, default=0)
+    parser.add_argument("--drop-after", type=int, default=None)
+    args = parser.parse_args()
+
+    state = FakeSMTPState(
+        username=args.username,
+        password=args.password,
+        fail_first=args.fail_first,
+        drop_after=args.drop_after,
+    )
+    server = FakeSMTPServer(state, host=args.host, port=args.port)
+    print(f"Fake SMTP {args.host}:{server.port} dinleniyor")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(state.stats())
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
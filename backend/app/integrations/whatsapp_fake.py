@@ -0,0 +1,153 @@
+"""
+OptiPlan360 — Sahte WhatsApp Cloud API
+Graph API'nin ``POST /{api_version}/{phone_number_id}/messages`` ucunu taklit eder.
+WhatsApp dispatcher'ının verim (throughput), hız sınırı ve yeniden deneme
+davranışını gerçek hesaba dokunmadan yerelde ölçmek için kullanılır.
+
+Çalıştır:
+    python -m app.integrations.whatsapp_fake --port 9100 --fail-first 1 --max-rps 20
+    WHATSAPP_API_BASE_URL=http://127.0.0.1:9100 ile dispatcher bu uca yönlenir.
+
+Testlerde uygulama ``httpx.ASGITransport(app=create_app(...))`` ile doğrudan bağlanır.
+"""
+
+import argparse
+import asyncio
+import itertools
+import random
+import time
+from collections import Counter, deque
+from typing import Deque, List, Optional
+
+from fastapi import FastAPI, Header, Request
+from fastapi.responses import JSONResponse
+
+
+class FakeWhatsAppState:
+    """Sahte ucun davranış ayarları ve gözlenen istekler."""
+
+    def __init__(
+        self,
+        fail_first: int = 0,
+        fail_rate: float = 0.0,
+        fail_status: int = 503,
+        latency: float = 0.0,
+        max_rps: Optional[float] = None,
+    ):
+        self.fail_first = fail_first  # Her alıcı için ilk N istek başarısız
+        self.fail_rate = fail_rate  # Kalan isteklerde rastgele hata oranı
+        self.fail_status = fail_status
+        self.latency = latency  # Yanıt gecikmesi (saniye)
+        self.max_rps = max_rps  # Aşılırsa 429 döner (Cloud API hız sınırı taklidi)
+
+        self.attempts: Counter = Counter()
+        self.delivered: List[str] = []
+        self.rate_limited = 0
+        self.failed = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._window: Deque[float] = deque()
+        self._ids = itertools.count(1)
+
+    def _over_rate_limit(self, now: float) -> bool:
+        if not self.max_rps:
+            return False
+        while self._window and now - self._window[0] >= 1.0:
+            self._window.popleft()
+        if len(self._window) >= self.max_rps:
+            return True
+        self._window.append(now)
+        return False
+
+    def stats(self) -> dict:
+        return {
+            "requests": sum(self.attempts.values()),
+            "delivered": len(self.delivered),
+            "failed": self.failed,
+            "rate_limited": self.rate_limited,
+            "max_in_flight": self.max_in_flight,
+        }
+
+
+def _error(status_code: int, message: str) -> JSONResponse:
+    return JSONResponse(
+        status_code=status_code,
+        content={"error": {"message": message, "type": "FakeWhatsAppError", "code": status_code}},
+    )
+
+
+def create_app(state: Optional[FakeWhatsAppState] = None) -> FastAPI:
+    """Sahte Cloud API uygulamasını oluştur; durum ``app.state.fake`` üzerindedir."""
+    state = state or FakeWhatsAppState()
+    app = FastAPI(title="Fake WhatsApp Cloud API")
+    app.state.fake = state
+
+    @app.post("/{api_version}/{phone_number_id}/messages")
+    async def send_message(
+        api_version: str,
+        phone_number_id: str,
+        request: Request,
+        authorization: str = Header(default=""),
+    ):
+        if not authorization.startswith("Bearer "):
+            return _error(401, "Invalid OAuth access token")
+
+        payload = await request.json()
+        to = str(payload.get("to", ""))
+        if not to:
+            return _error(400, "Missing recipient")
+
+        if state._over_rate_limit(time.monotonic()):
+            state.rate_limited += 1
+            return _error(429, "Too many requests")
+
+        state.attempts[to] += 1
+        state.in_flight += 1
+        state.max_in_flight = max(state.max_in_flight, state.in_flight)
+        try:
+            if state.latency:
+                await asyncio.sleep(state.latency)
+            if state.attempts[to] <= state.fail_first or random.random() < state.fail_rate:
+                state.failed += 1
+                return _error(state.fail_status, "Simulated failure")
+            state.delivered.append(to)
+            return {
+                "messaging_product": "whatsapp",
+                "contacts": [{"input": to, "wa_id": to}],
+                "messages": [{"id": f"wamid.fake{next(state._ids)}"}],
+            }
+        finally:
+            state.in_flight -= 1
+
+    @app.get("/stats")
+    async def stats():
+        return state.stats()
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sahte WhatsApp Cloud API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--fail-first", type=int, default=0)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--fail-status", type=int, default=503)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--max-rps", type=float, default=None)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    state = FakeWhatsAppState(
+        fail_first=args.fail_first,
+        fail_rate=args.fail_rate,
+        fail_status=args.fail_status,
+        latency=args.latency,
+        max_rps=args.max_rps,
+    )
+    uvicorn.run(create_app(state), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,12 +2,27 @@
 OptiPlan 360 - Log Rotation Konfigürasyonu
 
 Üretim ortamında log dosyalarının boyutunu sınırlar ve eski logları arşivler.
+
+Dosya yazımı istek yolunda yapılmaz: root logger'a yalnız bir QueueHandler
+bağlanır, dosya/console handler'ları arka plandaki QueueListener thread'inde
+çalışır. Kayıtlar JSON formatında, request_id/job_id alanlarıyla yazılır.
+Gürültülü modüller için örnekleme ve saniye başı sınır tanımlanabilir.
 """
 
+import atexit
+import contextvars
+import json
 import logging
 import logging.handlers
 import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
 
 # Log dizini
 LOG_DIR = Path(os.getenv("LOG_DIR", "./logs"))
@@ -15,6 +30,160 @@ LOG_DIR = Path(os.getenv("LOG_DIR", "./logs"))
 # Log seviyesi
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 
+# Dosya log formatı: json | text
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+
+# Kuyruk kapasitesi; dolarsa kayıt düşürülür (istek yolu asla bloklanmaz)
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+# Modül bazlı örnekleme: "app.services.price_tracking_service=0.1,app.services.x=0.5"
+LOG_SAMPLING = os.getenv("LOG_SAMPLING", "")
+
+# Modül bazlı saniye başı sınır: "app.services.price_tracking_service=20"
+LOG_RATE_LIMITS = os.getenv("LOG_RATE_LIMITS", "")
+
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "request_id", default=None
+)
+job_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("job_id", default=None)
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+@contextmanager
+def bind_log_context(
+    request_id: Optional[str] = None, job_id: Optional[str] = None
+) -> Iterator[None]:
+    """Blok süresince loglara request_id/job_id ekle."""
+    tokens = []
+    if request_id is not None:
+        tokens.append((request_id_var, request_id_var.set(request_id)))
+    if job_id is not None:
+        tokens.append((job_id_var, job_id_var.set(str(job_id))))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+class ContextFilter(logging.Filter):
+    """Çağıran thread'in context değişkenlerini kayda işler (kuyruğa girmeden önce)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "request_id"):
+            record.request_id = request_id_var.get()
+        if not hasattr(record, "job_id"):
+            record.job_id = job_id_var.get()
+        return True
+
+
+def _parse_rules(raw: str, cast) -> Dict[str, float]:
+    rules: Dict[str, float] = {}
+    for item in raw.split(","):
+        name, sep, value = item.partition("=")
+        if not sep or not name.strip():
+            continue
+        try:
+            rules[name.strip()] = cast(value.strip())
+        except ValueError:
+            continue
+    return rules
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Gürültülü logger'lar için örnekleme ve saniye başı sınır.
+    WARNING ve üstü kayıtlar her zaman geçer. Kural en uzun logger öneki ile eşleşir.
+    """
+
+    def __init__(
+        self,
+        sample_rates: Optional[Dict[str, float]] = None,
+        rate_limits: Optional[Dict[str, float]] = None,
+    ):
+        super().__init__()
+        self.sample_rates = sample_rates or {}
+        self.rate_limits = rate_limits or {}
+        self._windows: Dict[str, Tuple[int, int]] = {}  # prefix -> (saniye, sayaç)
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    @staticmethod
+    def _match(name: str, rules: Dict[str, float]) -> Optional[str]:
+        best = None
+        for prefix in rules:
+            if name == prefix or name.startswith(prefix + "."):
+                if best is None or len(prefix) > len(best):
+                    best = prefix
+        return best
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+
+        prefix = self._match(record.name, self.sample_rates)
+        if prefix is not None and random.random() >= self.sample_rates[prefix]:
+            self.dropped += 1
+            return False
+
+        prefix = self._match(record.name, self.rate_limits)
+        if prefix is not None:
+            second = int(time.monotonic())
+            with self._lock:
+                window, count = self._windows.get(prefix, (second, 0))
+                if window != second:
+                    window, count = second, 0
+                if count >= self.rate_limits[prefix]:
+                    self.dropped += 1
+                    return False
+                self._windows[prefix] = (window, count + 1)
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Tek satırlık JSON log kaydı."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+            "job_id": getattr(record, "job_id", None),
+        }
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            # Kuyruktan gelen kayıtlarda traceback önceden metne çevrilmiştir
+            payload["exc_info"] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Kuyruk doluysa bekleme yapmadan kaydı düşüren QueueHandler."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Mesajı çağıran thread'de birleştir; formatlama listener'daki handler'lara kalır
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
 
 def _ensure_log_dir() -> Path | None:
     """
@@ -28,26 +197,10 @@ def _ensure_log_dir() -> Path | None:
         return None
 
 
-def setup_logging() -> logging.Logger:
-    """
-    Uygulama loglama konfigürasyonunu ayarla.
-
-    Özellikler:
-    - RotatingFileHandler: 10MB'da bir yeni dosya oluşturur, 5 yedek tutar
-    - TimedRotatingFileHandler: Günlük log döndürme (gece yarısı)
-    - ConsoleHandler: Geliştirme ortamı için stdout
-    """
-    # Root logger
-    root_logger = logging.getLogger()
-    if getattr(root_logger, "_optiplan_logging_configured", False):
-        return root_logger
-
-    root_logger.setLevel(getattr(logging, LOG_LEVEL.upper()))
-
-    # Formatter
-    formatter = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
-    )
+def _build_handlers(formatter: logging.Formatter) -> list[logging.Handler]:
+    """Listener thread'inde çalışacak gerçek (bloklayan) handler'lar."""
+    handlers: list[logging.Handler] = []
+    file_formatter = JsonFormatter() if LOG_FORMAT == "json" else formatter
 
     log_dir = _ensure_log_dir()
     if log_dir is not None:
@@ -60,8 +213,8 @@ def setup_logging() -> logging.Logger:
                 encoding="utf-8",
             )
             app_handler.setLevel(logging.INFO)
-            app_handler.setFormatter(formatter)
-            root_logger.addHandler(app_handler)
+            app_handler.setFormatter(file_formatter)
+            handlers.append(app_handler)
         except OSError:
             pass
 
@@ -75,8 +228,8 @@ def setup_logging() -> logging.Logger:
                 encoding="utf-8",
             )
             daily_handler.setLevel(logging.INFO)
-            daily_handler.setFormatter(formatter)
-            root_logger.addHandler(daily_handler)
+            daily_handler.setFormatter(file_formatter)
+            handlers.append(daily_handler)
         except OSError:
             pass
 
@@ -89,8 +242,8 @@ def setup_logging() -> logging.Logger:
                 encoding="utf-8",
             )
             error_handler.setLevel(logging.ERROR)
-            error_handler.setFormatter(formatter)
-            root_logger.addHandler(error_handler)
+            error_handler.setFormatter(file_formatter)
+            handlers.append(error_handler)
         except OSError:
             pass
 
@@ -99,19 +252,70 @@ def setup_logging() -> logging.Logger:
         console_handler = logging.StreamHandler()
         console_handler.setLevel(logging.DEBUG)
         console_handler.setFormatter(formatter)
-        root_logger.addHandler(console_handler)
+        handlers.append(console_handler)
 
-    if not root_logger.handlers:
+    if not handlers:
         fallback_handler = logging.StreamHandler()
         fallback_handler.setLevel(logging.INFO)
         fallback_handler.setFormatter(formatter)
-        root_logger.addHandler(fallback_handler)
+        handlers.append(fallback_handler)
+
+    return handlers
+
+
+def setup_logging() -> logging.Logger:
+    """
+    Uygulama loglama konfigürasyonunu ayarla.
+
+    Özellikler:
+    - QueueHandler + QueueListener: dosya I/O'su arka plan thread'inde yapılır
+    - RotatingFileHandler: 10MB'da bir yeni dosya oluşturur, 5 yedek tutar
+    - TimedRotatingFileHandler: Günlük log döndürme (gece yarısı)
+    - ConsoleHandler: Geliştirme ortamı için stdout
+    - JSON kayıt formatı (LOG_FORMAT=text ile düz metin)
+    - LOG_SAMPLING / LOG_RATE_LIMITS ile modül bazlı örnekleme ve sınır
+    """
+    global _listener
+
+    # Root logger
+    root_logger = logging.getLogger()
+    if getattr(root_logger, "_optiplan_logging_configured", False):
+        return root_logger
+
+    root_logger.setLevel(getattr(logging, LOG_LEVEL.upper()))
+
+    # Formatter
+    formatter = logging.Formatter(
+        "%(asctime)s - %(name)s - %(levelname)s - %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
+    )
+
+    log_queue: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    queue_handler = DroppingQueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter())
+    queue_handler.addFilter(
+        SamplingFilter(_parse_rules(LOG_SAMPLING, float), _parse_rules(LOG_RATE_LIMITS, float))
+    )
+    root_logger.addHandler(queue_handler)
+
+    _listener = logging.handlers.QueueListener(
+        log_queue, *_build_handlers(formatter), respect_handler_level=True
+    )
+    _listener.start()
+    atexit.register(stop_logging)
 
     setattr(root_logger, "_optiplan_logging_configured", True)
 
     return root_logger
 
 
+def stop_logging() -> None:
+    """Kuyruktaki kayıtları boşalt ve listener thread'ini durdur."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
 def get_logger(name: str) -> logging.Logger:
     """Modül için logger al."""
     return logging.getLogger(name)
@@ -26,7 +26,13 @@ from .middleware.cache_middleware import CacheMiddleware
 from .rate_limit import limiter
 from .routers.v1 import v1_router
 from .security import add_security_middleware
-from .tasks.reminders import start_scheduler
+from .services.maintenance_service import (
+    seed_admin_user,
+    seed_canonical_stations,
+    startup_status,
+    sync_schema,
+)
+from .tasks.reminders import schedule_startup_backfill, start_scheduler, stop_scheduler
 
 # Setup logging with rotation
 
@@ -230,357 +236,69 @@ async def orchestrator_root():
     }
 
 
-def _seed_canonical_stations(db: Session) -> None:
-    """
-
-
-
-
-    MASTER_HANDOFF §0.6 – 5 kanonik üretim istasyonunu oluşturur.
-
-
-
-
-    İdempotent: mevcut ise atlar.
-
-
-
-
-    """
-
-    from .models import Station
-
-    canonical = [
-        {
-            "name": "Hazırlık",
-            "description": "Malzeme hazırlama ve kesim hazırlığı (İki okutmalı: 1. okutma başlangıç)",
-            "istasyon_durumu": "Hazır",
-        },
-        {
-            "name": "Ebatlama",
-            "description": "Parçaların boyutlandırılması (İki okutmalı: 2. okutma tamamlandı)",
-            "istasyon_durumu": "Hazır",
-        },
-        {
-            "name": "Bantlama",
-            "description": "Kenar bantı uygulanması",
-            "istasyon_durumu": "Hazır",
-        },
-        {
-            "name": "Kontrol",
-            "description": "Kalite kontrolü (İki okutmalı: 1. okutma teslimata hazır)",
-            "istasyon_durumu": "Hazır",
-        },
-        {
-            "name": "Teslim",
-            "description": "Teslimat ve paketleme (İki okutmalı: 2. okutma teslimat yapıldı)",
-            "istasyon_durumu": "Hazır",
-        },
-    ]
-
-    created = 0
-
-    for s in canonical:
-
-        exists = db.query(Station).filter(Station.name == s["name"]).first()
-
-        if not exists:
-
-            db.add(
-                Station(
-                    name=s["name"],
-                    description=s["description"],
-                    active=True,
-                    istasyon_durumu=s["istasyon_durumu"],
-                )
-            )
-
-            created += 1
-
-    if created:
-
-        db.commit()
-
-        logger.info("Kanonik istasyonlar oluşturuldu: %d adet", created)
-
-
-def _seed_admin_user(db: Session) -> None:
+def _run_startup_tasks():
     """
-
-
-
-
-    Varsayılan admin kullanıcısını oluşturur.
-
-
-
-
-    İdempotent: admin zaten varsa atlar.
-
-
-
-
+    Trafik almadan önceki hızlı adımlar: şema senkronu, tohumlar, zamanlayıcı.
+    Tam tablo backfill'leri hazır olduktan sonra arka planda yürür
+    (bkz. app/services/maintenance_service.py, scripts/maintenance.py).
     """
-
-    from .auth import hash_password
-
-    existing = db.query(models.User).filter(models.User.username == "admin").first()
-
-    if existing:
-
-        # Şifre hash'i yoksa veya boşsa yeniden oluştur
-
-        if not existing.password_hash:
-
-            existing.password_hash = hash_password("admin")
-
-            db.commit()
-
-            logger.info("Admin kullanıcısının şifresi güncellendi.")
-
-        return
-
-    admin_user = models.User(
-        username="admin",
-        email="admin@optiplan360.local",
-        display_name="Admin",
-        password_hash=hash_password("admin"),
-        role="ADMIN",
-        is_active=True,
-    )
-
-    db.add(admin_user)
-
-    db.commit()
-
-    logger.info("Varsayılan admin kullanıcısı oluşturuldu (admin/admin).")
-
-
-def _column_exists(conn, table_name: str, column_name: str) -> bool:
-
-    dialect = conn.dialect.name
-
-    if dialect == "sqlite":
-
-        rows = conn.execute(text(f"PRAGMA table_info({table_name})")).fetchall()
-
-        return any(str(row[1]) == column_name for row in rows)
-
-    row = conn.execute(
-        text(
-            """
-
-
-
-
-            SELECT 1
-
-
-
-
-            FROM information_schema.columns
-
-
-
-
-            WHERE table_schema = current_schema()
-
-
-
-
-              AND table_name = :table_name
-
-
-
-
-              AND column_name = :column_name
-
-
-
-
-            LIMIT 1
-
-
-
-
-            """
-        ),
-        {"table_name": table_name, "column_name": column_name},
-    ).first()
-
-    return row is not None
-
-
-def _add_column_if_missing(conn, table_name: str, column_name: str, column_sql: str) -> bool:
-
-    if _column_exists(conn, table_name, column_name):
-
-        return False
-
-    conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_sql}"))
-
-    return True
-
-
-def _run_startup_schema_fixes() -> None:
-
-    added_columns: list[str] = []
-
-    with engine.begin() as conn:
-
-        column_specs: list[tuple[str, str, str]] = [
-            ("orders", "tracking_token", "VARCHAR(36)"),
-            ("stations", "device_type", "VARCHAR"),
-            ("stations", "device_model", "VARCHAR"),
-            ("stations", "device_serial_number", "VARCHAR"),
-            ("stations", "ip_address", "VARCHAR"),
-            ("stations", "connection_type", "VARCHAR"),
-            ("stations", "installation_date", "TIMESTAMP"),
-            ("stations", "last_maintenance_date", "TIMESTAMP"),
-            ("crm_accounts", "plaka_birim_fiyat", "DOUBLE PRECISION"),
-            ("crm_accounts", "bant_metre_fiyat", "DOUBLE PRECISION"),
-            ("opti_jobs", "claim_token", "VARCHAR"),
-            ("opti_jobs", "xml_file_path", "VARCHAR"),
-            ("opti_jobs", "result_json", "TEXT"),
-            ("orders", "order_no", "INTEGER"),
-            ("orders", "reminder_count", "INTEGER DEFAULT 0"),
-            ("orders", "last_reminder_at", "TIMESTAMP"),
-        ]
-
-        for table_name, column_name, column_sql in column_specs:
-
-            try:
-
-                if _add_column_if_missing(conn, table_name, column_name, column_sql):
-
-                    added_columns.append(f"{table_name}.{column_name}")
-
-            except Exception as exc:
-
-                logger.warning("Schema fix atlandi (%s.%s): %s", table_name, column_name, exc)
-
+    # Eksik tablo/kolonlari olustur (migrate edilmemislerse)
+    if os.getenv("STARTUP_SCHEMA_SYNC", "1") == "1":
         try:
-
-            conn.execute(
-                text(
-                    "CREATE UNIQUE INDEX IF NOT EXISTS ix_orders_tracking_token ON orders(tracking_token)"
-                )
-            )
-
-            conn.execute(
-                text(
-                    "CREATE UNIQUE INDEX IF NOT EXISTS uq_single_opti_running "
-                    "ON opti_jobs(state) WHERE state = 'OPTI_RUNNING'"
-                )
-            )
-
+            sync_schema(engine)
+            logger.info("DB tablolari kontrol edildi / olusturuldu.")
         except Exception as exc:
-
-            logger.warning("Schema index fix atlandi: %s", exc)
-
-    if added_columns:
-
-        logger.info("Schema self-heal: %d kolon eklendi.", len(added_columns))
-
-    else:
-
-        logger.info("Schema self-heal: eksik kolon bulunmadi.")
-
-
-def _run_startup_tasks():
-
-    # Eksik tablolari otomatik olustur (migrate edilmemislerse)
-
-    try:
-
-        models.Base.metadata.create_all(bind=engine, checkfirst=True)
-
-        _run_startup_schema_fixes()
-
-        logger.info("DB tablolari kontrol edildi / olusturuldu.")
-
-        # Runtime UUID + order_no doldurma
-
-        db = SessionLocal()
-
-        try:
-
-            import uuid
-
-            from app.models import Order
-
-            null_orders = db.query(Order).filter(Order.tracking_token == None).all()
-
-            if null_orders:
-
-                for o in null_orders:
-
-                    o.tracking_token = str(uuid.uuid4())
-
-                db.commit()
-
-                logger.info(f"{len(null_orders)} eski siparise tracking_token atandi.")
-
-            # Mevcut siparişlere sıralı order_no ata
-
-            null_no_orders = (
-                db.query(Order)
-                .filter(Order.order_no == None)
-                .order_by(Order.created_at.asc())
-                .all()
-            )
-
-            if null_no_orders:
-
-                from sqlalchemy import func as sa_func
-
-                max_no = db.query(sa_func.max(Order.order_no)).scalar() or 0
-
-                for o in null_no_orders:
-
-                    max_no += 1
-
-                    o.order_no = max_no
-
-                db.commit()
-
-                logger.info(f"{len(null_no_orders)} eski siparise order_no atandi.")
-
-        except Exception:
-
-            pass
-
-        finally:
-
-            db.close()
-
-    except Exception as exc:
-
-        logger.warning("Tablo olusturma hatasi (atlaniyor): %s", exc)
-
+            logger.warning("Tablo olusturma hatasi (atlaniyor): %s", exc)
     start_scheduler()
-
     db = SessionLocal()
-
     try:
-
-        _seed_canonical_stations(db)
-
-        _seed_admin_user(db)
-
+        seed_canonical_stations(db)
+        seed_admin_user(db)
     except Exception as exc:
-
         logger.warning("Seed hatası (atlanıyor): %s", exc)
-
     finally:
-
         db.close()
 
 
+def _start_background_backfill():
+    """Backfill zamanlayıcı lideri üzerinde, tamamlanana kadar yeniden denenen iş olarak yürür."""
+    if os.getenv("STARTUP_BACKFILL", "1") != "1":
+        startup_status.backfill = "skipped"
+        return
+    schedule_startup_backfill(SessionLocal)
+
+
 @asynccontextmanager
 async def lifespan(_: FastAPI):
+    startup_status.started_at = time.monotonic()
     _run_startup_tasks()
+    from app.services.event_bus import bus as ws_event_bus
+
+    await ws_event_bus.start()
+    whatsapp_dispatcher_enabled = os.getenv("WHATSAPP_DISPATCHER_ENABLED", "0") == "1"
+    if whatsapp_dispatcher_enabled:
+        from app.services.whatsapp_scheduler import start_dispatcher
+
+        await start_dispatcher()
+    email_dispatcher_enabled = os.getenv("EMAIL_DISPATCHER_ENABLED", "1") == "1"
+    if email_dispatcher_enabled:
+        from app.services.email_dispatcher import start_dispatcher as start_email_dispatcher
+
+        start_email_dispatcher()
+    startup_status.mark_ready()
+    _start_background_backfill()
     yield
+    startup_status.stop_backfill()
+    if whatsapp_dispatcher_enabled:
+        from app.services.whatsapp_scheduler import stop_dispatcher
+
+        await stop_dispatcher()
+    if email_dispatcher_enabled:
+        from app.services.email_dispatcher import stop_dispatcher as stop_email_dispatcher
+
+        stop_email_dispatcher()
+    await ws_event_bus.stop()
+    stop_scheduler()
 
 app.router.lifespan_context = lifespan
 
@@ -660,6 +378,36 @@ def health_check(db: Session = Depends(get_db), response: Response = None):
         "version": "1.0.0",
         "database": "healthy" if db_healthy else "unhealthy",
         "service": "OPTIPLAN360 API",
+        "ready": startup_status.ready,
+        "startup": startup_status.to_dict(),
+    }
+
+
+@app.get("/health/live")
+def liveness_check():
+    """Canlılık: süreç istek yanıtlıyor. DB'ye dokunmaz (yeniden başlatma kararı için)."""
+    return {"status": "alive", "timestamp": datetime.now(UTC).isoformat()}
+
+
+@app.get("/health/ready")
+def readiness_check(db: Session = Depends(get_db), response: Response = None):
+    """
+    Hazır olma: açılış adımları bitti ve DB erişilebilir (trafik yönlendirme için).
+    Arka plan backfill'i sürerken de hazırdır; ilerlemesi ``startup`` altında raporlanır.
+    """
+    db_healthy = False
+    try:
+        db.execute(text("SELECT 1"))
+        db_healthy = True
+    except Exception as e:
+        logger.error(f"Readiness DB hatası: {e}")
+    ready = startup_status.ready and db_healthy
+    if not ready and response is not None:
+        response.status_code = 503
+    return {
+        "status": "ready" if ready else "not_ready",
+        "database": "healthy" if db_healthy else "unhealthy",
+        "startup": startup_status.to_dict(),
     }
 
 
@@ -157,6 +157,7 @@ class CacheMiddleware:
             or request.headers.get("cookie")
             or "no-cache" in cache_control
             or request.url.path.startswith("/api/v1/auth")
+            or request.url.path.startswith("/health")  # Sonda yanıtları anlık olmalı
         ):
             await self.app(scope, receive, send)
             return
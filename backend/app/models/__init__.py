@@ -6,3 +6,4 @@ from .integrations import *  # noqa: F401, F403
 from .optiplanning import *  # noqa: F401, F403
 from .order import *  # noqa: F401, F403
 from .product import *  # noqa: F401, F403
+from .search import *  # noqa: F401, F403
@@ -186,6 +186,62 @@ class AuditRecord(Base):
     )
 
 
+# ═══════════════════════════════════════════════════════════════
+# TOKEN İPTAL & GİRİŞ DENEMESİ DEPOSU (tüm worker'lar ortak kullanır)
+# ═══════════════════════════════════════════════════════════════
+
+
+class RevokedToken(Base):
+    """Geçersiz kılınmış JWT kaydı (jti). Süresi dolanlar expires_at sırasıyla temizlenir."""
+
+    __tablename__ = "revoked_tokens"
+
+    jti = Column(String, primary_key=True)
+    token_type = Column(String, nullable=True)  # access, refresh
+    expires_at = Column(TIMESTAMP(timezone=True), nullable=False, index=True)
+    revoked_at = Column(TIMESTAMP(timezone=True), nullable=False, index=True)
+
+
+class SchedulerLease(Base):
+    """Tek lider kiralaması: zamanlanmış işleri yalnız kirayı tutan süreç çalıştırır."""
+
+    __tablename__ = "scheduler_leases"
+
+    name = Column(String, primary_key=True)  # scheduler
+    holder = Column(String, nullable=False)  # host:pid:rastgele
+    expires_at = Column(TIMESTAMP(timezone=True), nullable=False)
+    renewed_at = Column(TIMESTAMP(timezone=True), nullable=False)
+
+
+class ComplianceBatchJob(Base):
+    """Toplu uyumluluk kontrolü işi; durum ve sonuçlar her worker'dan okunabilir."""
+
+    __tablename__ = "compliance_batch_jobs"
+
+    id = Column(String(32), primary_key=True)
+    status = Column(String, nullable=False, default="running")  # running, done, failed
+    total_orders = Column(Integer, nullable=False)
+    completed = Column(Integer, nullable=False, default=0, server_default="0")
+    strict_mode = Column(Boolean, nullable=False, default=False)
+    rules_version = Column(Integer, nullable=False, default=0)
+    results = Column(Text)  # JSON; iş bitince yazılır
+    error = Column(Text)
+    created_at = Column(TIMESTAMP(timezone=True), nullable=False)
+    updated_at = Column(TIMESTAMP(timezone=True), nullable=False)  # İlerleme yazıldıkça yenilenir
+    finished_at = Column(TIMESTAMP(timezone=True), nullable=True, index=True)
+
+
+class AuthAttempt(Base):
+    """IP bazlı başarısız giriş sayacı ve kilit süresi."""
+
+    __tablename__ = "auth_attempts"
+
+    key = Column(String, primary_key=True)  # IP adresi
+    count = Column(Integer, default=0, nullable=False)
+    locked_until = Column(TIMESTAMP(timezone=True), nullable=True)
+    updated_at = Column(TIMESTAMP(timezone=True), nullable=False, index=True)
+
+
 class Log(Base):
     __tablename__ = "logs"
     id = Column(Integer, primary_key=True, index=True)
@@ -189,6 +189,8 @@ class PriceUploadJob(Base):
     file_data = Column(LargeBinary)
     supplier = Column(String, nullable=False)
     rows_extracted = Column(Integer, default=0)
+    rows_processed = Column(Integer, default=0)  # Toplu yazım ilerlemesi (parça parça)
+    content_hash = Column(String(64), nullable=True, index=True)  # sha256(tedarikçi + dosya)
     error_message = Column(Text, nullable=True)
     uploaded_by_id = Column(Integer, ForeignKey("users.id"))
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
@@ -5,6 +5,7 @@ from sqlalchemy import (
     Column,
     Enum,
     ForeignKey,
+    Index,
     Integer,
     LargeBinary,
     Numeric,
@@ -116,13 +117,18 @@ class OCRLine(Base):
 
 class WhatsAppMessage(Base):
     __tablename__ = "whatsapp_messages"
+    __table_args__ = (Index("ix_whatsapp_message_status_next_attempt", "status", "next_attempt_at"),)
 
     id = Column(String, primary_key=True, index=True)
     to_phone = Column(String, nullable=False)
     message = Column(Text, nullable=False)
-    status = Column(String, nullable=False, default="PENDING")  # PENDING, SENT, FAILED
+    status = Column(String, nullable=False, default="PENDING")  # PENDING, SENDING, SENT, FAILED
     waba_message_id = Column(String)
 
+    # Dispatcher yeniden deneme durumu; SENDING iken next_attempt_at kilit süresi sonudur
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    next_attempt_at = Column(TIMESTAMP(timezone=True), nullable=True)
+
     order_id = Column(Integer, ForeignKey("orders.id"))
     order_ts_code = Column(String)
 
@@ -142,6 +148,33 @@ class WhatsAppSetting(Base):
     updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now())
 
 
+# ═══════════════════════════════════════════════════
+# E-POSTA MODELLERİ
+# ═══════════════════════════════════════════════════
+
+
+class EmailMessage(Base):
+    """Giden e-posta kuyruğu; gönderimi app/services/email_dispatcher.py yapar."""
+
+    __tablename__ = "email_messages"
+    __table_args__ = (Index("ix_email_message_status_next_attempt", "status", "next_attempt_at"),)
+
+    id = Column(String, primary_key=True, index=True)
+    to_email = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    template = Column(String)  # order_created, reminder_payment, ...
+    raw_message = Column(Text)  # Hazır MIME içeriği (ekler dahil); SENT/FAILED olunca silinir
+    status = Column(String, nullable=False, default="PENDING")  # PENDING, SENDING, SENT, FAILED
+
+    # Dispatcher yeniden deneme durumu; SENDING iken next_attempt_at kilit süresi sonudur
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    next_attempt_at = Column(TIMESTAMP(timezone=True), nullable=True)
+
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+    sent_at = Column(TIMESTAMP(timezone=True), nullable=True)
+    error = Column(Text)
+
+
 # ═══════════════════════════════════════════════════
 # AZURE & GOOGLE MODELLERİ
 # ═══════════════════════════════════════════════════
@@ -177,6 +210,27 @@ class AWSTextractConfig(Base):
     updated_at = Column(TIMESTAMP(timezone=True), onupdate=func.now())
 
 
+# ═══════════════════════════════════════════════════
+# AI YANIT ÖNBELLEĞİ
+# ═══════════════════════════════════════════════════
+
+
+class LLMCacheEntry(Base):
+    """LLM yanıt önbelleği; anahtar sağlayıcı/model/ayar/prompt/ek içeriğinin SHA-256'sı."""
+
+    __tablename__ = "llm_response_cache"
+
+    key = Column(String(64), primary_key=True)
+    provider = Column(String, nullable=False)
+    model = Column(String, nullable=False)
+    value = Column(Text, nullable=False)  # JSON
+    size_bytes = Column(Integer, nullable=False, default=0)
+    hit_count = Column(Integer, nullable=False, default=0, server_default="0")
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+    expires_at = Column(TIMESTAMP(timezone=True), nullable=False, index=True)
+    last_used_at = Column(TIMESTAMP(timezone=True), nullable=False, index=True)
+
+
 # ═══════════════════════════════════════════════════════════════
 # ENTEGRASYON MODÜLLERİ — Mikro Senkron / Outbox-Inbox Pattern
 # ═══════════════════════════════════════════════════════════════
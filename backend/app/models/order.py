@@ -2,8 +2,20 @@
 
 
 
-from sqlalchemy import TIMESTAMP, Boolean, Column, Enum, ForeignKey, Index, Integer, Numeric, String, Text
-from sqlalchemy.orm import relationship
+from app.utils.text_normalize import phone_suffix_key
+
+
+
+from sqlalchemy import TIMESTAMP, Boolean, Column, Enum, ForeignKey, Index, Integer, Numeric, String, Text, event, select
+from sqlalchemy.orm import relationship, validates
+
+
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+
+
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 
 
@@ -75,6 +87,14 @@ class Customer(Base):
 
 
 
+    # Ters çevrilmiş ulusal rakamlar: son hane eşleşmesi indeksli aralık sorgusuyla yapılır
+
+
+
+    phone_suffix = Column(String, nullable=True, index=True)
+
+
+
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
 
 
@@ -99,6 +119,22 @@ class Customer(Base):
 
 
 
+    @validates("phone")
+
+
+
+    def _sync_phone_suffix(self, key, value):
+
+
+
+        self.phone_suffix = phone_suffix_key(value) or None
+
+
+
+        return value
+
+
+
 
 
 
@@ -421,6 +457,10 @@ class StatusLog(Base):
 
 
 
+    __table_args__ = (Index("ix_status_log_part_created", "part_id", "created_at"),)
+
+
+
     id = Column(Integer, primary_key=True, index=True)
 
 
@@ -453,6 +493,166 @@ class StatusLog(Base):
 
 
 
+class PartCurrentStatus(Base):
+
+
+
+    """Parça başına son StatusLog kaydının projeksiyonu (istasyon okutmada PK okuması)."""
+
+
+
+    __tablename__ = "part_current_status"
+
+
+
+    part_id = Column(Integer, ForeignKey("parts.id"), primary_key=True)
+
+
+
+    status_log_id = Column(Integer, nullable=False)
+
+
+
+    station_id = Column(Integer, ForeignKey("stations.id"), nullable=False)
+
+
+
+    status = Column(String, nullable=False)
+
+
+
+    changed_at = Column(TIMESTAMP(timezone=True))  # Kaynak StatusLog.created_at
+
+
+
+
+
+
+
+
+
+
+
+def upsert_part_current_status(connection, status_log_id: int) -> None:
+
+
+
+    """Verilen StatusLog satırını projeksiyona yaz (aynı bağlantı/transaction içinde)."""
+
+
+
+    source = select(
+
+
+
+        StatusLog.part_id,
+
+
+
+        StatusLog.id,
+
+
+
+        StatusLog.station_id,
+
+
+
+        StatusLog.status,
+
+
+
+        StatusLog.created_at,
+
+
+
+    ).where(StatusLog.id == status_log_id)
+
+
+
+    columns = ["part_id", "status_log_id", "station_id", "status", "changed_at"]
+
+
+
+    dialect_name = connection.dialect.name
+
+
+
+    if dialect_name in ("sqlite", "postgresql"):
+
+
+
+        insert = sqlite_insert if dialect_name == "sqlite" else pg_insert
+
+
+
+        stmt = insert(PartCurrentStatus).from_select(columns, source)
+
+
+
+        stmt = stmt.on_conflict_do_update(
+
+
+
+            index_elements=["part_id"],
+
+
+
+            set_={name: stmt.excluded[name] for name in columns[1:]},
+
+
+
+        )
+
+
+
+        connection.execute(stmt)
+
+
+
+        return
+
+
+
+    part_id = connection.execute(select(StatusLog.part_id).where(StatusLog.id == status_log_id)).scalar()
+
+
+
+    connection.execute(PartCurrentStatus.__table__.delete().where(PartCurrentStatus.part_id == part_id))
+
+
+
+    connection.execute(PartCurrentStatus.__table__.insert().from_select(columns, source))
+
+
+
+
+
+
+
+
+
+
+
+@event.listens_for(StatusLog, "after_insert")
+
+
+
+def _project_status_log(_mapper, connection, target) -> None:
+
+
+
+    upsert_part_current_status(connection, target.id)
+
+
+
+
+
+
+
+
+
+
+
 class Message(Base):
 
 
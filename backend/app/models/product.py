@@ -1,5 +1,23 @@
+import re
+import weakref
+
 from app.database import Base
-from sqlalchemy import TIMESTAMP, Boolean, Column, Float, ForeignKey, Integer, Numeric, String
+from app.utils.text_normalize import normalize_text
+from sqlalchemy import (
+    TIMESTAMP,
+    Boolean,
+    Column,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    Numeric,
+    String,
+    delete,
+    event,
+    inspect,
+    select,
+)
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -78,6 +96,18 @@ class MaterialSpec(Base):
     )
 
 
+class MaterialSpecToken(Base):
+    """Spec arama indeksi: ürün tipi, renk, kalınlık ve spec kodunun katlanmış kelimeleri"""
+
+    __tablename__ = "material_spec_tokens"
+    __table_args__ = (Index("ix_material_spec_tokens_token", "token", "spec_id"),)
+
+    spec_id = Column(
+        Integer, ForeignKey("material_specs.id", ondelete="CASCADE"), primary_key=True
+    )
+    token = Column(String, primary_key=True)
+
+
 class SupplierItem(Base):
     """Firma varyantı (aynı spec'in marka bazlı versiyonu)"""
 
@@ -117,3 +147,117 @@ class Item(Base):
     updated_at = Column(TIMESTAMP(timezone=True), onupdate=func.now())
 
     supplier_item = relationship("SupplierItem", back_populates="items")
+
+
+class CodeSequence(Base):
+    """Önek başına sayaç (ör. STK-2610-): kodlar MAX(code) taraması yerine buradan ayrılır"""
+
+    __tablename__ = "code_sequences"
+
+    prefix = Column(String, primary_key=True)
+    last_value = Column(Integer, nullable=False, default=0)
+    updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+# ═══════════════════════════════════════════════════════════════
+# SPEC ARAMA İNDEKSİ — spec, ürün tipi ve renk yazımlarında senkron
+# ═══════════════════════════════════════════════════════════════
+
+_TOKEN_SOURCE_COLUMNS = (
+    MaterialSpec.id,
+    MaterialSpec.spec_code,
+    MaterialSpec.thickness_mm,
+    ProductType.code,
+    ProductType.short_code,
+    ProductType.name,
+    Color.code,
+    Color.name,
+)
+
+_spec_token_engines: "weakref.WeakSet" = weakref.WeakSet()
+
+
+def normalize_spec_term(value) -> str:
+    """Arama terimi / indeks kelimesi: Türkçe katlanmış, sayılar kanonik (18.00 -> 18)."""
+    text = normalize_text(str(value))
+    try:
+        return f"{float(text):g}"
+    except ValueError:
+        return text
+
+
+def spec_search_tokens(*values) -> set:
+    """Kelimeler ve bütün değerler ayrı ayrı ("mlm-beyaz-18-210x280", "mlm", "beyaz", ...)."""
+    tokens = set()
+    for value in values:
+        if value in (None, ""):
+            continue
+        text = normalize_spec_term(value)
+        tokens.update(text.split())
+        tokens.update(re.findall(r"\w+", text))
+    return tokens
+
+
+def spec_tokens_ready(connection) -> bool:
+    engine = connection.engine
+    if engine in _spec_token_engines:
+        return True
+    if inspect(connection).has_table(MaterialSpecToken.__tablename__):
+        _spec_token_engines.add(engine)
+        return True
+    return False
+
+
+def write_spec_tokens(connection, spec_filter=None) -> int:
+    """Filtreye uyan spec'lerin kelimelerini yeniden yazar (filtre yoksa tümü); satır sayısı döner."""
+    stmt = select(*_TOKEN_SOURCE_COLUMNS).join(ProductType).join(Color)
+    if spec_filter is not None:
+        stmt = stmt.where(spec_filter)
+    rows = connection.execute(stmt).all()
+    spec_ids = [row[0] for row in rows]
+    table = MaterialSpecToken.__table__
+    if spec_filter is None:
+        connection.execute(delete(table))
+    elif spec_ids:
+        connection.execute(delete(table).where(table.c.spec_id.in_(spec_ids)))
+    values = [
+        {"spec_id": spec_id, "token": token}
+        for spec_id, *fields in rows
+        for token in spec_search_tokens(*fields)
+    ]
+    if values:
+        connection.execute(table.insert(), values)
+    return len(values)
+
+
+def _register_spec_token_events() -> None:
+    def _spec_written(_mapper, connection, target) -> None:
+        if spec_tokens_ready(connection):
+            write_spec_tokens(connection, MaterialSpec.id == target.id)
+
+    def _spec_updated(_mapper, connection, target) -> None:
+        state = inspect(target)
+        columns = ("spec_code", "thickness_mm", "product_type_id", "color_id")
+        if any(state.attrs[name].history.has_changes() for name in columns):
+            _spec_written(_mapper, connection, target)
+
+    def _parent_updated(fk_column):
+        def _listener(_mapper, connection, target) -> None:
+            state = inspect(target)
+            changed = any(
+                state.attrs[name].history.has_changes()
+                for name in ("code", "short_code", "name")
+                if name in state.attrs
+            )
+            if changed and spec_tokens_ready(connection):
+                write_spec_tokens(connection, fk_column == target.id)
+
+        return _listener
+
+    event.listen(MaterialSpec, "after_insert", _spec_written)
+    event.listen(MaterialSpec, "after_update", _spec_updated)
+    event.listen(ProductType, "after_update", _parent_updated(MaterialSpec.product_type_id))
+    event.listen(Color, "after_update", _parent_updated(MaterialSpec.color_id))
+
+
+_register_spec_token_events()
@@ -0,0 +1,206 @@
+"""
+Arama indeksi — sipariş, müşteri ve stok kartları için tam metin dokümanları.
+
+``search_documents`` her kaynak kaydın görüntü başlığını, özetini ve Türkçe
+katlanmış (``normalize_text``) arama metnini tutar. Dialect'e özgü indeks
+tablo oluşturulduktan sonra eklenir:
+
+* SQLite: ``search_fts`` FTS5 tablosu (external content) + senkron tetikleyiciler
+* PostgreSQL: üretilmiş ``search_vector`` tsvector kolonu + GIN indeksi
+
+Dokümanlar kaynak kayıtla aynı transaction içinde ORM olaylarıyla güncellenir.
+Toplu işlemler (``bulk_insert_mappings``, ``query.update``) olayları atladığı
+için ``search_index_service.rebuild_search_index`` ile yeniden kurulabilir.
+"""
+
+import logging
+import weakref
+
+from app.database import Base
+from app.utils.text_normalize import normalize_text
+from sqlalchemy import Column, DDL, Integer, String, Text, UniqueConstraint, event, inspect
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from .integrations import StockCard
+from .order import Customer, Order
+
+logger = logging.getLogger(__name__)
+
+SEARCH_ENTITY_TYPES = ("order", "customer", "product")
+
+
+class SearchDocument(Base):
+    __tablename__ = "search_documents"
+    __table_args__ = (UniqueConstraint("entity_type", "entity_id", name="uq_search_documents_entity"),)
+
+    id = Column(Integer, primary_key=True)
+    entity_type = Column(String(16), nullable=False)
+    entity_id = Column(String(64), nullable=False)
+    title = Column(String, nullable=False)
+    summary = Column(String, nullable=True)
+    search_text = Column(Text, nullable=False)
+
+
+SEARCH_INDEX_DDL = {
+    "sqlite": [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5("
+        "search_text, content='search_documents', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2')",
+        "CREATE TRIGGER IF NOT EXISTS search_documents_ai AFTER INSERT ON search_documents BEGIN "
+        "INSERT INTO search_fts(rowid, search_text) VALUES (new.id, new.search_text); END",
+        "CREATE TRIGGER IF NOT EXISTS search_documents_ad AFTER DELETE ON search_documents BEGIN "
+        "INSERT INTO search_fts(search_fts, rowid, search_text) "
+        "VALUES ('delete', old.id, old.search_text); END",
+        "CREATE TRIGGER IF NOT EXISTS search_documents_au AFTER UPDATE ON search_documents BEGIN "
+        "INSERT INTO search_fts(search_fts, rowid, search_text) "
+        "VALUES ('delete', old.id, old.search_text); "
+        "INSERT INTO search_fts(rowid, search_text) VALUES (new.id, new.search_text); END",
+    ],
+    "postgresql": [
+        "ALTER TABLE search_documents ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('simple', search_text)) STORED",
+        "CREATE INDEX IF NOT EXISTS ix_search_documents_vector "
+        "ON search_documents USING GIN (search_vector)",
+    ],
+}
+
+# Tablosu hazır olduğu bilinen engine'ler (yalnız olumlu sonuç önbelleğe alınır;
+# migration sonradan çalışırsa olaylar kendiliğinden devreye girer)
+_ready_engines: "weakref.WeakSet" = weakref.WeakSet()
+
+
+@event.listens_for(SearchDocument.__table__, "after_create")
+def _create_search_index(_table, connection, **_kw) -> None:
+    for statement in SEARCH_INDEX_DDL.get(connection.dialect.name, []):
+        try:
+            connection.execute(DDL(statement))
+        except Exception as exc:  # FTS5 derlenmemiş SQLite: LIKE aramasına düşülür
+            logger.warning("Arama indeksi oluşturulamadı: %s", exc)
+            return
+    _ready_engines.add(connection.engine)
+
+
+@event.listens_for(SearchDocument.__table__, "before_drop")
+def _drop_search_index(_table, connection, **_kw) -> None:
+    if connection.dialect.name == "sqlite":
+        connection.execute(DDL("DROP TABLE IF EXISTS search_fts"))
+    _ready_engines.discard(connection.engine)
+
+
+def search_index_ready(connection) -> bool:
+    engine = connection.engine
+    if engine in _ready_engines:
+        return True
+    if inspect(connection).has_table(SearchDocument.__tablename__):
+        _ready_engines.add(engine)
+        return True
+    return False
+
+
+def _join(*parts) -> str:
+    return " ".join(str(p) for p in parts if p not in (None, ""))
+
+
+def _order_document(o: Order) -> dict:
+    thickness = f"{float(o.thickness_mm):g} mm" if o.thickness_mm is not None else None
+    return {
+        "title": f"Sipariş #{o.order_no or o.id}",
+        "summary": " · ".join(
+            str(p) for p in (o.crm_name_snapshot, o.material_name, o.color, thickness, o.status) if p
+        ),
+        "search_text": _join(
+            o.order_no, o.crm_name_snapshot, o.ts_code, o.phone_norm, o.material_name,
+            o.color, thickness, o.status, o.priority,
+        ),
+    }
+
+
+def _customer_document(c: Customer) -> dict:
+    return {"title": c.name or f"Müşteri #{c.id}", "summary": c.phone, "search_text": _join(c.name, c.phone)}
+
+
+def _stock_document(s: StockCard) -> dict:
+    return {
+        "title": _join(s.stock_code, "-", s.stock_name) if s.stock_name else s.stock_code,
+        "summary": " · ".join(str(p) for p in (s.unit, s.color, s.thickness, s.warehouse_location) if p),
+        "search_text": _join(s.stock_code, s.stock_name, s.color, s.thickness, s.unit, s.warehouse_location),
+    }
+
+
+# entity_type -> (model, doküman üretici, dokümanı etkileyen kolonlar)
+SEARCH_SOURCES = {
+    "order": (
+        Order,
+        _order_document,
+        ("order_no", "crm_name_snapshot", "ts_code", "phone_norm", "material_name",
+         "color", "thickness_mm", "status", "priority", "deleted_at"),
+    ),
+    "customer": (Customer, _customer_document, ("name", "phone", "deleted_at")),
+    "product": (
+        StockCard,
+        _stock_document,
+        ("stock_code", "stock_name", "color", "thickness", "unit", "warehouse_location", "deleted_at"),
+    ),
+}
+
+
+def build_search_document(entity_type: str, target) -> dict:
+    _model, builder, _columns = SEARCH_SOURCES[entity_type]
+    doc = builder(target)
+    doc["search_text"] = normalize_text(doc["search_text"])
+    return {"entity_type": entity_type, "entity_id": str(target.id), **doc}
+
+
+def delete_search_document(connection, entity_type: str, entity_id) -> None:
+    connection.execute(
+        SearchDocument.__table__.delete().where(
+            SearchDocument.entity_type == entity_type,
+            SearchDocument.entity_id == str(entity_id),
+        )
+    )
+
+
+def upsert_search_document(connection, entity_type: str, target) -> None:
+    """Kaynak kaydın dokümanını yaz; silinmiş (soft delete) kayıt indeksten çıkar."""
+    if getattr(target, "deleted_at", None) is not None:
+        delete_search_document(connection, entity_type, target.id)
+        return
+    values = build_search_document(entity_type, target)
+    dialect_name = connection.dialect.name
+    if dialect_name in ("sqlite", "postgresql"):
+        insert = sqlite_insert if dialect_name == "sqlite" else pg_insert
+        stmt = insert(SearchDocument).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["entity_type", "entity_id"],
+            set_={name: stmt.excluded[name] for name in ("title", "summary", "search_text")},
+        )
+        connection.execute(stmt)
+        return
+    delete_search_document(connection, entity_type, target.id)
+    connection.execute(SearchDocument.__table__.insert().values(**values))
+
+
+def _register_search_events(entity_type: str) -> None:
+    model, _builder, columns = SEARCH_SOURCES[entity_type]
+
+    def _after_write(_mapper, connection, target) -> None:
+        if search_index_ready(connection):
+            upsert_search_document(connection, entity_type, target)
+
+    def _after_update(_mapper, connection, target) -> None:
+        state = inspect(target)
+        if any(state.attrs[name].history.has_changes() for name in columns):
+            _after_write(_mapper, connection, target)
+
+    def _after_delete(_mapper, connection, target) -> None:
+        if search_index_ready(connection):
+            delete_search_document(connection, entity_type, target.id)
+
+    event.listen(model, "after_insert", _after_write)
+    event.listen(model, "after_update", _after_update)
+    event.listen(model, "after_delete", _after_delete)
+
+
+for _entity_type in SEARCH_SOURCES:
+    _register_search_events(_entity_type)
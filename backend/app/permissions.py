@@ -6,6 +6,7 @@ Used by both backend (authentication/authorization) and frontend (UI rendering)
 
 import logging
 from enum import Enum
+from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
@@ -249,9 +250,15 @@ def get_permissions_for_role(role: str) -> list[str]:
     return [p.value for p in ROLE_PERMISSIONS[role]]
 
 
+@lru_cache(maxsize=None)
+def get_permission_set(role: str) -> frozenset[Permission]:
+    """Rol için izin kümesi (O(1) üyelik kontrolü). ROLE_PERMISSIONS statik olduğundan önbelleklenir."""
+    return frozenset(ROLE_PERMISSIONS.get(role, []))
+
+
 def has_permission(role: str, permission: Permission) -> bool:
     """Rolün belirli bir izni var mı kontrol eder."""
-    return permission in ROLE_PERMISSIONS.get(role, [])
+    return permission in get_permission_set(role)
 
 
 def check_permission(role: str, *permissions: Permission) -> bool:
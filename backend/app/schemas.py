@@ -2762,6 +2762,10 @@ class PriceUploadJobOut(BaseModel):
 
 
 
+    rows_processed: Optional[int] = 0
+
+
+
     error_message: Optional[str] = None
 
 
@@ -5,6 +5,8 @@ from urllib.parse import urlparse
 from fastapi import FastAPI, Request, Response
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 
+from app.logging_config import bind_log_context
+
 
 def _extract_host(value: str) -> str:
     if not value:
@@ -102,6 +104,8 @@ def add_security_middleware(app: FastAPI):
         request_id = secrets.token_hex(16)
         request.state.request_id = request_id
 
-        response = await call_next(request)
+        # Bu istek boyunca üretilen log kayıtları request_id taşır
+        with bind_log_context(request_id=request_id):
+            response = await call_next(request)
         response.headers["X-Request-ID"] = request_id
         return response
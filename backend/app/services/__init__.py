@@ -43,6 +43,7 @@ _EXPORTS = {
     "quick_search": "app.services.stock_matcher",
     "suggest_grain": "app.services.grain_matcher",
     "validate_filename": "app.services.filename_generator",
+    "crm_analytics": "app.services.crm_analytics",
     "crm_service": "app.services.crm_service",
     "integration_service": "app.services.integration_service",
     "orchestrator_service": "app.services.orchestrator_service",
@@ -5,21 +5,32 @@ OptiPlan 360 için özel AI asistan fonksiyonları
 
 import json
 import logging
+import os
 from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, Optional
 
 from app.database import SessionLocal
 from app.models import Customer, Order, StockCard, User
-from app.services.gemini_service import get_gemini_service
+from app.services import search_index_service
+from app.services.gemini_service import get_gemini_service, is_json_reply
+from sqlalchemy.orm import Session
 
 logger = logging.getLogger(__name__)
 
+SMART_SEARCH_TOP_K = 20
+AI_SEARCH_USE_LLM = os.getenv("AI_SEARCH_USE_LLM", "1").lower() not in ("0", "false", "no")
+
 
 class AIAssistantService:
     """AI Asistan servis sınıfı - OptiPlan 360 özel iş akışları"""
 
     def __init__(self):
-        self.gemini_service = get_gemini_service()
+        try:
+            self.gemini_service = get_gemini_service()
+        except ValueError as e:
+            # API anahtarı yok: indeks tabanlı arama yine çalışır
+            logger.warning(f"Gemini servisi devre dışı: {str(e)}")
+            self.gemini_service = None
 
     async def analyze_business_data(
         self, user_id: str, analysis_type: str = "general"
@@ -250,76 +261,66 @@ class AIAssistantService:
             return {"success": False, "error": str(e), "timestamp": datetime.utcnow().isoformat()}
 
     async def smart_search(
-        self, user_id: str, query: str, search_scope: str = "all"
+        self,
+        user_id: str,
+        query: str,
+        search_scope: str = "all",
+        limit: int = SMART_SEARCH_TOP_K,
+        use_llm: Optional[bool] = None,
+        db: Optional[Session] = None,
     ) -> Dict[str, Any]:
         """
         Akıllı arama yapar
 
+        Adaylar yerel tam metin indeksinden (``search_index_service``) gelir;
+        LLM yalnız bu ilk ``limit`` adayı yeniden sıralar. LLM kapalıysa
+        (``AI_SEARCH_USE_LLM=0``), yapılandırılmamışsa ya da hata verirse
+        indeks sıralaması döner.
+
         Args:
             user_id: Kullanıcı ID
             query: Arama sorgusu
             search_scope: Arama kapsamı (orders, customers, products, all)
+            limit: LLM'e gönderilecek / döndürülecek en fazla aday sayısı
+            use_llm: LLM ile yeniden sıralama (None: ``AI_SEARCH_USE_LLM``)
+            db: Mevcut oturum (verilmezse yeni oturum açılır)
 
         Returns:
             Dict: Arama sonuçları
         """
+        own_session = db is None
         try:
-            db = SessionLocal()
+            if own_session:
+                db = SessionLocal()
 
             # Kullanıcı bilgilerini al
             user = db.query(User).filter(User.id == user_id).first()
             if not user:
                 return {"success": False, "error": "Kullanıcı bulunamadı"}
 
-            # Arama verilerini topla
-            search_data = {}
-
-            if search_scope in ["all", "orders"]:
-                orders = db.query(Order).limit(200).all()
-                search_data["orders"] = [
-                    {
-                        "id": str(o.id),
-                        "material": o.material_name,
-                        "quantity": o.quantity,
-                        "status": o.status,
-                        "customer_name": o.customer_name,
-                        "created_at": o.created_at.isoformat() if o.created_at else None,
-                    }
-                    for o in orders
-                ]
-
-            if search_scope in ["all", "customers"]:
-                customers = db.query(Customer).limit(100).all()
-                search_data["customers"] = [
-                    {
-                        "id": str(c.id),
-                        "name": c.name,
-                        "email": c.email,
-                        "phone": c.phone,
-                        "address": c.address,
-                    }
-                    for c in customers
-                ]
-
-            if search_scope in ["all", "products"]:
-                stocks = db.query(StockCard).limit(100).all()
-                search_data["products"] = [
-                    {
-                        "id": str(s.id),
-                        "stock_code": s.stock_code,
-                        "stock_name": s.stock_name,
-                        "total_quantity": float(s.total_quantity),
-                        "sale_price": float(s.sale_price) if s.sale_price else None,
-                    }
-                    for s in stocks
-                ]
+            candidates = search_index_service.search(db, query, scope=search_scope, limit=limit)
+            search_results = {
+                "query": query,
+                "total_results": len(candidates),
+                "results": [hit.to_dict() for hit in candidates],
+                "suggestions": [],
+            }
+            response = {
+                "success": True,
+                "source": "index",
+                "search_results": search_results,
+                "timestamp": datetime.utcnow().isoformat(),
+            }
 
-            db.close()
+            if use_llm is None:
+                use_llm = AI_SEARCH_USE_LLM
+            if not (use_llm and candidates and self.gemini_service):
+                return response
 
-            # Arama prompt'u
+            # Arama prompt'u: yalnız indeks adayları
             system_instruction = """
             Sen OptiPlan 360 akıllı arama uzmanısın. 
-            Kullanıcının sorgusuna göre en ilgili sonuçları bul ve sırala.
+            Sana verilen adayları kullanıcının sorgusuna göre sırala; aday listesinde olmayan sonuç üretme.
             """
 
             prompt = f"""
@@ -327,19 +328,15 @@ class AIAssistantService:
             Arama Sorgusu: {query}
             Arama Kapsamı: {search_scope}
             
-            Aşağıdaki verilerde ara:
-            {json.dumps(search_data, ensure_ascii=False, indent=2)}
+            Adaylar:
+            {json.dumps(search_results["results"], ensure_ascii=False, indent=2)}
             
             Şu formatında yanıt ver:
             {{
-                "query": "Arama sorgusu",
-                "total_results": 0,
                 "results": [
                     {{
                         "type": "order|customer|product",
                         "id": "ID",
-                        "title": "Başlık",
-                        "description": "Açıklama",
                         "relevance_score": 0.95
                     }}
                 ],
@@ -347,33 +344,70 @@ class AIAssistantService:
             }}
             """
 
-            response = await self.gemini_service.generate_text_response(
-                prompt=prompt, system_instruction=system_instruction
+            llm_response = await self.gemini_service.generate_text_response(
+                prompt=prompt, system_instruction=system_instruction, cache_validator=is_json_reply
             )
-
-            if response["success"]:
-                try:
-                    # JSON yanıtını parse et
-                    json_text = response["response"].strip()
-                    if json_text.startswith("```json"):
-                        json_text = json_text.replace("```json", "").replace("```", "").strip()
-
-                    search_results = json.loads(json_text)
-                    response["search_results"] = search_results
-
-                except json.JSONDecodeError:
-                    response["search_results"] = {
-                        "query": query,
-                        "total_results": 0,
-                        "results": [],
-                        "suggestions": [],
-                    }
-
+            if not llm_response.get("success"):
+                response["llm_error"] = llm_response.get("error")
+                return response
+
+            # Sıralama herhangi bir nedenle kullanılamazsa indeks sırası korunur
+            try:
+                reranked, suggestions = self._rerank_candidates(candidates, llm_response.get("response"))
+            except Exception as e:
+                logger.warning(f"Smart search sıralaması kullanılamadı: {str(e)}")
+                response["llm_error"] = "LLM yanıtı çözümlenemedi"
+                return response
+
+            if reranked:
+                search_results["results"] = reranked
+                response["source"] = "llm"
+            search_results["suggestions"] = suggestions
+            response["response"] = llm_response.get("response")
             return response
 
+        except ValueError as e:
+            return {"success": False, "error": str(e), "timestamp": datetime.utcnow().isoformat()}
         except Exception as e:
             logger.error(f"Smart search hatası: {str(e)}")
             return {"success": False, "error": str(e), "timestamp": datetime.utcnow().isoformat()}
+        finally:
+            if own_session and db is not None:
+                db.close()
+
+    @staticmethod
+    def _rerank_candidates(candidates, llm_text) -> tuple:
+        """
+        LLM sıralamasını indeks adaylarına uygular.
+
+        Aday dışı (uydurma) sonuçlar atılır; LLM'in atladığı adaylar indeks
+        sırasıyla sona eklenir. Yanıt beklenen biçimde değilse ValueError.
+        """
+        json_text = (llm_text or "").strip()
+        if json_text.startswith("```"):
+            json_text = json_text.replace("```json", "").replace("```", "").strip()
+        ranked = json.loads(json_text)
+        if not isinstance(ranked, dict) or not isinstance(ranked.get("results", []), list):
+            raise ValueError("LLM yanıtı beklenen biçimde değil")
+
+        by_key = {(hit.type, hit.id): hit for hit in candidates}
+        reranked = []
+        for item in ranked.get("results", []):
+            if not isinstance(item, dict):
+                continue
+            hit = by_key.pop((item.get("type"), str(item.get("id"))), None)
+            if hit is None:
+                continue
+            result = hit.to_dict()
+            result["relevance_score"] = item.get("relevance_score")
+            reranked.append(result)
+        if reranked:
+            reranked.extend(hit.to_dict() for hit in candidates if (hit.type, hit.id) in by_key)
+
+        suggestions = ranked.get("suggestions")
+        if not isinstance(suggestions, list):
+            suggestions = []
+        return reranked, [s for s in suggestions if isinstance(s, str)]
 
     async def get_recommendations(
         self, user_id: str, context: Optional[str] = None
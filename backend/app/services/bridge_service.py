@@ -37,9 +37,6 @@ Kurallar:
 
 
 
-import io
-
-
 import logging
 
 
@@ -55,13 +52,10 @@ from typing import Optional
 
 
 
-import openpyxl
-
-
-from openpyxl.styles import Alignment, Font, PatternFill
+from ..constants.excel_schema import GRAIN_MAP
 
 
-from ..constants.excel_schema import GRAIN_MAP
+from .opti_xlsx_writer import OptiSheetTemplate, render_opti_workbook
 
 
 logger = logging.getLogger(__name__)
@@ -114,6 +108,30 @@ OPTI_COLUMNS = [
 
 
 
+# Başlık satırı sarı/kalın; genişlikler içerikten (en fazla 30)
+
+
+OPTI_TAG_TEMPLATE = OptiSheetTemplate(
+
+
+    title="GOVDE",
+
+
+    header=tuple(OPTI_COLUMNS),
+
+
+    header_style="opti_tag_header",
+
+
+    max_auto_width=30,
+
+
+)
+
+
+
+
+
 EXPORT_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "exports")
 
 
@@ -243,37 +261,10 @@ def generate_optiplan_xlsx(order, parts: list) -> dict[str, bytes]:
 
 
 
-        wb = openpyxl.Workbook()
-
-
-        ws = wb.active
-
-
-        ws.title = group_name
-
-
-
-
-
-        # Başlık satırı
-
-
-        ws.append(OPTI_COLUMNS)
-
-
-        for cell in ws[1]:
-
-
-            cell.font = Font(bold=True)
-
-
-            cell.fill = PatternFill(fill_type="solid", fgColor="FFD700")
-
-
-            cell.alignment = Alignment(horizontal="center")
-
+        band_mm = order.band_mm
 
 
+        rows = []
 
 
         for part in group_parts:
@@ -282,16 +273,13 @@ def generate_optiplan_xlsx(order, parts: list) -> dict[str, bytes]:
             grain = GRAIN_MAP.get(part.grain_code or "0-Material", 0)
 
 
-            band_mm = order.band_mm
-
-
             adet = int(part.adet) if part.adet else 1
 
 
 
 
 
-            ws.append(
+            rows.append(
 
 
                 [
@@ -342,28 +330,7 @@ def generate_optiplan_xlsx(order, parts: list) -> dict[str, bytes]:
 
 
 
-        # Sütun genişliklerini otomatik ayarla
-
-
-        for col in ws.columns:
-
-
-            max_len = max((len(str(c.value or "")) for c in col), default=8)
-
-
-            ws.column_dimensions[col[0].column_letter].width = min(max_len + 2, 30)
-
-
-
-
-
-        buf = io.BytesIO()
-
-
-        wb.save(buf)
-
-
-        result[group_name] = buf.getvalue()
+        result[group_name] = render_opti_workbook(OPTI_TAG_TEMPLATE, rows, title=group_name)
 
 
 
@@ -5,14 +5,21 @@ Formatlar:
   Item Stock: STK-{YY}{MM}-{SEQ7}-{CD}
   Item Service: SRV-{YY}{MM}-{SEQ6}-{CD}
   MaterialSpec: {SHORT_CODE}-{COLOR}-{THICK}-{WxH}
+
+Sıra numaraları önek başına ``code_sequences`` sayaç satırından ayrılır
+(MAX(code) taraması yok); toplu içe aktarım N kodu tek seferde ayırabilir.
 """
 
 import hashlib
 from datetime import datetime
 
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from ..models import Item
+from ..models import CodeSequence, Item
 
 
 def _check_digit(base: str) -> str:
@@ -28,29 +35,85 @@ def _check_digit(base: str) -> str:
     return str((10 - (total % 10)) % 10)
 
 
-def generate_item_code(db: Session) -> str:
-    """STK-{YY}{MM}-{SEQ7}-{CD} formatında benzersiz stok kodu üretir."""
-    now = datetime.now()
-    prefix = f"STK-{now.strftime('%y%m')}-"
+def _item_prefix(now: datetime | None = None) -> str:
+    return f"STK-{(now or datetime.now()).strftime('%y%m')}-"
+
+
+def _format_code(prefix: str, seq: int, width: int) -> str:
+    base = f"{prefix}{str(seq).zfill(width)}"
+    return f"{base}-{_check_digit(base)}"
+
 
-    # Mevcut en yüksek sequence'ı bul
+def _max_existing_sequence(db: Session, prefix: str) -> int:
+    """Sayaç satırı henüz yokken (önekin ilk kullanımı / eski kayıtlar) mevcut en yüksek sequence."""
     last = (
         db.query(Item.code).filter(Item.code.like(f"{prefix}%")).order_by(Item.code.desc()).first()
     )
-
     if last and last[0]:
         try:
-            parts = last[0].split("-")
-            seq = int(parts[2]) + 1
+            return int(last[0].split("-")[2])
         except (IndexError, ValueError):
-            seq = 1
-    else:
-        seq = 1
-
-    seq_str = str(seq).zfill(7)
-    base = f"{prefix}{seq_str}"
-    cd = _check_digit(base)
-    return f"{base}-{cd}"
+            return 0
+    return 0
+
+
+def _increment_sequence(db: Session, prefix: str, count: int) -> int | None:
+    """Tek atomik UPDATE; satır yoksa None. Satır kilidi transaction sonuna kadar tutulur."""
+    stmt = (
+        update(CodeSequence)
+        .where(CodeSequence.prefix == prefix)
+        .values(last_value=CodeSequence.last_value + count, updated_at=func.now())
+    )
+    if db.get_bind().dialect.update_returning:
+        return db.execute(stmt.returning(CodeSequence.last_value)).scalar_one_or_none()
+    if db.execute(stmt).rowcount == 0:
+        return None
+    return db.scalar(select(CodeSequence.last_value).where(CodeSequence.prefix == prefix))
+
+
+def _create_sequence_row(db: Session, prefix: str) -> None:
+    """Sayaç satırını mevcut kodlardan başlatır; eşzamanlı ekleme sessizce yok sayılır."""
+    values = {"prefix": prefix, "last_value": _max_existing_sequence(db, prefix)}
+    dialect_name = db.get_bind().dialect.name
+    if dialect_name in ("sqlite", "postgresql"):
+        insert = sqlite_insert if dialect_name == "sqlite" else pg_insert
+        db.execute(
+            insert(CodeSequence).values(**values).on_conflict_do_nothing(index_elements=["prefix"])
+        )
+        return
+    try:
+        with db.begin_nested():
+            db.add(CodeSequence(**values))
+    except IntegrityError:
+        pass
+
+
+def allocate_sequence(db: Session, prefix: str, count: int = 1) -> int:
+    """
+    ``prefix`` için ``count`` ardışık değer ayırır ve ilkini döner.
+
+    Ayırma çağıranın transaction'ında yapılır: commit'te kesinleşir, rollback'te
+    sayaç da geri alınır (boşluk oluşmaz). Eşzamanlı çağrılar sayaç satırında sıraya girer.
+    """
+    if count < 1:
+        raise ValueError("count en az 1 olmalı")
+    last = _increment_sequence(db, prefix, count)
+    if last is None:
+        _create_sequence_row(db, prefix)
+        last = _increment_sequence(db, prefix, count)
+    return last - count + 1
+
+
+def generate_item_codes(db: Session, count: int) -> list[str]:
+    """Toplu içe aktarım için ``count`` stok kodunu tek sayaç güncellemesiyle ayırır."""
+    prefix = _item_prefix()
+    first = allocate_sequence(db, prefix, count)
+    return [_format_code(prefix, seq, 7) for seq in range(first, first + count)]
+
+
+def generate_item_code(db: Session) -> str:
+    """STK-{YY}{MM}-{SEQ7}-{CD} formatında benzersiz stok kodu üretir."""
+    return generate_item_codes(db, 1)[0]
 
 
 def generate_spec_code(
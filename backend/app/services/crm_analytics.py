@@ -0,0 +1,116 @@
+"""
+CRM Analytics — Pipeline istatistikleri
+Aşama dağılımı, kazanma oranı ve satış hızı (velocity) metrikleri.
+
+Tüm aşama kırılımı tek bir ``GROUP BY stage`` sorgusuyla hesaplanır ve
+süreç içi önbellekte tutulur. Fırsat oluşturma/güncelleme ve aşama geçişleri
+``invalidate_pipeline_cache`` ile önbelleği geçersiz kılar.
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from app.models import CRMOpportunity, OpportunityStageEnum
+from sqlalchemy import func as sa_func
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+PIPELINE_CACHE_TTL = 60  # saniye
+
+CLOSED_STAGES = (OpportunityStageEnum.CLOSED_WON, OpportunityStageEnum.CLOSED_LOST)
+
+# {bind_id: (version, expires_at, stats)}
+_pipeline_cache: Dict[int, Tuple[int, float, Dict[str, Any]]] = {}
+_cache_version = 0
+_cache_lock = threading.Lock()
+
+
+def invalidate_pipeline_cache() -> None:
+    """Pipeline önbelleğini geçersiz kıl (aşama geçişlerinde çağrılır)."""
+    global _cache_version
+    with _cache_lock:
+        _cache_version += 1
+        _pipeline_cache.clear()
+
+
+def _cycle_days_expr(dialect_name: str):
+    """Fırsat oluşturma → kapanış süresi (gün). Desteklenmeyen dialect'te None."""
+    start = CRMOpportunity.created_at
+    end = CRMOpportunity.actual_close_date
+    if dialect_name == "sqlite":
+        return sa_func.julianday(end) - sa_func.julianday(start)
+    if dialect_name == "postgresql":
+        return sa_func.extract("epoch", end - start) / 86400.0
+    return None
+
+
+def compute_pipeline_stats(db: Session) -> Dict[str, Any]:
+    """Pipeline kırılımını tek GROUP BY sorgusuyla hesapla (önbelleksiz)."""
+    columns = [
+        CRMOpportunity.stage,
+        sa_func.count(CRMOpportunity.id).label("count"),
+        sa_func.coalesce(sa_func.sum(CRMOpportunity.amount), 0).label("value"),
+    ]
+    cycle_days = _cycle_days_expr(db.get_bind().dialect.name)
+    if cycle_days is not None:
+        columns.append(sa_func.avg(cycle_days).label("avg_cycle_days"))
+
+    pipeline = {stage.value: {"count": 0, "value": 0.0} for stage in OpportunityStageEnum}
+    avg_cycle_days: Optional[float] = None
+    for row in db.execute(select(*columns).group_by(CRMOpportunity.stage)):
+        data = row._mapping
+        stage = data["stage"]
+        pipeline[stage.value] = {"count": int(data["count"]), "value": float(data["value"])}
+        if stage == OpportunityStageEnum.CLOSED_WON and data.get("avg_cycle_days") is not None:
+            avg_cycle_days = float(data["avg_cycle_days"])
+
+    won = pipeline[OpportunityStageEnum.CLOSED_WON.value]
+    lost = pipeline[OpportunityStageEnum.CLOSED_LOST.value]
+    open_stages = [s.value for s in OpportunityStageEnum if s not in CLOSED_STAGES]
+    open_count = sum(pipeline[s]["count"] for s in open_stages)
+    open_value = sum(pipeline[s]["value"] for s in open_stages)
+    closed_count = won["count"] + lost["count"]
+
+    win_rate = won["count"] / closed_count if closed_count else 0.0
+    avg_won_value = won["value"] / won["count"] if won["count"] else 0.0
+    # Satış hızı: açık fırsat * ortalama kazanılan tutar * kazanma oranı / ortalama döngü
+    sales_velocity = (
+        open_count * avg_won_value * win_rate / avg_cycle_days
+        if avg_cycle_days and avg_cycle_days > 0
+        else 0.0
+    )
+
+    return {
+        "pipeline": pipeline,
+        "total_opportunities": open_count + closed_count,
+        "open_opportunities": open_count,
+        "pipeline_value": open_value,
+        "won_count": won["count"],
+        "lost_count": lost["count"],
+        "win_rate": round(win_rate * 100, 2),
+        "avg_won_value": avg_won_value,
+        "avg_cycle_days": round(avg_cycle_days, 2) if avg_cycle_days is not None else None,
+        "sales_velocity": round(sales_velocity, 2),
+    }
+
+
+def get_pipeline_stats(db: Session, use_cache: bool = True) -> Dict[str, Any]:
+    """Önbellekli pipeline istatistikleri (TTL + sürüm ile geçersiz kılma)."""
+    bind_key = id(db.get_bind())
+    now = time.monotonic()
+    if use_cache:
+        with _cache_lock:
+            cached = _pipeline_cache.get(bind_key)
+            if cached and cached[0] == _cache_version and cached[1] > now:
+                return cached[2]
+            version = _cache_version
+
+    stats = compute_pipeline_stats(db)
+
+    if use_cache:
+        with _cache_lock:
+            # Hesaplama sırasında geçişi kaçırmamak için sürüm değişmişse yazma
+            if version == _cache_version:
+                _pipeline_cache[bind_key] = (version, now + PIPELINE_CACHE_TTL, stats)
+    return stats
@@ -26,11 +26,12 @@ from app.models import (
     TaskStatusEnum,
     User,
 )
+from app.services import crm_analytics
 from app.services.base_service import BaseService
 from app.services.email_service import email_service
 from app.utils import create_audit_log
 from sqlalchemy import func as sa_func
-from sqlalchemy import or_
+from sqlalchemy import or_, select
 from sqlalchemy.orm import Session, joinedload
 
 
@@ -302,6 +303,7 @@ def create_opportunity(db: Session, data: dict, user_id: int) -> CRMOpportunity:
         db, str(user_id), "CRM_OPPORTUNITY_CREATE", f"Fırsat oluşturuldu: {data.get('title')}"
     )
     db.commit()
+    crm_analytics.invalidate_pipeline_cache()
     db.refresh(opp)
     return opp
 
@@ -319,6 +321,7 @@ def update_opportunity(
             setattr(opp, k, v)
     create_audit_log(db, str(user_id), "CRM_OPPORTUNITY_UPDATE", f"Fırsat güncellendi: {opp.title}")
     db.commit()
+    crm_analytics.invalidate_pipeline_cache()
     db.refresh(opp)
     return opp
 
@@ -360,6 +363,7 @@ def transition_stage(
         f"Fırsat aşama geçişi: {old_stage.value} → {target.value} | {opp.title}",
     )
     db.commit()
+    crm_analytics.invalidate_pipeline_cache()
     db.refresh(opp)
     return opp, None
 
@@ -416,6 +420,7 @@ def convert_to_order(db: Session, opp_id: str, user_id: int):
         f"Fırsat siparişe dönüştürüldü: {opp.title} → Sipariş #{order.id}",
     )
     db.commit()
+    crm_analytics.invalidate_pipeline_cache()
     db.refresh(order)
     db.refresh(opp)
     return {"opportunity": opp, "order": order}, None
@@ -642,70 +647,35 @@ def list_notes(db: Session, entity_type: str, entity_id: str):
 
 
 def get_crm_stats(db: Session) -> dict:
-    total_accounts = (
-        db.query(sa_func.count(CRMAccount.id)).filter(CRMAccount.is_active == True).scalar() or 0
-    )
-    total_opportunities = db.query(sa_func.count(CRMOpportunity.id)).scalar() or 0
-    open_opportunities = (
-        db.query(sa_func.count(CRMOpportunity.id))
-        .filter(
-            CRMOpportunity.stage.notin_(
-                [OpportunityStageEnum.CLOSED_WON, OpportunityStageEnum.CLOSED_LOST]
-            )
-        )
-        .scalar()
-        or 0
-    )
-    pipeline_value = (
-        db.query(sa_func.coalesce(sa_func.sum(CRMOpportunity.amount), 0))
-        .filter(
-            CRMOpportunity.stage.notin_(
-                [OpportunityStageEnum.CLOSED_WON, OpportunityStageEnum.CLOSED_LOST]
-            )
-        )
-        .scalar()
-        or 0
-    )
-    won_count = (
-        db.query(sa_func.count(CRMOpportunity.id))
-        .filter(CRMOpportunity.stage == OpportunityStageEnum.CLOSED_WON)
-        .scalar()
-        or 0
-    )
-    total_quotes = db.query(sa_func.count(CRMQuote.id)).scalar() or 0
-    pending_tasks = (
-        db.query(sa_func.count(CRMTask.id))
-        .filter(CRMTask.status.in_([TaskStatusEnum.TODO, TaskStatusEnum.IN_PROGRESS]))
-        .scalar()
-        or 0
-    )
-
-    # Pipeline dağılımı
-    pipeline = {}
-    for stage in OpportunityStageEnum:
-        cnt = (
-            db.query(sa_func.count(CRMOpportunity.id))
-            .filter(CRMOpportunity.stage == stage)
-            .scalar()
-            or 0
-        )
-        val = (
-            db.query(sa_func.coalesce(sa_func.sum(CRMOpportunity.amount), 0))
-            .filter(CRMOpportunity.stage == stage)
-            .scalar()
-            or 0
+    pipeline_stats = crm_analytics.get_pipeline_stats(db)
+
+    # Fırsat dışı sayaçlar tek SELECT içinde skaler alt sorgularla okunur
+    counts = db.execute(
+        select(
+            select(sa_func.count(CRMAccount.id))
+            .where(CRMAccount.is_active == True)
+            .scalar_subquery()
+            .label("total_accounts"),
+            select(sa_func.count(CRMQuote.id)).scalar_subquery().label("total_quotes"),
+            select(sa_func.count(CRMTask.id))
+            .where(CRMTask.status.in_([TaskStatusEnum.TODO, TaskStatusEnum.IN_PROGRESS]))
+            .scalar_subquery()
+            .label("pending_tasks"),
         )
-        pipeline[stage.value] = {"count": cnt, "value": float(val)}
+    ).one()
 
     return {
-        "total_accounts": total_accounts,
-        "total_opportunities": total_opportunities,
-        "open_opportunities": open_opportunities,
-        "pipeline_value": float(pipeline_value),
-        "won_count": won_count,
-        "total_quotes": total_quotes,
-        "pending_tasks": pending_tasks,
-        "pipeline": pipeline,
+        "total_accounts": counts.total_accounts or 0,
+        "total_opportunities": pipeline_stats["total_opportunities"],
+        "open_opportunities": pipeline_stats["open_opportunities"],
+        "pipeline_value": float(pipeline_stats["pipeline_value"]),
+        "won_count": pipeline_stats["won_count"],
+        "total_quotes": counts.total_quotes or 0,
+        "pending_tasks": counts.pending_tasks or 0,
+        "pipeline": pipeline_stats["pipeline"],
+        "win_rate": pipeline_stats["win_rate"],
+        "avg_cycle_days": pipeline_stats["avg_cycle_days"],
+        "sales_velocity": pipeline_stats["sales_velocity"],
     }
 
 
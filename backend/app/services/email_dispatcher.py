@@ -0,0 +1,356 @@
+"""
+OptiPlan360 — E-posta Gönderim Dağıtıcısı
+PENDING durumdaki ``email_messages`` kayıtlarını arka plan thread'inde gönderir.
+
+- Kimliği doğrulanmış tek SMTP bağlantısı mesajlar ve partiler arasında
+  yeniden kullanılır; her mesaj için TLS el sıkışması ve login yapılmaz.
+  Bağlantı ``EMAIL_MAX_PER_CONNECTION`` mesajdan sonra ya da
+  ``EMAIL_IDLE_CLOSE_SECONDS`` boşta kaldığında kapatılır.
+- Kopan bağlantı bir kez yeniden açılır; mesaj kaybolmaz.
+- Geçici hatalar (4xx, ağ hatası) mesaj başına üstel geri çekilmeyle
+  ``next_attempt_at`` zamanına ertelenir; ``EMAIL_MAX_ATTEMPTS`` denemeden
+  sonra FAILED olur. 5xx yanıtları doğrudan FAILED.
+- Mesajlar koşullu UPDATE ile SENDING durumuna alınır; birden çok worker aynı
+  mesajı göndermez. Kilit süresi dolan SENDING kayıtları yeniden alınır.
+
+EMAIL_DISPATCHER_ENABLED=1 (varsayılan) ise main.py lifespan'inde başlar.
+"""
+
+import logging
+import os
+import smtplib
+import ssl
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List, Optional
+
+from app.models import EmailMessage
+from app.services.email_service import EmailService, email_service
+from app.utils import backoff_delay
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = int(os.environ.get("EMAIL_MAX_ATTEMPTS", "5"))
+MAX_PER_CONNECTION = int(os.environ.get("EMAIL_MAX_PER_CONNECTION", "100"))
+IDLE_CLOSE_SECONDS = float(os.environ.get("EMAIL_IDLE_CLOSE_SECONDS", "60"))
+BATCH_SIZE = 50
+BACKOFF_BASE_SECONDS = 60.0
+BACKOFF_MAX_SECONDS = 3600.0
+POLL_INTERVAL_SECONDS = 5.0  # Kuyruk boşken yeni mesaj kontrol aralığı
+LEASE_SECONDS = 300  # SENDING kilidinin süresi (çöken worker'ın mesajları geri alınır)
+SMTP_TIMEOUT_SECONDS = 30.0
+
+_dispatcher_instance: Optional["EmailDispatcher"] = None
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+@dataclass
+class _Outbound:
+    id: str
+    to_email: str
+    raw_message: str
+    attempts: int
+
+
+@dataclass
+class _SendResult:
+    id: str
+    status: str  # SENT, RETRY, FAILED
+    error: Optional[str] = None
+
+
+def _classify(code: int, message) -> tuple:
+    if isinstance(message, bytes):
+        message = message.decode("utf-8", "replace")
+    error = f"{code} {message}"[:500]
+    return ("FAILED" if code >= 500 else "RETRY"), error
+
+
+class EmailDispatcher:
+    """PENDING e-posta kuyruğunu kalıcı SMTP bağlantısı üzerinden partiler halinde gönderir."""
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Session]] = None,
+        *,
+        settings: Optional[EmailService] = None,
+        max_attempts: int = MAX_ATTEMPTS,
+        batch_size: int = BATCH_SIZE,
+        max_per_connection: int = MAX_PER_CONNECTION,
+        idle_close_seconds: float = IDLE_CLOSE_SECONDS,
+        backoff_base: float = BACKOFF_BASE_SECONDS,
+        backoff_max: float = BACKOFF_MAX_SECONDS,
+        poll_interval: float = POLL_INTERVAL_SECONDS,
+        lease_seconds: float = LEASE_SECONDS,
+    ):
+        self._session_factory = session_factory
+        self.settings = settings or email_service
+        self.max_attempts = max_attempts
+        self.batch_size = batch_size
+        self.max_per_connection = max_per_connection
+        self.idle_close_seconds = idle_close_seconds
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+
+        self.connections_opened = 0
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._sent_on_connection = 0
+        self._last_used = 0.0
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+    def _session(self) -> Session:
+        if self._session_factory is None:
+            from app.database import SessionLocal
+
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    # ─── Yaşam döngüsü ───
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="email-dispatcher", daemon=True)
+        self._thread.start()
+        logger.info("E-posta dispatcher başlatıldı (parti %d)", self.batch_size)
+
+    def stop(self, timeout: float = 30.0) -> None:
+        self._stopping = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.close()
+        logger.info("E-posta dispatcher durduruldu")
+
+    def notify(self) -> None:
+        """Yeni PENDING mesaj eklendiğinde beklemeden kuyruğu işlemesi için uyandır."""
+        self._wakeup.set()
+
+    def _run(self) -> None:
+        while not self._stopping:
+            try:
+                processed = self.drain_once()
+            except Exception as e:
+                logger.error("E-posta dispatcher genel hata: %s", e)
+                self.close()
+                processed = 0
+            if processed:
+                continue  # Kuyrukta iş olabilir; beklemeden devam et
+            if self._smtp is not None and time.monotonic() - self._last_used >= self.idle_close_seconds:
+                self.close()
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    # ─── SMTP bağlantısı ───
+
+    def _connection(self) -> smtplib.SMTP:
+        """Açık bağlantıyı döndür; yoksa ya da kota dolduysa yenisini aç ve giriş yap."""
+        if self._smtp is not None and self._sent_on_connection >= self.max_per_connection:
+            self.close()
+        if self._smtp is None:
+            cfg = self.settings
+            smtp = smtplib.SMTP(cfg.smtp_host, cfg.smtp_port, timeout=SMTP_TIMEOUT_SECONDS)
+            try:
+                smtp.ehlo()
+                if cfg.smtp_starttls:
+                    smtp.starttls(context=ssl.create_default_context())
+                    smtp.ehlo()
+                smtp.login(cfg.smtp_user, cfg.smtp_password)
+            except BaseException:
+                smtp.close()
+                raise
+            self._smtp = smtp
+            self._sent_on_connection = 0
+            self.connections_opened += 1
+        return self._smtp
+
+    def close(self) -> None:
+        """SMTP bağlantısını kapat (QUIT); bağlantı zaten kopmuşsa sessizce bırak."""
+        smtp, self._smtp = self._smtp, None
+        if smtp is None:
+            return
+        try:
+            smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            smtp.close()
+
+    # ─── Kuyruk işleme ───
+
+    def drain_once(self) -> int:
+        """Vadesi gelen mesajlardan bir parti al, tek bağlantıdan gönder ve sonuçları yaz."""
+        if not self.settings.is_configured():
+            logger.debug("SMTP yapılandırılmamış — e-posta gönderimi atlandı")
+            return 0
+        messages = self._claim_batch()
+        if not messages:
+            return 0
+        try:
+            self._connection()
+        except OSError as e:  # Bağlantı / giriş hatası: parti olduğu gibi ertelenir
+            logger.warning("SMTP bağlantısı kurulamadı: %s", e)
+            error = str(e)[:500] or type(e).__name__
+            results = [_SendResult(m.id, "RETRY", error=error) for m in messages]
+        else:
+            results = [self._send(m) for m in messages]
+        self._store_results(messages, results)
+        return len(messages)
+
+    def _due_condition(self, now: datetime):
+        return or_(
+            and_(
+                EmailMessage.status == "PENDING",
+                or_(EmailMessage.next_attempt_at.is_(None), EmailMessage.next_attempt_at <= now),
+            ),
+            and_(EmailMessage.status == "SENDING", EmailMessage.next_attempt_at <= now),
+        )
+
+    def _claim_batch(self) -> List[_Outbound]:
+        with self._session() as db:
+            now = _utcnow()
+            ids = db.scalars(
+                select(EmailMessage.id)
+                .where(self._due_condition(now))
+                .order_by(EmailMessage.created_at)
+                .limit(self.batch_size)
+            ).all()
+            if not ids:
+                return []
+
+            # Kilit bitişi bu partinin kimliği olarak da kullanılır
+            lease = now + timedelta(seconds=self.lease_seconds)
+            db.execute(
+                update(EmailMessage)
+                .where(EmailMessage.id.in_(ids), self._due_condition(now))
+                .values(status="SENDING", next_attempt_at=lease)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            rows = db.execute(
+                select(
+                    EmailMessage.id,
+                    EmailMessage.to_email,
+                    EmailMessage.raw_message,
+                    EmailMessage.attempts,
+                )
+                .where(
+                    EmailMessage.id.in_(ids),
+                    EmailMessage.status == "SENDING",
+                    EmailMessage.next_attempt_at == lease,
+                )
+                .order_by(EmailMessage.created_at)
+            ).all()
+            return [
+                _Outbound(
+                    id=r.id, to_email=r.to_email, raw_message=r.raw_message, attempts=r.attempts or 0
+                )
+                for r in rows
+            ]
+
+    def _send(self, msg: _Outbound) -> _SendResult:
+        retried = False
+        while True:
+            try:
+                smtp = self._connection()
+                smtp.sendmail(self.settings.smtp_from, [msg.to_email], msg.raw_message.encode("utf-8"))
+            except smtplib.SMTPRecipientsRefused as e:
+                code, message = e.recipients.get(msg.to_email, (450, str(e)))
+                return _SendResult(msg.id, *_classify(code, message))
+            except smtplib.SMTPResponseException as e:
+                if e.smtp_code == 421 or isinstance(e, smtplib.SMTPAuthenticationError):
+                    self.close()
+                    return _SendResult(msg.id, "RETRY", error=_classify(e.smtp_code, e.smtp_error)[1])
+                return _SendResult(msg.id, *_classify(e.smtp_code, e.smtp_error))
+            except OSError as e:  # SMTPServerDisconnected dahil
+                self.close()
+                # Boşta kapanmış bağlantı ilk denemede fark edilir; bir kez yeni bağlantıyla dene
+                if not retried:
+                    retried = True
+                    continue
+                logger.warning("E-posta gönderim hatası (%s): %s", msg.id, e)
+                return _SendResult(msg.id, "RETRY", error=str(e)[:500] or type(e).__name__)
+            self._sent_on_connection += 1
+            self._last_used = time.monotonic()
+            return _SendResult(msg.id, "SENT")
+
+    def _store_results(self, messages: List[_Outbound], results: List[_SendResult]) -> None:
+        attempts_by_id = {m.id: m.attempts for m in messages}
+        results_by_id = {r.id: r for r in results}
+        now = _utcnow()
+        counts = {"SENT": 0, "RETRY": 0, "FAILED": 0}
+
+        with self._session() as db:
+            rows = (
+                db.query(EmailMessage)
+                .filter(
+                    EmailMessage.id.in_(list(results_by_id)),
+                    EmailMessage.status == "SENDING",
+                )
+                .all()
+            )
+            for msg in rows:
+                result = results_by_id[msg.id]
+                msg.attempts = attempts_by_id[msg.id] + 1
+                msg.error = result.error
+                status = result.status
+                if status == "RETRY" and msg.attempts >= self.max_attempts:
+                    status = "FAILED"
+                counts[status] += 1
+
+                if status == "RETRY":
+                    delay = backoff_delay(msg.attempts, self.backoff_base, self.backoff_max)
+                    msg.status = "PENDING"
+                    msg.next_attempt_at = now + timedelta(seconds=delay)
+                    continue
+
+                msg.status = status
+                msg.next_attempt_at = None
+                msg.raw_message = None  # Son durumda MIME içeriği (ekler dahil) tutulmaz
+                if status == "SENT":
+                    msg.sent_at = now
+            db.commit()
+
+        logger.info(
+            "E-posta dispatcher: %d gönderildi, %d ertelendi, %d başarısız",
+            counts["SENT"],
+            counts["RETRY"],
+            counts["FAILED"],
+        )
+
+
+def get_dispatcher() -> Optional[EmailDispatcher]:
+    return _dispatcher_instance
+
+
+def start_dispatcher() -> EmailDispatcher:
+    """Dispatcher'ı başlat — main.py lifespan'inden çağrılır"""
+    global _dispatcher_instance
+    if _dispatcher_instance and _dispatcher_instance.running:
+        return _dispatcher_instance
+    _dispatcher_instance = EmailDispatcher()
+    _dispatcher_instance.start()
+    return _dispatcher_instance
+
+
+def stop_dispatcher() -> None:
+    """Dispatcher'ı durdur ve SMTP bağlantısını kapat"""
+    global _dispatcher_instance
+    if _dispatcher_instance is not None:
+        _dispatcher_instance.stop()
+        _dispatcher_instance = None
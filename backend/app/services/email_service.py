@@ -1,18 +1,24 @@
 """
 OptiPlan 360 - Email Service
 SMTP entegrasyonu ve email şablon yönetimi
+
+send_email mesajı ``email_messages`` kuyruğuna yazar ve hemen döner; SMTP
+gönderimini app/services/email_dispatcher.py arka planda yapar.
 """
 
+import logging
 import os
-import smtplib
-import ssl
 from email import encoders
 from email.mime.base import MIMEBase
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
+from uuid import uuid4
 
 from jinja2 import Template
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
 
 # Email şablonları
 EMAIL_TEMPLATES = {
@@ -90,7 +96,16 @@ class EmailService:
         self.smtp_user = os.getenv("SMTP_USER", "")
         self.smtp_password = os.getenv("SMTP_PASSWORD", "")
         self.smtp_from = os.getenv("SMTP_FROM", "noreply@optiplan360.com")
+        self.smtp_starttls = os.getenv("SMTP_STARTTLS", "1") == "1"
         self.app_url = os.getenv("APP_URL", "https://optiplan360.com")
+        self.session_factory: Optional[Callable[[], Session]] = None
+
+    def _session(self) -> Session:
+        if self.session_factory is None:
+            from app.database import SessionLocal
+
+            self.session_factory = SessionLocal
+        return self.session_factory()
 
     def is_configured(self) -> bool:
         """SMTP ayarları yapılandırılmış mı?"""
@@ -105,52 +120,76 @@ class EmailService:
         template = Template(template_str)
         return template.render(**context, app_url=self.app_url)
 
+    def build_message(
+        self,
+        to_email: str,
+        subject: str,
+        html_content: str,
+        attachments: Optional[List[Dict]] = None,
+    ) -> str:
+        """Gönderime hazır MIME içeriği"""
+        msg = MIMEMultipart("alternative")
+        msg["Subject"] = subject
+        msg["From"] = self.smtp_from
+        msg["To"] = to_email
+
+        # HTML content
+        html_part = MIMEText(html_content, "html", "utf-8")
+        msg.attach(html_part)
+
+        # Attachments
+        if attachments:
+            for att in attachments:
+                part = MIMEBase("application", "octet-stream")
+                part.set_payload(att["content"])
+                encoders.encode_base64(part)
+                part.add_header(
+                    "Content-Disposition", f'attachment; filename= {att["filename"]}'
+                )
+                msg.attach(part)
+
+        return msg.as_string()
+
     def send_email(
         self,
         to_email: str,
         subject: str,
         html_content: str,
         attachments: Optional[List[Dict]] = None,
+        template: Optional[str] = None,
     ) -> bool:
-        """Email gönder"""
+        """Email'i gönderim kuyruğuna ekle (SMTP gönderimi arka planda)"""
         if not self.is_configured():
-            print("SMTP not configured")
+            logger.warning("SMTP not configured")
             return False
 
+        from app.models import EmailMessage
+
         try:
-            msg = MIMEMultipart("alternative")
-            msg["Subject"] = subject
-            msg["From"] = self.smtp_from
-            msg["To"] = to_email
-
-            # HTML content
-            html_part = MIMEText(html_content, "html", "utf-8")
-            msg.attach(html_part)
-
-            # Attachments
-            if attachments:
-                for att in attachments:
-                    part = MIMEBase("application", "octet-stream")
-                    part.set_payload(att["content"])
-                    encoders.encode_base64(part)
-                    part.add_header(
-                        "Content-Disposition", f'attachment; filename= {att["filename"]}'
+            raw_message = self.build_message(to_email, subject, html_content, attachments)
+            with self._session() as db:
+                db.add(
+                    EmailMessage(
+                        id=str(uuid4()),
+                        to_email=to_email,
+                        subject=subject,
+                        template=template,
+                        raw_message=raw_message,
+                        status="PENDING",
                     )
-                    msg.attach(part)
-
-            # Send
-            context = ssl.create_default_context()
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-                server.starttls(context=context)
-                server.login(self.smtp_user, self.smtp_password)
-                server.send_message(msg)
-
-            return True
-
+                )
+                db.commit()
         except Exception as e:
-            print(f"Email send failed: {e}")
+            logger.error("Email enqueue failed: %s", e)
             return False
 
+        from app.services.email_dispatcher import get_dispatcher
+
+        dispatcher = get_dispatcher()
+        if dispatcher is not None:
+            dispatcher.notify()
+        return True
+
     def send_order_created(
         self, to_email: str, customer_name: str, order_id: str, order_date: str, order_status: str
     ) -> bool:
@@ -164,7 +203,9 @@ class EmailService:
                 "order_status": order_status,
             },
         )
-        return self.send_email(to_email, f"Sipariş Oluşturuldu - #{order_id}", html)
+        return self.send_email(
+            to_email, f"Sipariş Oluşturuldu - #{order_id}", html, template="order_created"
+        )
 
     def send_order_status_changed(
         self, to_email: str, customer_name: str, order_id: str, old_status: str, new_status: str
@@ -179,7 +220,12 @@ class EmailService:
                 "new_status": new_status,
             },
         )
-        return self.send_email(to_email, f"Sipariş Durumu Güncellendi - #{order_id}", html)
+        return self.send_email(
+            to_email,
+            f"Sipariş Durumu Güncellendi - #{order_id}",
+            html,
+            template="order_status_changed",
+        )
 
     def send_payment_reminder(
         self,
@@ -201,7 +247,9 @@ class EmailService:
                 "due_date": due_date,
             },
         )
-        return self.send_email(to_email, f"Ödeme Hatırlatması - Fatura #{invoice_id}", html)
+        return self.send_email(
+            to_email, f"Ödeme Hatırlatması - Fatura #{invoice_id}", html, template="reminder_payment"
+        )
 
     def send_welcome(self, to_email: str, username: str) -> bool:
         """Hoş geldin emaili gönder"""
@@ -211,14 +259,16 @@ class EmailService:
                 "username": username,
             },
         )
-        return self.send_email(to_email, "OptiPlan 360'a Hoş Geldiniz!", html)
+        return self.send_email(to_email, "OptiPlan 360'a Hoş Geldiniz!", html, template="welcome")
 
     def send_password_reset(self, to_email: str, username: str, reset_link: str) -> bool:
         """Şifre sıfırlama emaili gönder"""
         html = self.render_template(
             "forgot_password", {"username": username, "reset_link": reset_link}
         )
-        return self.send_email(to_email, "OptiPlan360 - Şifre Sıfırlama İstediğiniz", html)
+        return self.send_email(
+            to_email, "OptiPlan360 - Şifre Sıfırlama İstediğiniz", html, template="forgot_password"
+        )
 
     def send_ticket_reply(
         self, to_email: str, username: str, subject: str, reply_message: str
@@ -228,7 +278,9 @@ class EmailService:
             "ticket_replied",
             {"username": username, "subject": subject, "reply_message": reply_message},
         )
-        return self.send_email(to_email, f"Destek Talebiniz Yanıtlandı: {subject}", html)
+        return self.send_email(
+            to_email, f"Destek Talebiniz Yanıtlandı: {subject}", html, template="ticket_replied"
+        )
 
 
 # Singleton instance
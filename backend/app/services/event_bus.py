@@ -0,0 +1,328 @@
+"""
+OptiPlan 360 - WebSocket Olay Yolu (Event Bus)
+WebSocket olaylarını tüm uvicorn worker'larına dağıtır.
+
+Bir worker'da oluşan olay (istasyon okutma, XML collector durum geçişi) önce
+arka uca yazılır; her worker arka ucu dinler ve olayı kendi bağlı istemcilerine
+iletir. Teslimat, arka ucun tek sıralı akışından yapıldığı için kanal bazında
+her worker olayları aynı sırada görür.
+
+Arka uçlar (``WS_BUS_BACKEND``):
+- ``memory``  : tek süreç, harici bağımlılık yok (varsayılan)
+- ``sqlite``  : paylaşımlı SQLite dosyasındaki ``ws_events`` tablosu (WAL);
+                her worker artan id sırasıyla okur. ``WS_BUS_URL`` dosya yoludur.
+- ``postgres``: LISTEN/NOTIFY (psycopg2). ``WS_BUS_URL`` yoksa DATABASE_URL kullanılır.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[Dict[str, Any]], None]
+Deliver = Callable[[str, str], None]
+
+SQLITE_POLL_INTERVAL_SECONDS = 0.05
+SQLITE_RETENTION_SECONDS = 300  # Okunmuş olayların tutulma süresi
+SQLITE_BATCH_SIZE = 500
+POSTGRES_NOTIFY_CHANNEL = "optiplan_ws"
+POSTGRES_MAX_PAYLOAD = 7900  # NOTIFY yük sınırı 8000 bayt
+
+
+class BroadcastBackend:
+    """Arka uç arayüzü: ``publish_sync`` her iş parçacığından çağrılabilir."""
+
+    name = "base"
+
+    async def start(self, deliver: Deliver) -> None:
+        raise NotImplementedError
+
+    async def stop(self) -> None:
+        pass
+
+    def publish_sync(self, channel: str, payload: str) -> None:
+        raise NotImplementedError
+
+    async def publish(self, channel: str, payload: str) -> None:
+        await asyncio.to_thread(self.publish_sync, channel, payload)
+
+
+class MemoryBackend(BroadcastBackend):
+    """Tek süreç içi dağıtım; olaylar event loop sırasıyla teslim edilir."""
+
+    name = "memory"
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._deliver: Optional[Deliver] = None
+
+    async def start(self, deliver: Deliver) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._deliver = deliver
+
+    async def stop(self) -> None:
+        self._loop = None
+        self._deliver = None
+
+    def publish_sync(self, channel: str, payload: str) -> None:
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._deliver, channel, payload)
+
+    async def publish(self, channel: str, payload: str) -> None:
+        self.publish_sync(channel, payload)
+
+
+class SQLiteBackend(BroadcastBackend):
+    """Paylaşımlı SQLite dosyası üzerinden worker'lar arası dağıtım."""
+
+    name = "sqlite"
+
+    def __init__(
+        self,
+        path: str,
+        poll_interval: float = SQLITE_POLL_INTERVAL_SECONDS,
+        retention_seconds: float = SQLITE_RETENTION_SECONDS,
+    ):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.retention_seconds = retention_seconds
+        self._local = threading.local()
+        self._deliver: Optional[Deliver] = None
+        self._task: Optional[asyncio.Task] = None
+        self._last_id = 0
+        self._last_cleanup = 0.0
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _setup(self) -> int:
+        conn = self._connect()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS ws_events ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "channel TEXT NOT NULL, "
+            "payload TEXT NOT NULL, "
+            "created_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_ws_events_created_at ON ws_events(created_at)")
+        # Yalnız bundan sonraki olaylar; eski olaylar yeni bağlanan worker'a tekrar gönderilmez
+        return conn.execute("SELECT COALESCE(MAX(id), 0) FROM ws_events").fetchone()[0]
+
+    async def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+        self._last_id = await asyncio.to_thread(self._setup)
+        self._task = asyncio.create_task(self._poll_loop(), name="ws-bus-sqlite")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def publish_sync(self, channel: str, payload: str) -> None:
+        self._connect().execute(
+            "INSERT INTO ws_events (channel, payload, created_at) VALUES (?, ?, ?)",
+            (channel, payload, time.time()),
+        )
+
+    def _fetch(self, after_id: int) -> List[tuple]:
+        conn = self._connect()
+        rows = conn.execute(
+            "SELECT id, channel, payload FROM ws_events WHERE id > ? ORDER BY id LIMIT ?",
+            (after_id, SQLITE_BATCH_SIZE),
+        ).fetchall()
+        now = time.time()
+        if now - self._last_cleanup > self.retention_seconds / 2:
+            self._last_cleanup = now
+            conn.execute("DELETE FROM ws_events WHERE created_at < ?", (now - self.retention_seconds,))
+        return rows
+
+    async def _poll_loop(self) -> None:
+        while True:
+            try:
+                rows = await asyncio.to_thread(self._fetch, self._last_id)
+            except sqlite3.Error as e:
+                logger.error("WS olay yolu okunamadı: %s", e)
+                rows = []
+            for event_id, channel, payload in rows:
+                self._last_id = event_id
+                self._deliver(channel, payload)
+            if len(rows) < SQLITE_BATCH_SIZE:
+                await asyncio.sleep(self.poll_interval)
+
+
+class PostgresNotifyBackend(BroadcastBackend):
+    """Postgres LISTEN/NOTIFY ile worker'lar arası dağıtım (psycopg2)."""
+
+    name = "postgres"
+
+    def __init__(self, dsn: str, notify_channel: str = POSTGRES_NOTIFY_CHANNEL):
+        self.dsn = dsn.replace("postgresql+psycopg2://", "postgresql://")
+        self.notify_channel = notify_channel
+        self._local = threading.local()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._deliver: Optional[Deliver] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    def _connect(self):
+        import psycopg2
+
+        conn = psycopg2.connect(self.dsn)
+        conn.autocommit = True
+        return conn
+
+    async def start(self, deliver: Deliver) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._deliver = deliver
+        self._stopping.clear()
+        ready = threading.Event()
+        self._thread = threading.Thread(
+            target=self._listen, args=(ready,), name="ws-bus-postgres", daemon=True
+        )
+        self._thread.start()
+        await asyncio.to_thread(ready.wait, 10)
+
+    def _listen(self, ready: threading.Event) -> None:
+        import select
+
+        while not self._stopping.is_set():
+            try:
+                conn = self._connect()
+                with conn.cursor() as cur:
+                    cur.execute(f'LISTEN "{self.notify_channel}"')
+                ready.set()
+                while not self._stopping.is_set():
+                    if select.select([conn], [], [], 1.0) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        data = json.loads(conn.notifies.pop(0).payload)
+                        self._loop.call_soon_threadsafe(self._deliver, data["c"], data["p"])
+                conn.close()
+            except Exception as e:
+                logger.error("WS olay yolu LISTEN bağlantısı koptu: %s", e)
+                ready.set()
+                self._stopping.wait(2.0)
+
+    async def stop(self) -> None:
+        self._stopping.set()
+        if self._thread is not None:
+            await asyncio.to_thread(self._thread.join, 5)
+            self._thread = None
+
+    def publish_sync(self, channel: str, payload: str) -> None:
+        data = json.dumps({"c": channel, "p": payload})
+        if len(data.encode("utf-8")) > POSTGRES_MAX_PAYLOAD:
+            logger.warning("WS olayı NOTIFY sınırını aşıyor, atlandı (kanal=%s)", channel)
+            return
+        conn = getattr(self._local, "conn", None)
+        if conn is None or conn.closed:
+            conn = self._local.conn = self._connect()
+        with conn.cursor() as cur:
+            cur.execute("SELECT pg_notify(%s, %s)", (self.notify_channel, data))
+
+
+def create_backend_from_env() -> BroadcastBackend:
+    kind = os.environ.get("WS_BUS_BACKEND", "memory").strip().lower()
+    url = os.environ.get("WS_BUS_URL", "").strip()
+    if kind == "sqlite":
+        return SQLiteBackend(url or "ws_bus.db")
+    if kind == "postgres":
+        return PostgresNotifyBackend(url or os.environ.get("DATABASE_URL", ""))
+    if kind != "memory":
+        logger.warning("Bilinmeyen WS_BUS_BACKEND=%s, memory kullanılıyor", kind)
+    return MemoryBackend()
+
+
+class EventBus:
+    """Kanal bazlı yayın; yerel abonelere arka uç üzerinden teslim eder."""
+
+    def __init__(self, backend: Optional[BroadcastBackend] = None):
+        self.backend = backend
+        self._handlers: Dict[str, List[Handler]] = defaultdict(list)
+        self._started = False
+        self.published = 0
+        self.delivered = 0
+
+    @property
+    def started(self) -> bool:
+        return self._started
+
+    def subscribe(self, channel: str, handler: Handler) -> None:
+        """Yerel abone ekle. Handler event loop'ta çağrılır ve beklememelidir."""
+        self._handlers[channel].append(handler)
+
+    async def start(self, backend: Optional[BroadcastBackend] = None) -> None:
+        if self._started:
+            return
+        if backend is not None:
+            self.backend = backend
+        if self.backend is None:
+            self.backend = create_backend_from_env()
+        await self.backend.start(self._deliver)
+        self._started = True
+        logger.info("WS olay yolu başlatıldı (%s)", self.backend.name)
+
+    async def stop(self) -> None:
+        if not self._started:
+            return
+        self._started = False
+        await self.backend.stop()
+
+    def _deliver(self, channel: str, payload: str) -> None:
+        handlers = self._handlers.get(channel)
+        if not handlers:
+            return
+        message = json.loads(payload)
+        self.delivered += 1
+        for handler in handlers:
+            try:
+                handler(message)
+            except Exception as e:
+                logger.error("WS olay işleyici hatası (kanal=%s): %s", channel, e)
+
+    async def publish(self, channel: str, message: Dict[str, Any]) -> None:
+        """Olayı tüm worker'lara yayınla. Yol başlatılmadıysa yalnız yerelde teslim edilir."""
+        payload = json.dumps(message, default=str)
+        self.published += 1
+        if not self._started:
+            self._deliver(channel, payload)
+            return
+        await self.backend.publish(channel, payload)
+
+    def publish_nowait(self, channel: str, message: Dict[str, Any]) -> None:
+        """Senkron koddan (zamanlayıcı iş parçacıkları dahil) yayın."""
+        payload = json.dumps(message, default=str)
+        self.published += 1
+        if self._started:
+            try:
+                self.backend.publish_sync(channel, payload)
+            except Exception as e:
+                logger.error("WS olayı yayınlanamadı (kanal=%s): %s", channel, e)
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return  # Event loop yok: bağlı istemci de yok
+        self._deliver(channel, payload)
+
+
+# Singleton instance
+bus = EventBus()
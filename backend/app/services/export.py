@@ -13,10 +13,14 @@ from ..exceptions import NotFoundError, ValidationError
 from ..models import OptiJob, Order, OrderPart
 from .export_validator import ExportValidator
 from .filename_generator import FilenameGenerator
+from .opti_xlsx_writer import OptiSheetTemplate, write_opti_workbook
 
 EXPORT_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "exports")
 os.makedirs(EXPORT_DIR, exist_ok=True)
 
+# Eski pandas ``to_excel(index=False)`` düzeni: "Sheet1", stilsiz başlık
+JOB_EXPORT_TEMPLATE = OptiSheetTemplate(title="Sheet1", header=tuple(REQUIRED_COLUMNS))
+
 
 def generate_xlsx_for_job(job: OptiJob, parts: list[OrderPart], output_dir: str) -> list[str]:
     """GOVDE ve ARKALIK gruplari icin XLSX uretir."""
@@ -46,8 +50,8 @@ def generate_xlsx_for_job(job: OptiJob, parts: list[OrderPart], output_dir: str)
             continue
 
         thickness = _resolve_group_thickness(order, part_group, group_parts)
-        frame = _build_export_dataframe(group_parts, part_group)
-        validation = validator.validate(frame, group=part_group)
+        rows = _build_export_rows(group_parts, part_group)
+        validation = validator.validate(pd.DataFrame(rows, columns=REQUIRED_COLUMNS), group=part_group)
         if not validation.is_valid:
             raise ValidationError(f"Export kural ihlali: {validation.errors}")
 
@@ -60,7 +64,7 @@ def generate_xlsx_for_job(job: OptiJob, parts: list[OrderPart], output_dir: str)
         final_path = export_root / filename
         tmp_path = final_path.with_name(f"{final_path.stem}.tmp{final_path.suffix}")
         try:
-            frame.to_excel(tmp_path, index=False)
+            write_opti_workbook(tmp_path, JOB_EXPORT_TEMPLATE, rows)
             os.replace(tmp_path, final_path)
         finally:
             if tmp_path.exists():
@@ -111,29 +115,28 @@ def export_order_to_excel_openpyxl(order):
     return generate_xlsx_for_job(export_job, list(order.parts), EXPORT_DIR)
 
 
-def _build_export_dataframe(parts: list[OrderPart], group: str) -> pd.DataFrame:
-    rows: list[dict[str, object]] = []
+def _build_export_rows(parts: list[OrderPart], group: str) -> list[list[object]]:
+    """REQUIRED_COLUMNS sırasıyla satırlar."""
+    rows: list[list[object]] = []
     is_arkalik = group == "ARKALIK"
 
     for index, part in enumerate(parts, start=1):
         rows.append(
-            {
-                "NO": index,
-                "CODE": str(getattr(part, "id", index)),
-                "LENGTH": _coerce_dimension(getattr(part, "boy_mm", None), getattr(part, "boy", None)),
-                "WIDTH": _coerce_dimension(getattr(part, "en_mm", None), getattr(part, "en", None)),
-                "QUANTITY": int(getattr(part, "adet", None) or getattr(part, "quantity", None) or 1),
-                "GRAIN": _normalize_grain(
-                    getattr(part, "grain_code", None) or getattr(part, "grain", None)
-                ),
-                "TOP_EDGE": "" if is_arkalik else _edge_cell(getattr(part, "u1", None)),
-                "BOTTOM_EDGE": "" if is_arkalik else _edge_cell(getattr(part, "u2", None)),
-                "LEFT_EDGE": "" if is_arkalik else _edge_cell(getattr(part, "k1", None)),
-                "RIGHT_EDGE": "" if is_arkalik else _edge_cell(getattr(part, "k2", None)),
-            }
+            [
+                index,
+                str(getattr(part, "id", index)),
+                _coerce_dimension(getattr(part, "boy_mm", None), getattr(part, "boy", None)),
+                _coerce_dimension(getattr(part, "en_mm", None), getattr(part, "en", None)),
+                int(getattr(part, "adet", None) or getattr(part, "quantity", None) or 1),
+                _normalize_grain(getattr(part, "grain_code", None) or getattr(part, "grain", None)),
+                "" if is_arkalik else _edge_cell(getattr(part, "u1", None)),
+                "" if is_arkalik else _edge_cell(getattr(part, "u2", None)),
+                "" if is_arkalik else _edge_cell(getattr(part, "k1", None)),
+                "" if is_arkalik else _edge_cell(getattr(part, "k2", None)),
+            ]
         )
 
-    return pd.DataFrame(rows, columns=REQUIRED_COLUMNS)
+    return rows
 
 
 def _coerce_dimension(primary: object, fallback: object) -> float:
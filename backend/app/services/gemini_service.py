@@ -1,6 +1,10 @@
 """
 Gemini AI Servisi - Google Gemini API entegrasyonu
 OptiPlan 360 için AI destekli asistan fonksiyonları
+
+Metin ve görüntü yanıtları app/services/llm_cache.py ile önbelleğe alınır;
+çağrı bazında ``use_cache=False`` ile atlanabilir. JSON bekleyen çağrılar
+``cache_validator`` verir; çözümlenemeyen yanıt önbelleğe yazılmaz.
 """
 
 import asyncio
@@ -9,13 +13,33 @@ import json
 import logging
 import os
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 import google.generativeai as genai
+from app.services.llm_cache import llm_cache
 from google.generativeai.types import HarmBlockThreshold, HarmCategory
 
 logger = logging.getLogger(__name__)
 
+TEXT_MODEL_NAME = "gemini-1.5-pro"
+VISION_MODEL_NAME = "gemini-1.5-pro-visional"
+
+
+def parse_json_reply(text: str) -> Any:
+    """Model yanıtındaki JSON'u çözer (```json bloğu temizlenir); geçersizse ValueError."""
+    json_text = (text or "").strip()
+    if json_text.startswith("```json"):
+        json_text = json_text.replace("```json", "").replace("```", "").strip()
+    return json.loads(json_text)
+
+
+def is_json_reply(text: str) -> bool:
+    try:
+        parse_json_reply(text)
+    except ValueError:
+        return False
+    return True
+
 
 class GeminiService:
     """Google Gemini AI servis sınıfı"""
@@ -73,19 +97,32 @@ class GeminiService:
 
         # Modeller
         self.text_model = genai.GenerativeModel(
-            model_name="gemini-1.5-pro",
+            model_name=TEXT_MODEL_NAME,
             generation_config=self.model_config,
             safety_settings=self.safety_settings,
         )
 
         self.vision_model = genai.GenerativeModel(
-            model_name="gemini-1.5-pro-visional",
+            model_name=VISION_MODEL_NAME,
             generation_config=self.model_config,
             safety_settings=self.safety_settings,
         )
 
+    def _cache_config(self, **extra: Any) -> Dict[str, Any]:
+        """Önbellek anahtarına giren üretim ayarları"""
+        safety = {
+            getattr(category, "name", str(category)): getattr(threshold, "name", str(threshold))
+            for category, threshold in self.safety_settings.items()
+        }
+        return {"generation": self.model_config, "safety": safety, **extra}
+
     async def generate_text_response(
-        self, prompt: str, context: Optional[str] = None, system_instruction: Optional[str] = None
+        self,
+        prompt: str,
+        context: Optional[str] = None,
+        system_instruction: Optional[str] = None,
+        use_cache: bool = True,
+        cache_validator: Optional[Callable[[str], bool]] = None,
     ) -> Dict[str, Any]:
         """
         Metin tabanlı yanıt üretir
@@ -94,6 +131,8 @@ class GeminiService:
             prompt: Kullanıcı sorusu/komutu
             context: İsteğe bağlı bağlam bilgisi
             system_instruction: Sistem talimatları
+            use_cache: False ise önbellek atlanır
+            cache_validator: Yanıt yalnız True döndürürse önbelleğe yazılır/önbellekten verilir
 
         Returns:
             Dict: Yanıt ve metadata
@@ -102,15 +141,42 @@ class GeminiService:
             # Sistem talimatını hazırla
             full_prompt = self._build_prompt(prompt, context, system_instruction)
 
+            key, cached = await asyncio.to_thread(
+                llm_cache.lookup,
+                "gemini",
+                TEXT_MODEL_NAME,
+                self._cache_config(),
+                full_prompt,
+                use_cache=use_cache,
+            )
+            if cached is not None and (cache_validator is None or cache_validator(cached["text"])):
+                return {
+                    "success": True,
+                    "response": cached["text"],
+                    "model": TEXT_MODEL_NAME,
+                    "timestamp": datetime.utcnow().isoformat(),
+                    "tokens_used": None,
+                    "cached": True,
+                }
+
             # Asenkron yanıt üret
             response = await asyncio.to_thread(self.text_model.generate_content, full_prompt)
+            if cache_validator is None or cache_validator(response.text):
+                await asyncio.to_thread(
+                    llm_cache.store,
+                    key,
+                    {"text": response.text},
+                    provider="gemini",
+                    model=TEXT_MODEL_NAME,
+                )
 
             return {
                 "success": True,
                 "response": response.text,
-                "model": "gemini-1.5-pro",
+                "model": TEXT_MODEL_NAME,
                 "timestamp": datetime.utcnow().isoformat(),
                 "tokens_used": getattr(response, "usage_metadata", None),
+                "cached": False,
             }
 
         except Exception as e:
@@ -118,7 +184,11 @@ class GeminiService:
             return {"success": False, "error": str(e), "timestamp": datetime.utcnow().isoformat()}
 
     async def analyze_image(
-        self, image_data: bytes, prompt: str, mime_type: str = "image/jpeg"
+        self,
+        image_data: bytes,
+        prompt: str,
+        mime_type: str = "image/jpeg",
+        use_cache: bool = True,
     ) -> Dict[str, Any]:
         """
         Görüntü analizi yapar
@@ -127,6 +197,7 @@ class GeminiService:
             image_data: Görüntü verisi (bytes)
             prompt: Analiz talimatı
             mime_type: Görüntü formatı
+            use_cache: False ise önbellek atlanır
 
         Returns:
             Dict: Analiz sonuçları
@@ -137,28 +208,54 @@ class GeminiService:
             # Görüntüyü yükle
             image = PIL.Image.open(io.BytesIO(image_data))
 
-            # Vision model ile analiz et
-            response = await asyncio.to_thread(self.vision_model.generate_content, [prompt, image])
+            key, cached = await asyncio.to_thread(
+                llm_cache.lookup,
+                "gemini",
+                VISION_MODEL_NAME,
+                self._cache_config(mime_type=mime_type),
+                prompt,
+                (image_data,),
+                use_cache=use_cache,
+            )
+            if cached is not None:
+                response_text = cached["text"]
+            else:
+                # Vision model ile analiz et
+                response = await asyncio.to_thread(
+                    self.vision_model.generate_content, [prompt, image]
+                )
+                response_text = response.text
+                await asyncio.to_thread(
+                    llm_cache.store,
+                    key,
+                    {"text": response_text},
+                    provider="gemini",
+                    model=VISION_MODEL_NAME,
+                )
 
             return {
                 "success": True,
-                "response": response.text,
-                "model": "gemini-1.5-pro-visional",
+                "response": response_text,
+                "model": VISION_MODEL_NAME,
                 "timestamp": datetime.utcnow().isoformat(),
                 "image_size": f"{image.width}x{image.height}",
+                "cached": cached is not None,
             }
 
         except Exception as e:
             logger.error(f"Gemini görüntü analizi hatası: {str(e)}")
             return {"success": False, "error": str(e), "timestamp": datetime.utcnow().isoformat()}
 
-    async def extract_structured_data(self, text: str, schema: Dict[str, Any]) -> Dict[str, Any]:
+    async def extract_structured_data(
+        self, text: str, schema: Dict[str, Any], use_cache: bool = True
+    ) -> Dict[str, Any]:
         """
         Metinden yapılandırılmış veri çıkarır
 
         Args:
             text: İşlenecek metin
             schema: Beklenen veri şeması
+            use_cache: False ise önbellek atlanır
 
         Returns:
             Dict: Yapılandırılmış veri
@@ -178,17 +275,13 @@ class GeminiService:
             response = await self.generate_text_response(
                 prompt=schema_prompt,
                 system_instruction="Sen bir veri çıkarma uzmanısın. Sadece geçerli JSON formatında yanıt ver.",
+                use_cache=use_cache,
+                cache_validator=is_json_reply,
             )
 
             if response["success"]:
                 try:
-                    # JSON yanıtını parse et
-                    json_text = response["response"].strip()
-                    if json_text.startswith("```json"):
-                        json_text = json_text.replace("```json", "").replace("```", "").strip()
-
-                    extracted_data = json.loads(json_text)
-                    response["extracted_data"] = extracted_data
+                    response["extracted_data"] = parse_json_reply(response["response"])
 
                 except json.JSONDecodeError as e:
                     response["success"] = False
@@ -225,7 +318,7 @@ class GeminiService:
             # Chat session oluştur
             if system_instruction:
                 model = genai.GenerativeModel(
-                    model_name="gemini-1.5-pro",
+                    model_name=TEXT_MODEL_NAME,
                     system_instruction=system_instruction,
                     generation_config=self.model_config,
                     safety_settings=self.safety_settings,
@@ -242,7 +335,7 @@ class GeminiService:
             return {
                 "success": True,
                 "response": response.text,
-                "model": "gemini-1.5-pro",
+                "model": TEXT_MODEL_NAME,
                 "timestamp": datetime.utcnow().isoformat(),
                 "tokens_used": getattr(response, "usage_metadata", None),
             }
@@ -268,7 +361,7 @@ class GeminiService:
         return "\n".join(parts)
 
     async def analyze_document(
-        self, document_text: str, document_type: str = "general"
+        self, document_text: str, document_type: str = "general", use_cache: bool = True
     ) -> Dict[str, Any]:
         """
         Doküman analizi yapar (fatura, sözleşme, vb.)
@@ -276,6 +369,7 @@ class GeminiService:
         Args:
             document_text: Doküman metni
             document_type: Doküman tipi
+            use_cache: False ise önbellek atlanır
 
         Returns:
             Dict: Analiz sonuçları
@@ -302,7 +396,7 @@ class GeminiService:
             """
 
             return await self.generate_text_response(
-                prompt=prompt, system_instruction=system_instruction
+                prompt=prompt, system_instruction=system_instruction, use_cache=use_cache
             )
 
         except Exception as e:
@@ -0,0 +1,256 @@
+"""
+OptiPlan360 — LLM Yanıt Önbelleği
+Aynı prompt'un sağlayıcıya tekrar gönderilmesini önleyen kalıcı önbellek
+(``llm_response_cache`` tablosu).
+
+- Anahtar: sağlayıcı, model, üretim ayarları, prompt ve eklerin (or. görüntü
+  baytları) SHA-256 özeti; ayarlardan biri değişirse kayıt kullanılmaz.
+- Kayıtlar ``LLM_CACHE_TTL_SECONDS`` sonra geçersizdir. Yazımda toplam kayıt
+  ``LLM_CACHE_MAX_ENTRIES`` ve toplam boyut ``LLM_CACHE_MAX_BYTES`` altında
+  tutulur; en uzun süredir kullanılmayanlar silinir.
+- Çağrı bazında ``use_cache=False`` ile atlanır; ``LLM_CACHE_ENABLED=0`` tümden
+  kapatır. Önbellek hatası LLM çağrısını bozmaz, ıskalama sayılır.
+
+Kullanım:
+    key, cached = llm_cache.lookup("openai", model, config, prompt)
+    if cached is None:
+        cached = {"content": call_provider(...)}
+        llm_cache.store(key, cached, provider="openai", model=model)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from app.models import LLMCacheEntry
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+LLM_CACHE_ENABLED = os.environ.get("LLM_CACHE_ENABLED", "1") == "1"
+LLM_CACHE_TTL_SECONDS = int(os.environ.get("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.environ.get("LLM_CACHE_MAX_ENTRIES", "5000"))
+LLM_CACHE_MAX_BYTES = int(os.environ.get("LLM_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def cache_key(
+    provider: str,
+    model: str,
+    config: Dict[str, Any],
+    prompt: str,
+    attachments: Iterable[bytes] = (),
+) -> str:
+    """İçerik adresli önbellek anahtarı (64 karakter hex)."""
+    header = json.dumps(
+        {"provider": provider, "model": model, "config": config},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    digest = hashlib.sha256()
+    for part in (header.encode("utf-8"), prompt.encode("utf-8")):
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    for data in attachments:
+        digest.update(hashlib.sha256(data).digest())
+    return digest.hexdigest()
+
+
+@dataclass
+class LLMCacheStats:
+    hits: int = 0
+    misses: int = 0
+    bypassed: int = 0
+    stores: int = 0
+    evictions: int = 0
+    errors: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return round(self.hits / lookups, 4) if lookups else 0.0
+
+
+class LLMResponseCache:
+    """Kalıcı, TTL ve boyut sınırlı LLM yanıt önbelleği."""
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Session]] = None,
+        *,
+        enabled: bool = LLM_CACHE_ENABLED,
+        ttl_seconds: int = LLM_CACHE_TTL_SECONDS,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+        max_bytes: int = LLM_CACHE_MAX_BYTES,
+    ):
+        self.session_factory = session_factory
+        self.enabled = enabled
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stats = LLMCacheStats()
+        self._lock = threading.Lock()
+
+    def _session(self) -> Session:
+        if self.session_factory is None:
+            from app.database import SessionLocal
+
+            self.session_factory = SessionLocal
+        return self.session_factory()
+
+    def _count(self, field: str, amount: int = 1) -> None:
+        with self._lock:
+            setattr(self.stats, field, getattr(self.stats, field) + amount)
+
+    # ─── Okuma / yazma ───
+
+    def lookup(
+        self,
+        provider: str,
+        model: str,
+        config: Dict[str, Any],
+        prompt: str,
+        attachments: Iterable[bytes] = (),
+        use_cache: bool = True,
+    ) -> Tuple[Optional[str], Optional[Any]]:
+        """
+        (anahtar, önbellekteki değer) döndürür. Değer yoksa None; anahtar None ise
+        önbellek atlanmıştır ve ``store`` bir şey yazmaz.
+        """
+        if not (use_cache and self.enabled):
+            self._count("bypassed")
+            return None, None
+        key = cache_key(provider, model, config, prompt, attachments)
+        value = self.get(key)
+        self._count("hits" if value is not None else "misses")
+        return key, value
+
+    def get(self, key: str) -> Optional[Any]:
+        now = _utcnow()
+        try:
+            with self._session() as db:
+                raw = db.scalar(
+                    select(LLMCacheEntry.value).where(
+                        LLMCacheEntry.key == key, LLMCacheEntry.expires_at > now
+                    )
+                )
+                if raw is None:
+                    return None
+                db.execute(
+                    update(LLMCacheEntry)
+                    .where(LLMCacheEntry.key == key)
+                    .values(last_used_at=now, hit_count=LLMCacheEntry.hit_count + 1)
+                )
+                db.commit()
+            return json.loads(raw)
+        except (SQLAlchemyError, ValueError) as e:
+            self._count("errors")
+            logger.warning("LLM önbelleği okunamadı: %s", e)
+            return None
+
+    def store(self, key: Optional[str], value: Any, *, provider: str, model: str) -> None:
+        if key is None:
+            return
+        raw = json.dumps(value, ensure_ascii=False, default=str)
+        size = len(raw.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        now = _utcnow()
+        try:
+            with self._session() as db:
+                db.merge(
+                    LLMCacheEntry(
+                        key=key,
+                        provider=provider,
+                        model=model,
+                        value=raw,
+                        size_bytes=size,
+                        hit_count=0,
+                        expires_at=now + timedelta(seconds=self.ttl_seconds),
+                        last_used_at=now,
+                    )
+                )
+                db.commit()
+                evicted = self._prune(db, now)
+            self._count("stores")
+            if evicted:
+                self._count("evictions", evicted)
+        except SQLAlchemyError as e:
+            self._count("errors")
+            logger.warning("LLM önbelleğine yazılamadı: %s", e)
+
+    def _prune(self, db: Session, now: datetime) -> int:
+        """Süresi dolanları, ardından sınırları aşan en eski kullanılanları sil."""
+        removed = db.execute(delete(LLMCacheEntry).where(LLMCacheEntry.expires_at <= now)).rowcount
+        entries, total = db.execute(
+            select(func.count(), func.coalesce(func.sum(LLMCacheEntry.size_bytes), 0))
+        ).one()
+        if entries > self.max_entries or total > self.max_bytes:
+            rows = db.execute(
+                select(LLMCacheEntry.key, LLMCacheEntry.size_bytes).order_by(
+                    LLMCacheEntry.last_used_at.desc()
+                )
+            ).all()
+            kept = kept_bytes = 0
+            stale = []
+            for key, size in rows:
+                if kept < self.max_entries and kept_bytes + size <= self.max_bytes:
+                    kept += 1
+                    kept_bytes += size
+                else:
+                    stale.append(key)
+            if stale:
+                db.execute(delete(LLMCacheEntry).where(LLMCacheEntry.key.in_(stale)))
+                removed += len(stale)
+        db.commit()
+        return removed
+
+    # ─── Yönetim ───
+
+    def clear(self, provider: Optional[str] = None) -> int:
+        with self._session() as db:
+            stmt = delete(LLMCacheEntry)
+            if provider:
+                stmt = stmt.where(LLMCacheEntry.provider == provider)
+            removed = db.execute(stmt).rowcount
+            db.commit()
+        return removed
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.stats = LLMCacheStats()
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            data = asdict(self.stats)
+            data["hit_rate"] = self.stats.hit_rate
+        data.update(
+            enabled=self.enabled,
+            ttl_seconds=self.ttl_seconds,
+            max_entries=self.max_entries,
+            max_bytes=self.max_bytes,
+        )
+        try:
+            with self._session() as db:
+                entries, total = db.execute(
+                    select(func.count(), func.coalesce(func.sum(LLMCacheEntry.size_bytes), 0))
+                ).one()
+            data.update(entries=entries, size_bytes=int(total))
+        except SQLAlchemyError as e:
+            logger.warning("LLM önbellek metrikleri okunamadı: %s", e)
+        return data
+
+
+# Singleton instance
+llm_cache = LLMResponseCache()
@@ -0,0 +1,384 @@
+"""
+OptiPlan 360 — Açılış ve bakım işleri
+
+Uygulama açılışı trafik almadan önce yalnız hızlı adımları çalıştırır:
+
+  - ``sync_schema``: tablo/kolon listeleri tek seferde okunur, yalnız eksikler
+    oluşturulur (tablo başına ``create_all`` / kolon başına PRAGMA yok)
+  - ``seed_canonical_stations`` / ``seed_admin_user``: idempotent tohumlar
+
+Tam tablo taraması gerektiren backfill'ler (tracking_token, phone_suffix,
+projeksiyon ve arama indeksi) hazır olduktan sonra zamanlayıcı liderinde
+``BACKFILL_CHUNK_SIZE`` satırlık partilerle yürür ve tamamlanana kadar yeniden
+denenir (bkz. app/tasks/reminders.py); ilerleme ``startup_status`` üzerinden
+``/health/ready`` ile raporlanır. Aynı işlerin tamamı ``scripts/maintenance.py``
+ile tek seferde (deploy adımı olarak) çalıştırılabilir.
+
+order_no backfill'i yalnız bu tek seferlik adımda çalışır: ``max + 1`` ile
+numara veren canlı sipariş oluşturmayla yarışır (benzersiz kolon) ve eski
+siparişler yenilerden sonra numaralanır.
+"""
+
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import func, inspect, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app import models
+from app.models import Customer, Order, Station, User
+from app.utils import phone_suffix_key
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_CHUNK_SIZE = int(os.getenv("STARTUP_BACKFILL_CHUNK", "500"))
+BACKFILL_PAUSE_SECONDS = float(os.getenv("STARTUP_BACKFILL_PAUSE", "0.05"))  # Partiler arası
+
+# Alembic'e geçmemiş kurulumlar için kolon self-heal listesi: (tablo, kolon, tip)
+SCHEMA_COLUMN_FIXES: list[tuple[str, str, str]] = [
+    ("orders", "tracking_token", "VARCHAR(36)"),
+    ("stations", "device_type", "VARCHAR"),
+    ("stations", "device_model", "VARCHAR"),
+    ("stations", "device_serial_number", "VARCHAR"),
+    ("stations", "ip_address", "VARCHAR"),
+    ("stations", "connection_type", "VARCHAR"),
+    ("stations", "installation_date", "TIMESTAMP"),
+    ("stations", "last_maintenance_date", "TIMESTAMP"),
+    ("crm_accounts", "plaka_birim_fiyat", "DOUBLE PRECISION"),
+    ("crm_accounts", "bant_metre_fiyat", "DOUBLE PRECISION"),
+    ("opti_jobs", "claim_token", "VARCHAR"),
+    ("opti_jobs", "xml_file_path", "VARCHAR"),
+    ("opti_jobs", "result_json", "TEXT"),
+    ("orders", "order_no", "INTEGER"),
+    ("orders", "reminder_count", "INTEGER DEFAULT 0"),
+    ("orders", "last_reminder_at", "TIMESTAMP"),
+    ("customers", "phone_suffix", "VARCHAR"),
+    ("whatsapp_messages", "attempts", "INTEGER DEFAULT 0"),
+    ("whatsapp_messages", "next_attempt_at", "TIMESTAMP"),
+    ("price_upload_jobs", "rows_processed", "INTEGER DEFAULT 0"),
+    ("price_upload_jobs", "content_hash", "VARCHAR(64)"),
+]
+
+SCHEMA_INDEX_FIXES: list[str] = [
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_orders_tracking_token ON orders(tracking_token)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS uq_single_opti_running "
+    "ON opti_jobs(state) WHERE state = 'OPTI_RUNNING'",
+    "CREATE INDEX IF NOT EXISTS ix_customers_phone_suffix ON customers(phone_suffix)",
+    "CREATE INDEX IF NOT EXISTS ix_whatsapp_message_status_next_attempt "
+    "ON whatsapp_messages(status, next_attempt_at)",
+    "CREATE INDEX IF NOT EXISTS ix_status_log_part_created ON status_logs(part_id, created_at)",
+    "CREATE INDEX IF NOT EXISTS ix_price_upload_jobs_content_hash ON price_upload_jobs(content_hash)",
+]
+
+# MASTER_HANDOFF §0.6 – 5 kanonik üretim istasyonu
+CANONICAL_STATIONS: list[dict[str, str]] = [
+    {
+        "name": "Hazırlık",
+        "description": "Malzeme hazırlama ve kesim hazırlığı (İki okutmalı: 1. okutma başlangıç)",
+        "istasyon_durumu": "Hazır",
+    },
+    {
+        "name": "Ebatlama",
+        "description": "Parçaların boyutlandırılması (İki okutmalı: 2. okutma tamamlandı)",
+        "istasyon_durumu": "Hazır",
+    },
+    {
+        "name": "Bantlama",
+        "description": "Kenar bantı uygulanması",
+        "istasyon_durumu": "Hazır",
+    },
+    {
+        "name": "Kontrol",
+        "description": "Kalite kontrolü (İki okutmalı: 1. okutma teslimata hazır)",
+        "istasyon_durumu": "Hazır",
+    },
+    {
+        "name": "Teslim",
+        "description": "Teslimat ve paketleme (İki okutmalı: 2. okutma teslimat yapıldı)",
+        "istasyon_durumu": "Hazır",
+    },
+]
+
+
+# ═══════════════════════════════════════════════════
+# ŞEMA + TOHUM (açılışta, hızlı)
+# ═══════════════════════════════════════════════════
+
+
+def sync_schema(bind: Engine) -> Dict[str, list]:
+    """Eksik tabloları oluşturur, eksik kolonları ekler, self-heal indekslerini kurar."""
+    existing = set(inspect(bind).get_table_names())
+    missing = [
+        table for name, table in models.Base.metadata.tables.items() if name not in existing
+    ]
+    if missing:
+        models.Base.metadata.create_all(bind=bind, tables=missing)
+
+    fixes_by_table: dict[str, list[tuple[str, str]]] = defaultdict(list)
+    for table_name, column_name, column_sql in SCHEMA_COLUMN_FIXES:
+        fixes_by_table[table_name].append((column_name, column_sql))
+
+    added_columns: list[str] = []
+    with bind.begin() as conn:
+        inspector = inspect(conn)
+        tables = set(inspector.get_table_names())
+        for table_name, specs in fixes_by_table.items():
+            if table_name not in tables:
+                continue
+            columns = {column["name"] for column in inspector.get_columns(table_name)}
+            for column_name, column_sql in specs:
+                if column_name in columns:
+                    continue
+                try:
+                    conn.execute(
+                        text(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_sql}")
+                    )
+                    added_columns.append(f"{table_name}.{column_name}")
+                except Exception as exc:
+                    logger.warning("Schema fix atlandi (%s.%s): %s", table_name, column_name, exc)
+        try:
+            for statement in SCHEMA_INDEX_FIXES:
+                conn.execute(text(statement))
+        except Exception as exc:
+            logger.warning("Schema index fix atlandi: %s", exc)
+
+    if added_columns:
+        logger.info("Schema self-heal: %d kolon eklendi.", len(added_columns))
+    return {"created_tables": [table.name for table in missing], "added_columns": added_columns}
+
+
+def seed_canonical_stations(db: Session) -> int:
+    """Kanonik istasyonları oluşturur. İdempotent: mevcut olanlar atlanır."""
+    names = [station["name"] for station in CANONICAL_STATIONS]
+    existing = set(db.scalars(select(Station.name).where(Station.name.in_(names))))
+    created = 0
+    for station in CANONICAL_STATIONS:
+        if station["name"] not in existing:
+            db.add(Station(active=True, **station))
+            created += 1
+    if created:
+        db.commit()
+        logger.info("Kanonik istasyonlar oluşturuldu: %d adet", created)
+    return created
+
+
+def seed_admin_user(db: Session) -> None:
+    """
+    Varsayılan admin kullanıcısını oluşturur.
+    İdempotent: admin zaten varsa atlar.
+    """
+    from app.auth import hash_password
+
+    existing = db.query(User).filter(User.username == "admin").first()
+    if existing:
+        # Şifre hash'i yoksa veya boşsa yeniden oluştur
+        if not existing.password_hash:
+            existing.password_hash = hash_password("admin")
+            db.commit()
+            logger.info("Admin kullanıcısının şifresi güncellendi.")
+        return
+    db.add(
+        User(
+            username="admin",
+            email="admin@optiplan360.local",
+            display_name="Admin",
+            password_hash=hash_password("admin"),
+            role="ADMIN",
+            is_active=True,
+        )
+    )
+    db.commit()
+    logger.info("Varsayılan admin kullanıcısı oluşturuldu (admin/admin).")
+
+
+# ═══════════════════════════════════════════════════
+# BACKFILL (hazır olduktan sonra, partili)
+# ═══════════════════════════════════════════════════
+
+
+def backfill_tracking_tokens(db: Session, limit: int) -> int:
+    orders = db.scalars(select(Order).where(Order.tracking_token.is_(None)).limit(limit)).all()
+    for order in orders:
+        order.tracking_token = str(uuid.uuid4())
+    db.commit()
+    return len(orders)
+
+
+def backfill_order_numbers(db: Session, limit: int) -> int:
+    """Sıralı order_no; ORM üzerinden yazılır ki arama dokümanı da güncellensin."""
+    orders = db.scalars(
+        select(Order)
+        .where(Order.order_no.is_(None))
+        .order_by(Order.created_at.asc(), Order.id.asc())
+        .limit(limit)
+    ).all()
+    if orders:
+        max_no = db.scalar(select(func.max(Order.order_no))) or 0
+        for offset, order in enumerate(orders, 1):
+            order.order_no = max_no + offset
+        db.commit()
+    return len(orders)
+
+
+def backfill_phone_suffixes(db: Session, limit: int, after_id: int = 0) -> tuple[int, int]:
+    """(işlenen, son id): anahtar üretilemeyen telefonlar NULL kalır, id ile ilerlenir."""
+    customers = db.scalars(
+        select(Customer)
+        .where(Customer.phone.is_not(None), Customer.phone_suffix.is_(None), Customer.id > after_id)
+        .order_by(Customer.id)
+        .limit(limit)
+    ).all()
+    for customer in customers:
+        customer.phone_suffix = phone_suffix_key(customer.phone)
+    db.commit()
+    return len(customers), (customers[-1].id if customers else after_id)
+
+
+def run_backfills(
+    session_factory: Callable[[], Session],
+    chunk_size: int = BACKFILL_CHUNK_SIZE,
+    pause: float = 0.0,
+    stop: Optional[threading.Event] = None,
+    progress: Optional[Dict[str, int]] = None,
+    order_numbers: bool = False,
+) -> Dict[str, int]:
+    """
+    Backfill'leri partiler halinde çalıştırır; her parti kendi transaction'ı.
+    ``order_numbers`` yalnız trafik yokken (tek seferlik bakım) açılmalıdır.
+    """
+    counts = progress if progress is not None else {}
+
+    def stopped() -> bool:
+        if stop is not None and stop.is_set():
+            return True
+        if pause:
+            time.sleep(pause)
+        return False
+
+    steps = [("tracking_token", backfill_tracking_tokens)]
+    if order_numbers:
+        steps.append(("order_no", backfill_order_numbers))
+    for name, step in steps:
+        counts.setdefault(name, 0)
+        while True:
+            with session_factory() as db:
+                done = step(db, chunk_size)
+            counts[name] += done
+            if done < chunk_size or stopped():
+                break
+        if stop is not None and stop.is_set():
+            return counts
+
+    counts.setdefault("phone_suffix", 0)
+    after_id = 0
+    while True:
+        with session_factory() as db:
+            done, after_id = backfill_phone_suffixes(db, chunk_size, after_id)
+        counts["phone_suffix"] += done
+        if done < chunk_size or stopped():
+            break
+    if stop is not None and stop.is_set():
+        return counts
+
+    from app.services.part_status_service import ensure_part_status_projection
+    from app.services.product_service import ensure_spec_search_index
+    from app.services.search_index_service import ensure_search_index
+
+    with session_factory() as db:
+        counts["part_status_projection"] = int(bool(ensure_part_status_projection(db)))
+    with session_factory() as db:
+        counts["search_index"] = int(bool(ensure_search_index(db)))
+    with session_factory() as db:
+        counts["spec_search_index"] = int(bool(ensure_spec_search_index(db)))
+    return counts
+
+
+def run_maintenance(
+    bind: Engine,
+    session_factory: Callable[[], Session],
+    chunk_size: int = BACKFILL_CHUNK_SIZE,
+    backfill: bool = True,
+) -> Dict[str, object]:
+    """Tek seferlik bakım: şema, tohumlar ve (istenirse) tüm backfill'ler."""
+    result: Dict[str, object] = {"schema": sync_schema(bind)}
+    with session_factory() as db:
+        result["stations_created"] = seed_canonical_stations(db)
+        seed_admin_user(db)
+    if backfill:
+        result["backfilled"] = run_backfills(
+            session_factory, chunk_size=chunk_size, order_numbers=True
+        )
+    return result
+
+
+# ═══════════════════════════════════════════════════
+# HAZIRLIK DURUMU
+# ═══════════════════════════════════════════════════
+
+
+@dataclass
+class StartupStatus:
+    """Süreç açılış durumu: canlılıktan bağımsız hazır olma + arka plan backfill ilerlemesi."""
+
+    ready: bool = False
+    started_at: float = field(default_factory=time.monotonic)
+    startup_seconds: Optional[float] = None
+    backfill: str = "pending"  # pending | running | done | stopped | failed | skipped
+    backfilled: Dict[str, int] = field(default_factory=dict)
+    error: Optional[str] = None
+    _stop: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    def mark_ready(self) -> None:
+        self.ready = True
+        self.startup_seconds = round(time.monotonic() - self.started_at, 3)
+        logger.info("Uygulama hazır (%.3fs).", self.startup_seconds)
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "ready": self.ready,
+            "startup_seconds": self.startup_seconds,
+            "backfill": self.backfill,
+            "backfilled": dict(self.backfilled),
+            "error": self.error,
+        }
+
+    def run_backfill(
+        self, session_factory: Callable[[], Session], chunk_size: int = BACKFILL_CHUNK_SIZE
+    ) -> bool:
+        """Backfill'i bu thread'de yürütür; tamamlandıysa True (yeniden denemede kalınan yerden)."""
+        if self.backfill == "done":
+            return True
+        if self._stop.is_set():
+            return False
+        self.backfill = "running"
+        self.error = None
+        try:
+            run_backfills(
+                session_factory,
+                chunk_size=chunk_size,
+                pause=BACKFILL_PAUSE_SECONDS,
+                stop=self._stop,
+                progress=self.backfilled,
+            )
+            self.backfill = "stopped" if self._stop.is_set() else "done"
+            logger.info("Arka plan backfill %s: %s", self.backfill, self.backfilled)
+        except Exception as exc:
+            self.backfill = "failed"
+            self.error = str(exc)
+            logger.exception("Arka plan backfill başarısız")
+        return self.backfill == "done"
+
+    def stop_backfill(self) -> None:
+        """Kapanışta yürüyen backfill'i parti sınırında durdurur; sonraki denemeler çalışmaz."""
+        self.ready = False
+        self._stop.set()
+
+
+startup_status = StartupStatus()
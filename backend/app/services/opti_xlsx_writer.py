@@ -0,0 +1,159 @@
+"""
+OptiPlan 360 — OptiPlanning XLSX yazıcısı
+
+OptiPlanning'e giden tüm çalışma kitapları (bridge 12-tag dosyası, iş export'u,
+sipariş sayfası) bu modülden geçer:
+
+  - openpyxl write-only modu: hücreler bellekte tutulmadan sırayla yazılır
+  - Stiller ``OPTI_NAMED_STYLES`` içinde bir kez tanımlanır, çalışma kitabına
+    NamedStyle olarak kaydedilir; hücre başına Font/Fill/Border kurulmaz
+  - Sayfa düzeni (başlık, stiller, genişlikler) ``OptiSheetTemplate`` olarak
+    çağıran modülde sabit tutulur
+
+Çıktının sayfa XML'i eski (normal mod) yazımla aynıdır: ``dimension`` ve kolon
+genişlikleri satırlar yazılmadan önce hesaplanır.
+"""
+
+import io
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Iterable, Optional, Sequence, Union
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+from openpyxl.styles.borders import DEFAULT_BORDER
+from openpyxl.styles.fills import DEFAULT_EMPTY_FILL
+from openpyxl.styles.fonts import DEFAULT_FONT
+from openpyxl.utils import get_column_letter
+
+_THIN = Side(style="thin")
+_THIN_BORDER = Border(left=_THIN, right=_THIN, top=_THIN, bottom=_THIN)
+
+# Stil adı → NamedStyle alanları (verilmeyenler varsayılan font/dolgu/kenarlık)
+OPTI_NAMED_STYLES: dict[str, dict[str, Any]] = {
+    "opti_tag_header": {
+        "font": Font(bold=True),
+        "fill": PatternFill(fill_type="solid", fgColor="FFD700"),
+        "alignment": Alignment(horizontal="center"),
+    },
+    "opti_meta_label": {
+        "font": Font(bold=True, size=10, color="1F4E79"),
+        "fill": PatternFill(start_color="D6E4F0", end_color="D6E4F0", fill_type="solid"),
+        "border": _THIN_BORDER,
+    },
+    "opti_meta_value": {"font": Font(size=10), "border": _THIN_BORDER},
+    "opti_table_header": {
+        "font": Font(bold=True, size=10, color="FFFFFF"),
+        "fill": PatternFill(start_color="2E75B6", end_color="2E75B6", fill_type="solid"),
+        "alignment": Alignment(horizontal="center"),
+        "border": _THIN_BORDER,
+    },
+    "opti_table_cell": {"border": _THIN_BORDER},
+}
+
+# (değer, stil adı) çiftlerinden oluşan başlık öncesi satır; boş liste = boş satır
+PreambleRow = Sequence[tuple[Any, Optional[str]]]
+
+
+@dataclass(frozen=True)
+class OptiSheetTemplate:
+    """Tek sayfalık OptiPlanning düzeni; modül düzeyinde bir kez kurulur."""
+
+    title: str
+    header: tuple[str, ...]
+    header_style: Optional[str] = None
+    cell_style: Optional[str] = None
+    widths: tuple[float, ...] = ()  # A kolonundan itibaren sabit genişlikler
+    max_auto_width: Optional[int] = None  # Verilirse genişlik içerikten hesaplanır
+
+
+def _named_style(name: str) -> NamedStyle:
+    spec = OPTI_NAMED_STYLES[name]
+    return NamedStyle(
+        name=name,
+        font=spec.get("font", DEFAULT_FONT),
+        fill=spec.get("fill", DEFAULT_EMPTY_FILL),
+        border=spec.get("border", DEFAULT_BORDER),
+        alignment=spec.get("alignment", Alignment()),
+    )
+
+
+def _styled(ws, value: Any, style: Optional[str]):
+    if style is None:
+        return value
+    cell = WriteOnlyCell(ws, value=value)
+    cell.style = style
+    return cell
+
+
+def _auto_widths(header: Sequence[Any], rows: Sequence[Sequence[Any]], limit: int) -> list[int]:
+    """Kolondaki en uzun metin + 2, ``limit`` ile sınırlı (eski ``ws.columns`` taraması)."""
+    lengths = [len(str(value or "")) for value in header]
+    for row in rows:
+        if len(row) > len(lengths):
+            lengths.extend([0] * (len(row) - len(lengths)))
+        for index, value in enumerate(row):
+            size = len(str(value or ""))
+            if size > lengths[index]:
+                lengths[index] = size
+    return [min(size + 2, limit) for size in lengths]
+
+
+def write_opti_workbook(
+    target: Union[str, BinaryIO],
+    template: OptiSheetTemplate,
+    rows: Iterable[Sequence[Any]],
+    title: Optional[str] = None,
+    preamble: Sequence[PreambleRow] = (),
+) -> None:
+    """Başlık öncesi satırlar + şablon başlığı + veri satırlarını ``target``'a yazar."""
+    rows = rows if isinstance(rows, list) else list(rows)
+    style_names = {template.header_style, template.cell_style}
+    style_names.update(style for row in preamble for _value, style in row)
+    style_names.discard(None)
+
+    wb = Workbook(write_only=True)
+    for name in sorted(style_names, key=list(OPTI_NAMED_STYLES).index):
+        wb.add_named_style(_named_style(name))
+    ws = wb.create_sheet(title or template.title)
+
+    # write-only sayfa boyutu bilmez; satırlar baştan belli olduğu için
+    # WorksheetWriter'ın okuduğu calculate_dimension burada sağlanır
+    last_column = max([len(template.header), *map(len, rows), *map(len, preamble)])
+    last_row = len(preamble) + 1 + len(rows)
+    dimension = f"A1:{get_column_letter(last_column)}{last_row}"
+    ws.calculate_dimension = lambda: dimension
+
+    widths = list(template.widths)
+    if template.max_auto_width is not None:
+        widths = _auto_widths(template.header, rows, template.max_auto_width)
+    for index, width in enumerate(widths, 1):
+        ws.column_dimensions[get_column_letter(index)].width = width
+
+    for row in preamble:
+        ws.append([_styled(ws, value, style) for value, style in row])
+    ws.append([_styled(ws, value, template.header_style) for value in template.header])
+    if template.cell_style is None:
+        for row in rows:
+            ws.append(row)
+    else:
+        # Kolon başına tek stilli hücre: write-only append() satırı hemen
+        # yazdığı için aynı hücreler sonraki satırda yeniden kullanılabilir
+        cells = [_styled(ws, None, template.cell_style) for _ in range(last_column)]
+        for row in rows:
+            for cell, value in zip(cells, row):
+                cell.value = value
+            ws.append(cells[: len(row)])
+    wb.save(target)
+
+
+def render_opti_workbook(
+    template: OptiSheetTemplate,
+    rows: Iterable[Sequence[Any]],
+    title: Optional[str] = None,
+    preamble: Sequence[PreambleRow] = (),
+) -> bytes:
+    """``write_opti_workbook`` çıktısını bayt olarak döndürür."""
+    buf = io.BytesIO()
+    write_opti_workbook(buf, template, rows, title=title, preamble=preamble)
+    return buf.getvalue()
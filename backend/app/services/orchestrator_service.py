@@ -119,6 +119,22 @@ def _add_audit(
     db.add(event)
 
 
+def _publish_job_state(job: OptiJob) -> None:
+    """Durum gecisini tum worker'lardaki WebSocket ekranlarina yayinla."""
+    try:
+        from ..websockets import publish_event_nowait
+
+        state = job.state.value if hasattr(job.state, "value") else job.state
+        publish_event_nowait(
+            {
+                "type": "OPTI_JOB_STATE",
+                "data": {"job_id": job.id, "order_id": job.order_id, "state": state},
+            }
+        )
+    except Exception as exc:
+        logger.warning("Job durum olayi yayinlanamadi (%s): %s", job.id, exc)
+
+
 def _load_rules_json() -> dict:
     """config/rules.json dosyasini yukler."""
     rules_path = os.path.join(os.path.dirname(__file__), "..", "..", "..", "config", "rules.json")
@@ -204,6 +220,7 @@ class OrchestratorService:
             self.db.commit()
             if refresh:
                 self.db.refresh(job)
+            _publish_job_state(job)
 
         return job
 
@@ -0,0 +1,125 @@
+"""
+OptiPlan 360 - Parça Güncel Durum Projeksiyonu
+``part_current_status`` tablosu her parçanın en son StatusLog kaydını tutar.
+
+Projeksiyon, StatusLog insert'iyle aynı transaction içinde ``after_insert``
+olayıyla güncellenir (bkz. ``models.order.upsert_part_current_status``);
+istasyon okutmaları böylece büyüyen log tablosunu sıralamak yerine birincil
+anahtar okuması yapar. Bu modül yeniden kurma ve tutarlılık kontrolünü sağlar:
+
+    python scripts/part_status.py check [--repair]
+    python scripts/part_status.py rebuild
+"""
+
+import logging
+from typing import Any, Dict, Optional
+
+from app.models import PartCurrentStatus, StatusLog, upsert_part_current_status
+from sqlalchemy import delete, exists, func, select
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+PROJECTION_COLUMNS = ["part_id", "status_log_id", "station_id", "status", "changed_at"]
+
+
+def get_current_status(db: Session, part_id: int) -> Optional[PartCurrentStatus]:
+    """Parçanın güncel durumu (PK okuması)."""
+    return db.get(PartCurrentStatus, part_id)
+
+
+def _latest_logs():
+    """Parça başına en yeni StatusLog (created_at, id) — projeksiyonun tanımı."""
+    ranked = select(
+        StatusLog.part_id,
+        StatusLog.id.label("status_log_id"),
+        StatusLog.station_id,
+        StatusLog.status,
+        StatusLog.created_at.label("changed_at"),
+        func.row_number()
+        .over(
+            partition_by=StatusLog.part_id,
+            order_by=(StatusLog.created_at.desc(), StatusLog.id.desc()),
+        )
+        .label("rn"),
+    ).subquery()
+    return (
+        select(*(ranked.c[name] for name in PROJECTION_COLUMNS))
+        .where(ranked.c.rn == 1)
+        .subquery("latest")
+    )
+
+
+def rebuild_part_status(db: Session) -> int:
+    """Projeksiyonu StatusLog'dan sıfırdan kur; yazılan parça sayısını döndürür."""
+    latest = _latest_logs()
+    db.execute(delete(PartCurrentStatus))
+    db.execute(
+        PartCurrentStatus.__table__.insert().from_select(
+            PROJECTION_COLUMNS, select(*(latest.c[name] for name in PROJECTION_COLUMNS))
+        )
+    )
+    db.commit()
+    count = db.scalar(select(func.count()).select_from(PartCurrentStatus)) or 0
+    logger.info("part_current_status yeniden kuruldu: %d parça", count)
+    return count
+
+
+def ensure_part_status_projection(db: Session) -> bool:
+    """Log var ama projeksiyon boşsa (migration'sız kurulum) yeniden kur."""
+    has_logs = db.scalar(select(exists().select_from(StatusLog)))
+    has_projection = db.scalar(select(exists().select_from(PartCurrentStatus)))
+    if has_logs and not has_projection:
+        rebuild_part_status(db)
+        return True
+    return False
+
+
+def check_part_status_consistency(
+    db: Session, repair: bool = False, sample_size: int = 20
+) -> Dict[str, Any]:
+    """Projeksiyonu StatusLog ile karşılaştır; ``repair`` ile farkları düzelt."""
+    latest = _latest_logs()
+    proj = PartCurrentStatus.__table__
+
+    diffs = db.execute(
+        select(latest.c.part_id, latest.c.status_log_id, proj.c.part_id.label("projected"))
+        .select_from(latest.outerjoin(proj, proj.c.part_id == latest.c.part_id))
+        .where(
+            proj.c.part_id.is_(None)
+            | (proj.c.status_log_id != latest.c.status_log_id)
+            | (proj.c.station_id != latest.c.station_id)
+            | (proj.c.status != latest.c.status)
+        )
+    ).all()
+    orphaned = db.scalars(
+        select(proj.c.part_id).where(~exists().where(StatusLog.part_id == proj.c.part_id))
+    ).all()
+
+    missing = [row.part_id for row in diffs if row.projected is None]
+    stale = [row.part_id for row in diffs if row.projected is not None]
+    report = {
+        "checked_parts": db.scalar(select(func.count()).select_from(latest)) or 0,
+        "missing": len(missing),
+        "stale": len(stale),
+        "orphaned": len(orphaned),
+        "sample_part_ids": sorted(missing + stale + list(orphaned))[:sample_size],
+        "consistent": not (diffs or orphaned),
+        "repaired": False,
+    }
+
+    if repair and not report["consistent"]:
+        connection = db.connection()
+        for row in diffs:
+            upsert_part_current_status(connection, row.status_log_id)
+        if orphaned:
+            db.execute(delete(PartCurrentStatus).where(PartCurrentStatus.part_id.in_(orphaned)))
+        db.commit()
+        report["repaired"] = True
+        logger.warning(
+            "part_current_status onarıldı: %d eksik, %d eski, %d sahipsiz",
+            len(missing),
+            len(stale),
+            len(orphaned),
+        )
+    return report
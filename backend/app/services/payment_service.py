@@ -23,7 +23,7 @@ from app.models import (
 from app.services.base_service import BaseService
 from app.services.email_service import email_service
 from app.exceptions import ValidationError as AppValidationError, NotFoundError
-from sqlalchemy import and_, func, or_
+from sqlalchemy import and_, case, func, or_, select, true
 from sqlalchemy.orm import Session
 
 
@@ -509,131 +509,178 @@ def send_payment_reminder(db: Session, promise_id: str) -> PaymentPromise:
 # ══════════════════════════════════════════════════════════════
 
 
-def get_payment_statistics(db: Session, account_id: Optional[str] = None) -> Dict:
-    """Tahsilat istatistikleri"""
+def _sum_when(condition, column):
+    """Kosullu toplam: kosulu saglayan satirlarin kolon toplami (bos ise 0)."""
+    return func.coalesce(func.sum(case((condition, column), else_=0)), 0)
+
+
+def _count_when(condition):
+    """Kosullu sayim: kosulu saglayan satir sayisi."""
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+def _invoice_stat_columns(now: datetime) -> List:
+    """Fatura istatistikleri icin tek taramada hesaplanan agregat kolonlar."""
+    is_overdue = and_(Invoice.status != PaymentStatusEnum.PAID, Invoice.due_date < now)
+    return [
+        func.count(Invoice.id).label("total_invoices"),
+        func.coalesce(func.sum(Invoice.total_amount), 0).label("total_amount"),
+        func.coalesce(func.sum(Invoice.paid_amount), 0).label("paid_amount"),
+        func.coalesce(func.sum(Invoice.remaining_amount), 0).label("remaining_amount"),
+        _count_when(is_overdue).label("overdue_invoices"),
+        _sum_when(is_overdue, Invoice.remaining_amount).label("overdue_amount"),
+    ]
+
+
+def _promise_stat_columns(now: datetime) -> List:
+    """Bekleyen odeme sozleri icin agregat kolonlar (status filtresi sorguda)."""
+    return [
+        func.count(PaymentPromise.id).label("pending_promises_count"),
+        func.coalesce(func.sum(PaymentPromise.promised_amount), 0).label(
+            "pending_promises_amount"
+        ),
+        _count_when(func.date(PaymentPromise.promise_date) == now.date()).label(
+            "today_promises"
+        ),
+        _count_when(PaymentPromise.promise_date < now).label("overdue_promises"),
+    ]
+
+
+def _aging_columns(now: datetime) -> List:
+    """Odenmemis faturalar icin vade yaslandirma kovalari (CASE ile tek tarama)."""
+    d30 = now - timedelta(days=30)
+    d60 = now - timedelta(days=60)
+    d90 = now - timedelta(days=90)
+    d120 = now - timedelta(days=120)
+    amount = Invoice.remaining_amount
+    return [
+        _sum_when(or_(Invoice.due_date >= d30, Invoice.due_date.is_(None)), amount).label(
+            "aging_0_30"
+        ),
+        _sum_when(and_(Invoice.due_date < d30, Invoice.due_date >= d60), amount).label(
+            "aging_31_60"
+        ),
+        _sum_when(and_(Invoice.due_date < d60, Invoice.due_date >= d90), amount).label(
+            "aging_61_90"
+        ),
+        _sum_when(and_(Invoice.due_date < d90, Invoice.due_date >= d120), amount).label(
+            "aging_91_120"
+        ),
+        _sum_when(Invoice.due_date < d120, amount).label("aging_120_plus"),
+    ]
+
+
+_INVOICE_STAT_KEYS = (
+    "total_invoices",
+    "total_amount",
+    "paid_amount",
+    "remaining_amount",
+    "overdue_invoices",
+    "overdue_amount",
+)
+_PROMISE_STAT_KEYS = (
+    "pending_promises_count",
+    "pending_promises_amount",
+    "today_promises",
+    "overdue_promises",
+)
+_AGING_KEYS = ("aging_0_30", "aging_31_60", "aging_61_90", "aging_91_120", "aging_120_plus")
 
-    query = db.query(Invoice)
-    if account_id:
-        query = query.filter(Invoice.account_id == account_id)
 
-    total_invoices = query.count()
-    total_amount = query.with_entities(func.sum(Invoice.total_amount)).scalar() or 0
-    paid_amount = query.with_entities(func.sum(Invoice.paid_amount)).scalar() or 0
-    remaining_amount = query.with_entities(func.sum(Invoice.remaining_amount)).scalar() or 0
+def _build_statistics(row: Dict[str, Any]) -> Dict:
+    total_amount = float(row.get("total_amount") or 0)
+    paid_amount = float(row.get("paid_amount") or 0)
+    return {
+        "total_invoices": int(row.get("total_invoices") or 0),
+        "total_amount": total_amount,
+        "paid_amount": paid_amount,
+        "remaining_amount": float(row.get("remaining_amount") or 0),
+        "collection_rate": (paid_amount / total_amount * 100) if total_amount > 0 else 0,
+        "overdue_invoices": int(row.get("overdue_invoices") or 0),
+        "overdue_amount": float(row.get("overdue_amount") or 0),
+        "pending_promises_count": int(row.get("pending_promises_count") or 0),
+        "pending_promises_amount": float(row.get("pending_promises_amount") or 0),
+        "today_promises": int(row.get("today_promises") or 0),
+        "overdue_promises": int(row.get("overdue_promises") or 0),
+    }
 
-    overdue_invoices = query.filter(
-        and_(Invoice.status != PaymentStatusEnum.PAID, Invoice.due_date < datetime.now())
-    ).count()
 
-    overdue_amount = (
-        query.filter(
-            and_(Invoice.status != PaymentStatusEnum.PAID, Invoice.due_date < datetime.now())
-        )
-        .with_entities(func.sum(Invoice.remaining_amount))
-        .scalar()
-        or 0
-    )
+def _build_aging(row: Dict[str, Any]) -> Dict:
+    report = {key: float(row.get(key) or 0) for key in _AGING_KEYS}
+    report["total"] = sum(report.values())
+    return report
 
-    # Ödeme sözü istatistikleri
-    pending_promises = db.query(PaymentPromise).filter(PaymentPromise.status == "PENDING")
-    if account_id:
-        pending_promises = pending_promises.filter(PaymentPromise.account_id == account_id)
-
-    pending_promises_count = pending_promises.count()
-    pending_promises_amount = (
-        pending_promises.with_entities(func.sum(PaymentPromise.promised_amount)).scalar() or 0
-    )
 
-    today_promises = pending_promises.filter(
-        func.date(PaymentPromise.promise_date) == datetime.now().date()
-    ).count()
+def get_payment_statistics(db: Session, account_id: Optional[str] = None) -> Dict:
+    """Tahsilat istatistikleri.
 
-    overdue_promises = pending_promises.filter(PaymentPromise.promise_date < datetime.now()).count()
+    Fatura ve odeme sozu agregatlari iki alt sorgudan tek SELECT ile okunur.
+    """
+    now = datetime.now()
 
-    return {
-        "total_invoices": total_invoices,
-        "total_amount": float(total_amount),
-        "paid_amount": float(paid_amount),
-        "remaining_amount": float(remaining_amount),
-        "collection_rate": (paid_amount / total_amount * 100) if total_amount > 0 else 0,
-        "overdue_invoices": overdue_invoices,
-        "overdue_amount": float(overdue_amount),
-        "pending_promises_count": pending_promises_count,
-        "pending_promises_amount": float(pending_promises_amount),
-        "today_promises": today_promises,
-        "overdue_promises": overdue_promises,
-    }
+    invoice_stmt = select(*_invoice_stat_columns(now))
+    promise_stmt = select(*_promise_stat_columns(now)).where(PaymentPromise.status == "PENDING")
+    if account_id:
+        invoice_stmt = invoice_stmt.where(Invoice.account_id == account_id)
+        promise_stmt = promise_stmt.where(PaymentPromise.account_id == account_id)
 
+    invoice_sub = invoice_stmt.subquery("invoice_stats")
+    promise_sub = promise_stmt.subquery("promise_stats")
+    # Her iki alt sorgu tek satir dondurur; true() ile acik capraz birlesim
+    row = db.execute(
+        select(invoice_sub, promise_sub).select_from(invoice_sub.join(promise_sub, true()))
+    ).one()
+    return _build_statistics(dict(row._mapping))
 
-def get_aging_report(db: Session, account_id: Optional[str] = None) -> Dict:
-    """Yaşlandırma raporu (30-60-90-120+ gün)"""
 
-    query = db.query(Invoice).filter(Invoice.status != PaymentStatusEnum.PAID)
-    if account_id:
-        query = query.filter(Invoice.account_id == account_id)
+def get_payment_statistics_by_account(db: Session) -> Dict[str, Dict]:
+    """Tum cari hesaplar icin tahsilat istatistikleri (account_id -> istatistik).
 
+    Hesap basina ayri cagri yerine fatura ve soz tablolari birer GROUP BY ile taranir.
+    """
     now = datetime.now()
+    rows: Dict[str, Dict[str, Any]] = {}
 
-    # 0-30 gün
-    aging_0_30 = (
-        query.filter(or_(Invoice.due_date >= now - timedelta(days=30), Invoice.due_date == None))
-        .with_entities(func.sum(Invoice.remaining_amount))
-        .scalar()
-        or 0
+    invoice_rows = db.execute(
+        select(Invoice.account_id, *_invoice_stat_columns(now)).group_by(Invoice.account_id)
     )
-
-    # 31-60 gün
-    aging_31_60 = (
-        query.filter(
-            and_(
-                Invoice.due_date < now - timedelta(days=30),
-                Invoice.due_date >= now - timedelta(days=60),
-            )
+    for row in invoice_rows:
+        data = row._mapping
+        rows.setdefault(data["account_id"], {}).update(
+            {key: data[key] for key in _INVOICE_STAT_KEYS}
         )
-        .with_entities(func.sum(Invoice.remaining_amount))
-        .scalar()
-        or 0
-    )
 
-    # 61-90 gün
-    aging_61_90 = (
-        query.filter(
-            and_(
-                Invoice.due_date < now - timedelta(days=60),
-                Invoice.due_date >= now - timedelta(days=90),
-            )
-        )
-        .with_entities(func.sum(Invoice.remaining_amount))
-        .scalar()
-        or 0
+    promise_rows = db.execute(
+        select(PaymentPromise.account_id, *_promise_stat_columns(now))
+        .where(PaymentPromise.status == "PENDING")
+        .group_by(PaymentPromise.account_id)
     )
-
-    # 91-120 gün
-    aging_91_120 = (
-        query.filter(
-            and_(
-                Invoice.due_date < now - timedelta(days=90),
-                Invoice.due_date >= now - timedelta(days=120),
-            )
+    for row in promise_rows:
+        data = row._mapping
+        rows.setdefault(data["account_id"], {}).update(
+            {key: data[key] for key in _PROMISE_STAT_KEYS}
         )
-        .with_entities(func.sum(Invoice.remaining_amount))
-        .scalar()
-        or 0
-    )
 
-    # 120+ gün
-    aging_120_plus = (
-        query.filter(Invoice.due_date < now - timedelta(days=120))
-        .with_entities(func.sum(Invoice.remaining_amount))
-        .scalar()
-        or 0
+    return {account_id: _build_statistics(data) for account_id, data in rows.items()}
+
+
+def get_aging_report(db: Session, account_id: Optional[str] = None) -> Dict:
+    """Yaşlandırma raporu (30-60-90-120+ gün)"""
+    stmt = select(*_aging_columns(datetime.now())).where(
+        Invoice.status != PaymentStatusEnum.PAID
     )
+    if account_id:
+        stmt = stmt.where(Invoice.account_id == account_id)
 
-    return {
-        "aging_0_30": float(aging_0_30),
-        "aging_31_60": float(aging_31_60),
-        "aging_61_90": float(aging_61_90),
-        "aging_91_120": float(aging_91_120),
-        "aging_120_plus": float(aging_120_plus),
-        "total": float(aging_0_30 + aging_31_60 + aging_61_90 + aging_91_120 + aging_120_plus),
-    }
+    row = db.execute(stmt).one()
+    return _build_aging(dict(row._mapping))
+
+
+def get_aging_report_by_account(db: Session) -> Dict[str, Dict]:
+    """Tum cari hesaplar icin yaslandirma raporu (account_id -> rapor), tek GROUP BY."""
+    stmt = (
+        select(Invoice.account_id, *_aging_columns(datetime.now()))
+        .where(Invoice.status != PaymentStatusEnum.PAID)
+        .group_by(Invoice.account_id)
+    )
+    return {row.account_id: _build_aging(dict(row._mapping)) for row in db.execute(stmt)}
@@ -1,5 +1,7 @@
 """
 Fiyat takip sistemi — GPT-4o ile yapılandırılmış veri çıkarma.
+
+Aynı metnin tekrar çıkarılmasında yanıt app/services/llm_cache.py'den gelir.
 """
 
 import json
@@ -7,8 +9,13 @@ import logging
 import os
 from typing import Any
 
+from app.services.llm_cache import llm_cache
+
 logger = logging.getLogger(__name__)
 
+EXTRACTION_TEMPERATURE = 0.0
+EXTRACTION_MAX_TOKENS = 4096
+
 _client = None
 
 EXTRACTION_SYSTEM_PROMPT = """Sen bir fiyat listesi analiz uzmanısın. Sana verilen metin bir fiyat listesi belgesinden çıkarılmıştır.
@@ -87,11 +94,33 @@ def _get_config_model() -> str:
     return "gpt-4o"
 
 
+def _parse_items(content: str) -> list:
+    """Model yanıtından ürün listesini çıkarır (JSON hatasında ValueError)."""
+    # JSON çıkarma
+    content = content.strip()
+    if content.startswith("```"):
+        lines = content.split("\n")
+        content = "\n".join(lines[1:-1])
+
+    items = json.loads(content)
+
+    # Normalize
+    if isinstance(items, dict):
+        for key in ("items", "products", "data", "urunler"):
+            if key in items and isinstance(items[key], list):
+                items = items[key]
+                break
+        else:
+            items = [items]
+    return items
+
+
 def extract_price_data_from_text(
     text: str,
     supplier: str = "",
     model: str = "",
     max_text_length: int = 15000,
+    use_cache: bool = True,
 ) -> list[dict[str, Any]]:
     """
     GPT-4o ile metinden yapılandırılmış fiyat verisi çıkarır.
@@ -101,15 +130,11 @@ def extract_price_data_from_text(
         supplier: Tedarikçi adı (context için)
         model: OpenAI model adı
         max_text_length: Metin uzunluk limiti
+        use_cache: False ise önbellek atlanır
 
     Returns:
         Ürün dict listesi
     """
-    client = _get_client()
-    if client is None:
-        logger.warning("OpenAI istemcisi mevcut değil, AI çıkarma atlanıyor")
-        return []
-
     # Model adını config'den al (parametre boşsa)
     if not model:
         model = _get_config_model()
@@ -126,34 +151,36 @@ def extract_price_data_from_text(
     user_prompt = f"Tedarikçi: {supplier}\n\nFiyat listesi metni:\n{text}"
 
     try:
-        response = client.chat.completions.create(
-            model=model,
-            temperature=0.0,
-            max_tokens=4096,
-            messages=[
-                {"role": "system", "content": EXTRACTION_SYSTEM_PROMPT},
-                {"role": "user", "content": user_prompt},
-            ],
+        cache_config = {
+            "temperature": EXTRACTION_TEMPERATURE,
+            "max_tokens": EXTRACTION_MAX_TOKENS,
+            "system": EXTRACTION_SYSTEM_PROMPT,
+        }
+        cache_key, cached = llm_cache.lookup(
+            "openai", model, cache_config, user_prompt, use_cache=use_cache
         )
-
-        content = response.choices[0].message.content or ""
-
-        # JSON çıkarma
-        content = content.strip()
-        if content.startswith("```"):
-            lines = content.split("\n")
-            content = "\n".join(lines[1:-1])
-
-        items = json.loads(content)
-
-        # Normalize
-        if isinstance(items, dict):
-            for key in ("items", "products", "data", "urunler"):
-                if key in items and isinstance(items[key], list):
-                    items = items[key]
-                    break
-            else:
-                items = [items]
+        if cached is not None:
+            items = _parse_items(cached["content"])
+        else:
+            client = _get_client()
+            if client is None:
+                logger.warning("OpenAI istemcisi mevcut değil, AI çıkarma atlanıyor")
+                return []
+
+            response = client.chat.completions.create(
+                model=model,
+                temperature=EXTRACTION_TEMPERATURE,
+                max_tokens=EXTRACTION_MAX_TOKENS,
+                messages=[
+                    {"role": "system", "content": EXTRACTION_SYSTEM_PROMPT},
+                    {"role": "user", "content": user_prompt},
+                ],
+            )
+
+            content = response.choices[0].message.content or ""
+            items = _parse_items(content)
+            # Yalnız ayrıştırılabilen yanıtlar saklanır
+            llm_cache.store(cache_key, {"content": content}, provider="openai", model=model)
 
         if not isinstance(items, list):
             logger.warning("AI yanıtı list değil: %s", type(items))
@@ -162,7 +189,12 @@ def extract_price_data_from_text(
         # Ürün adı olmayanları filtrele
         valid = [item for item in items if isinstance(item, dict) and item.get("urun_adi")]
 
-        logger.info("AI çıkarma: %d ürün (toplam %d)", len(valid), len(items))
+        logger.info(
+            "AI çıkarma: %d ürün (toplam %d)%s",
+            len(valid),
+            len(items),
+            " [önbellek]" if cached is not None else "",
+        )
         return valid
 
     except json.JSONDecodeError as e:
@@ -0,0 +1,150 @@
+"""
+Fiyat Takip — PDF sayfa bazlı paralel çıkarım.
+
+Büyük tedarikçi kataloglarında pdfplumber tek iş parçacığında sayfa sayfa
+ilerlediği için dosya başına dakikalar sürüyordu. Sayfalar ``PDF_PAGES_PER_TASK``
+uzunluğunda aralıklara bölünür, süreç havuzunda işlenir ve sayfa sırasıyla
+yeniden birleştirilir. Her sayfanın bir süre sınırı vardır; sınırı aşan ya da
+hata veren sayfa boş (tablosuz) sonuç döner ve çağıran taraf onu AI yedeğine
+gönderebilir.
+
+Bu modül bilinçli olarak hafiftir (yalnız pdfplumber): ``spawn`` ile başlayan
+işçi süreçleri FastAPI/pandas yüklemez.
+"""
+
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+PDF_PAGE_TIMEOUT_SECONDS = float(os.getenv("PRICE_PDF_PAGE_TIMEOUT", "20"))
+PDF_WORKERS = int(os.getenv("PRICE_PDF_WORKERS", "0")) or min(4, os.cpu_count() or 1)
+PDF_PAGES_PER_TASK = 8
+PDF_MIN_PARALLEL_PAGES = 16  # Bunun altında havuz açma maliyeti kazancı aşar
+PDF_TASK_GRACE_SECONDS = 10.0
+
+
+@dataclass
+class PageExtract:
+    """Tek sayfanın çıkarım sonucu (0 tabanlı sayfa indeksi)."""
+
+    index: int
+    tables: list = field(default_factory=list)
+    text: str = ""
+    error: str | None = None
+
+
+class _PageTimeout(BaseException):
+    """pdfminer içindeki ``except Exception`` blokları yutmasın diye BaseException."""
+
+
+@contextmanager
+def _page_deadline(seconds: float):
+    """SIGALRM ile sayfa süre sınırı; desteklenmeyen ortamda (Windows, yan thread) no-op."""
+    if (
+        seconds <= 0
+        or not hasattr(signal, "SIGALRM")
+        or threading.current_thread() is not threading.main_thread()
+    ):
+        yield
+        return
+
+    def _raise(_signum, _frame):
+        raise _PageTimeout()
+
+    previous = signal.signal(signal.SIGALRM, _raise)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def count_pages(file_path: str) -> int:
+    import pdfplumber
+
+    with pdfplumber.open(file_path) as pdf:
+        return len(pdf.pages)
+
+
+def extract_page_range(
+    file_path: str, start: int, stop: int, page_timeout: float = PDF_PAGE_TIMEOUT_SECONDS
+) -> list[PageExtract]:
+    """[start, stop) aralığındaki sayfaların tablo ve metinlerini çıkarır (işçi süreç)."""
+    import pdfplumber
+
+    results: list[PageExtract] = []
+    with pdfplumber.open(file_path) as pdf:
+        for index in range(start, stop):
+            page = pdf.pages[index]
+            try:
+                with _page_deadline(page_timeout):
+                    tables = [t for t in page.extract_tables() if t]
+                    text = page.extract_text() or ""
+                results.append(PageExtract(index, tables, text))
+            except _PageTimeout:
+                results.append(PageExtract(index, error="timeout"))
+            except Exception as e:
+                results.append(PageExtract(index, error=str(e)))
+            finally:
+                page.close()
+    return results
+
+
+def extract_pages(
+    file_path: str,
+    page_timeout: float = PDF_PAGE_TIMEOUT_SECONDS,
+    workers: int = PDF_WORKERS,
+    pages_per_task: int = PDF_PAGES_PER_TASK,
+) -> list[PageExtract]:
+    """Tüm sayfaları (gerekirse paralel) çıkarır; sonuç sayfa sırasındadır."""
+    total = count_pages(file_path)
+    ranges = [(s, min(s + pages_per_task, total)) for s in range(0, total, pages_per_task)]
+    if workers <= 1 or total < PDF_MIN_PARALLEL_PAGES:
+        return [
+            page
+            for start, stop in ranges
+            for page in extract_page_range(file_path, start, stop, page_timeout)
+        ]
+
+    pages: list[PageExtract] = []
+    stuck = False
+    pool = multiprocessing.get_context("spawn").Pool(processes=min(workers, len(ranges)))
+    try:
+        pending = [
+            (start, stop, pool.apply_async(extract_page_range, (file_path, start, stop, page_timeout)))
+            for start, stop in ranges
+        ]
+        # Sonuçlar gönderim sırasıyla toplanır: sıralı birleştirme
+        for start, stop, result in pending:
+            try:
+                pages.extend(
+                    result.get(timeout=page_timeout * (stop - start) + PDF_TASK_GRACE_SECONDS)
+                )
+            except multiprocessing.TimeoutError:
+                stuck = True
+                logger.warning("PDF sayfaları zaman aşımı: %d-%d (%s)", start + 1, stop, file_path)
+                pages.extend(PageExtract(i, error="timeout") for i in range(start, stop))
+            except Exception as e:
+                logger.warning("PDF sayfaları okunamadı: %d-%d: %s", start + 1, stop, e)
+                pages.extend(PageExtract(i, error=str(e)) for i in range(start, stop))
+    finally:
+        if stuck:
+            pool.terminate()  # Takılan işçiyi bekleme
+        else:
+            pool.close()
+        pool.join()
+
+    logger.info(
+        "PDF çıkarımı: %d sayfa, %d işçi, %d tablolu sayfa",
+        total,
+        min(workers, len(ranges)),
+        sum(1 for p in pages if p.tables),
+    )
+    return pages
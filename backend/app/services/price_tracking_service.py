@@ -3,6 +3,7 @@ Fiyat Takip Servisi — dosya yükleme, işleme, birleştirme, export.
 İş mantığı bu katmanda; router sadece HTTP in/out yapar.
 """
 
+import hashlib
 import io
 import logging
 import tempfile
@@ -12,6 +13,7 @@ from uuid import uuid4
 
 import pandas as pd
 from app.exceptions import AuthorizationError, BusinessRuleError, NotFoundError, ValidationError
+from app.logging_config import bind_log_context
 from app.models import PriceItem, PriceJobStatusEnum, PriceUploadJob, User
 from app.services.price_tracking_ai import extract_price_data_from_text
 from app.services.price_tracking_helpers import (
@@ -22,6 +24,7 @@ from app.services.price_tracking_helpers import (
     normalize_columns,
 )
 from app.services.price_tracking_ocr import extract_text_from_image, extract_text_from_pdf_images
+from app.services.price_tracking_pdf import extract_pages
 from fastapi import BackgroundTasks
 from openpyxl import Workbook
 from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
@@ -30,6 +33,12 @@ from sqlalchemy.orm import Session, sessionmaker
 
 logger = logging.getLogger(__name__)
 
+# Toplu yazımda parti boyutu; her partiden sonra commit + ilerleme güncellemesi
+INGEST_CHUNK_SIZE = 2000
+
+# Tablosuz sayfalardan AI'ya gönderilecek en kısa metin
+AI_FALLBACK_MIN_CHARS = 20
+
 
 class PriceTrackingService:
     """Fiyat listesi işleme servisi."""
@@ -115,6 +124,22 @@ class PriceTrackingService:
                 f"Dosya boyutu limiti aşıldı: {file_size_mb:.1f}MB > {MAX_FILE_SIZE_MB}MB"
             )
 
+        # Aynı kullanıcı aynı dosyayı aynı tedarikçi için tekrar yüklediyse mevcut işi döndür
+        content_hash = _content_hash(file_data, supplier)
+        existing = (
+            db.query(PriceUploadJob)
+            .filter(
+                PriceUploadJob.content_hash == content_hash,
+                PriceUploadJob.uploaded_by_id == user.id,
+                PriceUploadJob.status != PriceJobStatusEnum.FAILED.value,
+            )
+            .order_by(PriceUploadJob.created_at.desc())
+            .first()
+        )
+        if existing:
+            logger.info("Aynı fiyat listesi zaten yüklenmiş: job=%s", existing.id)
+            return existing
+
         # Job oluştur
         job = PriceUploadJob(
             id=str(uuid4()),
@@ -125,6 +150,7 @@ class PriceTrackingService:
             file_data=file_data,
             supplier=supplier,
             uploaded_by_id=user.id,
+            content_hash=content_hash,
         )
         db.add(job)
         db.commit()
@@ -152,15 +178,20 @@ class PriceTrackingService:
         """Job ID uzerinden dosyayi isler (background-task uyumlu)."""
         db = session_factory()
         try:
-            job = PriceTrackingService.get_job(db, job_id)
-            job.status = PriceJobStatusEnum.PROCESSING.value
-            job.error_message = None
-            db.commit()
-            file_data = job.file_data or b""
-            PriceTrackingService._process_job(db, job, file_data)
+            with bind_log_context(job_id=job_id):
+                job = PriceTrackingService.get_job(db, job_id)
+                job.status = PriceJobStatusEnum.PROCESSING.value
+                job.error_message = None
+                db.commit()
+                file_data = job.file_data or b""
+                PriceTrackingService._process_job(db, job, file_data)
         except Exception as e:
             db.rollback()
             try:
+                # Yarıda kalan partileri temizle; başarısız iş kısmi ürün bırakmaz
+                db.query(PriceItem).filter(PriceItem.job_id == job_id).delete(
+                    synchronize_session=False
+                )
                 job = db.query(PriceUploadJob).filter(PriceUploadJob.id == job_id).first()
                 if job:
                     job.status = PriceJobStatusEnum.FAILED.value
@@ -203,29 +234,9 @@ class PriceTrackingService:
             # Hesaplanabilir alanları doldur
             df = PriceTrackingService._calculate_derived_fields(df)
 
-            # DB'ye yaz
-            items_created = 0
-            for _, row in df.iterrows():
-                item = PriceItem(
-                    id=str(uuid4()),
-                    job_id=job.id,
-                    urun_kodu=_safe_str(row.get("URUN_KODU")),
-                    urun_adi=str(row.get("URUN_ADI", "")),
-                    birim=str(row.get("BIRIM", "ADET")),
-                    boyut=_safe_str(row.get("BOYUT")),
-                    renk=_safe_str(row.get("RENK")),
-                    liste_fiyati=_safe_float(row.get("LISTE_FIYATI")),
-                    iskonto_orani=_safe_float(row.get("ISKONTO_ORANI"), 0),
-                    net_fiyat=_safe_float(row.get("NET_FIYAT")),
-                    kdv_orani=_safe_float(row.get("KDV_ORANI"), 20),
-                    kdv_dahil_fiyat=_safe_float(row.get("KDV_DAHIL_FIYAT")),
-                    para_birimi=str(row.get("PARA_BIRIMI", "TRY")),
-                    kategori=_safe_str(row.get("KATEGORI")),
-                    marka=_safe_str(row.get("MARKA")),
-                    tedarikci=job.supplier,
-                )
-                db.add(item)
-                items_created += 1
+            # DB'ye parti parti yaz
+            records = PriceTrackingService._build_item_records(df, job)
+            items_created = PriceTrackingService._bulk_insert_items(db, job, records)
 
             job.status = PriceJobStatusEnum.COMPLETED.value
             job.rows_extracted = items_created
@@ -235,6 +246,68 @@ class PriceTrackingService:
         finally:
             Path(tmp_path).unlink(missing_ok=True)
 
+    @staticmethod
+    def _build_item_records(df: pd.DataFrame, job: PriceUploadJob) -> list[dict]:
+        """DataFrame'i sütun bazında PriceItem satırlarına çevirir (satır döngüsü yok)."""
+        index = df.index
+
+        def text_col(name: str) -> pd.Series:
+            if name not in df.columns:
+                return pd.Series(None, index=index, dtype=object)
+            col = df[name]
+            cleaned = col.astype(str).str.strip()
+            return cleaned.where(col.notna() & cleaned.ne(""), None)
+
+        def label_col(name: str, default: str) -> pd.Series:
+            if name not in df.columns:
+                return pd.Series(default, index=index, dtype=object)
+            col = df[name]
+            return col.astype(str).where(col.notna(), default)
+
+        def number_col(name: str, default=None) -> pd.Series:
+            if name not in df.columns:
+                return pd.Series(default, index=index, dtype=object)
+            col = pd.to_numeric(df[name], errors="coerce").astype(object)
+            return col.where(col.notna(), default)
+
+        out = pd.DataFrame(
+            {
+                "job_id": job.id,
+                "urun_kodu": text_col("URUN_KODU"),
+                "urun_adi": label_col("URUN_ADI", ""),
+                "birim": label_col("BIRIM", "ADET"),
+                "boyut": text_col("BOYUT"),
+                "renk": text_col("RENK"),
+                "liste_fiyati": number_col("LISTE_FIYATI"),
+                "iskonto_orani": number_col("ISKONTO_ORANI", 0),
+                "net_fiyat": number_col("NET_FIYAT"),
+                "kdv_orani": number_col("KDV_ORANI", 20),
+                "kdv_dahil_fiyat": number_col("KDV_DAHIL_FIYAT"),
+                "para_birimi": label_col("PARA_BIRIMI", "TRY"),
+                "kategori": text_col("KATEGORI"),
+                "marka": text_col("MARKA"),
+                "tedarikci": job.supplier,
+            },
+            index=index,
+        )
+        out.insert(0, "id", [str(uuid4()) for _ in range(len(out))])
+        return out.to_dict("records")
+
+    @staticmethod
+    def _bulk_insert_items(db: Session, job: PriceUploadJob, records: list[dict]) -> int:
+        """Satırları INGEST_CHUNK_SIZE'lık partilerle yazar; her parti ayrı transaction."""
+        # Aynı iş yeniden işlenirse eski satırlar çiftlenmesin
+        db.query(PriceItem).filter(PriceItem.job_id == job.id).delete(synchronize_session=False)
+        job.rows_processed = 0
+        total = len(records)
+        for start in range(0, total, INGEST_CHUNK_SIZE):
+            chunk = records[start : start + INGEST_CHUNK_SIZE]
+            db.bulk_insert_mappings(PriceItem, chunk)
+            job.rows_processed = start + len(chunk)
+            db.commit()
+            logger.info("Fiyat yazımı: job=%s %d/%d", job.id, job.rows_processed, total)
+        return total
+
     # ── Format-spesifik işleme ─────────────────────────────
 
     @staticmethod
@@ -248,9 +321,8 @@ class PriceTrackingService:
         if df.empty:
             return pd.DataFrame()
 
-        # DEBUG: Orijinal sütunları logla
-        logger.info("EXCEL ORIJINAL SUTUNLAR: %s", list(df.columns))
-        logger.info("EXCEL SUTUN UNIQUE MI: %s", df.columns.is_unique)
+        logger.debug("EXCEL ORIJINAL SUTUNLAR: %s", list(df.columns))
+        logger.debug("EXCEL SUTUN UNIQUE MI: %s", df.columns.is_unique)
 
         col_mapping = normalize_columns(df.columns.tolist())
         logger.info("ESLEME SONUCU: %s", col_mapping)
@@ -258,9 +330,8 @@ class PriceTrackingService:
         if col_mapping:
             df = df.rename(columns=col_mapping)
 
-            # DEBUG: Rename sonrası sütunları logla
-            logger.info("RENAME SONRASI SUTUNLAR: %s", list(df.columns))
-            logger.info("RENAME SONRASI UNIQUE MI: %s", df.columns.is_unique)
+            logger.debug("RENAME SONRASI SUTUNLAR: %s", list(df.columns))
+            logger.debug("RENAME SONRASI UNIQUE MI: %s", df.columns.is_unique)
 
             # Duplicate sütunları temizle (güvenlik katmanı)
             if not df.columns.is_unique:
@@ -275,12 +346,12 @@ class PriceTrackingService:
             # ── Renk ayrıştırma: "/" ile ayrılmış çoklu renkleri ayrı satırlara aç ──
             df = PriceTrackingService._explode_multi_color(df)
 
-            # DEBUG: İlk satırı logla
-            if len(df) > 0:
+            # İlk satırı yalnız DEBUG seviyesinde logla
+            if len(df) > 0 and logger.isEnabledFor(logging.DEBUG):
                 first_row = df.iloc[0]
                 for col in df.columns:
                     val = first_row[col]
-                    logger.info("  SUTUN[%s] = %r (type=%s)", col, val, type(val).__name__)
+                    logger.debug("  SUTUN[%s] = %r (type=%s)", col, val, type(val).__name__)
         else:
             # Sütun eşleme yapılamazsa AI'ya gönder
             text = df.to_string(index=False)
@@ -293,60 +364,41 @@ class PriceTrackingService:
 
     @staticmethod
     def _process_pdf(file_path: str, supplier: str) -> pd.DataFrame:
-        """PDF'den tablo veya metin çıkarır, AI ile yapılandırır."""
+        """PDF sayfalarını paralel çıkarır; tablosuz sayfaları AI ile yapılandırır."""
         try:
-            import pdfplumber
+            pages = extract_pages(file_path)
         except ImportError:
             logger.error("pdfplumber yüklü değil")
             return pd.DataFrame()
-
-        # pdfplumber ile tablo çıkarımı dene
-        all_rows: list = []
-        headers: list[str] | None = None
-
-        try:
-            with pdfplumber.open(file_path) as pdf:
-                for page in pdf.pages:
-                    for table in page.extract_tables():
-                        if not table:
-                            continue
-                        for row_idx, row in enumerate(table):
-                            if row_idx == 0 and headers is None:
-                                headers = [str(c or "").strip() for c in row]
-                            else:
-                                all_rows.append(row)
         except Exception as e:
-            logger.warning("pdfplumber tablo çıkarımı başarısız: %s", e)
-
-        if all_rows and headers:
-            df = pd.DataFrame(all_rows, columns=headers).dropna(how="all")
-            col_mapping = normalize_columns(df.columns.tolist())
-            if col_mapping:
-                df = df.rename(columns=col_mapping)
-                return df
-
-        # Metin çıkar → AI
-        text_parts: list[str] = []
-        try:
-            with pdfplumber.open(file_path) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text_parts.append(page_text)
-        except Exception:
-            pass
-
-        if not text_parts:
-            text = extract_text_from_pdf_images(file_path)
+            logger.warning("pdfplumber sayfa çıkarımı başarısız: %s", e)
+            pages = []
+
+        frames: list[pd.DataFrame] = []
+        table_df = _tables_to_frame(pages)
+        if table_df is not None:
+            frames.append(table_df)
+            # Yalnız tablo vermeyen sayfalar AI'ya gider
+            fallback_pages = [p for p in pages if not p.tables]
         else:
-            text = "\n".join(text_parts)
-
-        items = extract_price_data_from_text(text, supplier=supplier)
-        if items:
-            df = pd.DataFrame(items)
-            return PriceTrackingService._normalize_ai_output(df)
+            fallback_pages = pages
+
+        if fallback_pages or not pages:
+            text = "\n".join(p.text for p in fallback_pages if p.text.strip())
+            if not text.strip() and table_df is None:
+                # Metin katmanı yok: taranmış PDF
+                text = extract_text_from_pdf_images(file_path)
+            if len(text.strip()) >= AI_FALLBACK_MIN_CHARS:
+                logger.info(
+                    "PDF AI yedeği: %d/%d sayfa", len(fallback_pages), len(pages)
+                )
+                items = extract_price_data_from_text(text, supplier=supplier)
+                if items:
+                    frames.append(PriceTrackingService._normalize_ai_output(pd.DataFrame(items)))
 
-        return pd.DataFrame()
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
 
     @staticmethod
     def _process_image(file_path: str, supplier: str) -> pd.DataFrame:
@@ -452,42 +504,30 @@ class PriceTrackingService:
         if "RENK" not in df.columns:
             return df
 
-        new_rows = []
-        exploded = False
-
-        for _, row in df.iterrows():
-            renk_val = row.get("RENK")
-
-            # Renk değeri yoksa veya NaN ise olduğu gibi bırak
-            if pd.isna(renk_val) or not str(renk_val).strip():
-                new_rows.append(row.to_dict())
-                continue
-
-            renk_str = str(renk_val).strip()
+        df = df.reset_index(drop=True)
+        renk = df["RENK"]
+        renk_str = renk.astype(str).str.strip()
 
-            # '/' ile ayrılmış çoklu renkler var mı?
-            if "/" in renk_str:
-                colors = [c.strip() for c in renk_str.split("/") if c.strip()]
-
-                if len(colors) > 1:
-                    exploded = True
-                    for color in colors:
-                        new_row = row.to_dict()
-                        new_row["RENK"] = color
-                        new_rows.append(new_row)
-                else:
-                    new_rows.append(row.to_dict())
-            else:
-                new_rows.append(row.to_dict())
+        # Renk değeri yoksa/boşsa ya da '/' içermiyorsa satır olduğu gibi kalır
+        multi = renk.notna() & renk_str.ne("") & renk_str.str.contains("/", regex=False)
+        if not multi.any():
+            return df
 
-        if exploded:
-            result = pd.DataFrame(new_rows)
-            logger.info(
-                "Renk ayrıştırma: %d satır → %d satır (çoklu renkler açıldı)", len(df), len(result)
-            )
-            return result.reset_index(drop=True)
+        colors = renk_str[multi].str.split("/").explode().str.strip()
+        colors = colors[colors.ne("")]
+        counts = colors.groupby(level=0).size()
+        split_idx = counts.index[counts > 1]
+        if split_idx.empty:
+            return df
 
-        return df
+        colors = colors[colors.index.isin(split_idx)]
+        expanded = df.loc[colors.index].copy()
+        expanded["RENK"] = colors.to_numpy()
+        result = pd.concat([df.drop(index=split_idx), expanded]).sort_index(kind="stable")
+        logger.info(
+            "Renk ayrıştırma: %d satır → %d satır (çoklu renkler açıldı)", len(df), len(result)
+        )
+        return result.reset_index(drop=True)
 
     @staticmethod
     def _calculate_derived_fields(df: pd.DataFrame) -> pd.DataFrame:
@@ -644,38 +684,38 @@ class PriceTrackingService:
 # ── Yardımcı fonksiyonlar ─────────────────────────────────
 
 
-def _extract_scalar(value):
-    """
-    Pandas Series/DataFrame gibi çoklu değer dönebilen yapıların içinden
-    tekil (skalar) değeri çıkarır. Defensive programming.
-    """
-    if isinstance(value, (pd.Series, pd.DataFrame)):
-        if value.empty:
-            return None
-        # İlk geçerli değeri almaya çalış, yoksa ilk değeri al
-        valid = value.dropna()
-        if not valid.empty:
-            return valid.iloc[0]
-        return value.iloc[0]
-    return value
+def _tables_to_frame(pages: list) -> pd.DataFrame | None:
+    """Sayfa tablolarını sırayla birleştirir; başlık ilk tablonun ilk satırıdır."""
+    headers: list[str] | None = None
+    rows: list[list] = []
+    for page in pages:
+        for table in page.tables:
+            for row_idx, row in enumerate(table):
+                cells = [str(c or "").strip() for c in row]
+                if headers is None:
+                    headers = cells
+                    continue
+                # Her sayfada tekrarlanan başlık satırı veri değildir
+                if row_idx == 0 and cells == headers:
+                    continue
+                rows.append((list(row) + [None] * len(headers))[: len(headers)])
+
+    if not rows or not headers:
+        return None
+    df = pd.DataFrame(rows, columns=headers).dropna(how="all")
+    col_mapping = normalize_columns(df.columns.tolist())
+    if not col_mapping:
+        return None
+    return df.rename(columns=col_mapping)
 
 
-def _safe_str(value) -> str | None:
-    value = _extract_scalar(value)
-    if value is None or (isinstance(value, float) and pd.isna(value)):
-        return None
-    return str(value).strip() or None
-
-
-def _safe_float(value, default=None) -> float | None:
-    value = _extract_scalar(value)
-    if value is None:
-        return default
-    try:
-        f = float(value)
-        return f if not pd.isna(f) else default
-    except (ValueError, TypeError):
-        return default
+def _content_hash(file_data: bytes, supplier: str) -> str:
+    """Tekrar yükleme tespiti için tedarikçi + dosya içeriği özeti."""
+    digest = hashlib.sha256()
+    digest.update((supplier or "").strip().casefold().encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(file_data)
+    return digest.hexdigest()
 
 
 def _add_summary_sheet(wb: Workbook, df: pd.DataFrame) -> None:
@@ -5,8 +5,8 @@ Doküman bölüm 4-6-7'ye göre uygulama
 
 import logging
 
-from sqlalchemy import or_
-from sqlalchemy.orm import Session
+from sqlalchemy import distinct, exists, func, literal, or_, select, union_all
+from sqlalchemy.orm import Session, joinedload, selectinload
 
 from ..exceptions import ConflictError, NotFoundError
 from ..models import (
@@ -16,11 +16,19 @@ from ..models import (
     IncomingSpecStatusEnum,
     Item,
     MaterialSpec,
+    MaterialSpecToken,
     ProductRequest,
     ProductType,
     SupplierItem,
+    normalize_spec_term,
+    write_spec_tokens,
+)
+from .code_generator import (
+    generate_item_code,
+    generate_item_codes,
+    generate_spec_code,
+    generate_spec_hash,
 )
-from .code_generator import generate_item_code, generate_spec_code, generate_spec_hash
 
 logger = logging.getLogger(__name__)
 
@@ -202,6 +210,27 @@ class ProductService:
         self.db.refresh(item)
         return item
 
+    def create_items(self, rows: list[dict]) -> list[Item]:
+        """Toplu SKU oluşturma; stok kodları tek sayaç güncellemesiyle blok halinde ayrılır."""
+        if not rows:
+            return []
+        supplier_item_ids = {row["supplier_item_id"] for row in rows}
+        found = {
+            si_id
+            for (si_id,) in self.db.query(SupplierItem.id).filter(
+                SupplierItem.id.in_(supplier_item_ids)
+            )
+        }
+        missing = sorted(supplier_item_ids - found)
+        if missing:
+            raise NotFoundError("SupplierItem", missing[0])
+
+        codes = generate_item_codes(self.db, len(rows))
+        items = [Item(code=code, **row) for code, row in zip(codes, rows)]
+        self.db.add_all(items)
+        self.db.commit()
+        return items
+
     # ═══════════════════════════════════════════
     # SPEC-FIRST ARAMA (Doküman bölüm 6)
     # ═══════════════════════════════════════════
@@ -219,50 +248,57 @@ class ProductService:
         """
         Spec-first arama. Satışçı "BEYAZ 18" yazar → eşleşen spec'ler döner.
         Her spec için firma varyantları ve match_status hesaplanır.
+
+        Terimler ``material_spec_tokens`` indeksinde önek olarak aranır; en az bir
+        terimi tutan spec döner, kaç terimi tuttuğuna (``score``) göre sıralanır.
+        Tip, renk ve firma varyantları eager yüklenir: sonuç sayısından bağımsız 2 sorgu.
         """
-        q = (
-            self.db.query(MaterialSpec)
-            .join(ProductType)
-            .join(Color)
-            .filter(MaterialSpec.is_active == True)
-        )
+        stmt = select(MaterialSpec).where(MaterialSpec.is_active == True)
 
         if product_type_id:
-            q = q.filter(MaterialSpec.product_type_id == product_type_id)
+            stmt = stmt.where(MaterialSpec.product_type_id == product_type_id)
         if color_id:
-            q = q.filter(MaterialSpec.color_id == color_id)
+            stmt = stmt.where(MaterialSpec.color_id == color_id)
         if thickness_mm:
-            q = q.filter(MaterialSpec.thickness_mm == thickness_mm)
+            stmt = stmt.where(MaterialSpec.thickness_mm == thickness_mm)
         if width_cm:
-            q = q.filter(MaterialSpec.width_cm == width_cm)
+            stmt = stmt.where(MaterialSpec.width_cm == width_cm)
         if height_cm:
-            q = q.filter(MaterialSpec.height_cm == height_cm)
-
-        # Serbest metin arama
-        if query:
-            terms = query.strip().upper().split()
-            for term in terms:
-                q = q.filter(
-                    or_(
-                        ProductType.short_code.ilike(f"%{term}%"),
-                        ProductType.name.ilike(f"%{term}%"),
-                        Color.code.ilike(f"%{term}%"),
-                        Color.name.ilike(f"%{term}%"),
-                        MaterialSpec.spec_code.ilike(f"%{term}%"),
-                        MaterialSpec.thickness_mm == _try_float(term),
-                    )
+            stmt = stmt.where(MaterialSpec.height_cm == height_cm)
+
+        # Serbest metin arama: terim kapsamına göre sıralı
+        terms = _spec_query_terms(query)
+        if terms:
+            token = MaterialSpecToken.token
+            matches = union_all(
+                *(
+                    select(MaterialSpecToken.spec_id, literal(index).label("term"))
+                    .where(token >= term, token < term + "\uffff")
+                    for index, term in enumerate(terms)
                 )
-
-        specs = q.limit(limit).all()
+            ).subquery()
+            coverage = (
+                select(matches.c.spec_id, func.count(distinct(matches.c.term)).label("score"))
+                .group_by(matches.c.spec_id)
+                .subquery()
+            )
+            score = coverage.c.score
+            stmt = stmt.join(coverage, coverage.c.spec_id == MaterialSpec.id).add_columns(score)
+            stmt = stmt.order_by(score.desc(), MaterialSpec.id)
+        else:
+            stmt = stmt.add_columns(literal(0)).order_by(MaterialSpec.id)
+
+        stmt = stmt.options(
+            joinedload(MaterialSpec.product_type),
+            joinedload(MaterialSpec.color),
+            selectinload(
+                MaterialSpec.supplier_items.and_(SupplierItem.is_active == True)
+            ).joinedload(SupplierItem.brand),
+        ).limit(limit)
 
         results = []
-        for spec in specs:
-            supplier_items = (
-                self.db.query(SupplierItem)
-                .filter(SupplierItem.spec_id == spec.id, SupplierItem.is_active == True)
-                .order_by(SupplierItem.priority.desc())
-                .all()
-            )
+        for spec, score in self.db.execute(stmt).unique().all():
+            supplier_items = sorted(spec.supplier_items, key=lambda si: -(si.priority or 0))
             count = len(supplier_items)
             if count == 0:
                 status = "NO_MATCH"
@@ -278,6 +314,7 @@ class ProductService:
                     "color": spec.color,
                     "supplier_items": supplier_items,
                     "match_status": status,
+                    "score": score,
                 }
             )
 
@@ -404,8 +441,26 @@ class ProductService:
         return incoming
 
 
-def _try_float(s: str) -> float | None:
-    try:
-        return float(s)
-    except (ValueError, TypeError):
-        return None
+def _spec_query_terms(query: str | None) -> list[str]:
+    """Sorgu terimleri indeks kelimeleriyle aynı şekilde katlanır; tekrarlar atılır."""
+    if not query:
+        return []
+    return list(dict.fromkeys(normalize_spec_term(part) for part in query.split()))
+
+
+def rebuild_spec_search_index(db: Session) -> int:
+    """Spec arama indeksini sıfırdan kur; yazılan kelime sayısını döndürür."""
+    count = write_spec_tokens(db.connection())
+    db.commit()
+    logger.info("Spec arama indeksi yeniden kuruldu: %d kelime", count)
+    return count
+
+
+def ensure_spec_search_index(db: Session) -> bool:
+    """Spec var ama indeks boşsa (ilk kurulum / migration sonrası) kur."""
+    if db.scalar(select(exists().select_from(MaterialSpecToken))):
+        return False
+    if not db.scalar(select(exists().select_from(MaterialSpec))):
+        return False
+    rebuild_spec_search_index(db)
+    return True
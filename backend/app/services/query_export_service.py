@@ -0,0 +1,173 @@
+"""
+OptiPlan 360 - SQL Konsolu Akışlı Dışa Aktarım
+Sorgu sonucunu belleğe almadan CSV veya XLSX olarak parça parça üretir.
+
+Sorgu ``stream_results`` ile çalıştırılır (Postgres'te sunucu taraflı cursor,
+SQLite'ta tembel cursor) ve satırlar ``EXPORT_BATCH_ROWS``'luk partiler halinde
+okunur. CSV her partide istemciye yazılır; XLSX openpyxl write-only modunda
+diskteki geçici dosyaya yazılıp sonunda parça parça gönderilir. Bellek kullanımı
+satır sayısından bağımsızdır.
+
+İstemci bağlantıyı keserse akış bir sonraki partide durur ve cursor/bağlantı
+``finally`` içinde kapatılır.
+"""
+
+import csv
+import io
+import logging
+import tempfile
+from datetime import date, datetime, time
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+from openpyxl import Workbook
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+EXPORT_BATCH_ROWS = 1000
+XLSX_READ_CHUNK = 64 * 1024
+
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def _cell(val: Any) -> Any:
+    if isinstance(val, (datetime, date, time)):
+        return val.isoformat()
+    if isinstance(val, (bytes, bytearray, memoryview)):
+        return bytes(val).hex()
+    return val
+
+
+class QueryExportStream:
+    """Açık bir sorgu sonucunu seçilen formatta bayt parçalarına çevirir."""
+
+    def __init__(
+        self,
+        connection: Connection,
+        result,
+        fmt: str,
+        max_rows: Optional[int] = None,
+        batch_size: int = EXPORT_BATCH_ROWS,
+    ):
+        self.connection = connection
+        self.result = result
+        self.fmt = fmt
+        self.max_rows = max_rows
+        self.batch_size = batch_size
+        self.columns: List[str] = list(result.keys())
+        self.rows_written = 0
+        self.completed = False
+        self._closed = False
+
+    @property
+    def media_type(self) -> str:
+        return EXPORT_FORMATS[self.fmt]
+
+    def _batches(self) -> Iterator[list]:
+        for batch in self.result.partitions(self.batch_size):
+            if self.max_rows is not None:
+                remaining = self.max_rows - self.rows_written
+                if remaining <= 0:
+                    return
+                batch = batch[:remaining]
+            self.rows_written += len(batch)
+            yield batch
+
+    def _iter_csv(self) -> Iterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        # BOM: Excel Türkçe karakterleri doğru açsın
+        buffer.write("\ufeff")
+        writer.writerow(self.columns)
+        for batch in self._batches():
+            writer.writerows([_cell(v) for v in row] for row in batch)
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+
+    def _iter_xlsx(self) -> Iterator[bytes]:
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("Query Result")
+        ws.append(self.columns)
+        for batch in self._batches():
+            for row in batch:
+                ws.append([_cell(v) for v in row])
+            yield b""  # İptal kontrol noktası; satırlar geçici dosyada
+        with tempfile.TemporaryFile() as output:
+            wb.save(output)
+            output.seek(0)
+            while True:
+                chunk = output.read(XLSX_READ_CHUNK)
+                if not chunk:
+                    break
+                yield chunk
+
+    def iter_bytes(self) -> Iterator[bytes]:
+        """Senkron bayt akışı; bitince ya da kapatılınca bağlantıyı bırakır."""
+        try:
+            if self.fmt == "xlsx":
+                yield from self._iter_xlsx()
+            else:
+                yield from self._iter_csv()
+            self.completed = True
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self.result.close()
+        finally:
+            self.connection.close()
+        if not self.completed:
+            logger.info("SQL dışa aktarımı yarıda kesildi (%d satır)", self.rows_written)
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        """StreamingResponse için: her parti thread havuzunda üretilir.
+
+        Her ``await`` bir iptal noktasıdır; istemci koparsa ``aclose`` ile
+        senkron üretici kapatılır ve cursor serbest kalır.
+        """
+        chunks = self.iter_bytes()
+        try:
+            while True:
+                chunk = await run_in_threadpool(next, chunks, None)
+                if chunk is None:
+                    break
+                if chunk:
+                    yield chunk
+        finally:
+            chunks.close()
+            self.close()  # Hiç başlamamış üretici için
+
+
+def open_query_export(
+    bind: Engine,
+    sql: str,
+    fmt: str = "csv",
+    max_rows: Optional[int] = None,
+    batch_size: int = EXPORT_BATCH_ROWS,
+) -> QueryExportStream:
+    """Sorguyu akış modunda çalıştır. SQL hataları akış başlamadan yükseltilir."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Desteklenmeyen format: {fmt}")
+    connection = bind.connect()
+    try:
+        result = connection.execution_options(
+            stream_results=True, max_row_buffer=batch_size
+        ).execute(text(sql))
+        if not result.returns_rows:
+            raise ValueError("Sorgu satır döndürmüyor")
+    except Exception:
+        connection.close()
+        raise
+    return QueryExportStream(connection, result, fmt, max_rows=max_rows, batch_size=batch_size)
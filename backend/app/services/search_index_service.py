@@ -0,0 +1,171 @@
+"""
+OptiPlan 360 - Yerel Tam Metin Arama
+Sipariş, müşteri ve stok kartlarında ``search_documents`` indeksi üzerinden
+sıralı arama (bkz. ``models.search``).
+
+SQLite'ta FTS5 (bm25), PostgreSQL'de tsvector (ts_rank) kullanılır; ikisi de
+yoksa katlanmış metin üzerinde LIKE taramasına düşülür. Sorgu metni indeksle
+aynı şekilde Türkçe katlanır; her terim önek olarak eşleşir. Önce tüm
+terimler (AND) aranır, sonuç yoksa herhangi biri (OR) yeterli sayılır.
+LLM gerektirmez; AI akıllı arama yalnız buradan gelen ilk k adayı yeniden sıralar.
+"""
+
+import logging
+import re
+from dataclasses import asdict, dataclass
+from typing import Dict, List
+
+from app.models import SEARCH_SOURCES, SearchDocument, build_search_document
+from app.utils.text_normalize import normalize_text
+from sqlalchemy import and_, delete, exists, func, inspect, literal_column, or_, select, text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+REBUILD_BATCH_SIZE = 1000
+
+# API kapsamı -> indeks entity_type
+SEARCH_SCOPES = {
+    "orders": ("order",),
+    "customers": ("customer",),
+    "products": ("product",),
+    "all": ("order", "customer", "product"),
+}
+
+
+@dataclass
+class SearchHit:
+    type: str
+    id: str
+    title: str
+    description: str
+    score: float
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+_RESULT_COLUMNS = (
+    SearchDocument.entity_type,
+    SearchDocument.entity_id,
+    SearchDocument.title,
+    SearchDocument.summary,
+)
+
+
+def _terms(query: str) -> List[str]:
+    return re.findall(r"\w+", normalize_text(query or ""))
+
+
+def _entity_types(scope: str) -> tuple:
+    if scope not in SEARCH_SCOPES:
+        raise ValueError(f"Geçersiz arama kapsamı: {scope}")
+    return SEARCH_SCOPES[scope]
+
+
+def _has_fts(db: Session) -> bool:
+    return inspect(db.get_bind()).has_table("search_fts")
+
+
+def _search_sqlite_fts(db: Session, terms: List[str], types: tuple, limit: int, operator: str):
+    match = f" {operator} ".join(f'"{t}"*' for t in terms)
+    placeholders = ", ".join(f":t{i}" for i in range(len(types)))
+    sql = text(
+        "SELECT d.entity_type, d.entity_id, d.title, d.summary, -bm25(search_fts) AS score "
+        "FROM search_fts JOIN search_documents d ON d.id = search_fts.rowid "
+        f"WHERE search_fts MATCH :match AND d.entity_type IN ({placeholders}) "
+        "ORDER BY bm25(search_fts) LIMIT :limit"
+    )
+    params = {"match": match, "limit": limit, **{f"t{i}": t for i, t in enumerate(types)}}
+    return db.execute(sql, params).all()
+
+
+def _search_postgres(db: Session, terms: List[str], types: tuple, limit: int, operator: str):
+    joiner = " & " if operator == "AND" else " | "
+    query = func.to_tsquery("simple", joiner.join(f"{t}:*" for t in terms))
+    vector = literal_column("search_vector")
+    rank = func.ts_rank(vector, query).label("score")
+    stmt = (
+        select(*_RESULT_COLUMNS, rank)
+        .where(vector.op("@@")(query), SearchDocument.entity_type.in_(types))
+        .order_by(rank.desc())
+        .limit(limit)
+    )
+    return db.execute(stmt).all()
+
+
+def _search_like(db: Session, terms: List[str], types: tuple, limit: int, operator: str):
+    combine = and_ if operator == "AND" else or_
+    condition = combine(*(SearchDocument.search_text.like(f"%{t}%") for t in terms))
+    # Kısa doküman = daha yoğun eşleşme
+    length = func.length(SearchDocument.search_text)
+    stmt = (
+        select(*_RESULT_COLUMNS, (1.0 / length).label("score"))
+        .where(condition, SearchDocument.entity_type.in_(types))
+        .order_by(length)
+        .limit(limit)
+    )
+    return db.execute(stmt).all()
+
+
+def search(
+    db: Session, query: str, scope: str = "all", limit: int = SEARCH_DEFAULT_LIMIT
+) -> List[SearchHit]:
+    """Sorguya en uygun ``limit`` kaydı ilgililik sırasıyla döndürür."""
+    types = _entity_types(scope)
+    terms = _terms(query)
+    if not terms:
+        return []
+    limit = max(1, min(limit, SEARCH_MAX_LIMIT))
+
+    dialect_name = db.get_bind().dialect.name
+    if dialect_name == "postgresql":
+        backend = _search_postgres
+    elif dialect_name == "sqlite" and _has_fts(db):
+        backend = _search_sqlite_fts
+    else:
+        backend = _search_like
+
+    rows = backend(db, terms, types, limit, "AND")
+    if not rows and len(terms) > 1:
+        rows = backend(db, terms, types, limit, "OR")
+    return [
+        SearchHit(type=t, id=i, title=title, description=summary or "", score=round(float(score), 6))
+        for t, i, title, summary, score in rows
+    ]
+
+
+def rebuild_search_index(db: Session) -> int:
+    """İndeksi kaynak tablolardan sıfırdan kur; yazılan doküman sayısını döndürür."""
+    db.execute(delete(SearchDocument))
+    count = 0
+    for entity_type, (model, _builder, _columns) in SEARCH_SOURCES.items():
+        batch = []
+        rows = db.execute(
+            select(model).where(model.deleted_at.is_(None)).execution_options(yield_per=REBUILD_BATCH_SIZE)
+        ).scalars()
+        for row in rows:
+            batch.append(build_search_document(entity_type, row))
+            if len(batch) >= REBUILD_BATCH_SIZE:
+                db.execute(SearchDocument.__table__.insert(), batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            db.execute(SearchDocument.__table__.insert(), batch)
+            count += len(batch)
+    db.commit()
+    logger.info("Arama indeksi yeniden kuruldu: %d doküman", count)
+    return count
+
+
+def ensure_search_index(db: Session) -> bool:
+    """Kaynak kayıt var ama indeks boşsa (ilk kurulum / migration sonrası) kur."""
+    if db.scalar(select(exists().select_from(SearchDocument))):
+        return False
+    for model, _builder, _columns in SEARCH_SOURCES.values():
+        if db.scalar(select(exists().where(model.deleted_at.is_(None)))):
+            rebuild_search_index(db)
+            return True
+    return False
@@ -10,6 +10,8 @@ from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, Optional
 
 from app.exceptions import AuthenticationError
+from app.services.token_store import AUTH_LOCKOUT_DURATION, MAX_AUTH_ATTEMPTS  # noqa: F401
+from app.services.token_store import token_store
 from fastapi import HTTPException, Request
 from jose import JWTError, jwt
 
@@ -20,7 +22,6 @@ SECRET_KEY = os.getenv("OPTIPLAN_SECRET_KEY", "")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30  # 30 dakika
 REFRESH_TOKEN_EXPIRE_DAYS = 7  # 7 gün
-BLACKLISTED_TOKENS = set()  # Production'da Redis kullanılmalı
 
 
 class TokenService:
@@ -68,8 +69,8 @@ class TokenService:
         try:
             payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
 
-            # Blacklist kontrolü (production'da Redis kullanılmalı)
-            if payload.get("jti") in BLACKLISTED_TOKENS:
+            # Blacklist kontrolü (tüm worker'larca paylaşılan depo)
+            if token_store.is_revoked(payload.get("jti")):
                 raise AuthenticationError("Token geçersiz kılındı")
 
             return payload
@@ -93,7 +94,7 @@ class TokenService:
                 raise AuthenticationError("Token kullanıcı bilgisi içermiyor")
 
             # Eski refresh token'ı blacklist'e ekle
-            BLACKLISTED_TOKENS.add(payload.get("jti"))
+            TokenService._revoke_payload(payload)
 
             # Yeni access token oluştur
             new_access_token = TokenService.create_access_token(
@@ -119,46 +120,31 @@ class TokenService:
         """Token'ı geçersiz kıl (logout için)"""
         try:
             payload = TokenService.decode_token(token)
-            BLACKLISTED_TOKENS.add(payload.get("jti"))
+            TokenService._revoke_payload(payload)
             return True
         except Exception as e:
             logger.error(f"Token revocation error: {str(e)}")
             return False
 
+    @staticmethod
+    def _revoke_payload(payload: Dict[str, Any]) -> None:
+        """Decode edilmiş token'ı süre sonuna kadar iptal deposuna yaz."""
+        exp = payload.get("exp")
+        if isinstance(exp, (int, float)):
+            expires_at = datetime.fromtimestamp(exp, tz=timezone.utc)
+        else:
+            expires_at = datetime.now(timezone.utc) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+        token_store.revoke(payload.get("jti"), expires_at, payload.get("type"))
+
     @staticmethod
     def is_token_blacklisted(jti: str) -> bool:
         """Token blacklist kontrolü"""
-        return jti in BLACKLISTED_TOKENS
+        return token_store.is_revoked(jti)
 
     @staticmethod
     def cleanup_expired_tokens():
         """Süresi dolmuş token'ları blacklist'ten temizle"""
-        # Production'da Redis TTL kullanılmalı
-        current_time = datetime.now(timezone.utc)
-        expired_tokens = []
-
-        # Bu basit bir implementasyon - production'da Redis kullanın
-        for jti in BLACKLISTED_TOKENS:
-            try:
-                payload = jwt.decode(
-                    jwt.encode(
-                        {"jti": jti, "exp": current_time.timestamp()},
-                        SECRET_KEY,
-                        algorithm=ALGORITHM,
-                    ),
-                    SECRET_KEY,
-                    algorithms=[ALGORITHM],
-                )
-                if payload.get("exp", 0) < current_time.timestamp():
-                    expired_tokens.append(jti)
-            except Exception:
-                expired_tokens.append(jti)
-
-        for jti in expired_tokens:
-            BLACKLISTED_TOKENS.discard(jti)
-
-        if expired_tokens:
-            logger.info(f"Cleaned up {len(expired_tokens)} expired tokens from blacklist")
+        return token_store.cleanup_expired()
 
 
 # Middleware for automatic token refresh
@@ -219,39 +205,15 @@ async def token_refresh_middleware(request: Request, call_next):
         raise AuthenticationError("Token yenileme hatası")
 
 
-# Rate limiting for auth endpoints
-AUTH_ATTEMPTS = {}  # Production'da Redis kullanılmalı
-MAX_AUTH_ATTEMPTS = 5
-AUTH_LOCKOUT_DURATION = 15  # minutes
-
-
+# Rate limiting for auth endpoints (sayaçlar paylaşılan depoda)
 def check_auth_attempts(ip: str) -> bool:
     """IP bazlı auth deneme kontrolü"""
-    attempts = AUTH_ATTEMPTS.get(ip, {"count": 0, "locked_until": None})
-
-    if attempts.get("locked_until"):
-        if datetime.now().timestamp() < attempts["locked_until"]:
-            return False  # Locked
-        else:
-            # Lockout expired, reset
-            AUTH_ATTEMPTS[ip] = {"count": 0, "locked_until": None}
-
-    return True
+    return token_store.check_attempts(ip)
 
 
 def record_auth_attempt(ip: str, success: bool):
     """Auth denemesini kaydet"""
-    if success:
-        AUTH_ATTEMPTS[ip] = {"count": 0, "locked_until": None}
-    else:
-        attempts = AUTH_ATTEMPTS.get(ip, {"count": 0, "locked_until": None})
-        attempts["count"] += 1
-
-        if attempts["count"] >= MAX_AUTH_ATTEMPTS:
-            attempts["locked_until"] = datetime.now().timestamp() + (AUTH_LOCKOUT_DURATION * 60)
-            logger.warning(f"IP {ip} locked for {AUTH_LOCKOUT_DURATION} minutes")
-
-        AUTH_ATTEMPTS[ip] = attempts
+    token_store.record_attempt(ip, success)
 
 
 # Security headers for auth responses
@@ -0,0 +1,223 @@
+"""
+OptiPlan 360 - Token İptal ve Giriş Denemesi Deposu
+Tüm uvicorn worker'larının ortak okuduğu, veritabanı destekli depo.
+
+- İptal edilen token'lar ``revoked_tokens`` tablosunda, süre sonu (expires_at)
+  indeksiyle tutulur; temizlik bu indeks üzerinden tek DELETE ile yapılır.
+- Üyelik kontrolü süreç içi bir Bloom filtresiyle önden karşılanır. Filtre
+  ``SYNC_INTERVAL_SECONDS`` aralıkla yalnız yeni iptalleri çekerek güncellenir;
+  "belki var" yanıtları birincil anahtar sorgusuyla doğrulanır.
+- IP bazlı giriş denemesi sayacı ``auth_attempts`` tablosundadır.
+"""
+
+import hashlib
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Optional
+
+from app.models import AuthAttempt, RevokedToken
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+SYNC_INTERVAL_SECONDS = 1.0  # Diğer worker'ların iptallerini görme gecikmesi üst sınırı
+SYNC_OVERLAP_SECONDS = 5.0  # Geç commit edilen iptalleri kaçırmamak için geriye örtüşme
+BLOOM_CAPACITY = 100_000
+BLOOM_ERROR_RATE = 0.01
+
+MAX_AUTH_ATTEMPTS = 5
+AUTH_LOCKOUT_DURATION = 15  # minutes
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """SQLite tz bilgisini düşürebildiği için okunan değerleri UTC'ye sabitle."""
+    if value is None or value.tzinfo is not None:
+        return value
+    return value.replace(tzinfo=timezone.utc)
+
+
+class BloomFilter:
+    """Sabit boyutlu Bloom filtresi (yanlış negatif yok, sınırlı yanlış pozitif)."""
+
+    def __init__(self, capacity: int = BLOOM_CAPACITY, error_rate: float = BLOOM_ERROR_RATE):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, int(round(self.size / capacity * math.log(2))))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class TokenRevocationStore:
+    """Paylaşımlı token iptal ve giriş denemesi deposu."""
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Session]] = None,
+        sync_interval: float = SYNC_INTERVAL_SECONDS,
+    ):
+        self._session_factory = session_factory
+        self.sync_interval = sync_interval
+        self._lock = threading.Lock()
+        self._bloom = BloomFilter()
+        self._watermark: Optional[datetime] = None
+        self._last_sync = 0.0
+
+    def _session(self) -> Session:
+        if self._session_factory is None:
+            from app.database import SessionLocal
+
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    # ─── Bloom filtresi senkronizasyonu ───
+
+    def _sync(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._last_sync < self.sync_interval:
+            return
+        with self._lock:
+            if not force and now - self._last_sync < self.sync_interval:
+                return
+            stmt = select(RevokedToken.jti, RevokedToken.revoked_at)
+            if self._watermark is not None:
+                stmt = stmt.where(
+                    RevokedToken.revoked_at
+                    >= self._watermark - timedelta(seconds=SYNC_OVERLAP_SECONDS)
+                )
+            try:
+                with self._session() as db:
+                    for jti, revoked_at in db.execute(stmt):
+                        self._bloom.add(jti)
+                        revoked_at = _as_utc(revoked_at)
+                        if self._watermark is None or revoked_at > self._watermark:
+                            self._watermark = revoked_at
+            except SQLAlchemyError as e:
+                logger.error("Token iptal deposu senkronize edilemedi: %s", e)
+                return
+            self._last_sync = now
+
+    def rebuild(self) -> None:
+        """Bloom filtresini veritabanından sıfırdan kur (temizlik sonrası)."""
+        with self._lock:
+            self._bloom = BloomFilter()
+            self._watermark = None
+            self._last_sync = 0.0
+        self._sync(force=True)
+
+    # ─── Token iptali ───
+
+    def revoke(self, jti: str, expires_at: datetime, token_type: Optional[str] = None) -> None:
+        """Token'ı iptal et. Aynı jti tekrar iptal edilirse sessizce yok sayılır."""
+        if not jti:
+            return
+        with self._session() as db:
+            db.add(
+                RevokedToken(
+                    jti=jti,
+                    token_type=token_type,
+                    expires_at=_as_utc(expires_at),
+                    revoked_at=_utcnow(),
+                )
+            )
+            try:
+                db.commit()
+            except IntegrityError:
+                db.rollback()
+        with self._lock:
+            self._bloom.add(jti)
+
+    def is_revoked(self, jti: Optional[str]) -> bool:
+        """O(1) ön kontrol; yalnız Bloom pozitiflerinde birincil anahtar okuması yapılır."""
+        if not jti:
+            return False
+        self._sync()
+        if jti not in self._bloom:
+            return False
+        with self._session() as db:
+            row = db.get(RevokedToken, jti)
+            return row is not None and _as_utc(row.expires_at) > _utcnow()
+
+    def cleanup_expired(self) -> int:
+        """Süresi dolmuş iptalleri expires_at indeksiyle sil ve filtreyi yeniden kur."""
+        with self._session() as db:
+            result = db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= _utcnow()))
+            db.commit()
+            removed = result.rowcount or 0
+        if removed:
+            logger.info("Cleaned up %d expired tokens from blacklist", removed)
+            self.rebuild()
+        return removed
+
+    # ─── Giriş denemesi sınırlama ───
+
+    def check_attempts(self, key: str) -> bool:
+        """Anahtar (IP) kilitli değilse True döndürür; süresi dolan kilidi sıfırlar."""
+        with self._session() as db:
+            attempt = db.get(AuthAttempt, key)
+            if attempt is None or attempt.locked_until is None:
+                return True
+            if _utcnow() < _as_utc(attempt.locked_until):
+                return False
+            attempt.count = 0
+            attempt.locked_until = None
+            attempt.updated_at = _utcnow()
+            db.commit()
+            return True
+
+    def record_attempt(self, key: str, success: bool) -> None:
+        """Giriş denemesini kaydet; eşik aşılınca kilitle."""
+        with self._session() as db:
+            attempt = db.get(AuthAttempt, key)
+            if attempt is None:
+                attempt = AuthAttempt(key=key, count=0)
+                db.add(attempt)
+            attempt.updated_at = _utcnow()
+            if success:
+                attempt.count = 0
+                attempt.locked_until = None
+            else:
+                attempt.count = (attempt.count or 0) + 1
+                if attempt.count >= MAX_AUTH_ATTEMPTS:
+                    attempt.locked_until = _utcnow() + timedelta(minutes=AUTH_LOCKOUT_DURATION)
+                    logger.warning(f"IP {key} locked for {AUTH_LOCKOUT_DURATION} minutes")
+            try:
+                db.commit()
+            except IntegrityError:
+                # Başka bir worker aynı anahtarı aynı anda oluşturdu; tekrar dene
+                db.rollback()
+                self.record_attempt(key, success)
+
+    def get_attempt_state(self, key: str) -> Dict[str, Optional[float]]:
+        with self._session() as db:
+            attempt = db.get(AuthAttempt, key)
+            if attempt is None:
+                return {"count": 0, "locked_until": None}
+            locked_until = _as_utc(attempt.locked_until)
+            return {
+                "count": attempt.count,
+                "locked_until": locked_until.timestamp() if locked_until else None,
+            }
+
+
+token_store = TokenRevocationStore()
@@ -2,7 +2,8 @@ r"""
 OptiPlan 360 - Tracking Folder Service
 
 Siparis takip klasorlerini yonetir.
-State degisikliklerinde XLSX/XML dosyalarini ilgili takip klasorune kopyalar.
+State degisikliklerinde XLSX/XML dosyalarini ilgili takip klasorune tasir;
+dosya islemleri ``tracking_mirror_service`` kuyrugunda, gecis yolunun disinda yapilir.
 
 Klasor yapisi:
   C:\Optiplan360_Entegrasyon\
@@ -30,12 +31,17 @@ Klasor yapisi:
       +-- _loglar\                <- Worker/collector loglari
 """
 
+import atexit
 import logging
 import os
 import shutil
 from datetime import datetime
 from typing import Optional
 
+from sqlalchemy.orm import Session
+
+from .tracking_mirror_service import MirrorEvent, TrackingMirror
+
 logger = logging.getLogger(__name__)
 
 # -- Konfigurasyon --
@@ -63,6 +69,7 @@ OPTIPLAN_KESIM_TAMAM = os.path.join(OPTIPLAN_ROOT, "6_KESIM_TAMAMLANDI")
 OPTIPLAN_TESLIM = os.path.join(OPTIPLAN_ROOT, "7_TESLIM_EDILDI")
 OPTIPLAN_RAPORLAR = os.path.join(OPTIPLAN_ROOT, "_raporlar")
 OPTIPLAN_LOGLAR = os.path.join(OPTIPLAN_ROOT, "_loglar")
+OPTIPLAN_TAKIP_INDEX = os.path.join(OPTIPLAN_ROOT, "_takip_index.json")
 
 # State -> Klasor eslesmesi
 STATE_FOLDER_MAP = {
@@ -75,6 +82,9 @@ STATE_FOLDER_MAP = {
     "FAILED": OPTIPLAN_HATALI,
 }
 
+mirror = TrackingMirror(STATE_FOLDER_MAP, OPTIPLAN_HATALI, index_path=OPTIPLAN_TAKIP_INDEX)
+atexit.register(mirror.stop)
+
 
 # Tum klasorleri baslangicta olustur
 def _ensure_dirs():
@@ -104,19 +114,6 @@ except OSError:
     pass  # Docker ortaminda Windows yollari olmayabilir
 
 
-def _safe_copy(src: str, dst_dir: str) -> Optional[str]:
-    """Dosyayi hedef klasore kopyalar. Hata olursa None doner."""
-    if not os.path.exists(src):
-        return None
-    try:
-        os.makedirs(dst_dir, exist_ok=True)
-        dst = os.path.join(dst_dir, os.path.basename(src))
-        shutil.copy2(src, dst)
-        return dst
-    except OSError as e:
-        logger.warning("Dosya kopyalama hatasi (%s -> %s): %s", src, dst_dir, e)
-        return None
-
 
 def _safe_move(src: str, dst_dir: str) -> Optional[str]:
     """Dosyayi hedef klasore tasir. Hata olursa None doner."""
@@ -134,34 +131,21 @@ def _safe_move(src: str, dst_dir: str) -> Optional[str]:
         return None
 
 
-def _cleanup_from_other_folders(filename: str, exclude_folder: str):
-    """Bir dosyayi diger takip klasorlerinden siler (state degisince eski yerde kalmasin)."""
-    for folder in STATE_FOLDER_MAP.values():
-        if folder == exclude_folder:
-            continue
-        old_path = os.path.join(folder, filename)
-        if os.path.exists(old_path):
-            try:
-                os.remove(old_path)
-            except OSError:
-                pass
-
-
 def on_xlsx_created(xlsx_path: str, job_id: str, order_ts_code: str = ""):
     """
-    XLSX olusturulunca cagirilir.
+    XLSX olusturulunca cagirilir (kuyruga yazar, beklemez).
     1. XLSX'i OptiPlanning/Import/ klasorune kopyalar
-    2. OPTiPLAN/1_GELEN_SIPARISLER/ klasorune kopyalar
+    2. OPTiPLAN/1_GELEN_SIPARISLER/ klasorune yerlestirir
     """
-    fname = os.path.basename(xlsx_path)
-
-    # OptiPlanning Import
-    _safe_copy(xlsx_path, OPTIPLANNING_IMPORT)
-
-    # OPTiPLAN takip
-    _safe_copy(xlsx_path, OPTIPLAN_GELEN)
-
-    logger.info("Tracking: XLSX olusturuldu -> Import + 1_GELEN: %s", fname)
+    mirror.submit(
+        MirrorEvent(
+            job_id=job_id,
+            state="OPTI_IMPORTED",
+            source=xlsx_path,
+            copies=((xlsx_path, OPTIPLANNING_IMPORT),),
+        )
+    )
+    logger.debug("Tracking: XLSX olusturuldu -> Import + 1_GELEN: %s", os.path.basename(xlsx_path))
 
 
 def on_state_change(
@@ -173,39 +157,35 @@ def on_state_change(
     error_message: str = "",
 ):
     """
-    Job state degistiginde cagirilir.
-    Dosyayi ilgili takip klasorune tasir/kopyalar.
+    Job state degistiginde cagirilir (kuyruga yazar, beklemez).
+    Takip dosyasi (XML, yoksa XLSX, o da yoksa job'in son bilinen dosyasi)
+    ilgili takip klasorune tasinir; FAILED'da hata detay dosyasi yazilir.
     """
-    target_folder = STATE_FOLDER_MAP.get(new_state)
-    if not target_folder:
-        return
-
-    # Takip dosyasi: XLSX veya XML (hangisi mevcutsa)
-    tracking_file = xml_path or xlsx_path
-    if not tracking_file:
+    if new_state not in STATE_FOLDER_MAP:
         return
-
-    fname = os.path.basename(tracking_file)
-
-    # Dosyayi hedef klasore kopyala
-    result = _safe_copy(tracking_file, target_folder)
-
-    # Eski klasorlerden temizle
-    if result:
-        _cleanup_from_other_folders(fname, target_folder)
-
-    # Hata durumunda detay dosyasi olustur
-    if new_state == "FAILED" and error_message:
-        error_file = os.path.join(OPTIPLAN_HATALI, f"{os.path.splitext(fname)[0]}_HATA.txt")
-        try:
-            with open(error_file, "w", encoding="utf-8") as f:
-                f.write(f"Job ID: {job_id}\n")
-                f.write(f"Tarih: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"Hata: {error_message}\n")
-        except OSError:
-            pass
-
-    logger.info("Tracking: %s -> %s (%s)", new_state, os.path.basename(target_folder), fname)
+    mirror.submit(
+        MirrorEvent(
+            job_id=job_id,
+            state=new_state,
+            source=xml_path or xlsx_path,
+            error_message=error_message,
+        )
+    )
+
+
+def reconcile_tracking_folders(db: Session) -> dict:
+    """Takip klasorlerini opti_jobs state'lerinden yeniden kurar."""
+    from ..models import OptiJob
+
+    jobs = (
+        (job_id, state.value if hasattr(state, "value") else state, xml_file_path)
+        for job_id, state, xml_file_path in db.query(
+            OptiJob.id, OptiJob.state, OptiJob.xml_file_path
+        ).yield_per(1000)
+    )
+    result = mirror.reconcile(jobs)
+    logger.info("Tracking reconcile: %s", result)
+    return result
 
 
 def on_receipt_created(
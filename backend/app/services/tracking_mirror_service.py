@@ -0,0 +1,334 @@
+"""
+OptiPlan 360 - Takip Klasoru Aynalama
+
+State gecislerinde takip dosyasinin klasorler arasi yer degistirmesi worker /
+collector gecis yolundan cikarildi: olaylar kuyruga yazilir, arka plan
+thread'i uygular.
+
+  - Ayni job'in art arda gelen gecisleri ``TRACKING_MIRROR_COALESCE_SECONDS``
+    icinde birlestirilir; yalniz son state uygulanir (XML_READY -> DELIVERED
+    tek tasima olur)
+  - Dosya hedefe once hardlink ile, olmazsa kopya ile gecici adla yazilir ve
+    ``os.replace`` ile atomik olarak yerine konur; kaynak artik yoksa takip
+    klasorundeki kopya yeniden adlandirilarak tasinir
+  - Dosyanin hangi takip klasorunde oldugu bellekte tutulur; her geciste tum
+    state klasorleri taranmaz
+  - job -> takip dosyasi eslesmesi ``index_path``'e yazilir; yolu olmayan
+    gecisler (or. worker FAILED) son bilinen dosyayi tasir, reconcile bu
+    eslesmeyi kullanir
+"""
+
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# -- Konfigurasyon --
+MIRROR_ASYNC = os.environ.get("TRACKING_MIRROR_ASYNC", "1") == "1"
+MIRROR_COALESCE_SECONDS = float(os.environ.get("TRACKING_MIRROR_COALESCE_SECONDS", "0.5"))
+
+
+@dataclass
+class MirrorEvent:
+    """Bir job icin bekleyen aynalama isi."""
+
+    job_id: str
+    state: Optional[str] = None
+    source: Optional[str] = None
+    # State'ten bagimsiz ek kopyalar: (kaynak, hedef klasor), or. OptiPlanning/Import
+    copies: Tuple[Tuple[str, str], ...] = ()
+    error_message: str = ""
+
+    def merge(self, newer: "MirrorEvent") -> "MirrorEvent":
+        copies = self.copies + tuple(c for c in newer.copies if c not in self.copies)
+        return MirrorEvent(
+            job_id=self.job_id,
+            state=newer.state or self.state,
+            source=newer.source or self.source,
+            copies=copies,
+            error_message=newer.error_message if newer.state else self.error_message,
+        )
+
+
+@dataclass
+class MirrorStats:
+    submitted: int = 0
+    coalesced: int = 0
+    applied: int = 0
+    linked: int = 0
+    copied: int = 0
+    renamed: int = 0
+    failed: int = 0
+
+
+def place_file(src: str, dst_dir: str) -> Optional[str]:
+    """
+    ``src``'yi ``dst_dir``'e atomik olarak yerlestirir: hardlink, olmazsa kopya.
+    Donen: "link", "copy", "same" ya da kaynak yoksa None.
+    """
+    if not os.path.exists(src):
+        return None
+    os.makedirs(dst_dir, exist_ok=True)
+    dst = os.path.join(dst_dir, os.path.basename(src))
+    if os.path.exists(dst) and os.path.samefile(src, dst):
+        return "same"
+    tmp = dst + ".mirror.tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    try:
+        os.link(src, tmp)
+        method = "link"
+    except OSError:  # Farkli disk / hardlink desteklemeyen dosya sistemi
+        shutil.copy2(src, tmp)
+        method = "copy"
+    os.replace(tmp, dst)
+    return method
+
+
+class TrackingMirror:
+    """Takip klasoru aynalama kuyrugu (job basina birlestirme + arka plan uygulama)."""
+
+    def __init__(
+        self,
+        state_folders: Dict[str, str],
+        error_folder: str,
+        index_path: Optional[str] = None,
+        coalesce_seconds: float = MIRROR_COALESCE_SECONDS,
+        run_async: bool = MIRROR_ASYNC,
+    ):
+        self.state_folders = state_folders
+        self.error_folder = error_folder
+        self.index_path = index_path
+        self.coalesce_seconds = coalesce_seconds
+        self.run_async = run_async
+        self.stats = MirrorStats()
+        self._pending: Dict[str, Tuple[MirrorEvent, float]] = {}
+        self._cond = threading.Condition()
+        self._busy = False
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        self._locations: Dict[str, str] = {}  # dosya adi -> bulundugu takip klasoru
+        self._index: Optional[Dict[str, Dict[str, str]]] = None
+        self._apply_lock = threading.Lock()
+
+    # -- Kuyruk --
+
+    def submit(self, event: MirrorEvent) -> None:
+        if not self.run_async:
+            self._apply_batch([event])
+            return
+        with self._cond:
+            self.stats.submitted += 1
+            pending = self._pending.get(event.job_id)
+            if pending is not None:
+                event = pending[0].merge(event)
+                self.stats.coalesced += 1
+            self._pending[event.job_id] = (event, time.monotonic() + self.coalesce_seconds)
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping = False
+                self._thread = threading.Thread(
+                    target=self._run, name="tracking-mirror", daemon=True
+                )
+                self._thread.start()
+            self._cond.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    if self._stopping and not self._pending:
+                        return
+                    now = time.monotonic()
+                    due = [
+                        job_id
+                        for job_id, (_event, due_at) in self._pending.items()
+                        if due_at <= now or self._stopping
+                    ]
+                    if due:
+                        batch = [self._pending.pop(job_id)[0] for job_id in due]
+                        self._busy = True
+                        break
+                    timeout = (
+                        min(due_at for _event, due_at in self._pending.values()) - now
+                        if self._pending
+                        else None
+                    )
+                    self._cond.wait(timeout)
+            try:
+                self._apply_batch(batch)
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Bekleyen tum olaylari hemen uygula ve bitmesini bekle."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._pending = {job_id: (event, 0.0) for job_id, (event, _) in self._pending.items()}
+            self._cond.notify_all()
+            while self._pending or self._busy:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Kuyrugu bosaltip thread'i durdurur (kapanista)."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        self._thread = None
+
+    # -- Uygulama --
+
+    def _load_index(self) -> Dict[str, Dict[str, str]]:
+        if self._index is None:
+            self._index = {}
+            if self.index_path and os.path.exists(self.index_path):
+                try:
+                    with open(self.index_path, "r", encoding="utf-8") as f:
+                        self._index = json.load(f)
+                except (OSError, ValueError) as e:
+                    logger.warning("Takip indeksi okunamadi: %s", e)
+        return self._index
+
+    def _save_index(self) -> None:
+        if not self.index_path or self._index is None:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+            tmp = self.index_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._index, f, ensure_ascii=False)
+            os.replace(tmp, self.index_path)
+        except OSError as e:
+            logger.warning("Takip indeksi yazilamadi: %s", e)
+
+    def _locate(self, fname: str) -> Optional[str]:
+        """Dosyanin bulundugu takip klasoru; bilinmiyorsa bir kez taranir."""
+        folder = self._locations.get(fname)
+        if folder and os.path.exists(os.path.join(folder, fname)):
+            return folder
+        self._locations.pop(fname, None)
+        for candidate in dict.fromkeys(self.state_folders.values()):
+            if os.path.exists(os.path.join(candidate, fname)):
+                self._locations[fname] = candidate
+                return candidate
+        return None
+
+    def _count(self, method: Optional[str]) -> None:
+        if method == "link":
+            self.stats.linked += 1
+        elif method == "copy":
+            self.stats.copied += 1
+        elif method == "rename":
+            self.stats.renamed += 1
+
+    def _apply_batch(self, events: List[MirrorEvent]) -> None:
+        with self._apply_lock:
+            index = self._load_index()
+            for event in events:
+                try:
+                    self._apply(event, index)
+                    self.stats.applied += 1
+                except OSError as e:
+                    self.stats.failed += 1
+                    logger.warning("Takip aynalama hatasi (job=%s): %s", event.job_id, e)
+            self._save_index()
+
+    def _apply(self, event: MirrorEvent, index: Dict[str, Dict[str, str]]) -> None:
+        for src, folder in event.copies:
+            self._count(place_file(src, folder))
+
+        target = self.state_folders.get(event.state or "")
+        known = index.get(event.job_id)
+        fname = os.path.basename(event.source) if event.source else (known or {}).get("file")
+
+        if target and fname:
+            current = self._locate(fname)
+            source_exists = bool(event.source) and os.path.exists(event.source)
+            method = None
+            if source_exists:
+                method = place_file(event.source, target)
+                if current and current != target and method:
+                    os.remove(os.path.join(current, fname))
+            elif current and current != target:
+                # Kaynak gitti (or. Export'tan tasindi): takip kopyasini yeniden adlandir
+                os.makedirs(target, exist_ok=True)
+                os.replace(os.path.join(current, fname), os.path.join(target, fname))
+                method = "rename"
+            self._count(method)
+            if method or current == target:
+                self._locations[fname] = target
+                index[event.job_id] = {"file": fname, "state": event.state}
+                logger.info(
+                    "Tracking: %s -> %s (%s)", event.state, os.path.basename(target), fname
+                )
+
+        if event.state == "FAILED" and event.error_message:
+            stem = os.path.splitext(fname)[0] if fname else event.job_id
+            self._write_error_file(stem, event)
+
+    def _write_error_file(self, stem: str, event: MirrorEvent) -> None:
+        error_file = os.path.join(self.error_folder, f"{stem}_HATA.txt")
+        try:
+            os.makedirs(self.error_folder, exist_ok=True)
+            with open(error_file, "w", encoding="utf-8") as f:
+                f.write(f"Job ID: {event.job_id}\n")
+                f.write(f"Tarih: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+                f.write(f"Hata: {event.error_message}\n")
+        except OSError:
+            pass
+
+    # -- Reconcile --
+
+    def reconcile(self, jobs: Iterable[Tuple[str, str, Optional[str]]]) -> dict:
+        """
+        Klasor durumunu DB'den yeniden kurar. ``jobs``: (job_id, state, dosya yolu).
+
+        Yol yoksa indeksteki son dosya kullanilir. Her dosya yalniz state'inin
+        klasorunde kalir; diger state klasorlerindeki kopyalari silinir.
+        """
+        self.flush()
+        result = {"jobs": 0, "placed": 0, "already_ok": 0, "removed": 0, "missing": 0}
+        folders = list(dict.fromkeys(self.state_folders.values()))
+        with self._apply_lock:
+            index = self._load_index()
+            for job_id, state, path in jobs:
+                target = self.state_folders.get(state)
+                fname = os.path.basename(path) if path else (index.get(job_id) or {}).get("file")
+                if not target or not fname:
+                    continue
+                result["jobs"] += 1
+                holders = [f for f in folders if os.path.exists(os.path.join(f, fname))]
+                if target in holders:
+                    result["already_ok"] += 1
+                else:
+                    source = path if path and os.path.exists(path) else None
+                    if source is None and holders:
+                        source = os.path.join(holders[0], fname)
+                    if source is None:
+                        result["missing"] += 1
+                        continue
+                    self._count(place_file(source, target))
+                    result["placed"] += 1
+                for folder in holders:
+                    if folder != target:
+                        os.remove(os.path.join(folder, fname))
+                        result["removed"] += 1
+                self._locations[fname] = target
+                index[job_id] = {"file": fname, "state": state}
+            self._save_index()
+        return result
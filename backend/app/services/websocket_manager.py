@@ -1,20 +1,182 @@
 """
 OptiPlan 360 - WebSocket Manager
 Real-time sipariş ve istasyon güncellemeleri
+
+Her bağlantının kendi sınırlı gönderim kuyruğu ve yazıcı görevi vardır.
+Yayın (broadcast) yalnızca kuyruğa ekler; yavaş veya yarı kopuk bir istemci
+(zayıf Wi-Fi'daki atölye tableti) diğer abonelerin gönderimini bekletmez.
+Kuyruk dolunca ``drop_oldest`` en eski mesajı atar, ``disconnect`` bağlantıyı kapatır.
 """
 
+import asyncio
+import json
+import logging
+import time
+from collections import deque
 from datetime import datetime
-from typing import Dict, Set
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
 
+from app.services.event_bus import EventBus, bus
 from fastapi import WebSocket
 
+logger = logging.getLogger(__name__)
+
+SEND_QUEUE_SIZE = 256
+SEND_TIMEOUT_SECONDS = 10.0  # Tek bir gönderim bu süreyi aşarsa istemci kopuk sayılır
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_DISCONNECT = "disconnect"
+WS_CLOSE_TRY_AGAIN_LATER = 1013
+
+
+def encode_message(message: dict) -> str:
+    """send_json ile aynı JSON biçimi; kanal başına bir kez kodlanır."""
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+
+
+class ClientConnection:
+    """Tek WebSocket için sınırlı gönderim kuyruğu, yazıcı görevi ve gecikme metrikleri."""
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        client_id: str,
+        max_queue: int = SEND_QUEUE_SIZE,
+        overflow: str = OVERFLOW_DROP_OLDEST,
+        send_timeout: float = SEND_TIMEOUT_SECONDS,
+        on_close: Optional[Callable[["ClientConnection"], None]] = None,
+    ):
+        if overflow not in (OVERFLOW_DROP_OLDEST, OVERFLOW_DISCONNECT):
+            raise ValueError(f"Geçersiz taşma politikası: {overflow}")
+        self.websocket = websocket
+        self.client_id = client_id
+        self.max_queue = max_queue
+        self.overflow = overflow
+        self.send_timeout = send_timeout
+        self._on_close = on_close
+
+        # (kuyruğa eklenme zamanı, metin)
+        self._queue: Deque[Tuple[float, str]] = deque()
+        self._ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._closer: Optional[asyncio.Task] = None
+        self._kick = False
+        self.closed = False
+
+        self.sent = 0
+        self.dropped = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._writer(), name=f"ws-writer-{self.client_id}")
+        self._task.add_done_callback(self._writer_done)
+
+    def enqueue(self, text: str) -> bool:
+        """O(1) kuyruğa ekleme; bağlantı kapalıysa veya kapatıldıysa False."""
+        if self.closed:
+            return False
+        if len(self._queue) >= self.max_queue:
+            self.dropped += 1
+            if self.overflow == OVERFLOW_DISCONNECT:
+                logger.warning(
+                    "WebSocket gönderim kuyruğu doldu, bağlantı kapatılıyor: %s", self.client_id
+                )
+                self._kick = True
+                self.close()
+                return False
+            self._queue.popleft()
+        self._queue.append((time.monotonic(), text))
+        self._ready.set()
+        return True
+
+    def close(self) -> None:
+        """Yazıcıyı durdur; bekleyen mesajlar atılır."""
+        if self.closed:
+            return
+        self.closed = True
+        self._ready.set()
+        if self._task is None:
+            self._finish()
+        elif not self._task.done():
+            # Takılı bir send_text'i beklemeden bırak
+            self._task.cancel()
+
+    async def wait_closed(self) -> None:
+        pending = {t for t in (self._task, self._closer) if t is not None}
+        if pending:
+            await asyncio.wait(pending)
+
+    def _finish(self) -> None:
+        self._queue.clear()
+        if self._on_close is not None:
+            callback, self._on_close = self._on_close, None
+            callback(self)
+
+    async def _writer(self) -> None:
+        try:
+            while not self.closed:
+                if not self._queue:
+                    self._ready.clear()
+                    await self._ready.wait()
+                    continue
+                enqueued_at, text = self._queue.popleft()
+                await asyncio.wait_for(self.websocket.send_text(text), timeout=self.send_timeout)
+                lag = time.monotonic() - enqueued_at
+                self.last_lag = lag
+                self.max_lag = max(self.max_lag, lag)
+                self.sent += 1
+        except Exception as e:
+            logger.warning("WebSocket istemcisine gönderilemedi (%s): %r", self.client_id, e)
+            self._kick = True
+
+    def _writer_done(self, _task: asyncio.Task) -> None:
+        # İptal edilen (hiç başlamamış olsa bile) yazıcı için de çalışır
+        self.closed = True
+        if self._kick:
+            self._closer = asyncio.ensure_future(self._close_socket())
+        self._finish()
+
+    async def _close_socket(self) -> None:
+        try:
+            await asyncio.wait_for(self.websocket.close(code=WS_CLOSE_TRY_AGAIN_LATER), timeout=1.0)
+        except Exception:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        oldest = self._queue[0][0] if self._queue else None
+        return {
+            "client_id": self.client_id,
+            "queue_depth": len(self._queue),
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "lag_seconds": round(time.monotonic() - oldest, 3) if oldest is not None else 0.0,
+            "last_send_lag_seconds": round(self.last_lag, 3),
+            "max_lag_seconds": round(self.max_lag, 3),
+            "closed": self.closed,
+        }
+
 
 class ConnectionManager:
     """WebSocket bağlantı yöneticisi"""
 
-    def __init__(self):
-        # Aktif bağlantılar: {user_id: WebSocket}
-        self.active_connections: Dict[str, WebSocket] = {}
+    def __init__(
+        self,
+        max_queue: int = SEND_QUEUE_SIZE,
+        overflow: str = OVERFLOW_DROP_OLDEST,
+        send_timeout: float = SEND_TIMEOUT_SECONDS,
+        event_bus: Optional[EventBus] = None,
+        bus_channel: str = "ws.channels",
+    ):
+        self.max_queue = max_queue
+        self.overflow = overflow
+        self.send_timeout = send_timeout
+        # Olay yolu verilirse yayınlar tüm worker'lara dağıtılır
+        self.event_bus = event_bus
+        self.bus_channel = bus_channel
+        if event_bus is not None:
+            event_bus.subscribe(bus_channel, self.deliver_local)
+        # Aktif bağlantılar: {user_id: ClientConnection}
+        self.active_connections: Dict[str, ClientConnection] = {}
         # Kanal abonelikleri: {channel: Set[user_id]}
         self.channels: Dict[str, Set[str]] = {
             "orders": set(),
@@ -25,12 +187,30 @@ class ConnectionManager:
     async def connect(self, websocket: WebSocket, user_id: str):
         """Yeni bağlantı kabul et"""
         await websocket.accept()
-        self.active_connections[user_id] = websocket
+        previous = self.active_connections.get(user_id)
+        if previous is not None:
+            previous.close()
+        conn = ClientConnection(
+            websocket,
+            user_id,
+            max_queue=self.max_queue,
+            overflow=self.overflow,
+            send_timeout=self.send_timeout,
+            on_close=self._on_connection_closed,
+        )
+        self.active_connections[user_id] = conn
+        conn.start()
+
+    def _on_connection_closed(self, conn: ClientConnection) -> None:
+        # Aynı kullanıcı yeniden bağlandıysa yeni bağlantıya dokunma
+        if self.active_connections.get(conn.client_id) is conn:
+            self.disconnect(conn.client_id)
 
     def disconnect(self, user_id: str):
         """Bağlantıyı kapat"""
-        if user_id in self.active_connections:
-            del self.active_connections[user_id]
+        conn = self.active_connections.pop(user_id, None)
+        if conn is not None:
+            conn.close()
         # Tüm kanallardan çıkar
         for channel in self.channels.values():
             channel.discard(user_id)
@@ -45,44 +225,64 @@ class ConnectionManager:
         if channel in self.channels:
             self.channels[channel].discard(user_id)
 
+    async def _publish(self, scope: str, target: Optional[str], message: dict):
+        envelope = {"scope": scope, "target": target, "message": message}
+        if self.event_bus is not None:
+            await self.event_bus.publish(self.bus_channel, envelope)
+        else:
+            self.deliver_local(envelope)
+
+    def deliver_local(self, envelope: dict):
+        """Olay yolundan gelen yayını bu süreçteki bağlantılara uygula."""
+        scope, target, message = envelope["scope"], envelope.get("target"), envelope["message"]
+        if scope == "user":
+            self._send_local(target, message)
+        elif scope == "channel":
+            self._broadcast_channel_local(target, message)
+        else:
+            self._broadcast_local(message)
+
     async def send_to_user(self, user_id: str, message: dict):
         """Belirli kullanıcıya mesaj gönder"""
-        if user_id in self.active_connections:
-            await self.active_connections[user_id].send_json(message)
+        await self._publish("user", user_id, message)
 
     async def broadcast_to_channel(self, channel: str, message: dict):
-        """Kanaldaki tüm kullanıcılara mesaj gönder"""
+        """Kanaldaki tüm kullanıcıların kuyruğuna mesaj ekle (beklemeden)"""
+        await self._publish("channel", channel, message)
+
+    async def broadcast(self, message: dict):
+        """Tüm bağlı kullanıcıların kuyruğuna mesaj ekle (beklemeden)"""
+        await self._publish("all", None, message)
+
+    def _send_local(self, user_id: str, message: dict):
+        if user_id in self.active_connections:
+            self.active_connections[user_id].enqueue(encode_message(message))
+
+    def _broadcast_channel_local(self, channel: str, message: dict):
         if channel in self.channels:
+            text = encode_message(message)
             disconnected = []
             for user_id in self.channels[channel]:
-                if user_id in self.active_connections:
-                    try:
-                        await self.active_connections[user_id].send_json(message)
-                    except Exception:
-                        disconnected.append(user_id)
-                else:
+                conn = self.active_connections.get(user_id)
+                if conn is None or not conn.enqueue(text):
                     disconnected.append(user_id)
 
             # Temizlik
             for user_id in disconnected:
                 self.channels[channel].discard(user_id)
 
-    async def broadcast(self, message: dict):
-        """Tüm bağlı kullanıcılara mesaj gönder"""
-        disconnected = []
-        for user_id, websocket in self.active_connections.items():
-            try:
-                await websocket.send_json(message)
-            except Exception:
-                disconnected.append(user_id)
+    def _broadcast_local(self, message: dict):
+        text = encode_message(message)
+        for conn in list(self.active_connections.values()):
+            conn.enqueue(text)
 
-        # Temizlik
-        for user_id in disconnected:
-            self.disconnect(user_id)
+    def stats(self) -> List[Dict[str, Any]]:
+        """Bağlantı başına kuyruk derinliği, düşürülen mesaj ve gecikme metrikleri."""
+        return [conn.stats() for conn in self.active_connections.values()]
 
 
 # Singleton instance
-manager = ConnectionManager()
+manager = ConnectionManager(event_bus=bus)
 
 
 # WebSocket message builders
@@ -1,125 +1,418 @@
-"""
-OptiPlan360 — WhatsApp Scheduler (Opsiyonel)
-PENDING durumdaki WhatsApp mesajlarını periyodik olarak gönderir.
-NOT: Henüz production'da etkinleştirilmemiştir.
-      main.py'den start_scheduler() çağrılırsa etkin olur.
-"""
-
-import logging
-from datetime import datetime, timezone
-from uuid import uuid4
-
-from app.database import SessionLocal
-from app.models import AuditLog, WhatsAppMessage
-from app.services.whatsapp_service import _get_setting, _is_configured
-
-logger = logging.getLogger(__name__)
-
-_scheduler_instance = None
-
-
-def is_within_working_hours() -> bool:
-    """Mesai saatleri kontrolü (09:00-18:00 UTC)"""
-    now = datetime.now(timezone.utc)
-    return 9 <= now.hour < 18
-
-
-def check_and_send_pending() -> None:
-    """
-    DB'deki PENDING WhatsApp mesajlarını kontrol et ve gönder.
-    APScheduler job callback'i olarak çağrılır.
-    """
-    import httpx
-
-    db = SessionLocal()
-    try:
-        if not is_within_working_hours():
-            logger.debug("Mesai dışı — WhatsApp gönderim atlandı")
-            return
-
-        if not _is_configured(db):
-            logger.debug("WhatsApp yapılandırılmamış — atlandı")
-            return
-
-        pending = (
-            db.query(WhatsAppMessage).filter(WhatsAppMessage.status == "PENDING").limit(20).all()
-        )
-        if not pending:
-            return
-
-        pid = _get_setting(db, "phone_number_id")
-        token = _get_setting(db, "access_token")
-        api_ver = _get_setting(db, "api_version", "v18.0")
-        url = f"https://graph.facebook.com/{api_ver}/{pid}/messages"
-
-        with httpx.Client(timeout=10) as client:
-            for msg in pending:
-                try:
-                    payload = {
-                        "messaging_product": "whatsapp",
-                        "to": msg.to_phone,
-                        "type": "text",
-                        "text": {"body": msg.message},
-                    }
-                    resp = client.post(
-                        url,
-                        json=payload,
-                        headers={
-                            "Authorization": f"Bearer {token}",
-                            "Content-Type": "application/json",
-                        },
-                    )
-                    if resp.status_code == 200:
-                        data = resp.json()
-                        msg.status = "SENT"
-                        msg.waba_message_id = data.get("messages", [{}])[0].get("id")
-                    else:
-                        msg.status = "FAILED"
-                        msg.error = resp.text[:200]
-                except Exception as e:
-                    msg.status = "FAILED"
-                    msg.error = str(e)[:200]
-                    logger.error("Scheduler WhatsApp gönderim hatası: %s", e)
-
-                db.add(
-                    AuditLog(
-                        id=str(uuid4()),
-                        user_id=msg.sent_by_id,
-                        order_id=msg.order_id,
-                        action="WHATSAPP_SCHEDULER",
-                        detail=f"Scheduler: {msg.to_phone} → {msg.status}",
-                        created_at=datetime.now(timezone.utc),
-                    )
-                )
-            db.commit()
-            logger.info("Scheduler: %d PENDING mesaj işlendi", len(pending))
-    except Exception as e:
-        logger.error("WhatsApp scheduler genel hata: %s", e)
-    finally:
-        db.close()
-
-
-def start_scheduler() -> None:
-    """APScheduler'ı başlat — main.py'den çağrılır (opsiyonel)"""
-    global _scheduler_instance
-    try:
-        from apscheduler.schedulers.background import BackgroundScheduler
-    except ImportError:
-        logger.warning("apscheduler paketi yüklü değil — WhatsApp scheduler devre dışı")
-        return
-
-    if _scheduler_instance and _scheduler_instance.running:
-        return
-
-    _scheduler_instance = BackgroundScheduler()
-    _scheduler_instance.add_job(check_and_send_pending, "interval", minutes=5)
-    _scheduler_instance.start()
-    logger.info("WhatsApp scheduler başlatıldı (5 dk aralık)")
-
-
-def stop_scheduler() -> None:
-    """Scheduler'ı durdur"""
-    global _scheduler_instance
-    if _scheduler_instance and _scheduler_instance.running:
-        _scheduler_instance.shutdown()
-        logger.info("WhatsApp scheduler durduruldu")
+"""
+OptiPlan360 — WhatsApp Gönderim Dağıtıcısı (Opsiyonel)
+PENDING durumdaki WhatsApp mesajlarını kuyruk boşalana kadar sürekli gönderir.
+
+- Tek, bağlantı havuzlu ``httpx.AsyncClient``; eşzamanlı istek sayısı
+  ``WHATSAPP_CONCURRENCY`` ile sınırlıdır.
+- Gönderim hızı token bucket ile ``WHATSAPP_RATE_PER_SECOND`` altında tutulur
+  (ani yük kapasitesi ``WHATSAPP_RATE_BURST``).
+- Geçici hatalar (429, 5xx, ağ hatası) mesaj başına üstel geri çekilmeyle
+  ``next_attempt_at`` zamanına ertelenir; ``WHATSAPP_MAX_ATTEMPTS`` denemeden
+  sonra FAILED olur. Diğer 4xx yanıtları doğrudan FAILED.
+- Mesajlar koşullu UPDATE ile SENDING durumuna alınır; birden çok worker aynı
+  mesajı göndermez. Kilit süresi dolan SENDING kayıtları yeniden alınır.
+
+NOT: Varsayılan olarak kapalıdır. WHATSAPP_DISPATCHER_ENABLED=1 ise main.py
+      lifespan'inde start_dispatcher() ile başlar.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List, Optional, Tuple
+from uuid import uuid4
+
+import httpx
+from app.models import AuditLog, WhatsAppMessage
+from app.services.whatsapp_service import _get_setting, _is_configured
+from app.utils import backoff_delay
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+API_BASE_URL = os.environ.get("WHATSAPP_API_BASE_URL", "https://graph.facebook.com").rstrip("/")
+RATE_PER_SECOND = float(os.environ.get("WHATSAPP_RATE_PER_SECOND", "20"))
+RATE_BURST = int(os.environ.get("WHATSAPP_RATE_BURST", "20"))
+CONCURRENCY = int(os.environ.get("WHATSAPP_CONCURRENCY", "8"))
+MAX_ATTEMPTS = int(os.environ.get("WHATSAPP_MAX_ATTEMPTS", "5"))
+BATCH_SIZE = 100
+BACKOFF_BASE_SECONDS = 30.0
+BACKOFF_MAX_SECONDS = 3600.0
+POLL_INTERVAL_SECONDS = 5.0  # Kuyruk boşken yeni mesaj kontrol aralığı
+LEASE_SECONDS = 120  # SENDING kilidinin süresi (çöken worker'ın mesajları geri alınır)
+REQUEST_TIMEOUT_SECONDS = 10.0
+
+_dispatcher_instance: Optional["WhatsAppDispatcher"] = None
+
+
+def is_within_working_hours() -> bool:
+    """Mesai saatleri kontrolü (09:00-18:00 UTC)"""
+    now = datetime.now(timezone.utc)
+    return 9 <= now.hour < 18
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+
+def _waba_message_id(resp: httpx.Response) -> Optional[str]:
+    """200 yanıtındaki ``messages[0].id``; gövde beklenen biçimde değilse None."""
+    try:
+        return resp.json()["messages"][0]["id"]
+    except (ValueError, LookupError, TypeError):
+        logger.warning("WhatsApp yanıtında mesaj kimliği okunamadı: %s", resp.text[:200])
+        return None
+
+
+class TokenBucket:
+    """Asenkron token bucket hız sınırlayıcı."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = max(1.0, capacity if capacity is not None else rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+@dataclass
+class _Outbound:
+    id: str
+    to_phone: str
+    message: str
+    attempts: int
+
+
+@dataclass
+class _SendResult:
+    id: str
+    status: str  # SENT, RETRY, FAILED
+    waba_message_id: Optional[str] = None
+    error: Optional[str] = None
+    retry_after: float = 0.0
+
+
+class WhatsAppDispatcher:
+    """PENDING kuyruğunu hız sınırı altında eşzamanlı gönderen dağıtıcı."""
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Session]] = None,
+        *,
+        base_url: str = API_BASE_URL,
+        rate_per_second: float = RATE_PER_SECOND,
+        burst: float = RATE_BURST,
+        concurrency: int = CONCURRENCY,
+        max_attempts: int = MAX_ATTEMPTS,
+        batch_size: int = BATCH_SIZE,
+        backoff_base: float = BACKOFF_BASE_SECONDS,
+        backoff_max: float = BACKOFF_MAX_SECONDS,
+        poll_interval: float = POLL_INTERVAL_SECONDS,
+        lease_seconds: float = LEASE_SECONDS,
+        working_hours_only: bool = True,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self._session_factory = session_factory
+        self.base_url = base_url.rstrip("/")
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.batch_size = batch_size
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.working_hours_only = working_hours_only
+        self._transport = transport
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._bucket: Optional[TokenBucket] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def _session(self) -> Session:
+        if self._session_factory is None:
+            from app.database import SessionLocal
+
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    # ─── Yaşam döngüsü ───
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def open(self) -> None:
+        """Havuzlu HTTP istemcisini ve sınırlayıcıları oluştur."""
+        if self._client is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._client = httpx.AsyncClient(
+            timeout=REQUEST_TIMEOUT_SECONDS,
+            limits=httpx.Limits(
+                max_connections=self.concurrency,
+                max_keepalive_connections=self.concurrency,
+            ),
+            transport=self._transport,
+        )
+        self._bucket = TokenBucket(self.rate_per_second, self.burst)
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._wakeup = asyncio.Event()
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        await self.open()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run(), name="whatsapp-dispatcher")
+        logger.info(
+            "WhatsApp dispatcher başlatıldı (%.1f msg/sn, %d eşzamanlı)",
+            self.rate_per_second,
+            self.concurrency,
+        )
+
+    async def stop(self) -> None:
+        self._stopping = True
+        if self._wakeup is not None:
+            self._wakeup.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        await self.close()
+        logger.info("WhatsApp dispatcher durduruldu")
+
+    def notify(self) -> None:
+        """Yeni PENDING mesaj eklendiğinde beklemeden kuyruğu işlemesi için uyandır."""
+        if self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                processed = await self.drain_once()
+            except Exception as e:
+                logger.error("WhatsApp dispatcher genel hata: %s", e)
+                processed = 0
+            if processed:
+                continue  # Kuyrukta iş olabilir; pencere beklemeden devam et
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    # ─── Kuyruk işleme ───
+
+    async def drain_once(self) -> int:
+        """Vadesi gelen mesajlardan bir parti al, eşzamanlı gönder ve sonuçları yaz."""
+        if self.working_hours_only and not is_within_working_hours():
+            logger.debug("Mesai dışı — WhatsApp gönderim atlandı")
+            return 0
+        await self.open()
+        claim = await asyncio.to_thread(self._claim_batch)
+        if claim is None:
+            return 0
+        (url, token), messages = claim
+        outcomes = await asyncio.gather(
+            *(self._send(url, token, m) for m in messages), return_exceptions=True
+        )
+        # Beklenmeyen hata tek mesajı etkiler; alınan tüm satırların sonucu her durumda yazılır
+        results = []
+        for msg, outcome in zip(messages, outcomes):
+            if isinstance(outcome, BaseException):
+                logger.error("WhatsApp gönderim beklenmeyen hata (%s): %s", msg.id, outcome)
+                outcome = _SendResult(msg.id, "RETRY", error=str(outcome)[:200] or type(outcome).__name__)
+            results.append(outcome)
+        await asyncio.to_thread(self._store_results, messages, results)
+        return len(messages)
+
+    def _due_condition(self, now: datetime):
+        return or_(
+            and_(
+                WhatsAppMessage.status == "PENDING",
+                or_(WhatsAppMessage.next_attempt_at.is_(None), WhatsAppMessage.next_attempt_at <= now),
+            ),
+            and_(WhatsAppMessage.status == "SENDING", WhatsAppMessage.next_attempt_at <= now),
+        )
+
+    def _claim_batch(self) -> Optional[Tuple[Tuple[str, str], List[_Outbound]]]:
+        with self._session() as db:
+            if not _is_configured(db):
+                logger.debug("WhatsApp yapılandırılmamış — atlandı")
+                return None
+            pid = _get_setting(db, "phone_number_id")
+            token = _get_setting(db, "access_token")
+            api_ver = _get_setting(db, "api_version", "v18.0")
+            url = f"{self.base_url}/{api_ver}/{pid}/messages"
+
+            now = _utcnow()
+            ids = db.scalars(
+                select(WhatsAppMessage.id)
+                .where(self._due_condition(now))
+                .order_by(WhatsAppMessage.sent_at)
+                .limit(self.batch_size)
+            ).all()
+            if not ids:
+                return None
+
+            # Kilit bitişi bu partinin kimliği olarak da kullanılır: aynı anda
+            # yarışan başka bir worker'ın aldığı satırlar seçime girmez.
+            lease = now + timedelta(seconds=self.lease_seconds)
+            db.execute(
+                update(WhatsAppMessage)
+                .where(WhatsAppMessage.id.in_(ids), self._due_condition(now))
+                .values(status="SENDING", next_attempt_at=lease)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            rows = db.execute(
+                select(
+                    WhatsAppMessage.id,
+                    WhatsAppMessage.to_phone,
+                    WhatsAppMessage.message,
+                    WhatsAppMessage.attempts,
+                ).where(
+                    WhatsAppMessage.id.in_(ids),
+                    WhatsAppMessage.status == "SENDING",
+                    WhatsAppMessage.next_attempt_at == lease,
+                )
+            ).all()
+            if not rows:
+                return None
+            return (url, token), [
+                _Outbound(id=r.id, to_phone=r.to_phone, message=r.message, attempts=r.attempts or 0)
+                for r in rows
+            ]
+
+    async def _send(self, url: str, token: str, msg: _Outbound) -> _SendResult:
+        payload = {
+            "messaging_product": "whatsapp",
+            "to": msg.to_phone,
+            "type": "text",
+            "text": {"body": msg.message},
+        }
+        async with self._semaphore:
+            await self._bucket.acquire()
+            try:
+                resp = await self._client.post(
+                    url,
+                    json=payload,
+                    headers={
+                        "Authorization": f"Bearer {token}",
+                        "Content-Type": "application/json",
+                    },
+                )
+            except httpx.HTTPError as e:
+                logger.warning("WhatsApp gönderim hatası (%s): %s", msg.id, e)
+                return _SendResult(msg.id, "RETRY", error=str(e)[:200] or type(e).__name__)
+
+        if resp.status_code == 200:
+            # Mesaj iletildi; kimlik okunamasa da SENT (yeniden gönderim çift mesaj olur)
+            return _SendResult(msg.id, "SENT", waba_message_id=_waba_message_id(resp))
+        if resp.status_code == 429 or resp.status_code >= 500:
+            try:
+                retry_after = float(resp.headers.get("Retry-After", 0))
+            except ValueError:
+                retry_after = 0.0
+            return _SendResult(msg.id, "RETRY", error=resp.text[:200], retry_after=retry_after)
+        return _SendResult(msg.id, "FAILED", error=resp.text[:200])
+
+    def _store_results(self, messages: List[_Outbound], results: List[_SendResult]) -> None:
+        attempts_by_id = {m.id: m.attempts for m in messages}
+        results_by_id = {r.id: r for r in results}
+        now = _utcnow()
+        counts = {"SENT": 0, "RETRY": 0, "FAILED": 0}
+
+        with self._session() as db:
+            rows = (
+                db.query(WhatsAppMessage)
+                .filter(
+                    WhatsAppMessage.id.in_(list(results_by_id)),
+                    WhatsAppMessage.status == "SENDING",
+                )
+                .all()
+            )
+            for msg in rows:
+                result = results_by_id[msg.id]
+                msg.attempts = attempts_by_id[msg.id] + 1
+                msg.error = result.error
+                status = result.status
+                if status == "RETRY" and msg.attempts >= self.max_attempts:
+                    status = "FAILED"
+                counts[status] += 1
+
+                if status == "RETRY":
+                    delay = max(
+                        result.retry_after,
+                        backoff_delay(msg.attempts, self.backoff_base, self.backoff_max),
+                    )
+                    msg.status = "PENDING"
+                    msg.next_attempt_at = now + timedelta(seconds=delay)
+                    continue
+
+                msg.status = status
+                msg.next_attempt_at = None
+                if status == "SENT":
+                    msg.waba_message_id = result.waba_message_id
+                db.add(
+                    AuditLog(
+                        id=str(uuid4()),
+                        user_id=msg.sent_by_id,
+                        order_id=msg.order_id,
+                        action="WHATSAPP_SCHEDULER",
+                        detail=f"Scheduler: {msg.to_phone} → {msg.status} ({msg.attempts}. deneme)",
+                        created_at=now,
+                    )
+                )
+            db.commit()
+
+        logger.info(
+            "Dispatcher: %d gönderildi, %d ertelendi, %d başarısız",
+            counts["SENT"],
+            counts["RETRY"],
+            counts["FAILED"],
+        )
+
+
+async def start_dispatcher() -> WhatsAppDispatcher:
+    """Dispatcher'ı başlat — main.py lifespan'inden çağrılır (opsiyonel)"""
+    global _dispatcher_instance
+    if _dispatcher_instance and _dispatcher_instance.running:
+        return _dispatcher_instance
+    _dispatcher_instance = WhatsAppDispatcher()
+    await _dispatcher_instance.start()
+    return _dispatcher_instance
+
+
+async def stop_dispatcher() -> None:
+    """Dispatcher'ı durdur ve HTTP istemcisini kapat"""
+    global _dispatcher_instance
+    if _dispatcher_instance is not None:
+        await _dispatcher_instance.stop()
+        _dispatcher_instance = None
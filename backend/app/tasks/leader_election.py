@@ -0,0 +1,158 @@
+"""
+Zamanlayıcı lider seçimi.
+
+Uvicorn/gunicorn N işçiyle çalıştığında her süreç kendi zamanlayıcısını
+başlatır; tekil işler (XML toplayıcı, OptiPlan worker, hatırlatıcılar) yalnız
+``scheduler_leases`` tablosundaki kirayı tutan süreçte çalışır.
+
+  - Kira ``SCHEDULER_LEASE_SECONDS`` sürelidir, lider bunu arka plan
+    thread'inde her ``lease / 3`` saniyede yeniler
+  - Süresi dolan kirayı ilk yenileme turunda başka bir süreç alır; lider
+    ölürse devir en geç ``lease + lease / 3`` saniye sürer
+  - Lider kendini yerel monotonik saatle ``lease - lease / 3`` süre lider
+    sayar: kira DB'de dolmadan önce iş çalıştırmayı bırakır, iki süreç aynı
+    anda lider olamaz
+  - Düzgün kapanışta kira bırakılır, devir beklemeden olur
+"""
+
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models import SchedulerLease
+
+logger = logging.getLogger(__name__)
+
+SCHEDULER_LEASE_NAME = "scheduler"
+SCHEDULER_LEASE_SECONDS = float(os.getenv("SCHEDULER_LEASE_SECONDS", "30"))
+LEADER_ELECTION_ENABLED = os.getenv("SCHEDULER_LEADER_ELECTION", "1") == "1"
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class LeaderElector:
+    """DB kira satırıyla lider seçimi; ``is_leader`` her iş çalışmadan önce sorulur."""
+
+    def __init__(
+        self,
+        name: str = SCHEDULER_LEASE_NAME,
+        lease_seconds: float = SCHEDULER_LEASE_SECONDS,
+        session_factory: Optional[Callable[[], Session]] = None,
+        holder: Optional[str] = None,
+    ):
+        self.name = name
+        self.lease_seconds = lease_seconds
+        self.renew_interval = lease_seconds / 3
+        self.holder = holder or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._session_factory = session_factory
+        self._valid_until = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _session(self) -> Session:
+        if self._session_factory is None:
+            from app.database import SessionLocal
+
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    def is_leader(self) -> bool:
+        return time.monotonic() < self._valid_until
+
+    def try_acquire(self) -> bool:
+        """Kirayı al ya da yenile. DB hatasında yerel geçerlilik olduğu gibi kalır."""
+        started = time.monotonic()
+        now = _utcnow()
+        expires_at = now + timedelta(seconds=self.lease_seconds)
+        db = self._session()
+        try:
+            # Tek koşullu UPDATE: kira bizdeyse ya da süresi dolduysa devral
+            result = db.execute(
+                update(SchedulerLease)
+                .where(
+                    SchedulerLease.name == self.name,
+                    or_(SchedulerLease.holder == self.holder, SchedulerLease.expires_at < now),
+                )
+                .values(holder=self.holder, expires_at=expires_at, renewed_at=now)
+            )
+            acquired = result.rowcount == 1
+            if not acquired and db.get(SchedulerLease, self.name) is None:
+                db.add(
+                    SchedulerLease(
+                        name=self.name, holder=self.holder, expires_at=expires_at, renewed_at=now
+                    )
+                )
+                try:
+                    db.flush()
+                    acquired = True
+                except IntegrityError:  # Aynı anda başka süreç ekledi
+                    db.rollback()
+                    acquired = False
+            db.commit()
+        except Exception as exc:
+            db.rollback()
+            logger.warning("Zamanlayıcı kirası yenilenemedi (%s): %s", self.holder, exc)
+            return self.is_leader()
+        finally:
+            db.close()
+
+        was_leader = self.is_leader()
+        if acquired:
+            self._valid_until = started + self.lease_seconds - self.renew_interval
+        else:
+            self._valid_until = 0.0
+        if acquired != was_leader:
+            logger.info(
+                "Zamanlayıcı liderliği %s: %s", "alındı" if acquired else "kaybedildi", self.holder
+            )
+        return acquired
+
+    def release(self) -> None:
+        """Kirayı hemen bırak; sonraki süreç süre dolmasını beklemez."""
+        self._valid_until = 0.0
+        db = self._session()
+        try:
+            db.execute(
+                update(SchedulerLease)
+                .where(SchedulerLease.name == self.name, SchedulerLease.holder == self.holder)
+                .values(expires_at=_utcnow())
+            )
+            db.commit()
+        except Exception as exc:
+            db.rollback()
+            logger.warning("Zamanlayıcı kirası bırakılamadı: %s", exc)
+        finally:
+            db.close()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.renew_interval):
+            self.try_acquire()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self.try_acquire()
+        self._thread = threading.Thread(
+            target=self._run, name=f"leader-{self.name}", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout=self.renew_interval + 5)
+        self._thread = None
+        self.release()
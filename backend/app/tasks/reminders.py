@@ -1,3 +1,5 @@
+import asyncio
+import functools
 import json
 import os
 from datetime import datetime, time, timedelta
@@ -5,6 +7,8 @@ from datetime import datetime, time, timedelta
 from app.database import SessionLocal
 from app.models import Order
 from app.services.whatsapp_service import send_template_message
+from app.tasks.leader_election import LEADER_ELECTION_ENABLED, LeaderElector
+from apscheduler.jobstores.base import JobLookupError
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from sqlalchemy.orm import Session
@@ -84,6 +88,35 @@ async def check_ready_orders():
 
 scheduler = AsyncIOScheduler()
 
+# Süreç başına elektör; start_scheduler içinde kurulur (fork sonrası pid doğru olsun)
+_scheduler_leader: LeaderElector | None = None
+
+
+def is_scheduler_leader() -> bool:
+    """Tekil işler bu süreçte çalışabilir mi? Seçim kapalıysa her süreç lider sayılır."""
+    if not LEADER_ELECTION_ENABLED:
+        return True
+    return _scheduler_leader is not None and _scheduler_leader.is_leader()
+
+
+def _leader_only(func):
+    """Zamanlanmış işi yalnız lider süreçte çalıştır; diğer süreçlerde tetikleme atlanır."""
+    if asyncio.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def async_wrapper():
+            if is_scheduler_leader():
+                await func()
+
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper():
+        if is_scheduler_leader():
+            func()
+
+    return wrapper
+
 
 def _run_xml_collector():
     """XML Collector senkron wrapper (APScheduler async değil)."""
@@ -109,26 +142,91 @@ def _run_optiplan_worker():
         logging.getLogger(__name__).error("OptiPlan Worker hatası: %s", exc)
 
 
+def _run_token_cleanup():
+    """Süresi dolmuş token iptal kayıtlarını temizle."""
+    try:
+        from app.services.token_store import token_store
+
+        token_store.cleanup_expired()
+    except Exception as exc:
+        import logging
+
+        logging.getLogger(__name__).error("Token temizleme hatası: %s", exc)
+
+
+STARTUP_BACKFILL_JOB_ID = "startup_backfill"
+STARTUP_BACKFILL_RETRY_SECONDS = int(os.getenv("STARTUP_BACKFILL_RETRY", "60"))
+
+
+def schedule_startup_backfill(session_factory=SessionLocal):
+    """
+    Açılış backfill'ini lider işi olarak kaydet. Kira o an başka süreçteyse
+    (or. çöken sürecin bayat kirası) iş sonraki turlarda yeni liderde çalışır;
+    hata veya yarıda kalmada yeniden denenir, tamamlanınca kaldırılır.
+    """
+    from app.services.maintenance_service import startup_status
+
+    def _run_startup_backfill():
+        if startup_status.run_backfill(session_factory):
+            try:
+                scheduler.remove_job(STARTUP_BACKFILL_JOB_ID)
+            except JobLookupError:
+                pass
+
+    scheduler.add_job(
+        _leader_only(_run_startup_backfill),
+        trigger=IntervalTrigger(seconds=STARTUP_BACKFILL_RETRY_SECONDS),
+        id=STARTUP_BACKFILL_JOB_ID,
+        next_run_time=datetime.now(),
+        max_instances=1,
+        coalesce=True,
+        replace_existing=True,
+    )
+
+
 def start_scheduler():
+    global _scheduler_leader
+    if LEADER_ELECTION_ENABLED and _scheduler_leader is None:
+        _scheduler_leader = LeaderElector()
+        _scheduler_leader.start()
+
     scheduler.add_job(
-        check_ready_orders,
+        _leader_only(check_ready_orders),
         trigger=IntervalTrigger(hours=1),
         id="ready_order_reminder",
         replace_existing=True,
     )
     # OptiPlanning XML çıktı klasörünü her 30 saniyede bir tara
     scheduler.add_job(
-        _run_xml_collector,
+        _leader_only(_run_xml_collector),
         trigger=IntervalTrigger(seconds=30),
         id="xml_collector",
         replace_existing=True,
     )
     # OptiPlanning Worker: OPTI_IMPORTED job'lari alir, GUI otomasyonu calistirir
     scheduler.add_job(
-        _run_optiplan_worker,
+        _leader_only(_run_optiplan_worker),
         trigger=IntervalTrigger(seconds=15),
         id="optiplan_worker",
         max_instances=1,
         replace_existing=True,
     )
+    # İptal edilmiş token kayıtlarını süre sonu indeksiyle temizle
+    scheduler.add_job(
+        _leader_only(_run_token_cleanup),
+        trigger=IntervalTrigger(hours=1),
+        id="token_revocation_cleanup",
+        max_instances=1,
+        replace_existing=True,
+    )
     scheduler.start()
+
+
+def stop_scheduler():
+    """Zamanlayıcıyı durdur ve liderlik kirasını bırak (diğer süreç hemen devralır)."""
+    global _scheduler_leader
+    if scheduler.running:
+        scheduler.shutdown(wait=False)
+    if _scheduler_leader is not None:
+        _scheduler_leader.stop()
+        _scheduler_leader = None
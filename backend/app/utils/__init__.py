@@ -5,11 +5,13 @@ from uuid import uuid4
 from app.models import AuditLog
 from sqlalchemy.orm import Session
 
+from .retry import backoff_delay
 from .text_normalize import (
     normalize_material_name,
     normalize_phone,
     normalize_text,
     normalize_turkish,
+    phone_suffix_key,
     sanitize_filename,
 )
 
@@ -35,10 +37,12 @@ def create_audit_log(
 
 
 __all__ = [
+    "backoff_delay",
     "create_audit_log",
     "normalize_material_name",
     "normalize_phone",
     "normalize_text",
     "normalize_turkish",
+    "phone_suffix_key",
     "sanitize_filename",
 ]
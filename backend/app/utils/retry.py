@@ -0,0 +1,7 @@
+import random
+
+
+def backoff_delay(attempts: int, base: float, cap: float) -> float:
+    """n. başarısız denemeden sonraki bekleme: base * 2^(n-1), üst sınırlı ve jitter'lı."""
+    delay = min(cap, base * (2 ** max(0, attempts - 1)))
+    return delay * random.uniform(0.5, 1.0)
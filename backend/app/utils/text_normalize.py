@@ -57,6 +57,24 @@ def normalize_phone(phone: str) -> str:
     return ""
 
 
+def phone_suffix_key(phone: str) -> str:
+    """Return national phone digits reversed, for indexed suffix lookups.
+
+    "+90 532 123 45 67", "05321234567" and "5321234567" all map to the same
+    key; the last N digits of the number become the first N characters.
+    """
+
+    if not phone:
+        return ""
+
+    digits = re.sub(r"\D", "", str(phone))
+    if len(digits) == 12 and digits.startswith("90"):
+        digits = digits[2:]
+    elif len(digits) == 11 and digits.startswith("0"):
+        digits = digits[1:]
+    return digits[::-1]
+
+
 def sanitize_filename(name: str, max_len: int = 100) -> str:
     """Strip unsafe characters and return an ASCII-safe filename fragment."""
 
@@ -1,48 +1,94 @@
 import json
 import logging
-from typing import List
+from typing import Any, Dict, List, Optional
 
 from fastapi import WebSocket
 
+from app.services.event_bus import EventBus, bus
+from app.services.websocket_manager import (
+    OVERFLOW_DROP_OLDEST,
+    SEND_QUEUE_SIZE,
+    SEND_TIMEOUT_SECONDS,
+    ClientConnection,
+)
+
 logger = logging.getLogger(__name__)
 
 
 class ConnectionManager:
-    def __init__(self):
+    def __init__(
+        self,
+        max_queue: int = SEND_QUEUE_SIZE,
+        overflow: str = OVERFLOW_DROP_OLDEST,
+        send_timeout: float = SEND_TIMEOUT_SECONDS,
+        event_bus: Optional[EventBus] = None,
+        bus_channel: str = "ws.broadcast",
+    ):
+        self.max_queue = max_queue
+        self.overflow = overflow
+        self.send_timeout = send_timeout
         # Aktif bağlantıları tutar (tüm admin ve operatör ekranları)
-        self.active_connections: List[WebSocket] = []
+        # WebSocket hashlenemediği için id(websocket) anahtar olarak kullanılır
+        self.connections: Dict[int, ClientConnection] = {}
+        # Olay yolu verilirse yayınlar tüm worker'lara dağıtılır
+        self.event_bus = event_bus
+        self.bus_channel = bus_channel
+        if event_bus is not None:
+            event_bus.subscribe(bus_channel, self.deliver_local)
+
+    @property
+    def active_connections(self) -> List[WebSocket]:
+        return [conn.websocket for conn in self.connections.values()]
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
-        self.active_connections.append(websocket)
-        logger.info(f"WebSocket connected. Total clients: {len(self.active_connections)}")
+        conn = ClientConnection(
+            websocket,
+            f"ws-{id(websocket):x}",
+            max_queue=self.max_queue,
+            overflow=self.overflow,
+            send_timeout=self.send_timeout,
+            on_close=lambda c: self.disconnect(c.websocket),
+        )
+        self.connections[id(websocket)] = conn
+        conn.start()
+        logger.info(f"WebSocket connected. Total clients: {len(self.connections)}")
 
     def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
-            logger.info(f"WebSocket disconnected. Total clients: {len(self.active_connections)}")
+        conn = self.connections.pop(id(websocket), None)
+        if conn is not None:
+            conn.close()
+            logger.info(f"WebSocket disconnected. Total clients: {len(self.connections)}")
 
     async def broadcast(self, message: dict):
         """
-        Gelen payload'u tüm bağlı ekranlara (React) saniyesinde basar.
+        Gelen payload'u tüm bağlı ekranların (React) gönderim kuyruğuna ekler.
+        Gönderimi her bağlantının kendi yazıcı görevi yapar; yavaş ekran diğerlerini bekletmez.
+        Olay yolu bağlıysa diğer worker'lardaki ekranlara da ulaşır.
         """
-        if not self.active_connections:
+        if self.event_bus is not None:
+            await self.event_bus.publish(self.bus_channel, message)
+        else:
+            self.deliver_local(message)
+
+    def deliver_local(self, message: dict):
+        """Bu süreçteki bağlantıların kuyruğuna ekle."""
+        if not self.connections:
             return
 
         json_message = json.dumps(message)
-        dead_connections = []
+        for conn in list(self.connections.values()):
+            conn.enqueue(json_message)
 
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(json_message)
-            except Exception as e:
-                logger.warning(f"Error sending message to websocket client: {e}")
-                dead_connections.append(connection)
-
-        # Kopan bağlantıları temizle
-        for dead in dead_connections:
-            self.disconnect(dead)
+    def stats(self) -> List[Dict[str, Any]]:
+        """Bağlantı başına kuyruk derinliği, düşürülen mesaj ve gecikme metrikleri."""
+        return [conn.stats() for conn in self.connections.values()]
 
 
 # Tüm uygulama içinde kullanılacak tekil örnek (Singleton)
-manager = ConnectionManager()
+manager = ConnectionManager(event_bus=bus)
+
+
+def publish_event_nowait(message: dict):
+    """Senkron koddan (zamanlayıcı işleri, servisler) tüm ekranlara olay yayınla."""
+    bus.publish_nowait(manager.bus_channel, message)
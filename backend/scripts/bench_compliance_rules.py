@@ -0,0 +1,101 @@
+"""Uyumluluk kontrolü süreleri: ajan zinciri vs. derlenmiş kural motoru.
+
+    python scripts/bench_compliance_rules.py --orders 100 --parts 500 --repeat 3
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.compliance.agent_orchestrator import AgentOrchestrator  # noqa: E402
+from app.compliance.grain_mapping_agent import GrainMappingAgent  # noqa: E402
+from app.compliance.part_type_rules_agent import PartTypeRulesAgent  # noqa: E402
+from app.compliance.rule_engine import compile_rules  # noqa: E402
+from app.features.compliance.transport.http.router import (  # noqa: E402
+    _grain_mappings,
+    _part_type_rules,
+)
+
+
+def build_orders(orders: int, parts: int) -> list[dict]:
+    """Her 5. parçası ARKALIK, her 50. parçası delikli olan sentetik sipariş taslakları."""
+    return [
+        {
+            "parts": [
+                {
+                    "part_group": "ARKALIK" if i % 5 == 4 else "GOVDE",
+                    "part_type": ("TB", "KM", "DR", "")[i % 4],
+                    "part_code": f"KM-{i % 10_000:04d}",
+                    "length_mm": 300 + i % 1700,
+                    "width_mm": 150 + i % 600,
+                    "thickness_mm": 18,
+                    "material_type": "MDF",
+                    "grain_direction": "LENGTHWISE",
+                    "edge_banding_u1": "0.8" if i % 2 == 0 else None,
+                    "edge_banding_k1": "0.8" if i % 3 == 0 else None,
+                    "drilling_operations": i % 50 == 49,
+                    "grain": str(i % 4),
+                }
+                for i in range(parts)
+            ]
+        }
+        for _ in range(orders)
+    ]
+
+
+def _best(fn, make_input, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        data = make_input()  # Kontroller parçaları yerinde düzelttiği için her turda yeni girdi
+        started = time.perf_counter()
+        fn(data)
+        timings.append(time.perf_counter() - started)
+    return round(min(timings), 3)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compliance rule engine benchmark")
+    parser.add_argument("--orders", type=int, default=100)
+    parser.add_argument("--parts", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    def make_input():
+        return build_orders(args.orders, args.parts)
+
+    def run_agents(orders):
+        orchestrator = AgentOrchestrator([PartTypeRulesAgent(), GrainMappingAgent()])
+        return [orchestrator.run(order) for order in orders]
+
+    def run_compiled(orders):
+        rules = compile_rules(_part_type_rules, _grain_mappings)
+        return [rules.run(order) for order in orders]
+
+    result = {
+        "orders": args.orders,
+        "parts_per_order": args.parts,
+        "agents_seconds": _best(run_agents, make_input, args.repeat),
+        # Ajanlarla aynı iş: yalnızca yerleşik ARKALIK + tane kontrolleri
+        "compiled_builtin_seconds": _best(
+            lambda orders: [compile_rules([], []).run(order) for order in orders],
+            make_input,
+            args.repeat,
+        ),
+        # Yönetilen parça tipi kuralları ve tane eşlemeleri de uygulanır
+        "compiled_seconds": _best(run_compiled, make_input, args.repeat),
+        "compile_seconds": _best(
+            lambda _: compile_rules(_part_type_rules, _grain_mappings), lambda: None, args.repeat
+        ),
+    }
+    print(json.dumps(result))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,95 @@
+"""OptiPlanning XLSX yazım süreleri (bridge / iş export'u / sipariş sayfası).
+
+    python scripts/bench_opti_xlsx.py --parts 10000 --repeat 3
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.features.orders.transport.http.router import _create_opti_xlsx  # noqa: E402
+from app.services.bridge_service import generate_optiplan_xlsx  # noqa: E402
+from app.services.export import generate_xlsx_for_job  # noqa: E402
+
+GRAINS = ["0-Material", "1-Boyuna", "2-Enine", "3-Material"]
+
+
+def build_order(parts: int) -> SimpleNamespace:
+    """Her 5. parçası ARKALIK olan sentetik sipariş."""
+    order = SimpleNamespace(
+        id=1,
+        ts_code="TS-BENCH",
+        crm_name_snapshot="Bench Mobilya",
+        color="BEYAZ",
+        material_name="MDFLAM",
+        thickness_mm=18,
+        band_mm=0.8,
+        plate_w_mm=2100,
+        plate_h_mm=2800,
+    )
+    order.parts = [
+        SimpleNamespace(
+            id=i + 1,
+            part_group="ARKALIK" if i % 5 == 4 else "GOVDE",
+            boy_mm=300 + i % 1700,
+            en_mm=150 + i % 600,
+            adet=i % 4 + 1,
+            grain_code=GRAINS[i % 4],
+            u1=i % 2 == 0,
+            u2=i % 3 == 0,
+            k1=i % 2 == 1,
+            k2=False,
+            part_desc=f"Kapak {i}",
+            drill_code_1="",
+            drill_code_2="",
+            thickness_mm=8 if i % 5 == 4 else None,
+        )
+        for i in range(parts)
+    ]
+    return order
+
+
+def _best(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return round(min(timings), 3)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="OptiPlanning XLSX writer benchmark")
+    parser.add_argument("--parts", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    order = build_order(args.parts)
+    job = SimpleNamespace(id="bench", order=order, customer_snapshot_name=order.crm_name_snapshot)
+    govde = [p for p in order.parts if p.part_group == "GOVDE"]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        result = {
+            "parts": args.parts,
+            "bridge_seconds": _best(lambda: generate_optiplan_xlsx(order, order.parts), args.repeat),
+            "job_export_seconds": _best(
+                lambda: generate_xlsx_for_job(job, order.parts, tmp), args.repeat
+            ),
+            "order_sheet_seconds": _best(
+                lambda: _create_opti_xlsx(str(Path(tmp) / "sheet.xlsx"), govde, order), args.repeat
+            ),
+        }
+    print(json.dumps(result))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
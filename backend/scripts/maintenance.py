@@ -0,0 +1,37 @@
+"""Tek seferlik bakım: şema senkronu, tohumlar ve tüm backfill'ler (deploy adımı).
+
+    python scripts/maintenance.py                 # hepsi
+    python scripts/maintenance.py --skip-backfill # yalnız şema + tohumlar
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.database import SessionLocal, engine  # noqa: E402
+from app.services.maintenance_service import (  # noqa: E402
+    BACKFILL_CHUNK_SIZE,
+    run_maintenance,
+)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Startup maintenance (schema, seeds, backfills)")
+    parser.add_argument("--skip-backfill", action="store_true", help="Only schema sync and seeds")
+    parser.add_argument("--chunk-size", type=int, default=BACKFILL_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    result = run_maintenance(
+        engine, SessionLocal, chunk_size=args.chunk_size, backfill=not args.skip_backfill
+    )
+    print(json.dumps({"ok": True, **result}, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,40 @@
+import argparse
+import json
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.database import SessionLocal  # noqa: E402
+from app.services.part_status_service import (  # noqa: E402
+    check_part_status_consistency,
+    rebuild_part_status,
+)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="part_current_status projection maintenance")
+    sub = parser.add_subparsers(dest="command", required=True)
+    check = sub.add_parser("check", help="Compare the projection with status_logs")
+    check.add_argument("--repair", action="store_true", help="Fix missing/stale/orphaned rows")
+    check.add_argument("--sample-size", type=int, default=20)
+    sub.add_parser("rebuild", help="Rebuild the projection from status_logs")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        if args.command == "rebuild":
+            result = {"ok": True, "parts": rebuild_part_status(db)}
+        else:
+            result = check_part_status_consistency(
+                db, repair=args.repair, sample_size=args.sample_size
+            )
+            result["ok"] = result["consistent"] or result["repaired"]
+
+    print(json.dumps(result, ensure_ascii=False))
+    return 0 if result["ok"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,34 @@
+"""Takip klasorlerini opti_jobs state'lerinden yeniden kurar.
+
+    python scripts/tracking_folders.py reconcile
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.database import SessionLocal  # noqa: E402
+from app.services.tracking_folder_service import reconcile_tracking_folders  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="OPTiPLAN tracking folder maintenance")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("reconcile", help="Rebuild tracking folder state from opti_jobs")
+    parser.parse_args()
+
+    with SessionLocal() as db:
+        result = reconcile_tracking_folders(db)
+    result["ok"] = result["missing"] == 0
+
+    print(json.dumps(result, ensure_ascii=False))
+    return 0 if result["ok"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
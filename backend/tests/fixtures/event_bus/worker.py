@@ -0,0 +1,53 @@
+"""
+Çok worker'lı WS olay yolu test düzeneği.
+
+Her süreç ayrı bir uvicorn worker'ını temsil eder: aynı SQLite olay dosyasına
+bağlanır, kendi olaylarını yayınlar ve tüm worker'ların olaylarını toplar.
+
+Kullanım: python worker.py <db_path> <worker_name> <events_per_channel> <total_expected> <go_file>
+Çıktı: alınan olaylar, JSON listesi olarak stdout'a.
+"""
+
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[3]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.services.event_bus import EventBus, SQLiteBackend  # noqa: E402
+
+CHANNELS = ("stations", "orders")
+
+
+async def main(db_path, worker, per_channel, total_expected, go_file):
+    bus = EventBus()
+    received = []
+    for channel in CHANNELS:
+        bus.subscribe(channel, lambda message, channel=channel: received.append([channel, message]))
+    await bus.start(SQLiteBackend(db_path, poll_interval=0.01))
+
+    # Tüm worker'lar dinlemeye başlayana kadar bekle
+    Path(f"{go_file}.{worker}").touch()
+    deadline = time.monotonic() + 20
+    while not Path(go_file).exists() and time.monotonic() < deadline:
+        await asyncio.sleep(0.01)
+
+    for i in range(per_channel):
+        for channel in CHANNELS:
+            await bus.publish(channel, {"worker": worker, "seq": i})
+        await asyncio.sleep(0)
+
+    deadline = time.monotonic() + 20
+    while len(received) < total_expected and time.monotonic() < deadline:
+        await asyncio.sleep(0.01)
+    await bus.stop()
+    print(json.dumps(received))
+
+
+if __name__ == "__main__":
+    db_path, worker, per_channel, total_expected, go_file = sys.argv[1:6]
+    asyncio.run(main(db_path, worker, int(per_channel), int(total_expected), go_file))
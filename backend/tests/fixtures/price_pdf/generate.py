@@ -0,0 +1,137 @@
+"""
+Çok sayfalı tedarikçi fiyat kataloğu (PDF) üretici.
+
+Harici kütüphane gerektirmez: çizgili tablolar (pdfplumber "lines" stratejisi)
+ve tablo içermeyen metin sayfaları doğrudan PDF komutlarıyla yazılır.
+
+Kullanım:
+    python generate.py katalog.pdf --pages 400            # yalnız üret
+    python generate.py katalog.pdf --pages 400 --bench    # seri / paralel çıkarım süreleri
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+HEADERS = ["Stok Kodu", "Product Name", "Birim", "Fiyat", "Renk"]
+COLUMN_WIDTHS = [80, 220, 50, 70, 90]
+ROWS_PER_PAGE = 30
+ROW_HEIGHT = 22
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842
+LEFT, TOP = 40, 800
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _text(x: float, y: float, value: str, size: int = 9) -> str:
+    return f"BT /F1 {size} Tf {x:.1f} {y:.1f} Td ({_escape(value)}) Tj ET"
+
+
+def row_values(page: int, row: int) -> list[str]:
+    n = page * ROWS_PER_PAGE + row
+    return [f"P{n:06d}", f"Menteşe Kapak {n}", "ADET", f"{100 + n % 900}.50", "BEYAZ"]
+
+
+def _table_page(page: int) -> str:
+    ops = ["0.5 w"]
+    width = sum(COLUMN_WIDTHS)
+    rows = [HEADERS] + [row_values(page, r) for r in range(ROWS_PER_PAGE)]
+    bottom = TOP - ROW_HEIGHT * len(rows)
+    for r in range(len(rows) + 1):
+        y = TOP - r * ROW_HEIGHT
+        ops.append(f"{LEFT} {y} m {LEFT + width} {y} l S")
+    x = LEFT
+    for w in COLUMN_WIDTHS + [0]:
+        ops.append(f"{x} {TOP} m {x} {bottom} l S")
+        x += w
+    for r, values in enumerate(rows):
+        y = TOP - (r + 1) * ROW_HEIGHT + 7
+        x = LEFT
+        for value, w in zip(values, COLUMN_WIDTHS):
+            # Helvetica/WinAnsi: Türkçe harfler ASCII karşılıklarıyla
+            ops.append(_text(x + 4, y, value.encode("ascii", "replace").decode()))
+            x += w
+    return "\n".join(ops)
+
+
+def _text_page(page: int) -> str:
+    lines = [
+        f"Kampanya Sayfasi {page + 1}",
+        f"Urun: Ozel Seri Kulp {page} - Fiyat 245.00 TRY - Birim ADET",
+        f"Urun: Ozel Seri Ray {page} - Fiyat 512.75 TRY - Birim TAKIM",
+    ]
+    return "\n".join(_text(LEFT, TOP - i * 18, line, 11) for i, line in enumerate(lines))
+
+
+def is_text_page(page: int, text_every: int) -> bool:
+    return text_every > 0 and page % text_every == text_every - 1
+
+
+def build_catalog(path, pages: int = 300, text_every: int = 25) -> Path:
+    """``pages`` sayfalık katalog yazar; her ``text_every``. sayfa tablosuzdur."""
+    objects: list[bytes] = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"",  # Pages, sayfa id'leri belli olunca doldurulur
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    ]
+    page_ids = []
+    for page in range(pages):
+        content = (_text_page(page) if is_text_page(page, text_every) else _table_page(page)).encode(
+            "latin-1"
+        )
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content))
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>"
+            % (PAGE_WIDTH, PAGE_HEIGHT, content_id)
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{i} 0 R" for i in page_ids).encode()
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    path = Path(path)
+    path.write_bytes(bytes(out))
+    return path
+
+
+def _bench(path: Path) -> None:
+    backend_dir = Path(__file__).resolve().parents[3]
+    if str(backend_dir) not in sys.path:
+        sys.path.insert(0, str(backend_dir))
+    from app.services.price_tracking_pdf import PDF_WORKERS, extract_pages
+
+    for workers in sorted({1, PDF_WORKERS}):
+        started = time.perf_counter()
+        pages = extract_pages(str(path), workers=workers)
+        elapsed = time.perf_counter() - started
+        tables = sum(1 for p in pages if p.tables)
+        print(f"workers={workers}: {len(pages)} sayfa, {tables} tablolu, {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fiyat kataloğu PDF fixture üretici")
+    parser.add_argument("output")
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--text-every", type=int, default=25)
+    parser.add_argument("--bench", action="store_true")
+    args = parser.parse_args()
+    catalog = build_catalog(args.output, args.pages, args.text_every)
+    print(f"{catalog}: {args.pages} sayfa")
+    if args.bench:
+        _bench(catalog)
@@ -13,9 +13,9 @@ import sys
 if str(BACKEND_DIR) not in sys.path:
     sys.path.insert(0, str(BACKEND_DIR))
 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
@@ -164,5 +164,121 @@ class TestAccessToken(unittest.TestCase):
         self.assertTrue(len(token) > 20)
 
 
+class TestAuthCaches(unittest.TestCase):
+    """Doğrulanmış token ve kullanıcı anlık görüntüsü önbellek testleri."""
+
+    def setUp(self):
+        from app.auth import invalidate_user_cache, require_permissions
+        from app.permissions import Permission
+
+        invalidate_user_cache()
+        self.addCleanup(invalidate_user_cache)
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        Base.metadata.create_all(bind=self.engine)
+
+        db = self.SessionLocal()
+        try:
+            user = User(
+                email="cache@test.local",
+                username="cacheuser",
+                display_name="Cache User",
+                password_hash=hash_password("secret123"),
+                role="OPERATOR",
+                is_active=True,
+            )
+            db.add(user)
+            db.commit()
+            self.user_id = user.id
+        finally:
+            db.close()
+
+        app = FastAPI()
+
+        @app.exception_handler(AppError)
+        async def _app_error_handler(request, exc: AppError):
+            return JSONResponse(status_code=exc.status_code, content=exc.to_response())
+
+        @app.get("/me")
+        def me(current_user: User = Depends(require_permissions(Permission.ORDERS_VIEW))):
+            return {"id": current_user.id, "role": current_user.role}
+
+        def override_get_db():
+            db = self.SessionLocal()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app.dependency_overrides[get_db] = override_get_db
+        self.client = TestClient(app)
+        token = create_access_token({"sub": str(self.user_id)})
+        self.headers = {"Authorization": f"Bearer {token}"}
+
+    def tearDown(self):
+        self.client.close()
+        self.engine.dispose()
+
+    def _count_user_selects(self, fn):
+        statements = []
+
+        def _before(conn, cursor, statement, parameters, context, executemany):
+            if "FROM users" in statement:
+                statements.append(statement)
+
+        event.listen(self.engine, "before_cursor_execute", _before)
+        try:
+            fn()
+        finally:
+            event.remove(self.engine, "before_cursor_execute", _before)
+        return len(statements)
+
+    def test_repeated_requests_reuse_user_snapshot(self):
+        """Ardışık isteklerde kullanıcı yalnız bir kez sorgulanmalı."""
+
+        def _poll():
+            for _ in range(5):
+                resp = self.client.get("/me", headers=self.headers)
+                self.assertEqual(resp.status_code, 200)
+
+        self.assertEqual(self._count_user_selects(_poll), 1)
+
+    def test_invalidation_applies_role_and_active_changes(self):
+        """Önbellek temizlenince rol/pasiflik değişikliği hemen uygulanmalı."""
+        from app.auth import invalidate_user_cache
+
+        self.assertEqual(self.client.get("/me", headers=self.headers).status_code, 200)
+
+        db = self.SessionLocal()
+        try:
+            user = db.query(User).filter(User.id == self.user_id).first()
+            user.role = "KIOSK"
+            db.commit()
+        finally:
+            db.close()
+        invalidate_user_cache(self.user_id)
+        self.assertEqual(self.client.get("/me", headers=self.headers).status_code, 403)
+
+        db = self.SessionLocal()
+        try:
+            user = db.query(User).filter(User.id == self.user_id).first()
+            user.role = "OPERATOR"
+            user.is_active = False
+            db.commit()
+        finally:
+            db.close()
+        invalidate_user_cache(self.user_id)
+        self.assertEqual(self.client.get("/me", headers=self.headers).status_code, 401)
+
+    def test_invalid_token_is_rejected(self):
+        """Geçersiz token önbelleğe alınmadan reddedilmeli."""
+        resp = self.client.get("/me", headers={"Authorization": "Bearer not-a-jwt"})
+        self.assertEqual(resp.status_code, 401)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,232 @@
+import gzip
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.services import backup_service  # noqa: E402
+from app.services.backup_service import BackupService  # noqa: E402
+
+
+class BackupServiceTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        self.db_file = self.root / "live.db"
+        self.uploads = self.root / "uploads"
+        (self.uploads / "orders").mkdir(parents=True)
+        (self.uploads / "orders" / "a.pdf").write_bytes(b"A" * 5000)
+        (self.uploads / "b.xlsx").write_bytes(b"B" * 3000)
+
+        conn = sqlite3.connect(self.db_file)
+        conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, payload BLOB)")
+        conn.executemany("INSERT INTO t (payload) VALUES (?)", [(os.urandom(512),) for _ in range(2000)])
+        conn.commit()
+        conn.close()
+
+        backup_dir = self.root / "backups"
+        backup_dir.mkdir()
+        for patcher in (
+            patch.object(backup_service, "BACKUP_DIR", backup_dir),
+            patch.object(backup_service, "UPLOADS_DIR", self.uploads),
+            patch.dict(os.environ, {"DATABASE_URL": f"sqlite:///{self.db_file}"}),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        cwd = os.getcwd()
+        os.chdir(self.root)  # Config dosyaları çalışma dizininden okunur
+        self.addCleanup(os.chdir, cwd)
+
+    def _create(self):
+        # Yedek adı saniye çözünürlüklü: ardışık yedekler için saat ilerletilir
+        offset = timedelta(seconds=len(BackupService.list_backups()))
+
+        class _Clock(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return datetime.now(tz) + offset
+
+        with patch.object(backup_service, "datetime", _Clock):
+            return BackupService.create_backup()
+
+    def test_uploads_are_incremental_and_content_addressed(self):
+        first = self._create()
+        uploads = first["manifest"]["components"]["uploads"]
+        self.assertEqual((uploads["files_copied"], uploads["files_reused"]), (2, 0))
+        self.assertEqual(uploads["bytes_copied"], 8000)
+
+        database = first["manifest"]["components"]["database"]
+        self.assertEqual(database["method"], "stepped")
+        self.assertGreater(database["pages"], 0)
+        self.assertGreater(database["size_bytes"], 0)
+        self.assertIn("duration_seconds", database)
+        self.assertGreater(first["size_bytes"], 0)
+        self.assertIn("duration_seconds", first)
+
+        (self.uploads / "b.xlsx").write_bytes(b"C" * 3000)
+        (self.uploads / "copy.pdf").write_bytes(b"A" * 5000)  # Aynı içerik: yeni nesne yok
+        with patch.object(backup_service, "_store_object", wraps=backup_service._store_object) as store:
+            second = self._create()
+        uploads = second["manifest"]["components"]["uploads"]
+        self.assertEqual((uploads["files_copied"], uploads["files_reused"]), (1, 2))
+        # Değişmeyen a.pdf okunmadı bile
+        self.assertEqual(sorted(Path(c.args[0]).name for c in store.call_args_list), ["b.xlsx", "copy.pdf"])
+        objects = list((self.root / "backups" / "objects").glob("*/*"))
+        self.assertEqual(len(objects), 3)
+
+    def test_restore_verifies_then_writes(self):
+        backup = self._create()
+        target = self.root / "restore"
+        target.mkdir()
+        (target / "b.xlsx").write_bytes(b"eski")
+
+        result = BackupService.restore_backup(backup["backup_id"], str(target))
+        self.assertEqual(result["verification"]["database"]["integrity"], "ok")
+        self.assertEqual(result["verification"]["uploads"], {"files_verified": 2, "files_failed": 0})
+        restored = sqlite3.connect(target / "optiplan.db")
+        self.assertEqual(restored.execute("SELECT COUNT(*) FROM t").fetchone()[0], 2000)
+        restored.close()
+        self.assertEqual((target / "orders" / "a.pdf").read_bytes(), b"A" * 5000)
+        self.assertEqual((target / "b.xlsx").read_bytes(), b"B" * 3000)
+
+        # list_backups id'si de geri yüklenebilir
+        listed_id = BackupService.list_backups()[0]["id"]
+        self.assertTrue(BackupService.verify_backup(listed_id)["success"])
+
+    def test_corrupt_object_aborts_restore_before_writing(self):
+        backup = self._create()
+        obj = next((self.root / "backups" / "objects").glob("*/*"))
+        obj.write_bytes(b"bozuk")
+        target = self.root / "restore"
+        target.mkdir()
+
+        with self.assertRaisesRegex(Exception, "verification failed"):
+            BackupService.restore_backup(backup["backup_id"], str(target))
+        self.assertEqual(list(target.iterdir()), [])
+
+    def test_corrupt_database_archive_fails_verification(self):
+        backup = self._create()
+        extract = self.root / "x"
+        extracted, manifest = BackupService._extract_backup(backup["backup_id"], extract)
+        with gzip.open(extracted / "database.sqlite.gz", "wb") as f:
+            f.write(b"not a database")
+        with self.assertRaisesRegex(Exception, "checksum mismatch"):
+            BackupService._verify_extracted(extracted, manifest)
+
+    def _create_postgres(self, toc="3; 2615 2200 SCHEMA - public postgres\n"):
+        real_run = subprocess.run
+
+        def fake_run(cmd, *args, **kwargs):
+            if cmd[0] == "pg_dump":
+                Path(cmd[cmd.index("--file") + 1]).write_bytes(b"PGDMP" + os.urandom(64))
+                return subprocess.CompletedProcess(cmd, 0)
+            if cmd[0] == "pg_restore":
+                if toc is None:
+                    raise subprocess.CalledProcessError(1, cmd, stderr="pg_restore: error: input file is too short")
+                return subprocess.CompletedProcess(cmd, 0, stdout=";\n; Archive created\n;\n" + toc)
+            return real_run(cmd, *args, **kwargs)
+
+        patcher = patch.object(backup_service.subprocess, "run", side_effect=fake_run)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        with patch.dict(os.environ, {"DATABASE_URL": "postgresql://u:p@db/optiplan"}):
+            return self._create()
+
+    def test_postgres_dump_is_checksummed_and_listed(self):
+        backup = self._create_postgres()
+        database = backup["manifest"]["components"]["database"]
+        self.assertEqual((database["type"], database["format"]), ("postgresql", "custom"))
+
+        verification = BackupService.verify_backup(backup["backup_id"])["verification"]
+        self.assertEqual(
+            verification["database"], {"checksum_verified": True, "format": "custom", "toc_entries": 1}
+        )
+
+        extracted, manifest = BackupService._extract_backup(backup["backup_id"], self.root / "x")
+        (extracted / "database.dump").write_bytes(b"PGDMP bozuk")
+        with self.assertRaisesRegex(Exception, "checksum mismatch"):
+            BackupService._verify_extracted(extracted, manifest)
+
+    def test_unreadable_postgres_dump_fails_verification(self):
+        backup = self._create_postgres(toc=None)
+        with self.assertRaisesRegex(Exception, "input file is too short"):
+            BackupService.verify_backup(backup["backup_id"])
+
+    def test_legacy_plain_postgres_dump_must_be_complete(self):
+        backup_dir = self.root / "legacy"
+        backup_dir.mkdir()
+        manifest = {"components": {"database": {"type": "postgresql"}}}
+        with gzip.open(backup_dir / "database.sql.gz", "wb") as f:
+            f.write(b"CREATE TABLE t (id int);\n--\n-- PostgreSQL database dump complete\n--\n")
+        verification = BackupService._verify_extracted(backup_dir, manifest)
+        self.assertTrue(verification["database"]["complete"])
+
+        with gzip.open(backup_dir / "database.sql.gz", "wb") as f:
+            f.write(b"CREATE TABLE t (id int);\n")
+        with self.assertRaisesRegex(Exception, "truncated"):
+            BackupService._verify_extracted(backup_dir, manifest)
+
+    def test_writers_are_not_blocked_during_backup(self):
+        latencies = []
+        done = threading.Event()
+
+        def writer():
+            conn = sqlite3.connect(self.db_file, timeout=10)
+            while not done.is_set():
+                started = time.perf_counter()
+                conn.execute("INSERT INTO t (payload) VALUES (?)", (b"x",))
+                conn.commit()
+                latencies.append(time.perf_counter() - started)
+                time.sleep(0.02)
+            conn.close()
+
+        thread = threading.Thread(target=writer)
+        with patch.object(backup_service, "BACKUP_PAGES_PER_STEP", 16), patch.object(
+            backup_service, "BACKUP_STEP_SLEEP", 0.01
+        ), patch.object(backup_service, "BACKUP_STEP_TIMEOUT", 1.0):
+            thread.start()
+            try:
+                info = BackupService._sqlite_online_backup(str(self.db_file), self.root / "snap.db")
+            finally:
+                done.set()
+                thread.join()
+
+        self.assertGreater(len(latencies), 5)
+        self.assertLess(max(latencies), 0.5)
+        # Sürekli yazma adımlı kopyayı yeniden başlatır; süre aşılınca tek adımda alınır
+        self.assertIn(info["method"], ("stepped", "single_step"))
+        snap = sqlite3.connect(self.root / "snap.db")
+        self.assertEqual(snap.execute("PRAGMA integrity_check").fetchone()[0], "ok")
+        self.assertGreaterEqual(snap.execute("SELECT COUNT(*) FROM t").fetchone()[0], 2000)
+        snap.close()
+
+    def test_single_step_fallback(self):
+        with patch.object(backup_service, "BACKUP_STEP_TIMEOUT", -1):
+            info = BackupService._sqlite_online_backup(str(self.db_file), self.root / "snap.db")
+        self.assertEqual(info["method"], "single_step")
+
+    def test_cleanup_collects_unreferenced_objects(self):
+        self._create()
+        (self.uploads / "b.xlsx").write_bytes(b"C" * 3000)
+        self._create()
+        self.assertEqual(len(list((self.root / "backups" / "objects").glob("*/*"))), 3)
+        with patch.object(backup_service, "MAX_BACKUP_COUNT", 1):
+            BackupService.cleanup_old_backups()
+        self.assertEqual(len(BackupService.list_backups()), 1)
+        self.assertEqual(len(list((self.root / "backups" / "objects").glob("*/*"))), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,218 @@
+import json
+import sys
+import threading
+import time
+import unittest
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.auth import get_current_user  # noqa: E402
+from app.compliance import batch_runner  # noqa: E402
+from app.compliance.batch_runner import (  # noqa: E402
+    BatchCapacityError,
+    get_batch_job,
+    iter_batch_results,
+    start_batch_job,
+    summarize_batch,
+)
+from app.compliance.rule_engine import compile_rules  # noqa: E402
+from app.database import Base  # noqa: E402
+from app.exceptions import AppError  # noqa: E402
+from app.features.compliance.transport.http import router as compliance_router  # noqa: E402
+from app.models import ComplianceBatchJob  # noqa: E402
+
+
+def _order(ok: bool) -> dict:
+    part = {"part_group": "ARKALIK", "drilling_operations": not ok, "grain": "1"}
+    return {"parts": [part]}
+
+
+class _SlowFirstRules:
+    """İlk siparişler daha geç biter: tamamlanma sırası gönderim sırasından farklı olur."""
+
+    version = 7
+
+    def __init__(self):
+        self.rules = compile_rules([], [])
+
+    def run(self, order):
+        time.sleep(order["delay"])
+        if order.get("boom"):
+            raise ValueError("bozuk taslak")
+        return self.rules.run(order)
+
+
+class _BlockingRules:
+    """``release`` çağrılana kadar biten iş yok: eşzamanlı iş sınırını sınamak için."""
+
+    version = 1
+
+    def __init__(self):
+        self.rules = compile_rules([], [])
+        self.gate = threading.Event()
+
+    def run(self, order):
+        self.gate.wait(5)
+        return self.rules.run(order)
+
+
+def _wait_finished(job_id):
+    deadline = time.monotonic() + 5
+    while get_batch_job(job_id)["status"] == "running" and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return get_batch_job(job_id)
+
+
+class JobStoreTestCase(unittest.TestCase):
+    """İş tablosu her testte boş bir bellek içi SQLite veritabanındadır."""
+
+    def setUp(self):
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        Base.metadata.create_all(bind=self.engine)
+        self.SessionLocal = sessionmaker(bind=self.engine)
+        patcher = patch.object(batch_runner, "session_factory", self.SessionLocal)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.engine.dispose)
+
+
+class BatchRunnerTest(JobStoreTestCase):
+    def test_results_stream_in_completion_order_and_summary_is_ordered(self):
+        orders = [{**_order(i % 2 == 0), "delay": 0.05 * (3 - i)} for i in range(4)]
+        orders[3]["boom"] = True
+
+        results = list(iter_batch_results(_SlowFirstRules(), orders, workers=4))
+        self.assertEqual([r["order_index"] for r in results], [3, 2, 1, 0])
+        self.assertEqual(results[0]["error"], "bozuk taslak")
+
+        summary = summarize_batch(results, len(orders))
+        self.assertEqual([r["order_index"] for r in summary["results"]], [0, 1, 2, 3])
+        self.assertEqual((summary["passed"], summary["failed"]), (2, 2))
+        self.assertEqual(summary["results"][1]["violation_count"], 1)
+
+    def test_job_handle_reports_progress_then_summary(self):
+        orders = [{**_order(True), "delay": 0.02} for _ in range(3)]
+        job = start_batch_job(_SlowFirstRules(), orders, strict_mode=True, workers=2)
+        self.assertEqual(job.snapshot()["status"], "running")
+
+        deadline = time.monotonic() + 5
+        while job.snapshot()["status"] == "running" and time.monotonic() < deadline:
+            time.sleep(0.01)
+        snapshot = job.snapshot()
+        self.assertEqual((snapshot["status"], snapshot["completed"]), ("done", 3))
+        self.assertEqual(snapshot["rules_version"], 7)
+        self.assertTrue(snapshot["summary"]["strict_mode"])
+        self.assertEqual([r["order_index"] for r in snapshot["summary"]["results"]], [0, 1, 2])
+
+    def test_finished_job_is_read_from_table(self):
+        job = start_batch_job(_SlowFirstRules(), [{**_order(False), "delay": 0}], workers=1)
+        snapshot = _wait_finished(job.id)
+        self.assertNotIn(job.id, batch_runner._jobs)  # Başka worker'ın göreceği hal
+        self.assertEqual((snapshot["status"], snapshot["completed"]), ("done", 1))
+        self.assertEqual(snapshot["summary"]["failed"], 1)
+        with self.SessionLocal() as db:
+            row = db.get(ComplianceBatchJob, job.id)
+            self.assertEqual(json.loads(row.results)[0]["violation_count"], 1)
+
+    def test_running_job_without_progress_is_reported_failed(self):
+        stale = datetime.now(UTC) - timedelta(seconds=batch_runner.BATCH_JOB_STALE_SECONDS + 1)
+        with self.SessionLocal() as db:
+            db.add(
+                ComplianceBatchJob(
+                    id="kayip",
+                    status="running",
+                    total_orders=3,
+                    strict_mode=False,
+                    rules_version=0,
+                    created_at=stale,
+                    updated_at=stale,
+                )
+            )
+            db.commit()
+        snapshot = get_batch_job("kayip")
+        self.assertEqual(snapshot["status"], "failed")
+        self.assertIsNotNone(snapshot["error"])
+        self.assertIsNone(get_batch_job("yok"))
+
+    def test_running_jobs_are_capped(self):
+        rules = _BlockingRules()
+        with patch.object(batch_runner, "_running", threading.BoundedSemaphore(1)):
+            job = start_batch_job(rules, [_order(True)], workers=1)
+            with self.assertRaises(BatchCapacityError):
+                start_batch_job(rules, [_order(True)], workers=1)
+            rules.gate.set()
+            self.assertEqual(_wait_finished(job.id)["status"], "done")
+            second = start_batch_job(rules, [_order(True)], workers=1)
+            self.assertEqual(_wait_finished(second.id)["status"], "done")
+
+
+class BatchEndpointsTest(JobStoreTestCase):
+    def setUp(self):
+        super().setUp()
+        app = FastAPI()
+
+        @app.exception_handler(AppError)
+        async def app_error_handler(request, exc: AppError):
+            return JSONResponse(status_code=exc.status_code, content=exc.to_response())
+
+        app.include_router(compliance_router.router)
+        app.dependency_overrides[get_current_user] = lambda: MagicMock(id=1)
+        self.client = TestClient(app)
+        self.addCleanup(self.client.close)
+        self.orders = [_order(i != 1) for i in range(5)]
+
+    def test_stream_emits_one_line_per_order_and_final_summary(self):
+        response = self.client.post("/api/compliance/batch-check/stream", json=self.orders)
+        self.assertEqual(response.status_code, 200, response.text)
+        self.assertTrue(response.headers["content-type"].startswith("application/x-ndjson"))
+
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        self.assertEqual([line["type"] for line in lines], ["result"] * 5 + ["summary"])
+        self.assertEqual(sorted(line["order_index"] for line in lines[:5]), [0, 1, 2, 3, 4])
+        summary = lines[-1]
+        self.assertEqual([r["order_index"] for r in summary["results"]], [0, 1, 2, 3, 4])
+        self.assertEqual((summary["passed"], summary["failed"]), (4, 1))
+
+        plain = self.client.post("/api/compliance/batch-check", json=self.orders).json()
+        self.assertEqual(plain["results"], summary["results"])
+
+    def test_job_endpoints(self):
+        started = self.client.post("/api/compliance/batch-check/jobs", json=self.orders)
+        self.assertEqual(started.status_code, 202, started.text)
+        job_id = started.json()["job_id"]
+
+        deadline = time.monotonic() + 5
+        while True:
+            body = self.client.get(f"/api/compliance/batch-check/jobs/{job_id}").json()
+            if body["status"] != "running" or time.monotonic() > deadline:
+                break
+            time.sleep(0.01)
+        self.assertEqual(body["status"], "done")
+        self.assertEqual(body["summary"]["failed"], 1)
+        self.assertEqual(self.client.get("/api/compliance/batch-check/jobs/yok").status_code, 404)
+
+    def test_job_endpoint_returns_429_above_cap(self):
+        with patch.object(batch_runner, "_running", threading.BoundedSemaphore(0)):
+            response = self.client.post("/api/compliance/batch-check/jobs", json=self.orders)
+        self.assertEqual(response.status_code, 429, response.text)
+        self.assertEqual(response.json()["error"]["code"], "TOO_MANY_BATCH_JOBS")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,220 @@
+import copy
+import sys
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.auth import get_current_user, require_admin  # noqa: E402
+from app.compliance.agent_orchestrator import AgentOrchestrator  # noqa: E402
+from app.compliance.grain_mapping_agent import GrainMappingAgent  # noqa: E402
+from app.compliance.part_type_rules_agent import PartTypeRulesAgent  # noqa: E402
+from app.compliance.rule_engine import (  # noqa: E402
+    compile_rules,
+    get_compiled_rules,
+    invalidate_rules,
+    rules_version,
+)
+from app.features.compliance.transport.http import router as compliance_router  # noqa: E402
+
+ORDER = {
+    "parts": [
+        {
+            "part_group": "ARKALIK",
+            "edge_banding_u1": "Red",
+            "edge_banding_k1": "Blue",
+            "drilling_operations": True,
+            "grain": "1",
+        },
+        {"part_group": "GOVDE", "edge_banding_u1": "Green", "grain": "2"},
+        {"part_group": "GOVDE", "grain": None},
+        {"part_group": "GOVDE", "grain": "7"},
+    ]
+}
+
+
+class RuleEngineTest(unittest.TestCase):
+    def test_builtin_rules_match_agent_chain(self):
+        legacy = AgentOrchestrator([PartTypeRulesAgent(), GrainMappingAgent()]).run(copy.deepcopy(ORDER))
+        data = copy.deepcopy(ORDER)
+        result = compile_rules([], []).run(data)
+
+        key = lambda f: (f["severity"], f["message"])  # noqa: E731
+        self.assertEqual(
+            sorted(map(key, result["report"])), sorted(map(key, legacy["report"]))
+        )
+        self.assertFalse(result["ok"])
+        self.assertIsNone(data["parts"][0]["edge_banding_u1"])
+        self.assertEqual([p.get("grain_opti") for p in data["parts"]], [1, 2, None, None])
+        self.assertEqual(result["report"][1]["status"], "FAIL")
+        self.assertEqual(result["report"][1]["part_index"], 0)
+
+    def test_part_type_rules_and_grain_mappings(self):
+        rules = compile_rules(compliance_router._part_type_rules, compliance_router._grain_mappings)
+        parts = [
+            {"part_type": "km", "part_code": "KM-12", "grain": "1"},
+            {"part_type": "TB", "length_mm": 600, "width_mm": 300, "grain": "0"},
+            {"part_group": "GOVDE", "material_type": "mdf", "thickness_mm": 25, "grain": "2"},
+            {"part_group": "GOVDE", "material_type": "MDF", "thickness_mm": 18},
+        ]
+        findings = rules.evaluate(parts)
+
+        self.assertEqual(
+            [(f["part_index"], f["rule"], f["field"]) for f in findings],
+            [
+                (0, "KM_CODE_FORMAT", "part_code"),
+                (1, "TB_DIMENSION_REQUIRED", "thickness_mm"),
+                (2, "GRAIN_MAPPING", "grain"),
+                (3, "GRAIN_MAPPING", "grain"),
+            ],
+        )
+        self.assertEqual([f["severity"] for f in findings], ["ERROR", "ERROR", "ERROR", "WARN"])
+        self.assertEqual((parts[3]["grain"], parts[3]["grain_opti"]), ("1", 1))
+
+    def test_non_scalar_part_fields_do_not_match_or_crash(self):
+        rules = compile_rules(compliance_router._part_type_rules, compliance_router._grain_mappings)
+        parts = [
+            {"grain": ["1"]},
+            {"grain": "1", "part_group": ["ARKALIK"], "drilling_operations": True},
+            {"grain": "1", "part_type": {"KM": 1}, "material_type": ["MDF"], "thickness_mm": [18]},
+            {"grain": {"x": 1}, "material_type": "MDF", "thickness_mm": {"mm": 18}},
+        ]
+        findings = rules.evaluate(parts)
+        self.assertEqual(
+            [(f["part_index"], f["rule"]) for f in findings], [(0, "GRAIN_CODE"), (3, "GRAIN_CODE")]
+        )
+        self.assertEqual([p.get("grain_opti") for p in parts], [None, 1, 1, None])
+
+        legacy = AgentOrchestrator([PartTypeRulesAgent(), GrainMappingAgent()]).run(
+            {"parts": [{"grain": ["1"]}, {"grain": "1", "part_group": ["A"]}]}
+        )
+        result = compile_rules([], []).run({"parts": [{"grain": ["1"]}, {"grain": "1", "part_group": ["A"]}]})
+        self.assertEqual(
+            [f["message"] for f in result["report"]], [f["message"] for f in legacy["report"]]
+        )
+
+    def test_invalid_regex_rule_is_skipped(self):
+        bad = SimpleNamespace(
+            is_active=True,
+            part_type="YN",
+            rule_code="YN_BAD",
+            required_fields=["color"],
+            validation_regex="[A-Z",
+            error_message="x",
+        )
+        with self.assertLogs("app.compliance.rule_engine", level="WARNING"):
+            rules = compile_rules(compliance_router._part_type_rules + [bad], [])
+        self.assertEqual(rules.evaluate([{"part_type": "YN", "grain": "1"}]), [])
+        self.assertEqual(len(rules.evaluate([{"part_type": "KM", "part_code": "KM-12", "grain": "1"}])), 1)
+
+    def test_compiled_rules_are_cached_per_version(self):
+        loader = MagicMock(return_value=([], []))
+        invalidate_rules()
+        self.addCleanup(invalidate_rules)
+        first = get_compiled_rules(loader)
+        self.assertIs(get_compiled_rules(loader), first)
+        version = invalidate_rules()
+        self.assertEqual(rules_version(), version)
+        second = get_compiled_rules(loader)
+        self.assertIsNot(second, first)
+        self.assertEqual(second.version, version)
+        self.assertEqual(loader.call_count, 2)
+
+
+class ComplianceRouterRuleEngineTest(unittest.TestCase):
+    def setUp(self):
+        app = FastAPI()
+        app.include_router(compliance_router.router)
+        admin = MagicMock(id=1, role="ADMIN")
+        app.dependency_overrides[get_current_user] = lambda: admin
+        app.dependency_overrides[require_admin] = lambda: admin
+        self.client = TestClient(app)
+        self.addCleanup(self.client.close)
+        # Yönetilen listeler modül düzeyinde; test sonunda eski hallerine dönülür
+        rules, mappings = list(compliance_router._part_type_rules), list(compliance_router._grain_mappings)
+        self.addCleanup(setattr, compliance_router, "_part_type_rules", rules)
+        self.addCleanup(setattr, compliance_router, "_grain_mappings", mappings)
+        self.addCleanup(invalidate_rules)
+
+    def _batch(self, orders):
+        response = self.client.post("/api/compliance/batch-check", json=orders)
+        self.assertEqual(response.status_code, 200, response.text)
+        return [(r["ok"], r["violation_count"]) for r in response.json()["results"]]
+
+    def test_rule_crud_changes_batch_results(self):
+        orders = [
+            {"parts": [{"part_group": "GOVDE", "part_type": "YN", "grain": "1"}]},
+            {"parts": [{"part_group": "GOVDE", "part_type": "YN", "color": "BEYAZ", "grain": "1"}]},
+        ]
+        self.assertEqual(self._batch(orders), [(True, 0), (True, 0)])
+
+        created = self.client.post(
+            "/api/compliance/rules/part-types",
+            json={
+                "part_type": "YN",
+                "rule_code": "YN_COLOR_REQUIRED",
+                "rule_description": "Yan parçalar için renk zorunludur",
+                "required_fields": ["color"],
+                "error_message": "Renk eksik",
+            },
+        )
+        self.assertEqual(created.status_code, 201, created.text)
+        self.assertEqual(self._batch(orders), [(False, 1), (True, 0)])
+
+        rule_id = created.json()["id"]
+        self.assertEqual(self.client.delete(f"/api/compliance/rules/part-types/{rule_id}").status_code, 200)
+        self.assertEqual(self._batch(orders), [(True, 0), (True, 0)])
+
+    def test_non_scalar_part_fields_do_not_fail_the_batch(self):
+        orders = [
+            {"order_id": "A", "parts": [{"grain": ["1"]}]},
+            {"order_id": "B", "parts": [{"grain": "1", "part_group": ["A"], "thickness_mm": {}}]},
+        ]
+        self.assertEqual(self._batch(orders), [(False, 1), (True, 0)])
+
+    def test_invalid_regex_is_rejected_with_422(self):
+        payload = {
+            "part_type": "YN",
+            "rule_code": "YN_CODE",
+            "rule_description": "Kod biçimi",
+            "required_fields": ["part_code"],
+            "validation_regex": "^YN-(\\d+$",
+        }
+        response = self.client.post("/api/compliance/rules/part-types", json=payload)
+        self.assertEqual(response.status_code, 422, response.text)
+
+        payload["validation_regex"] = "^YN-\\d+$"
+        created = self.client.post("/api/compliance/rules/part-types", json=payload)
+        self.assertEqual(created.status_code, 201, created.text)
+        payload["validation_regex"] = "*"
+        updated = self.client.put(f"/api/compliance/rules/part-types/{created.json()['id']}", json=payload)
+        self.assertEqual(updated.status_code, 422, updated.text)
+
+    def test_grain_mapping_update_invalidates(self):
+        order = [{"parts": [{"material_type": "MDF", "thickness_mm": 18, "grain": "2"}]}]
+        self.assertEqual(self._batch(order), [(True, 0)])
+
+        before = self.client.get("/api/compliance/health").json()["rules_version"]
+        response = self.client.put(
+            "/api/compliance/grain-mappings/grain-001",
+            json={
+                "material_type": "MDF",
+                "thickness_mm": 18,
+                "grain_direction": "LENGTHWISE",
+                "rotation_allowed": False,
+            },
+        )
+        self.assertEqual(response.status_code, 200, response.text)
+        self.assertGreater(self.client.get("/api/compliance/health").json()["rules_version"], before)
+        self.assertEqual(self._batch(order), [(False, 1)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -153,5 +153,52 @@ class TestCRMOpportunities(BaseCRMTest):
         self.assertEqual(resp.status_code, 200)
         self.assertEqual(resp.json()["stage"], "NEGOTIATION")
 
+class TestCRMPipelineStats(BaseCRMTest):
+    def setUp(self):
+        super().setUp()
+        from app.services import crm_analytics
+
+        crm_analytics.invalidate_pipeline_cache()
+        resp = self.client.post("/api/v1/crm/accounts", json={"company_name": "Pipeline A.Ş."})
+        self.account_id = resp.json()["id"]
+
+    def _create_opportunity(self, amount, stage="LEAD"):
+        payload = {"account_id": self.account_id, "title": f"Fırsat {amount}", "stage": stage, "amount": amount}
+        resp = self.client.post("/api/v1/crm/opportunities", json=payload)
+        return resp.json()["id"]
+
+    def test_pipeline_breakdown_and_win_rate(self):
+        self._create_opportunity(1000)
+        self._create_opportunity(2000, stage="PROPOSAL")
+        won_id = self._create_opportunity(3000, stage="NEGOTIATION")
+        lost_id = self._create_opportunity(4000, stage="QUALIFIED")
+        self.client.post(f"/api/v1/crm/opportunities/{won_id}/transition", json={"new_stage": "CLOSED_WON"})
+        self.client.post(
+            f"/api/v1/crm/opportunities/{lost_id}/transition",
+            json={"new_stage": "CLOSED_LOST", "lost_reason": "Fiyat"},
+        )
+
+        resp = self.client.get("/api/v1/crm/stats")
+        self.assertEqual(resp.status_code, 200)
+        data = resp.json()
+        self.assertEqual(data["total_opportunities"], 4)
+        self.assertEqual(data["open_opportunities"], 2)
+        self.assertEqual(data["pipeline_value"], 3000)
+        self.assertEqual(data["won_count"], 1)
+        self.assertEqual(data["win_rate"], 50.0)
+        self.assertEqual(data["pipeline"]["CLOSED_WON"], {"count": 1, "value": 3000.0})
+        self.assertEqual(data["pipeline"]["NEGOTIATION"], {"count": 0, "value": 0.0})
+        self.assertIsNotNone(data["avg_cycle_days"])
+
+    def test_stage_transition_invalidates_cached_stats(self):
+        opp_id = self._create_opportunity(500)
+        first = self.client.get("/api/v1/crm/stats").json()
+        self.assertEqual(first["pipeline"]["LEAD"]["count"], 1)
+
+        self.client.post(f"/api/v1/crm/opportunities/{opp_id}/transition", json={"new_stage": "PROPOSAL"})
+        second = self.client.get("/api/v1/crm/stats").json()
+        self.assertEqual(second["pipeline"]["LEAD"]["count"], 0)
+        self.assertEqual(second["pipeline"]["PROPOSAL"]["count"], 1)
+
 if __name__ == "__main__":
     unittest.main()
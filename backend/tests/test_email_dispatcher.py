@@ -0,0 +1,173 @@
+import sys
+import time
+import unittest
+from email import message_from_bytes
+from email.header import decode_header, make_header
+from pathlib import Path
+from unittest.mock import patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.database import Base  # noqa: E402
+from app.integrations.smtp_fake import FakeSMTPServer, FakeSMTPState  # noqa: E402
+from app.models import EmailMessage  # noqa: E402
+from app.services import email_dispatcher  # noqa: E402
+from app.services.email_dispatcher import EmailDispatcher  # noqa: E402
+from app.services.email_service import EmailService  # noqa: E402
+
+
+class EmailDispatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        Base.metadata.create_all(bind=self.engine)
+        self.SessionLocal = sessionmaker(bind=self.engine)
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def _server(self, **kwargs):
+        server = FakeSMTPServer(FakeSMTPState(**kwargs)).start()
+        self.addCleanup(server.stop)
+        env = {
+            "SMTP_HOST": "127.0.0.1",
+            "SMTP_PORT": str(server.port),
+            "SMTP_USER": "user",
+            "SMTP_PASSWORD": "secret",
+            "SMTP_STARTTLS": "0",
+        }
+        with patch.dict("os.environ", env):
+            self.service = EmailService()
+        self.service.session_factory = self.SessionLocal
+        return server.state
+
+    def _dispatcher(self, **kwargs):
+        options = {"backoff_base": 0, "poll_interval": 0.05}
+        options.update(kwargs)
+        dispatcher = EmailDispatcher(self.SessionLocal, settings=self.service, **options)
+        self.addCleanup(dispatcher.stop)
+        return dispatcher
+
+    def _drain(self, dispatcher, rounds=10):
+        for _ in range(rounds):
+            if not dispatcher.drain_once():
+                break
+
+    def _statuses(self):
+        with self.SessionLocal() as db:
+            return {m.to_email: (m.status, m.attempts) for m in db.query(EmailMessage)}
+
+    def test_batch_reuses_one_authenticated_connection(self):
+        state = self._server()
+        for i in range(25):
+            self.assertTrue(
+                self.service.send_payment_reminder(
+                    f"musteri{i}@example.com", "Müşteri", f"F-{i}", 100.0, "TRY", "2026-11-01"
+                )
+            )
+        self.assertEqual(state.connections, 0)  # Çağıran tarafta SMTP yok
+
+        dispatcher = self._dispatcher(batch_size=10)
+        self._drain(dispatcher)
+
+        self.assertEqual(len(state.messages), 25)
+        self.assertEqual((state.connections, state.logins, dispatcher.connections_opened), (1, 1, 1))
+        self.assertEqual({s for s, _ in self._statuses().values()}, {"SENT"})
+        with self.SessionLocal() as db:
+            row = db.query(EmailMessage).first()
+            self.assertEqual(row.template, "reminder_payment")
+            self.assertIsNotNone(row.sent_at)
+        parsed = message_from_bytes(state.messages[0][2])
+        self.assertEqual(str(make_header(decode_header(parsed["Subject"]))), "Ödeme Hatırlatması - Fatura #F-0")
+
+    def test_transient_errors_retry_and_permanent_errors_fail(self):
+        state = self._server(fail_first=1, reject={"yok@example.com": (550, "No such user")})
+        for to in ("a@example.com", "b@example.com", "yok@example.com"):
+            self.service.send_email(to, "Konu", "<p>x</p>")
+        dispatcher = self._dispatcher()
+
+        dispatcher.drain_once()
+        self.assertEqual(
+            self._statuses(),
+            {
+                "a@example.com": ("PENDING", 1),
+                "b@example.com": ("PENDING", 1),
+                "yok@example.com": ("FAILED", 1),
+            },
+        )
+        with self.SessionLocal() as db:
+            error = db.query(EmailMessage).filter_by(to_email="a@example.com").one().error
+        self.assertIn("451", error)
+
+        self._drain(dispatcher)
+        self.assertEqual(self._statuses()["a@example.com"], ("SENT", 2))
+        self.assertEqual(sorted(state.delivered), ["a@example.com", "b@example.com"])
+        self.assertEqual(state.connections, 1)  # Hatalar bağlantıyı düşürmez
+        with self.SessionLocal() as db:
+            # Son durumdaki kayıtlar MIME içeriğini (ekler dahil) tutmaz
+            self.assertEqual({m.raw_message for m in db.query(EmailMessage)}, {None})
+
+    def test_retries_stop_after_max_attempts(self):
+        self._server(fail_first=10)
+        self.service.send_email("a@example.com", "Konu", "<p>x</p>")
+        dispatcher = self._dispatcher(max_attempts=3)
+        self._drain(dispatcher)
+        self.assertEqual(self._statuses()["a@example.com"], ("FAILED", 3))
+
+    def test_dropped_connection_is_reopened_without_losing_messages(self):
+        state = self._server(drop_after=4)
+        for i in range(10):
+            self.service.send_email(f"m{i}@example.com", "Konu", "<p>x</p>")
+        self._drain(self._dispatcher())
+        self.assertEqual(len(state.messages), 10)
+        self.assertEqual(state.connections, 3)
+        self.assertEqual({s for s, _ in self._statuses().values()}, {"SENT"})
+
+    def test_connection_rotates_after_quota(self):
+        state = self._server()
+        for i in range(7):
+            self.service.send_email(f"m{i}@example.com", "Konu", "<p>x</p>")
+        self._drain(self._dispatcher(max_per_connection=3))
+        self.assertEqual((len(state.messages), state.connections), (7, 3))
+
+    def test_login_failure_defers_whole_batch(self):
+        state = self._server(password="baska")
+        for i in range(3):
+            self.service.send_email(f"m{i}@example.com", "Konu", "<p>x</p>")
+        self._dispatcher().drain_once()
+        self.assertEqual({v for v in self._statuses().values()}, {("PENDING", 1)})
+        self.assertEqual(state.messages, [])
+
+    def test_background_worker_sends_on_notify(self):
+        state = self._server()
+        dispatcher = self._dispatcher(poll_interval=30)
+        with patch.object(email_dispatcher, "_dispatcher_instance", dispatcher):
+            dispatcher.start()
+            time.sleep(0.1)  # İlk boş tur biter, worker uyumaya geçer
+            self.service.send_welcome("yeni@example.com", "yeni")
+            deadline = time.monotonic() + 5
+            while not state.messages and time.monotonic() < deadline:
+                time.sleep(0.02)
+            dispatcher.stop()
+        self.assertEqual(state.delivered, ["yeni@example.com"])
+        self.assertEqual(self._statuses()["yeni@example.com"], ("SENT", 1))
+
+    def test_not_configured_enqueues_nothing(self):
+        with patch.dict("os.environ", {"SMTP_HOST": "", "SMTP_USER": "", "SMTP_PASSWORD": ""}):
+            service = EmailService()
+        service.session_factory = self.SessionLocal
+        self.assertFalse(service.send_email("a@example.com", "Konu", "<p>x</p>"))
+        self.assertEqual(self._statuses(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
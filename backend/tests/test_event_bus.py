@@ -0,0 +1,155 @@
+import asyncio
+import json
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.services.event_bus import EventBus, MemoryBackend, SQLiteBackend  # noqa: E402
+from app.services.websocket_manager import ConnectionManager  # noqa: E402
+
+WORKER_SCRIPT = Path(__file__).parent / "fixtures" / "event_bus" / "worker.py"
+
+
+class _FakeSocket:
+    def __init__(self):
+        self.received = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        self.received.append(json.loads(text))
+
+    async def close(self, code=1000):
+        pass
+
+
+async def _settle(predicate, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        await asyncio.sleep(0.01)
+
+
+def test_unstarted_bus_delivers_locally():
+    async def _run():
+        bus = EventBus()
+        got = []
+        bus.subscribe("orders", got.append)
+        await bus.publish("orders", {"n": 1})
+        bus.publish_nowait("orders", {"n": 2})
+        assert got == [{"n": 1}, {"n": 2}]
+
+    asyncio.run(_run())
+
+
+def test_memory_backend_accepts_publish_from_threads():
+    async def _run():
+        bus = EventBus()
+        got = []
+        bus.subscribe("orders", got.append)
+        await bus.start(MemoryBackend())
+        worker = threading.Thread(target=bus.publish_nowait, args=("orders", {"from": "thread"}))
+        worker.start()
+        worker.join()
+        await _settle(lambda: got)
+        await bus.stop()
+        assert got == [{"from": "thread"}]
+
+    asyncio.run(_run())
+
+
+def test_sqlite_backend_fans_out_between_managers():
+    async def _run(db_path):
+        # İki ayrı bus + manager çifti, aynı dosyayı paylaşan iki worker gibi davranır
+        bus_a, bus_b = EventBus(), EventBus()
+        manager_a = ConnectionManager(event_bus=bus_a)
+        manager_b = ConnectionManager(event_bus=bus_b)
+        await bus_a.start(SQLiteBackend(db_path, poll_interval=0.01))
+        await bus_b.start(SQLiteBackend(db_path, poll_interval=0.01))
+
+        tablet = _FakeSocket()
+        await manager_b.connect(tablet, "tablet")
+        manager_b.subscribe("tablet", "stations")
+
+        for i in range(5):
+            await manager_a.broadcast_to_channel("stations", {"type": "station_scan", "n": i})
+        await manager_a.send_to_user("tablet", {"type": "notification"})
+
+        await _settle(lambda: len(tablet.received) == 6)
+        manager_b.disconnect("tablet")
+        await bus_a.stop()
+        await bus_b.stop()
+        return tablet.received
+
+    with tempfile.TemporaryDirectory() as tmp:
+        received = asyncio.run(_run(str(Path(tmp) / "bus.db")))
+    assert [m.get("n") for m in received] == [0, 1, 2, 3, 4, None]
+    assert received[-1] == {"type": "notification"}
+
+
+def test_sqlite_backend_does_not_replay_old_events():
+    async def _run(db_path):
+        first = EventBus()
+        await first.start(SQLiteBackend(db_path, poll_interval=0.01))
+        await first.publish("orders", {"old": True})
+        await first.stop()
+
+        late = EventBus()
+        got = []
+        late.subscribe("orders", got.append)
+        await late.start(SQLiteBackend(db_path, poll_interval=0.01))
+        await late.publish("orders", {"old": False})
+        await _settle(lambda: got)
+        await late.stop()
+        return got
+
+    with tempfile.TemporaryDirectory() as tmp:
+        assert asyncio.run(_run(str(Path(tmp) / "bus.db"))) == [{"old": False}]
+
+
+def test_multi_worker_harness_orders_events_per_channel():
+    workers, per_channel, channels = 3, 40, 2
+    total = workers * per_channel * channels
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "bus.db")
+        go_file = str(Path(tmp) / "go")
+        SQLiteBackend(db_path)._setup()
+        procs = [
+            subprocess.Popen(
+                [sys.executable, str(WORKER_SCRIPT), db_path, f"w{i}", str(per_channel), str(total), go_file],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+            )
+            for i in range(workers)
+        ]
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if all(Path(f"{go_file}.w{i}").exists() for i in range(workers)):
+                break
+            time.sleep(0.01)
+        Path(go_file).touch()
+        outputs = [p.communicate(timeout=60) for p in procs]
+
+    for proc, (_, err) in zip(procs, outputs):
+        assert proc.returncode == 0, err
+    views = [json.loads(out) for out, _ in outputs]
+
+    for view in views:
+        assert len(view) == total
+        for channel in ("stations", "orders"):
+            events = [msg for ch, msg in view if ch == channel]
+            # Her yayıncının kendi sırası korunur
+            for i in range(workers):
+                assert [e["seq"] for e in events if e["worker"] == f"w{i}"] == list(range(per_channel))
+    # Tüm worker'lar kanal başına aynı toplam sırayı görür
+    for channel in ("stations", "orders"):
+        orders = [[msg for ch, msg in view if ch == channel] for view in views]
+        assert all(order == orders[0] for order in orders)
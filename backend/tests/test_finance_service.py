@@ -192,6 +192,85 @@ class TestPaymentPromises(BaseFinanceTest):
         self.assertEqual(resp.status_code, 200)
         self.assertEqual(resp.json()["promised_amount"], 5000)
 
+
+class TestStatisticsAndAging(BaseFinanceTest):
+    def _create_invoice(self, total, due_in_days, account_id=None):
+        payload = {
+            "account_id": account_id or self.account_id,
+            "subtotal": total,
+            "total_amount": total,
+            "due_date": (datetime.now() + timedelta(days=due_in_days)).isoformat(),
+        }
+        resp = self.client.post("/api/v1/payments/invoices", json=payload)
+        self.assertEqual(resp.status_code, 200)
+        return resp.json()["id"]
+
+    def _count_statements(self, fn):
+        from sqlalchemy import event
+
+        statements = []
+
+        def _before(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(self.engine, "before_cursor_execute", _before)
+        try:
+            result = fn()
+        finally:
+            event.remove(self.engine, "before_cursor_execute", _before)
+        return result, statements
+
+    def test_statistics_and_aging_buckets(self):
+        from app.services import payment_service
+
+        self._create_invoice(100, 5)
+        self._create_invoice(200, -45)
+        self._create_invoice(300, -200)
+
+        db = self.SessionLocal()
+        try:
+            stats, statements = self._count_statements(
+                lambda: payment_service.get_payment_statistics(db)
+            )
+            self.assertEqual(len(statements), 1)
+            self.assertEqual(stats["total_invoices"], 3)
+            self.assertEqual(stats["total_amount"], 600)
+            self.assertEqual(stats["overdue_invoices"], 2)
+            self.assertEqual(stats["overdue_amount"], 500)
+
+            aging, statements = self._count_statements(
+                lambda: payment_service.get_aging_report(db)
+            )
+            self.assertEqual(len(statements), 1)
+            self.assertEqual(aging["aging_0_30"], 100)
+            self.assertEqual(aging["aging_31_60"], 200)
+            self.assertEqual(aging["aging_120_plus"], 300)
+            self.assertEqual(aging["total"], 600)
+        finally:
+            db.close()
+
+    def test_by_account_matches_single_account_reports(self):
+        resp = self.client.post("/api/v1/crm/accounts", json={"company_name": "Ikinci Cari"})
+        other_account_id = resp.json()["id"]
+        self._create_invoice(100, -40)
+        self._create_invoice(250, -100, account_id=other_account_id)
+
+        stats = self.client.get("/api/v1/payments/statistics/by-account").json()
+        aging = self.client.get("/api/v1/payments/aging-report/by-account").json()
+
+        for account_id in (self.account_id, other_account_id):
+            single_stats = self.client.get(
+                "/api/v1/payments/statistics", params={"account_id": account_id}
+            ).json()
+            single_aging = self.client.get(
+                "/api/v1/payments/aging-report", params={"account_id": account_id}
+            ).json()
+            self.assertEqual(stats[account_id], single_stats)
+            self.assertEqual(aging[account_id], single_aging)
+
+        self.assertEqual(aging[other_account_id]["aging_91_120"], 250)
+
+
 if __name__ == "__main__":
     unittest.main()
 
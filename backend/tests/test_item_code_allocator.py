@@ -0,0 +1,171 @@
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.database import Base  # noqa: E402
+from app.exceptions import NotFoundError  # noqa: E402
+from app.models import (  # noqa: E402
+    Brand,
+    CodeSequence,
+    Color,
+    Item,
+    MaterialSpec,
+    ProductType,
+    SupplierItem,
+)
+from app.services import code_generator  # noqa: E402
+from app.services.code_generator import (  # noqa: E402
+    _check_digit,
+    allocate_sequence,
+    generate_item_code,
+    generate_item_codes,
+)
+from app.services.product_service import ProductService  # noqa: E402
+
+PREFIX = "STK-2610-"
+
+
+def _seq(code: str) -> int:
+    return int(code.split("-")[2])
+
+
+def _seed_catalog(session_factory) -> int:
+    with session_factory() as db:
+        pt = ProductType(code="MELAMIN", short_code="MLM", name="Melamin")
+        color = Color(code="BEYAZ", name="Beyaz")
+        brand = Brand(code="KRN", name="Kronospan")
+        db.add_all([pt, color, brand])
+        db.flush()
+        spec = MaterialSpec(
+            product_type_id=pt.id, color_id=color.id, thickness_mm=18, width_cm=210, height_cm=280
+        )
+        db.add(spec)
+        db.flush()
+        si = SupplierItem(spec_id=spec.id, brand_id=brand.id)
+        db.add(si)
+        db.commit()
+        return si.id
+
+
+class ItemCodeAllocatorTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        Base.metadata.create_all(bind=self.engine)
+        self.SessionLocal = sessionmaker(bind=self.engine)
+        self.supplier_item_id = _seed_catalog(self.SessionLocal)
+        patcher = patch.object(code_generator, "_item_prefix", return_value=PREFIX)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def test_code_format_and_check_digit_unchanged(self):
+        with self.SessionLocal() as db:
+            code = generate_item_code(db)
+        self.assertEqual(code, "STK-2610-0000001-3")  # Luhn: önceki üretici ile aynı
+
+    def test_sequence_starts_after_existing_codes(self):
+        with self.SessionLocal() as db:
+            db.add(Item(code=f"{PREFIX}0000041-0", supplier_item_id=self.supplier_item_id))
+            db.add(Item(code="STK-2609-0000900-0", supplier_item_id=self.supplier_item_id))
+            db.commit()
+            self.assertEqual(_seq(generate_item_code(db)), 42)
+            db.commit()
+            # Sayaç satırı artık kaynak; tarama tekrar yapılmaz
+            self.assertEqual(db.get(CodeSequence, PREFIX).last_value, 42)
+
+    def test_block_reservation_is_contiguous_and_rollback_leaves_no_gap(self):
+        with self.SessionLocal() as db:
+            codes = generate_item_codes(db, 5)
+            db.commit()
+            self.assertEqual([_seq(c) for c in codes], [1, 2, 3, 4, 5])
+            self.assertTrue(all(c[-1] == _check_digit(c[:-2]) for c in codes))
+
+            generate_item_codes(db, 10)
+            db.rollback()
+            self.assertEqual(allocate_sequence(db, PREFIX, 3), 6)
+            db.commit()
+            with self.assertRaises(ValueError):
+                allocate_sequence(db, PREFIX, 0)
+
+    def test_bulk_create_items(self):
+        with self.SessionLocal() as db:
+            svc = ProductService(db)
+            items = svc.create_items(
+                [{"supplier_item_id": self.supplier_item_id, "barcode": f"B{i}"} for i in range(4)]
+            )
+            self.assertEqual([_seq(i.code) for i in items], [1, 2, 3, 4])
+            self.assertEqual(_seq(svc.create_item(self.supplier_item_id).code), 5)
+            with self.assertRaises(NotFoundError):
+                svc.create_items([{"supplier_item_id": 999}])
+
+
+class ItemCodeConcurrencyTest(unittest.TestCase):
+    THREADS = 8
+    ROUNDS = 15
+    BULK = 5
+
+    def test_concurrent_creation_never_collides(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        engine = create_engine(
+            f"sqlite:///{Path(tmp.name) / 'codes.db'}",
+            connect_args={"check_same_thread": False, "timeout": 30},
+        )
+        self.addCleanup(engine.dispose)
+        Base.metadata.create_all(bind=engine)
+        SessionLocal = sessionmaker(bind=engine)
+        supplier_item_id = _seed_catalog(SessionLocal)
+
+        barrier = threading.Barrier(self.THREADS)
+        errors = []
+
+        def worker(index):
+            try:
+                barrier.wait()
+                for round_no in range(self.ROUNDS):
+                    with SessionLocal() as db:
+                        svc = ProductService(db)
+                        if round_no % 3 == 0:
+                            svc.create_items(
+                                [{"supplier_item_id": supplier_item_id}] * self.BULK
+                            )
+                        else:
+                            svc.create_item(supplier_item_id)
+            except Exception as exc:  # pragma: no cover - hata raporu için
+                errors.append(exc)
+
+        with patch.object(code_generator, "_item_prefix", return_value=PREFIX):
+            threads = [threading.Thread(target=worker, args=(i,)) for i in range(self.THREADS)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(timeout=120)
+
+        self.assertEqual(errors, [])
+        with SessionLocal() as db:
+            codes = [code for (code,) in db.query(Item.code)]
+        bulk_rounds = len(range(0, self.ROUNDS, 3))
+        expected = self.THREADS * (self.ROUNDS - bulk_rounds + bulk_rounds * self.BULK)
+        self.assertEqual(len(codes), expected)
+        self.assertEqual(sorted(_seq(c) for c in codes), list(range(1, expected + 1)))
+
+
+if __name__ == "__main__":
+    unittest.main()
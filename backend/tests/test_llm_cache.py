@@ -0,0 +1,270 @@
+import asyncio
+import io
+import json
+import sys
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.database import Base  # noqa: E402
+from app.models import LLMCacheEntry  # noqa: E402
+from app.services import llm_cache as llm_cache_module  # noqa: E402
+from app.services import gemini_service, price_tracking_ai  # noqa: E402
+from app.services.llm_cache import LLMResponseCache, cache_key, llm_cache  # noqa: E402
+
+
+class FakeGeminiModel:
+    """generate_content çağrılarını sayan sahte sağlayıcı."""
+
+    def __init__(self, reply="yanıt"):
+        self.reply = reply
+        self.calls = []
+
+    def generate_content(self, content):
+        self.calls.append(content)
+        return SimpleNamespace(text=self.reply, usage_metadata=None)
+
+
+class FakeOpenAI:
+    def __init__(self, content):
+        self.calls = 0
+
+        def create(**_kwargs):
+            self.calls += 1
+            message = SimpleNamespace(content=content)
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=create))
+
+
+class LLMCacheTestBase(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        Base.metadata.create_all(bind=self.engine)
+        self.SessionLocal = sessionmaker(bind=self.engine)
+        for attr, value in (
+            ("session_factory", self.SessionLocal),
+            ("enabled", True),
+            ("stats", llm_cache_module.LLMCacheStats()),
+        ):
+            patcher = patch.object(llm_cache, attr, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def _entries(self):
+        with self.SessionLocal() as db:
+            return db.query(LLMCacheEntry).count()
+
+
+class GeminiCacheTest(LLMCacheTestBase):
+    def setUp(self):
+        super().setUp()
+        from app.services.gemini_service import GeminiService
+
+        self.service = GeminiService(api_key="test-key")
+        self.fake = FakeGeminiModel()
+        self.service.text_model = self.fake
+        self.service.vision_model = self.fake
+
+    def test_identical_prompt_is_served_from_cache(self):
+        first = asyncio.run(self.service.generate_text_response("Stok durumu?", context="depo"))
+        second = asyncio.run(self.service.generate_text_response("Stok durumu?", context="depo"))
+        self.assertEqual(len(self.fake.calls), 1)
+        self.assertEqual((first["cached"], second["cached"]), (False, True))
+        self.assertEqual(second["response"], "yanıt")
+        self.assertEqual((llm_cache.stats.hits, llm_cache.stats.misses, llm_cache.stats.stores), (1, 1, 1))
+
+        asyncio.run(self.service.generate_text_response("Stok durumu?", context="başka"))
+        self.assertEqual(len(self.fake.calls), 2)
+
+    def test_generation_config_is_part_of_the_key(self):
+        asyncio.run(self.service.generate_text_response("aynı"))
+        self.service.model_config = {**self.service.model_config, "temperature": 0.1}
+        asyncio.run(self.service.generate_text_response("aynı"))
+        self.assertEqual(len(self.fake.calls), 2)
+
+    def test_bypass_flag(self):
+        asyncio.run(self.service.generate_text_response("soru"))
+        result = asyncio.run(self.service.generate_text_response("soru", use_cache=False))
+        self.assertFalse(result["cached"])
+        self.assertEqual(len(self.fake.calls), 2)
+        self.assertEqual(llm_cache.stats.bypassed, 1)
+
+        with patch.object(llm_cache, "enabled", False):
+            asyncio.run(self.service.generate_text_response("soru"))
+        self.assertEqual(len(self.fake.calls), 3)
+
+    def test_structured_extraction_and_document_analysis(self):
+        self.fake.reply = '```json\n{"tutar": 120}\n```'
+        schema = {"tutar": "number"}
+        first = asyncio.run(self.service.extract_structured_data("Toplam 120 TL", schema))
+        second = asyncio.run(self.service.extract_structured_data("Toplam 120 TL", schema))
+        self.assertEqual(first["extracted_data"], second["extracted_data"])
+        self.assertEqual(len(self.fake.calls), 1)
+
+        asyncio.run(self.service.analyze_document("Fatura metni", "invoice"))
+        asyncio.run(self.service.analyze_document("Fatura metni", "invoice"))
+        asyncio.run(self.service.analyze_document("Fatura metni", "contract"))
+        self.assertEqual(len(self.fake.calls), 3)
+
+    def test_malformed_structured_reply_is_not_cached(self):
+        self.fake.reply = "Üzgünüm, JSON üretemedim"
+        schema = {"tutar": "number"}
+        failed = asyncio.run(self.service.extract_structured_data("Toplam 120 TL", schema))
+        self.assertFalse(failed["success"])
+        self.assertEqual(self._entries(), 0)
+
+        self.fake.reply = '{"tutar": 120}'
+        retried = asyncio.run(self.service.extract_structured_data("Toplam 120 TL", schema))
+        self.assertEqual(retried["extracted_data"], {"tutar": 120})
+        self.assertEqual(len(self.fake.calls), 2)
+        self.assertEqual(self._entries(), 1)
+
+        # Önceden yazılmış bozuk kayıt doğrulayıcıdan geçmezse kullanılmaz
+        self.fake.reply = "bozuk"
+        asyncio.run(self.service.generate_text_response("Ham soru"))
+        self.fake.reply = '{"ok": true}'
+        result = asyncio.run(
+            self.service.generate_text_response("Ham soru", cache_validator=gemini_service.is_json_reply)
+        )
+        self.assertEqual((result["cached"], result["response"]), (False, '{"ok": true}'))
+
+    def test_image_bytes_are_part_of_the_key(self):
+        import PIL.Image
+
+        def png(color):
+            buf = io.BytesIO()
+            PIL.Image.new("RGB", (4, 3), color).save(buf, format="PNG")
+            return buf.getvalue()
+
+        red, blue = png("red"), png("blue")
+        asyncio.run(self.service.analyze_image(red, "Ölçüleri oku", "image/png"))
+        hit = asyncio.run(self.service.analyze_image(red, "Ölçüleri oku", "image/png"))
+        asyncio.run(self.service.analyze_image(blue, "Ölçüleri oku", "image/png"))
+        self.assertEqual(len(self.fake.calls), 2)
+        self.assertTrue(hit["cached"])
+        self.assertEqual(hit["image_size"], "4x3")
+
+    def test_cache_failure_does_not_break_the_call(self):
+        Base.metadata.drop_all(bind=self.engine)
+        result = asyncio.run(self.service.generate_text_response("soru"))
+        self.assertTrue(result["success"])
+        self.assertEqual(result["response"], "yanıt")
+        self.assertGreaterEqual(llm_cache.stats.errors, 2)
+
+
+class PriceExtractionCacheTest(LLMCacheTestBase):
+    TEXT = "MLM Beyaz 18mm 210x280 ..... 1.250,00 TL\n" * 3
+
+    def test_repeated_page_is_parsed_from_cache(self):
+        fake = FakeOpenAI(json.dumps({"urunler": [{"urun_adi": "MLM Beyaz", "net_fiyat": 1250}]}))
+        with patch.object(price_tracking_ai, "_client", fake):
+            first = price_tracking_ai.extract_price_data_from_text(self.TEXT, supplier="A", model="gpt-4o")
+            second = price_tracking_ai.extract_price_data_from_text(self.TEXT, supplier="A", model="gpt-4o")
+            price_tracking_ai.extract_price_data_from_text(self.TEXT, supplier="B", model="gpt-4o")
+            price_tracking_ai.extract_price_data_from_text(
+                self.TEXT, supplier="A", model="gpt-4o", use_cache=False
+            )
+        self.assertEqual(first, second)
+        self.assertEqual(first[0]["urun_adi"], "MLM Beyaz")
+        self.assertEqual(fake.calls, 3)
+
+    def test_unparseable_reply_is_not_cached(self):
+        fake = FakeOpenAI("Üzgünüm, okuyamadım")
+        with patch.object(price_tracking_ai, "_client", fake):
+            self.assertEqual(price_tracking_ai.extract_price_data_from_text(self.TEXT, model="gpt-4o"), [])
+            price_tracking_ai.extract_price_data_from_text(self.TEXT, model="gpt-4o")
+        self.assertEqual(fake.calls, 2)
+        self.assertEqual(self._entries(), 0)
+
+
+class CacheBoundsTest(LLMCacheTestBase):
+    def _cache(self, **kwargs):
+        return LLMResponseCache(self.SessionLocal, enabled=True, **kwargs)
+
+    def test_key_covers_every_input(self):
+        base = cache_key("gemini", "m", {"t": 1}, "p", [b"a"])
+        self.assertEqual(base, cache_key("gemini", "m", {"t": 1}, "p", [b"a"]))
+        variants = [
+            cache_key("openai", "m", {"t": 1}, "p", [b"a"]),
+            cache_key("gemini", "m2", {"t": 1}, "p", [b"a"]),
+            cache_key("gemini", "m", {"t": 2}, "p", [b"a"]),
+            cache_key("gemini", "m", {"t": 1}, "p2", [b"a"]),
+            cache_key("gemini", "m", {"t": 1}, "p", [b"b"]),
+            cache_key("gemini", "m", {"t": 1}, "p"),
+        ]
+        self.assertEqual(len(set(variants + [base])), 7)
+
+    def test_ttl_expiry(self):
+        cache = self._cache(ttl_seconds=60)
+        key, _ = cache.lookup("p", "m", {}, "soru")
+        cache.store(key, {"text": "x"}, provider="p", model="m")
+        self.assertEqual(cache.lookup("p", "m", {}, "soru")[1], {"text": "x"})
+
+        later = datetime.now(timezone.utc) + timedelta(seconds=61)
+        with patch.object(llm_cache_module, "_utcnow", return_value=later):
+            self.assertIsNone(cache.lookup("p", "m", {}, "soru")[1])
+            cache.store(cache_key("p", "m", {}, "yeni"), {"text": "y"}, provider="p", model="m")
+        self.assertEqual(self._entries(), 1)  # Süresi dolan kayıt yazımda silindi
+        self.assertEqual(cache.stats.evictions, 1)
+
+    def test_entry_and_byte_bounds_evict_least_recently_used(self):
+        cache = self._cache(max_entries=3)
+        start = datetime.now(timezone.utc)
+        keys = [cache_key("p", "m", {}, f"soru {i}") for i in range(5)]
+        for i, key in enumerate(keys):
+            with patch.object(llm_cache_module, "_utcnow", return_value=start + timedelta(seconds=i)):
+                cache.store(key, {"text": i}, provider="p", model="m")
+            if i == 2:
+                # En eski kayıt yeniden kullanıldı
+                with patch.object(llm_cache_module, "_utcnow", return_value=start + timedelta(seconds=2.5)):
+                    cache.get(keys[0])
+        with self.SessionLocal() as db:
+            remaining = {k for (k,) in db.query(LLMCacheEntry.key)}
+        self.assertEqual(remaining, {keys[0], keys[3], keys[4]})
+
+        small = self._cache(max_bytes=40)
+        small.clear()
+        small.store(keys[0], {"text": "a" * 20}, provider="p", model="m")
+        small.store(keys[1], {"text": "b" * 20}, provider="p", model="m")
+        small.store(keys[2], {"text": "c" * 100}, provider="p", model="m")  # Sınırdan büyük: yazılmaz
+        metrics = small.metrics()
+        self.assertEqual((metrics["entries"], metrics["stores"]), (1, 2))
+        self.assertLessEqual(metrics["size_bytes"], 40)
+
+    def test_metrics_and_clear(self):
+        cache = self._cache()
+        key, _ = cache.lookup("gemini", "m", {}, "a")
+        cache.store(key, {"text": "x"}, provider="gemini", model="m")
+        cache.lookup("gemini", "m", {}, "a")
+        other, _ = cache.lookup("openai", "m", {}, "a")
+        cache.store(other, {"content": "[]"}, provider="openai", model="m")
+
+        metrics = cache.metrics()
+        self.assertEqual(
+            {k: metrics[k] for k in ("hits", "misses", "stores", "entries", "hit_rate")},
+            {"hits": 1, "misses": 2, "stores": 2, "entries": 2, "hit_rate": 0.3333},
+        )
+        self.assertEqual(cache.clear(provider="openai"), 1)
+        self.assertEqual(cache.clear(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
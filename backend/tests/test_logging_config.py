@@ -0,0 +1,109 @@
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.logging_config import (  # noqa: E402
+    ContextFilter,
+    DroppingQueueHandler,
+    JsonFormatter,
+    SamplingFilter,
+    _parse_rules,
+    bind_log_context,
+)
+
+
+def _record(name="app.test", level=logging.INFO, msg="mesaj %s", args=("x",)):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+def test_json_formatter_includes_context_fields():
+    record = _record()
+    with bind_log_context(request_id="req-1", job_id="job-9"):
+        ContextFilter().filter(record)
+
+    data = json.loads(JsonFormatter().format(record))
+    assert data["message"] == "mesaj x"
+    assert data["logger"] == "app.test"
+    assert data["request_id"] == "req-1"
+    assert data["job_id"] == "job-9"
+
+
+def test_context_is_reset_after_block():
+    with bind_log_context(request_id="req-1"):
+        pass
+    record = _record()
+    ContextFilter().filter(record)
+    assert record.request_id is None
+
+
+def test_sampling_filter_rate_limits_noisy_logger_but_keeps_warnings():
+    sampling = SamplingFilter(rate_limits={"app.noisy": 3})
+    passed = sum(sampling.filter(_record(name="app.noisy.sub")) for _ in range(10))
+    assert passed == 3
+    assert sampling.filter(_record(name="app.noisy", level=logging.WARNING))
+    assert sampling.filter(_record(name="app.quiet"))
+
+
+def test_sampling_filter_drops_everything_at_zero_rate():
+    sampling = SamplingFilter(sample_rates={"app.noisy": 0.0})
+    assert not any(sampling.filter(_record(name="app.noisy")) for _ in range(20))
+    assert sampling.dropped == 20
+
+
+def test_parse_rules_ignores_malformed_entries():
+    assert _parse_rules("a.b=0.5, bad, c=x, d=2", float) == {"a.b": 0.5, "d": 2.0}
+
+
+class _SlowHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+        self.gate = threading.Event()
+
+    def emit(self, record):
+        self.gate.wait(timeout=5)
+        self.records.append(self.format(record))
+
+
+def test_queue_handler_does_not_block_caller_on_slow_io():
+    log_queue = queue.Queue(maxsize=100)
+    slow = _SlowHandler()
+    slow.setFormatter(JsonFormatter())
+    listener = logging.handlers.QueueListener(log_queue, slow)
+    listener.start()
+
+    logger = logging.getLogger("app.test.queue")
+    logger.propagate = False
+    handler = DroppingQueueHandler(log_queue)
+    handler.addFilter(ContextFilter())
+    logger.addHandler(handler)
+    try:
+        started = time.monotonic()
+        with bind_log_context(job_id="job-1"):
+            for i in range(20):
+                logger.warning("kayit %d", i)
+        assert time.monotonic() - started < 1.0
+
+        slow.gate.set()
+        listener.stop()
+        assert len(slow.records) == 20
+        assert json.loads(slow.records[0])["job_id"] == "job-1"
+    finally:
+        logger.removeHandler(handler)
+        logger.propagate = True
+
+
+def test_queue_handler_drops_when_full():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=2))
+    for _ in range(5):
+        handler.handle(_record())
+    assert handler.dropped == 3
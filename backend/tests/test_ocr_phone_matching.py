@@ -0,0 +1,83 @@
+import sys
+import unittest
+from pathlib import Path
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.database import Base  # noqa: E402
+from app.features.ocr.transport.http.router import _match_customer_by_phone  # noqa: E402
+from app.models import Customer  # noqa: E402
+
+
+class MatchCustomerByPhoneTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        Base.metadata.create_all(bind=self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+        self.db.add_all(
+            [
+                Customer(name="Ahmet", phone="+905321234567"),
+                Customer(name="Mehmet", phone="0 533 765 43 21"),
+                Customer(name="Ayse", phone="0212 999 88 77"),
+            ]
+        )
+        self.db.commit()
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+
+    def test_suffix_column_is_kept_in_sync(self):
+        customer = self.db.query(Customer).filter_by(name="Ahmet").one()
+        self.assertEqual(customer.phone_suffix, "7654321235")
+        customer.phone = "05449998877"
+        self.db.commit()
+        self.db.refresh(customer)
+        self.assertEqual(customer.phone_suffix, "7788999445")
+
+    def test_exact_match(self):
+        self.assertEqual(_match_customer_by_phone(self.db, "05321234567").name, "Ahmet")
+
+    def test_differently_formatted_number_matches(self):
+        self.assertEqual(_match_customer_by_phone(self.db, "+90 533 765 4321").name, "Mehmet")
+
+    def test_last_seven_digits_match(self):
+        self.assertEqual(_match_customer_by_phone(self.db, "0555 999 88 77").name, "Ayse")
+
+    def test_no_match(self):
+        self.assertIsNone(_match_customer_by_phone(self.db, "0555 000 00 00"))
+        self.assertIsNone(_match_customer_by_phone(self.db, "abc"))
+
+    def test_lookups_use_suffix_index(self):
+        plans = []
+
+        def _before(conn, cursor, statement, parameters, context, executemany):
+            if "customers" in statement:
+                plans.extend(
+                    row[-1]
+                    for row in cursor.connection.execute(
+                        f"EXPLAIN QUERY PLAN {statement}", parameters
+                    )
+                )
+
+        event.listen(self.engine, "before_cursor_execute", _before)
+        try:
+            self.assertIsNone(_match_customer_by_phone(self.db, "0555 000 00 00"))
+        finally:
+            event.remove(self.engine, "before_cursor_execute", _before)
+        self.assertTrue(plans)
+        self.assertFalse([plan for plan in plans if plan.startswith("SCAN")], plans)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import io
+import sys
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+from types import SimpleNamespace
+
+from openpyxl import load_workbook
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+SCRIPTS_DIR = BACKEND_DIR / "scripts"
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from app.constants.excel_schema import REQUIRED_COLUMNS  # noqa: E402
+from app.features.orders.transport.http.router import _create_opti_xlsx  # noqa: E402
+from app.services.bridge_service import OPTI_COLUMNS, generate_optiplan_xlsx  # noqa: E402
+from app.services.export import generate_xlsx_for_job  # noqa: E402
+from bench_opti_xlsx import build_order  # noqa: E402
+
+
+def _sheet_xml(data) -> str:
+    with zipfile.ZipFile(io.BytesIO(data) if isinstance(data, bytes) else data) as zf:
+        return zf.read("xl/worksheets/sheet1.xml").decode()
+
+
+class OptiXlsxWriterTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.order = build_order(10)
+
+    def test_bridge_workbook_layout(self):
+        files = generate_optiplan_xlsx(self.order, self.order.parts)
+        self.assertEqual(set(files), {"GOVDE", "ARKALIK"})
+
+        ws = load_workbook(io.BytesIO(files["GOVDE"]))["GOVDE"]
+        self.assertEqual([c.value for c in ws[1]], OPTI_COLUMNS)
+        self.assertTrue(ws["A1"].font.b)
+        self.assertEqual(ws["A1"].fill.fgColor.rgb, "00FFD700")
+        self.assertEqual(ws["A1"].alignment.horizontal, "center")
+        self.assertEqual(
+            [c.value for c in ws[2]],
+            ["BEYAZ18", 300, 150, 1, 0, "18mm, 10.0mm trim", "0.8", "0.8", None, None, "BEYAZ", "Kapak 0"],
+        )
+        self.assertEqual(ws.max_row, 9)
+        self.assertEqual(ws.column_dimensions["F"].width, 19)  # len("18mm, 10.0mm trim") + 2
+        self.assertIn('<dimension ref="A1:L9" />', _sheet_xml(files["GOVDE"]))
+
+        arkalik = load_workbook(io.BytesIO(files["ARKALIK"]))["ARKALIK"]
+        self.assertEqual([c.value for c in arkalik[2]][6:10], [None, None, None, None])
+
+    def test_job_export_matches_pandas_layout(self):
+        job = SimpleNamespace(id="j1", order=self.order, customer_snapshot_name="Bench Mobilya")
+        paths = generate_xlsx_for_job(job, self.order.parts, self.tmp.name)
+        self.assertEqual(len(paths), 2)
+        self.assertFalse(list(Path(self.tmp.name).glob("*.tmp.xlsx")))
+
+        govde = next(p for p in paths if p.upper().endswith("GOVDE.XLSX"))
+        ws = load_workbook(govde)["Sheet1"]
+        self.assertEqual([c.value for c in ws[1]], REQUIRED_COLUMNS)
+        self.assertFalse(ws["A1"].has_style)
+        self.assertEqual([c.value for c in ws[2]], [1, "1", 300, 150, 1, "0-Material", "1", "1", None, None])
+        self.assertIn('<c r="I2" t="inlineStr" />', _sheet_xml(govde))
+        self.assertIn('<dimension ref="A1:J9" />', _sheet_xml(govde))
+
+    def test_order_sheet_styles_and_metadata(self):
+        path = str(Path(self.tmp.name) / "sheet.xlsx")
+        govde = [p for p in self.order.parts if p.part_group == "GOVDE"]
+        _create_opti_xlsx(path, govde, self.order)
+
+        ws = load_workbook(path)["OptiPlan"]
+        self.assertEqual([ws.cell(1, c).value for c in (1, 2, 3, 4)], ["Sipariş", "TS-BENCH", "Müşteri", "Bench Mobilya"])
+        self.assertEqual(ws["B2"].value, "MDFLAM")
+        self.assertEqual(ws["L2"].value, "GOVDE")
+        self.assertEqual(ws["A1"].font.color.rgb, "001F4E79")
+        self.assertEqual(ws["A1"].fill.fgColor.rgb, "00D6E4F0")
+        self.assertIsNone(ws["A3"].value)
+        self.assertEqual(ws["A4"].value, "Boy")
+        self.assertEqual(ws["A4"].fill.fgColor.rgb, "002E75B6")
+        self.assertEqual([c.value for c in ws[5]], [300, 150, 1, "0-Material", 1, 1, 0, 0, "Kapak 0", None, None, None])
+        self.assertEqual(ws["K5"].border.left.style, "thin")
+        self.assertEqual(ws.max_row, 12)
+        self.assertEqual(ws.column_dimensions["I"].width, 20)
+        self.assertEqual(ws.column_dimensions["L"].width, 14)
+
+    def test_ten_thousand_part_order(self):
+        order = build_order(10_000)
+        job = SimpleNamespace(id="big", order=order, customer_snapshot_name="Bench Mobilya")
+        paths = generate_xlsx_for_job(job, order.parts, self.tmp.name)
+
+        rows = {}
+        for path in paths:
+            ws = load_workbook(path, read_only=True)["Sheet1"]
+            rows[Path(path).stem.rsplit("_", 1)[-1].upper()] = ws.max_row - 1
+            last = list(ws.iter_rows(min_row=ws.max_row, values_only=True))[0]
+            self.assertIsNotNone(last[0])
+        self.assertEqual(rows, {"GOVDE": 8000, "ARKALIK": 2000})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,230 @@
+import sys
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.auth import get_current_user  # noqa: E402
+from app.database import Base  # noqa: E402
+from app.exceptions import BusinessRuleError  # noqa: E402
+from app.models import PartCurrentStatus, Station, StatusLog, User  # noqa: E402
+from app.routers import stations_router  # noqa: E402
+from app.services.part_status_service import (  # noqa: E402
+    check_part_status_consistency,
+    ensure_part_status_projection,
+    get_current_status,
+    rebuild_part_status,
+)
+
+
+class PartStatusProjectionTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        Base.metadata.create_all(bind=self.engine)
+        with self.SessionLocal() as db:
+            db.add_all([Station(name="HAZIRLIK"), Station(name="EBATLAMA")])
+            db.commit()
+            self.stations = {s.name: s.id for s in db.query(Station).all()}
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def _log(self, part_id, station, status="IN_PROGRESS", minutes_ago=0):
+        with self.SessionLocal() as db:
+            log = StatusLog(
+                part_id=part_id,
+                station_id=self.stations[station],
+                status=status,
+                created_at=datetime.now(timezone.utc) - timedelta(minutes=minutes_ago),
+            )
+            db.add(log)
+            db.commit()
+            return log.id
+
+    def _projection(self):
+        with self.SessionLocal() as db:
+            return {
+                p.part_id: (p.status_log_id, p.station_id, p.status)
+                for p in db.query(PartCurrentStatus).all()
+            }
+
+    def test_insert_updates_projection_in_same_transaction(self):
+        first = self._log(1, "HAZIRLIK", minutes_ago=40)
+        self.assertEqual(self._projection(), {1: (first, self.stations["HAZIRLIK"], "IN_PROGRESS")})
+
+        second = self._log(1, "EBATLAMA", status="REJECTED")
+        other = self._log(2, "HAZIRLIK")
+        self.assertEqual(
+            self._projection(),
+            {
+                1: (second, self.stations["EBATLAMA"], "REJECTED"),
+                2: (other, self.stations["HAZIRLIK"], "IN_PROGRESS"),
+            },
+        )
+
+        with self.SessionLocal() as db:
+            db.add(StatusLog(part_id=3, station_id=self.stations["HAZIRLIK"], status="IN_PROGRESS"))
+            db.rollback()
+        self.assertNotIn(3, self._projection())
+
+    def test_lookup_is_primary_key_read(self):
+        self._log(7, "HAZIRLIK")
+        statements = []
+
+        def _capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(self.engine, "before_cursor_execute", _capture)
+        try:
+            with self.SessionLocal() as db:
+                current = get_current_status(db, 7)
+        finally:
+            event.remove(self.engine, "before_cursor_execute", _capture)
+
+        self.assertEqual(current.station_id, self.stations["HAZIRLIK"])
+        self.assertEqual(len(statements), 1)
+        self.assertNotIn("status_logs", statements[0])
+        self.assertNotIn("ORDER BY", statements[0])
+
+    def test_rebuild_matches_latest_log_per_part(self):
+        self._log(1, "HAZIRLIK", minutes_ago=30)
+        latest = self._log(1, "EBATLAMA", minutes_ago=5)
+        only = self._log(2, "HAZIRLIK", minutes_ago=60)
+        with self.SessionLocal() as db:
+            db.query(PartCurrentStatus).delete()
+            db.commit()
+            self.assertTrue(ensure_part_status_projection(db))
+            self.assertFalse(ensure_part_status_projection(db))
+            self.assertEqual(rebuild_part_status(db), 2)
+
+        projection = self._projection()
+        self.assertEqual(projection[1][0], latest)
+        self.assertEqual(projection[2][0], only)
+
+    def test_consistency_check_detects_and_repairs_drift(self):
+        self._log(1, "HAZIRLIK", minutes_ago=30)
+        self._log(1, "EBATLAMA", minutes_ago=5)
+        self._log(2, "HAZIRLIK")
+        self._log(3, "HAZIRLIK")
+        expected = self._projection()
+
+        with self.SessionLocal() as db:
+            db.get(PartCurrentStatus, 1).station_id = self.stations["HAZIRLIK"]
+            db.delete(db.get(PartCurrentStatus, 2))
+            db.add(
+                PartCurrentStatus(
+                    part_id=99, status_log_id=999, station_id=self.stations["HAZIRLIK"], status="X"
+                )
+            )
+            db.commit()
+
+            report = check_part_status_consistency(db)
+            self.assertEqual(
+                (report["checked_parts"], report["missing"], report["stale"], report["orphaned"]),
+                (3, 1, 1, 1),
+            )
+            self.assertEqual(report["sample_part_ids"], [1, 2, 99])
+            self.assertFalse(report["consistent"])
+            self.assertFalse(report["repaired"])
+
+            self.assertTrue(check_part_status_consistency(db, repair=True)["repaired"])
+            self.assertTrue(check_part_status_consistency(db)["consistent"])
+        self.assertEqual(self._projection(), expected)
+
+
+class StationScanProjectionTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        Base.metadata.create_all(bind=self.engine)
+        with self.SessionLocal() as db:
+            db.add_all([Station(name="HAZIRLIK"), Station(name="EBATLAMA")])
+            user = User(
+                username="testop",
+                email="testop@test.com",
+                password_hash="x",
+                role="OPERATOR",
+                is_active=True,
+            )
+            db.add(user)
+            db.commit()
+            self.stations = {s.name: s.id for s in db.query(Station).all()}
+            user_id = user.id
+
+        app = FastAPI()
+        app.include_router(stations_router.router, prefix="/api/v1")
+
+        def override_get_db():
+            db = self.SessionLocal()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        def override_get_current_user():
+            with self.SessionLocal() as db:
+                return db.get(User, user_id)
+
+        app.dependency_overrides[stations_router.get_db] = override_get_db
+        app.dependency_overrides[get_current_user] = override_get_current_user
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        self.client.close()
+        self.engine.dispose()
+
+    def _seed(self, part_id, minutes_ago):
+        with self.SessionLocal() as db:
+            db.add(
+                StatusLog(
+                    part_id=part_id,
+                    station_id=self.stations["HAZIRLIK"],
+                    status="IN_PROGRESS",
+                    created_at=datetime.now(timezone.utc) - timedelta(minutes=minutes_ago),
+                )
+            )
+            db.commit()
+
+    def _scan(self, part_id):
+        return self.client.post(
+            "/api/v1/api/v1/stations/scan",
+            json={"order_id": "ORD-1", "part_id": part_id, "station_id": self.stations["EBATLAMA"]},
+        )
+
+    def test_early_second_scan_is_rejected_from_projection(self):
+        self._seed(10, minutes_ago=10)
+        with self.assertRaises(BusinessRuleError):
+            self._scan(10)
+        with self.SessionLocal() as db:
+            current = get_current_status(db, 10)
+            self.assertEqual((current.station_id, current.status), (self.stations["EBATLAMA"], "REJECTED"))
+
+    def test_scan_after_wait_advances_projection(self):
+        self._seed(11, minutes_ago=31)
+        response = self._scan(11)
+        self.assertEqual(response.status_code, 200, response.text)
+        with self.SessionLocal() as db:
+            current = get_current_status(db, 11)
+            self.assertEqual((current.station_id, current.status), (self.stations["EBATLAMA"], "IN_PROGRESS"))
+
+
+if __name__ == "__main__":
+    unittest.main()
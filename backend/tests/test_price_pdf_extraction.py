@@ -0,0 +1,69 @@
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+pytest.importorskip("pdfplumber")
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+FIXTURE_DIR = Path(__file__).parent / "fixtures" / "price_pdf"
+if str(FIXTURE_DIR) not in sys.path:
+    sys.path.insert(0, str(FIXTURE_DIR))
+
+from app.services.price_tracking_pdf import extract_page_range, extract_pages  # noqa: E402
+from app.services.price_tracking_service import PriceTrackingService  # noqa: E402
+from generate import ROWS_PER_PAGE, build_catalog  # noqa: E402
+
+
+class PricePdfExtractionTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def _catalog(self, pages, text_every):
+        return str(build_catalog(Path(self.tmp.name) / "katalog.pdf", pages, text_every))
+
+    def test_parallel_extraction_reassembles_pages_in_order(self):
+        path = self._catalog(pages=18, text_every=6)
+        serial = extract_pages(path, workers=1)
+        parallel = extract_pages(path, workers=2, pages_per_task=4)
+
+        self.assertEqual([p.index for p in parallel], list(range(18)))
+        self.assertEqual([p.tables for p in parallel], [p.tables for p in serial])
+        self.assertEqual([p.index for p in parallel if not p.tables], [5, 11, 17])
+        self.assertEqual(parallel[0].tables[0][1][0], "P000000")
+        self.assertEqual(parallel[16].tables[0][1][0], f"P{16 * ROWS_PER_PAGE:06d}")
+
+    def test_page_timeout_yields_empty_page(self):
+        path = self._catalog(pages=2, text_every=0)
+        pages = extract_page_range(path, 0, 2, page_timeout=0.0001)
+        self.assertEqual([(p.index, p.tables, p.error) for p in pages], [(0, [], "timeout"), (1, [], "timeout")])
+
+    def test_only_tableless_pages_go_to_ai_fallback(self):
+        path = self._catalog(pages=12, text_every=6)
+        ai_items = [{"urun_adi": "Ozel Seri Kulp", "liste_fiyati": 245.0, "birim": "ADET"}]
+        with patch(
+            "app.services.price_tracking_service.extract_price_data_from_text",
+            return_value=ai_items,
+        ) as ai:
+            df = PriceTrackingService._process_pdf(path, "Demo Supplier")
+
+        ai.assert_called_once()
+        sent = ai.call_args.args[0]
+        self.assertIn("Kampanya Sayfasi 6", sent)
+        self.assertIn("Kampanya Sayfasi 12", sent)
+        self.assertNotIn("P000000", sent)
+
+        self.assertEqual(len(df), 10 * ROWS_PER_PAGE + 1)
+        self.assertNotIn("Stok Kodu", set(df["URUN_KODU"].dropna()))  # tekrarlanan başlıklar atlandı
+        self.assertEqual(df.iloc[0]["URUN_KODU"], "P000000")
+        self.assertEqual(df.iloc[-1]["URUN_ADI"], "Ozel Seri Kulp")
+
+
+if __name__ == "__main__":
+    unittest.main()
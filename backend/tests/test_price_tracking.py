@@ -4,6 +4,7 @@ Price Tracking integration tests:
 2) Service helpers / derived calculations
 3) Router access control
 """
+import io
 import unittest
 from datetime import datetime, UTC
 from pathlib import Path
@@ -26,10 +27,11 @@ if str(BACKEND_DIR) not in sys.path:
 from app.auth import get_current_user  # noqa: E402
 from app.database import Base, get_db  # noqa: E402
 from app.exceptions import AppError, AuthorizationError, ValidationError  # noqa: E402
-from app.models import PriceUploadJob, User  # noqa: E402
+from app.models import PriceItem, PriceUploadJob, User  # noqa: E402
 from app.permissions import Permission, get_permissions_for_role  # noqa: E402
 from app.routers import price_tracking_router  # noqa: E402
 from app.services.price_tracking_helpers import normalize_columns  # noqa: E402
+from app.services import price_tracking_service  # noqa: E402
 from app.services.price_tracking_service import PriceTrackingService  # noqa: E402
 
 
@@ -320,6 +322,126 @@ class TestPriceTrackingRouterPermissions(unittest.TestCase):
             self.assertEqual(resp.status_code, 204)
 
 
+class TestPriceBulkIngest(unittest.TestCase):
+    ROWS = 5000
+
+    def setUp(self):
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        Base.metadata.create_all(bind=self.engine)
+        with self.SessionLocal() as db:
+            user = User(
+                email="ingest@test.local",
+                username="ingest",
+                display_name="Ingest",
+                role="OPERATOR",
+                is_active=True,
+            )
+            db.add(user)
+            db.commit()
+            self.user_id = user.id
+
+        df = pd.DataFrame(
+            {
+                "Ürün Kodu": [f"K{i:05d}" for i in range(self.ROWS)],
+                "Product Name": [f"Menteşe {i}" for i in range(self.ROWS)],
+                "Price": [100.0 + i for i in range(self.ROWS)],
+                "Discount %": [10.0] * self.ROWS,
+                "Renk": ["ALTIN/MAT FÜME" if i == 0 else "BEYAZ" for i in range(self.ROWS)],
+            }
+        )
+        buffer = io.BytesIO()
+        df.to_excel(buffer, index=False)
+        self.file_data = buffer.getvalue()
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def _upload(self, file_data=None, supplier="Demo Supplier"):
+        with self.SessionLocal() as db:
+            user = db.get(User, self.user_id)
+            job = PriceTrackingService.upload_and_process(
+                db=db,
+                file_data=file_data or self.file_data,
+                filename="prices.xlsx",
+                content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                supplier=supplier,
+                user=user,
+            )
+            return job.id
+
+    def test_bulk_ingest_writes_all_rows_in_chunks(self):
+        with patch.object(price_tracking_service, "INGEST_CHUNK_SIZE", 1000), patch.object(
+            price_tracking_service.logger, "info"
+        ) as log_info:
+            job_id = self._upload()
+
+        with self.SessionLocal() as db:
+            job = db.get(PriceUploadJob, job_id)
+            self.assertEqual(job.status, "COMPLETED")
+            self.assertEqual(job.rows_extracted, self.ROWS + 1)  # ilk satır iki renge açıldı
+            self.assertEqual(job.rows_processed, self.ROWS + 1)
+            item = db.query(PriceItem).filter(PriceItem.urun_kodu == "K00010").one()
+            self.assertEqual(item.urun_adi, "Menteşe 10")
+            self.assertAlmostEqual(float(item.net_fiyat), 99.0, places=2)
+            self.assertAlmostEqual(float(item.kdv_dahil_fiyat), 118.8, places=2)
+            self.assertEqual(item.birim, "ADET")
+            colors = [
+                i.renk for i in db.query(PriceItem).filter(PriceItem.urun_kodu == "K00000").all()
+            ]
+            self.assertEqual(sorted(colors), ["ALTIN", "MAT FÜME"])
+
+        progress = [c.args for c in log_info.call_args_list if c.args[0].startswith("Fiyat yazımı")]
+        self.assertEqual([args[2] for args in progress], [1000, 2000, 3000, 4000, 5000, 5001])
+
+    def test_identical_reupload_is_idempotent(self):
+        first = self._upload()
+        self.assertEqual(self._upload(), first)
+        other_supplier = self._upload(supplier="Başka Tedarikçi")
+        self.assertNotEqual(other_supplier, first)
+
+        with self.SessionLocal() as db:
+            self.assertEqual(db.query(PriceUploadJob).count(), 2)
+            self.assertEqual(
+                db.query(PriceItem).filter(PriceItem.job_id == first).count(), self.ROWS + 1
+            )
+
+    def test_failed_job_leaves_no_partial_items_and_can_be_retried(self):
+        original = PriceTrackingService._bulk_insert_items
+
+        def _fail_after_first_chunk(db, job, records):
+            original(db, job, records[:10])
+            raise RuntimeError("disk dolu")
+
+        with patch.object(
+            PriceTrackingService, "_bulk_insert_items", side_effect=_fail_after_first_chunk
+        ):
+            failed = self._upload()
+
+        retried = self._upload()
+        self.assertNotEqual(retried, failed)
+        with self.SessionLocal() as db:
+            self.assertEqual(db.get(PriceUploadJob, failed).status, "FAILED")
+            self.assertEqual(db.query(PriceItem).filter(PriceItem.job_id == failed).count(), 0)
+            self.assertEqual(db.get(PriceUploadJob, retried).status, "COMPLETED")
+
+    def test_explode_multi_color_keeps_row_order(self):
+        df = pd.DataFrame(
+            {
+                "URUN_ADI": ["A", "B", "C", "D"],
+                "RENK": ["KIRMIZI / MAVİ", None, "YEŞİL/", " SİYAH "],
+            }
+        )
+        out = PriceTrackingService._explode_multi_color(df)
+        self.assertEqual(out["URUN_ADI"].tolist(), ["A", "A", "B", "C", "D"])
+        self.assertEqual(out["RENK"].tolist()[:2], ["KIRMIZI", "MAVİ"])
+        self.assertEqual(out["RENK"].tolist()[3:], ["YEŞİL/", " SİYAH "])
+
+
 if __name__ == "__main__":
     unittest.main()
 
@@ -0,0 +1,162 @@
+import sys
+import unittest
+from pathlib import Path
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.database import Base  # noqa: E402
+from app.models import (  # noqa: E402
+    Brand,
+    Color,
+    MaterialSpec,
+    MaterialSpecToken,
+    ProductType,
+    SupplierItem,
+)
+from app.services.product_service import (  # noqa: E402
+    ProductService,
+    ensure_spec_search_index,
+)
+
+
+class SpecSearchTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        Base.metadata.create_all(bind=self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+        self.mlm = ProductType(code="MELAMIN", short_code="MLM", name="Melamin")
+        self.mdf = ProductType(code="MDF", short_code="MDF", name="MDF Lam")
+        self.beyaz = Color(code="BEYAZ", name="Beyaz")
+        self.gri = Color(code="ANTRASIT", name="Açık Gri")
+        self.brands = [Brand(code=f"B{i}", name=f"Marka {i}") for i in range(3)]
+        self.db.add_all([self.mlm, self.mdf, self.beyaz, self.gri, *self.brands])
+        self.db.commit()
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+
+    def _spec(self, pt, color, thickness, width=210, brands=0):
+        spec = MaterialSpec(
+            product_type_id=pt.id,
+            color_id=color.id,
+            thickness_mm=thickness,
+            width_cm=width,
+            height_cm=280,
+            spec_code=f"{pt.short_code}-{color.code}-{thickness:g}-{width}x280",
+        )
+        self.db.add(spec)
+        self.db.flush()
+        for priority, brand in enumerate(self.brands[:brands]):
+            self.db.add(SupplierItem(spec_id=spec.id, brand_id=brand.id, priority=priority))
+        self.db.commit()
+        return spec
+
+    def _count_queries(self, func):
+        statements = []
+
+        def _before(_conn, _cursor, statement, *_args):
+            statements.append(statement)
+
+        event.listen(self.engine, "before_cursor_execute", _before)
+        try:
+            result = func()
+        finally:
+            event.remove(self.engine, "before_cursor_execute", _before)
+        return result, len(statements)
+
+    def test_ranked_by_term_coverage(self):
+        white_18 = self._spec(self.mlm, self.beyaz, 18, brands=1)
+        grey_18 = self._spec(self.mlm, self.gri, 18, brands=2)
+        white_8 = self._spec(self.mdf, self.beyaz, 8)
+
+        results = ProductService(self.db).search_specs(query="beyaz 18")
+        self.assertEqual([r["spec"].id for r in results], [white_18.id, grey_18.id, white_8.id])
+        self.assertEqual([r["score"] for r in results], [2, 1, 1])
+        self.assertEqual(
+            [r["match_status"] for r in results], ["MATCHED", "AMBIGUOUS", "NO_MATCH"]
+        )
+        # Firma varyantları önceliğe göre
+        self.assertEqual([si.priority for si in results[1]["supplier_items"]], [1, 0])
+
+        # Türkçe katlama, önek ve ondalık yazım
+        hits = ProductService(self.db).search_specs(query="ACIK gr 18.0")
+        self.assertEqual((hits[0]["spec"].id, hits[0]["score"]), (grey_18.id, 3))
+        self.assertEqual(
+            [r["spec"].id for r in ProductService(self.db).search_specs(query="mdf-beyaz")],
+            [white_8.id],
+        )
+        self.assertEqual(ProductService(self.db).search_specs(query="yok"), [])
+
+    def test_filters_and_inactive_supplier_items(self):
+        spec = self._spec(self.mlm, self.beyaz, 18, brands=2)
+        self._spec(self.mlm, self.beyaz, 8)
+        spec.supplier_items[0].is_active = False
+        self.db.commit()
+        self.db.expire_all()
+
+        results = ProductService(self.db).search_specs(query="beyaz", thickness_mm=18)
+        self.assertEqual([r["spec"].id for r in results], [spec.id])
+        self.assertEqual(results[0]["match_status"], "MATCHED")
+        self.assertEqual(len(ProductService(self.db).search_specs()), 2)
+
+    def test_index_follows_renames(self):
+        spec = self._spec(self.mlm, self.beyaz, 18)
+        self.beyaz.name = "Kar Beyazı"
+        self.db.commit()
+        self.assertEqual(
+            [r["spec"].id for r in ProductService(self.db).search_specs(query="kar")], [spec.id]
+        )
+        spec.thickness_mm = 25
+        self.db.commit()
+        self.assertEqual(
+            [r["spec"].id for r in ProductService(self.db).search_specs(query="25")], [spec.id]
+        )
+
+    def test_query_count_independent_of_result_size(self):
+        def run():
+            self.db.expire_all()
+            return ProductService(self.db).search_specs(query="mlm beyaz", limit=200)
+
+        self._spec(self.mlm, self.beyaz, 18, brands=3)
+        small, small_queries = self._count_queries(run)
+
+        for width in range(100, 160):
+            self._spec(self.mlm, self.beyaz, 18, width=width, brands=2)
+        large, large_queries = self._count_queries(run)
+
+        self.assertEqual((len(small), len(large)), (1, 61))
+        self.assertEqual(small_queries, large_queries)
+        self.assertLessEqual(large_queries, 2)
+
+        # Router'ın dokunduğu ilişkiler ek sorgu üretmez
+        def serialize():
+            return [
+                (r["product_type"].name, r["color"].name, [si.brand.name for si in r["supplier_items"]])
+                for r in large
+            ]
+
+        _, extra = self._count_queries(serialize)
+        self.assertEqual(extra, 0)
+
+    def test_ensure_builds_missing_index(self):
+        self._spec(self.mlm, self.beyaz, 18)
+        self.db.query(MaterialSpecToken).delete()
+        self.db.commit()
+        self.assertTrue(ensure_spec_search_index(self.db))
+        self.assertFalse(ensure_spec_search_index(self.db))
+        self.assertEqual(len(ProductService(self.db).search_specs(query="beyaz")), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,166 @@
+import asyncio
+import multiprocessing
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.database import Base  # noqa: E402
+from app.models import SchedulerLease  # noqa: E402
+from app.tasks import reminders  # noqa: E402
+from app.tasks.leader_election import LeaderElector  # noqa: E402
+
+LEASE_SECONDS = 1.0
+SLOT_SECONDS = 0.1
+
+
+def _scheduler_process(db_url, barrier, run_seconds):
+    """Bir API işçisi gibi: kira için yarışır, lider olduğu her zaman diliminde işi bir kez çalıştırır."""
+    engine = create_engine(db_url, connect_args={"timeout": 30})
+    elector = LeaderElector(lease_seconds=LEASE_SECONDS, session_factory=sessionmaker(bind=engine))
+    barrier.wait()
+    elector.start()
+    deadline = time.monotonic() + run_seconds
+    last_slot = None
+    while time.monotonic() < deadline:
+        slot = int(time.time() / SLOT_SECONDS)
+        if slot != last_slot and elector.is_leader():
+            with engine.begin() as conn:
+                conn.execute(
+                    text("INSERT INTO job_runs (slot, holder) VALUES (:slot, :holder)"),
+                    {"slot": slot, "holder": elector.holder},
+                )
+            last_slot = slot
+        time.sleep(SLOT_SECONDS / 5)
+    elector.stop()
+    engine.dispose()
+
+
+class LeaderElectorTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        Base.metadata.create_all(bind=self.engine)
+        self.SessionLocal = sessionmaker(bind=self.engine)
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def _elector(self, holder, lease=0.6):
+        return LeaderElector(lease_seconds=lease, session_factory=self.SessionLocal, holder=holder)
+
+    def test_single_holder_expiry_and_release(self):
+        a, b = self._elector("a"), self._elector("b")
+        self.assertTrue(a.try_acquire())
+        self.assertFalse(b.try_acquire())
+        self.assertTrue(a.try_acquire())  # Yenileme
+        self.assertEqual((a.is_leader(), b.is_leader()), (True, False))
+
+        # Yenilemeyen lider, kira DB'de dolmadan kendini lider saymayı bırakır
+        time.sleep(0.45)
+        self.assertFalse(a.is_leader())
+        self.assertFalse(b.try_acquire())
+        time.sleep(0.2)
+        self.assertTrue(b.try_acquire())
+        self.assertFalse(a.try_acquire())
+
+        b.release()
+        self.assertFalse(b.is_leader())
+        self.assertTrue(a.try_acquire())
+        with self.SessionLocal() as db:
+            self.assertEqual(db.get(SchedulerLease, "scheduler").holder, "a")
+
+    def test_db_error_keeps_local_lease_until_it_runs_out(self):
+        a = self._elector("a")
+        self.assertTrue(a.try_acquire())
+        broken = MagicMock()
+        broken.execute.side_effect = RuntimeError("db down")
+        a._session_factory = lambda: broken
+        self.assertTrue(a.try_acquire())
+        time.sleep(0.45)
+        self.assertFalse(a.try_acquire())
+
+    def test_jobs_only_run_on_leader(self):
+        calls = []
+
+        async def async_job():
+            calls.append("async")
+
+        sync_job = reminders._leader_only(lambda: calls.append("sync"))
+        async_job = reminders._leader_only(async_job)
+        leader = MagicMock()
+        with patch.object(reminders, "LEADER_ELECTION_ENABLED", True), patch.object(
+            reminders, "_scheduler_leader", leader
+        ):
+            leader.is_leader.return_value = False
+            sync_job()
+            asyncio.run(async_job())
+            self.assertEqual(calls, [])
+
+            leader.is_leader.return_value = True
+            sync_job()
+            asyncio.run(async_job())
+        self.assertEqual(calls, ["sync", "async"])
+
+        with patch.object(reminders, "LEADER_ELECTION_ENABLED", False):
+            sync_job()
+        self.assertEqual(calls[-1], "sync")
+
+
+class MultiProcessLeaderTest(unittest.TestCase):
+    def test_no_job_runs_twice_and_leadership_fails_over(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        db_url = f"sqlite:///{Path(tmp.name) / 'leader.db'}"
+        engine = create_engine(db_url)
+        Base.metadata.create_all(bind=engine, tables=[SchedulerLease.__table__])
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE job_runs (slot INTEGER, holder TEXT)"))
+
+        ctx = multiprocessing.get_context("spawn")
+        barrier = ctx.Barrier(4)
+        processes = [
+            ctx.Process(target=_scheduler_process, args=(db_url, barrier, 4.5)) for _ in range(3)
+        ]
+        for process in processes:
+            process.start()
+        self.addCleanup(lambda: [p.kill() for p in processes if p.is_alive()])
+        barrier.wait(timeout=120)
+
+        # İlk lider çalışırken kesilir (kirayı bırakmadan, çöken işçi gibi)
+        time.sleep(1.5)
+        with engine.connect() as conn:
+            holder = conn.execute(text("SELECT holder FROM scheduler_leases")).scalar_one()
+        leader_pid = int(holder.split(":")[1])
+        next(p for p in processes if p.pid == leader_pid).terminate()
+        for process in processes:
+            process.join(timeout=60)
+
+        with engine.connect() as conn:
+            runs = conn.execute(text("SELECT slot, holder FROM job_runs ORDER BY slot")).all()
+        engine.dispose()
+
+        slots = [slot for slot, _ in runs]
+        self.assertEqual(len(slots), len(set(slots)), "aynı zaman diliminde iş iki kez çalıştı")
+        self.assertGreaterEqual(len({h for _, h in runs}), 2)
+        self.assertEqual(runs[0][1], holder)
+        # Devir süresi: kira + yenileme aralığı (+ zamanlama payı)
+        max_gap = max(b - a for a, b in zip(slots, slots[1:])) * SLOT_SECONDS
+        self.assertLess(max_gap, LEASE_SECONDS * 4 / 3 + 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,207 @@
+import asyncio
+import json
+import sys
+import unittest
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.auth import get_current_user  # noqa: E402
+from app.database import Base, get_db  # noqa: E402
+from app.models import Customer, Order, SearchDocument, StockCard, User  # noqa: E402
+from app.routers import ai_assistant_router  # noqa: E402
+from app.services import ai_assistant_service  # noqa: E402
+from app.services.search_index_service import (  # noqa: E402
+    ensure_search_index,
+    rebuild_search_index,
+    search,
+)
+
+
+class SearchIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        Base.metadata.create_all(bind=self.engine)
+        with self.SessionLocal() as db:
+            user = User(username="planner", email="p@test.com", password_hash="x", role="ADMIN", is_active=True)
+            customer = Customer(name="Çağlar Mobilya", phone="05321234567")
+            db.add_all([user, customer])
+            db.flush()
+            db.add_all(
+                [
+                    Order(
+                        order_no=101,
+                        ts_code="TS-101",
+                        customer_id=customer.id,
+                        crm_name_snapshot="Çağlar Mobilya",
+                        phone_norm="+905321234567",
+                        thickness_mm=18,
+                        color="BEYAZ",
+                        material_name="MDFLAM",
+                        status="NEW",
+                    ),
+                    Order(
+                        order_no=102,
+                        ts_code="TS-102",
+                        customer_id=customer.id,
+                        crm_name_snapshot="Çağlar Mobilya",
+                        phone_norm="+905321234567",
+                        thickness_mm=8,
+                        color="CEVİZ",
+                        material_name="SUNTALAM",
+                        status="DONE",
+                    ),
+                    StockCard(id=str(uuid.uuid4()), stock_code="MDF-18-BYZ", stock_name="Beyaz Parlak MDF"),
+                ]
+            )
+            db.commit()
+            self.user_id = user.id
+            self.customer_id = customer.id
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def _search(self, query, scope="all", limit=20):
+        with self.SessionLocal() as db:
+            return [(h.type, h.title) for h in search(db, query, scope=scope, limit=limit)]
+
+    def test_orm_writes_keep_index_current(self):
+        # Türkçe katlama + önek eşleşme
+        self.assertEqual(self._search("caglar", scope="customers"), [("customer", "Çağlar Mobilya")])
+        self.assertEqual(self._search("mdfla beyaz", scope="orders"), [("order", "Sipariş #101")])
+        self.assertEqual(self._search("parlak"), [("product", "MDF-18-BYZ - Beyaz Parlak MDF")])
+
+        with self.SessionLocal() as db:
+            customer = db.get(Customer, self.customer_id)
+            customer.name = "Yıldız Ahşap"
+            db.query(Order).filter(Order.order_no == 101).one().deleted_at = datetime.now(timezone.utc)
+            db.commit()
+        self.assertEqual(self._search("caglar", scope="customers"), [])
+        self.assertEqual(self._search("yildiz"), [("customer", "Yıldız Ahşap")])
+        self.assertEqual(self._search("mdflam", scope="orders"), [])
+
+        with self.SessionLocal() as db:
+            db.delete(db.query(StockCard).one())
+            db.commit()
+        self.assertEqual(self._search("parlak"), [])
+
+    def test_unrelated_updates_do_not_rewrite_documents(self):
+        statements = []
+        event.listen(self.engine, "before_cursor_execute", lambda *a: statements.append(a[2]))
+        with self.SessionLocal() as db:
+            db.query(Order).filter(Order.order_no == 102).one().reminder_count = 3
+            db.commit()
+        self.assertFalse([s for s in statements if "search_documents" in s])
+
+    def test_multi_term_falls_back_to_any_term(self):
+        hits = self._search("ceviz olmayan-kelime", scope="orders")
+        self.assertEqual(hits, [("order", "Sipariş #102")])
+        self.assertEqual(self._search("   "), [])
+        with self.SessionLocal() as db, self.assertRaises(ValueError):
+            search(db, "mdf", scope="invoices")
+
+    def test_rebuild_and_ensure(self):
+        with self.SessionLocal() as db:
+            db.query(SearchDocument).delete()
+            db.commit()
+            self.assertEqual(self._search("caglar"), [])
+            self.assertTrue(ensure_search_index(db))
+            self.assertFalse(ensure_search_index(db))
+            self.assertEqual(rebuild_search_index(db), 4)
+        self.assertEqual(len(self._search("caglar")), 3)
+
+    def test_smart_search_sends_only_top_k_candidates_to_llm(self):
+        service = ai_assistant_service.AIAssistantService.__new__(ai_assistant_service.AIAssistantService)
+        service.gemini_service = MagicMock()
+        service.gemini_service.generate_text_response = AsyncMock(
+            return_value={
+                "success": True,
+                "response": json.dumps(
+                    {
+                        "results": [
+                            {"type": "order", "id": "999", "relevance_score": 0.99},
+                            {"type": "order", "id": "1", "relevance_score": 0.9},
+                        ],
+                        "suggestions": ["ceviz"],
+                    }
+                ),
+            }
+        )
+        with self.SessionLocal() as db:
+            result = asyncio.run(service.smart_search(self.user_id, "mobilya", limit=2, use_llm=True, db=db))
+
+        prompt = service.gemini_service.generate_text_response.call_args.kwargs["prompt"]
+        self.assertEqual(prompt.count('"title":'), 2)
+        self.assertEqual(result["source"], "llm")
+        ranked = [(r["type"], r["id"]) for r in result["search_results"]["results"]]
+        self.assertEqual(ranked[0], ("order", "1"))
+        self.assertEqual(len(ranked), 2)  # Sıralanmayan aday sona eklenir
+        self.assertEqual(result["search_results"]["total_results"], 2)
+        self.assertEqual(result["search_results"]["suggestions"], ["ceviz"])
+
+        with self.SessionLocal() as db:
+            offline = asyncio.run(service.smart_search(self.user_id, "mobilya", use_llm=False, db=db))
+        self.assertEqual(service.gemini_service.generate_text_response.await_count, 1)
+        self.assertEqual(offline["source"], "index")
+        self.assertEqual(offline["search_results"]["total_results"], 3)
+
+    def test_smart_search_falls_back_to_index_order_on_bad_rerank(self):
+        service = ai_assistant_service.AIAssistantService.__new__(ai_assistant_service.AIAssistantService)
+        service.gemini_service = MagicMock()
+        with self.SessionLocal() as db:
+            expected = asyncio.run(service.smart_search(self.user_id, "mobilya", use_llm=False, db=db))
+        for reply in ("[1, 2]", '{"results": "yok"}', '{"results": [1, {"id": 5}]}', "bozuk"):
+            service.gemini_service.generate_text_response = AsyncMock(
+                return_value={"success": True, "response": reply}
+            )
+            with self.SessionLocal() as db:
+                result = asyncio.run(service.smart_search(self.user_id, "mobilya", use_llm=True, db=db))
+            self.assertTrue(result["success"], reply)
+            self.assertEqual(result["source"], "index")
+            self.assertEqual(result["search_results"]["results"], expected["search_results"]["results"])
+
+    def test_search_endpoint_without_llm(self):
+        app = FastAPI()
+        app.include_router(ai_assistant_router.router)
+
+        def override_get_db():
+            db = self.SessionLocal()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[get_current_user] = lambda: MagicMock(id=self.user_id)
+        service = ai_assistant_service.AIAssistantService.__new__(ai_assistant_service.AIAssistantService)
+        service.gemini_service = None
+        original = ai_assistant_service._ai_assistant_service
+        ai_assistant_service._ai_assistant_service = service
+        self.addCleanup(setattr, ai_assistant_service, "_ai_assistant_service", original)
+
+        with TestClient(app) as client:
+            response = client.get("/assistant/search", params={"q": "beyaz", "scope": "products"})
+        self.assertEqual(response.status_code, 200, response.text)
+        body = response.json()
+        self.assertEqual(body["source"], "index")
+        self.assertEqual([r["type"] for r in body["data"]["results"]], ["product"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,149 @@
+import asyncio
+import csv
+import io
+import sys
+import tracemalloc
+import unittest
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from openpyxl import load_workbook
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.auth import require_admin  # noqa: E402
+from app.database import Base, get_db  # noqa: E402
+from app.exceptions import BusinessRuleError  # noqa: E402
+from app.models import AuditLog, User  # noqa: E402
+from app.routers import sql_router  # noqa: E402
+from app.services.query_export_service import open_query_export  # noqa: E402
+
+ROWS = 25_000
+
+
+def _fill(engine, rows):
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE big (id INTEGER PRIMARY KEY, name TEXT, qty REAL)"))
+        conn.execute(
+            text(
+                "WITH RECURSIVE seq(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < :rows) "
+                "INSERT INTO big (id, name, qty) SELECT n, 'parça ' || n, n * 0.5 FROM seq"
+            ),
+            {"rows": rows},
+        )
+
+
+class SqlExportStreamTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        Base.metadata.create_all(bind=self.engine)
+        _fill(self.engine, ROWS)
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        with self.SessionLocal() as db:
+            admin = User(
+                username="admin",
+                email="admin@test.com",
+                password_hash="x",
+                role="ADMIN",
+                is_active=True,
+            )
+            db.add(admin)
+            db.commit()
+            admin_id = admin.id
+
+        app = FastAPI()
+        app.include_router(sql_router.router)
+
+        def override_get_db():
+            db = self.SessionLocal()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        def override_require_admin():
+            with self.SessionLocal() as db:
+                return db.get(User, admin_id)
+
+        app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[require_admin] = override_require_admin
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        self.client.close()
+        self.engine.dispose()
+
+    def test_csv_stream_has_all_rows_without_limit(self):
+        response = self.client.post("/api/v1/sql/export/stream", json={"sql": "SELECT * FROM big"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/csv"))
+        self.assertIn(".csv", response.headers["content-disposition"])
+
+        rows = list(csv.reader(io.StringIO(response.content.decode("utf-8-sig"))))
+        self.assertEqual(rows[0], ["id", "name", "qty"])
+        self.assertEqual(len(rows), ROWS + 1)
+        self.assertEqual(rows[-1], [str(ROWS), f"parça {ROWS}", str(ROWS * 0.5)])
+
+        with self.SessionLocal() as db:
+            self.assertEqual(db.query(AuditLog).filter(AuditLog.action == "SQL_EXPORT").count(), 1)
+
+    def test_xlsx_stream_and_row_cap(self):
+        response = self.client.post(
+            "/api/v1/sql/export/stream",
+            json={"sql": "SELECT id, name FROM big ORDER BY id", "format": "xlsx", "max_rows": 1500},
+        )
+        self.assertEqual(response.status_code, 200)
+        ws = load_workbook(io.BytesIO(response.content), read_only=True)["Query Result"]
+        rows = list(ws.iter_rows(values_only=True))
+        self.assertEqual(rows[0], ("id", "name"))
+        self.assertEqual(len(rows), 1501)
+        self.assertEqual(rows[-1], (1500, "parça 1500"))
+
+    def test_rejects_unsafe_and_invalid_sql_before_streaming(self):
+        with self.assertRaises(BusinessRuleError):
+            self.client.post("/api/v1/sql/export/stream", json={"sql": "DELETE FROM big"})
+        with self.assertRaises(BusinessRuleError):
+            self.client.post("/api/v1/sql/export/stream", json={"sql": "SELECT * FROM missing"})
+
+    def test_cancel_mid_stream_releases_connection(self):
+        async def _run():
+            stream = open_query_export(self.engine, "SELECT * FROM big", batch_size=100)
+            chunks = stream.__aiter__()
+            first = await chunks.__anext__()
+            await chunks.aclose()
+            return stream, first
+
+        stream, first = asyncio.run(_run())
+        self.assertTrue(first.decode("utf-8-sig").startswith("id,name,qty"))
+        self.assertFalse(stream.completed)
+        self.assertEqual(stream.rows_written, 100)
+        self.assertTrue(stream.connection.closed)
+
+    def test_memory_stays_flat_with_row_count(self):
+        def _peak(rows):
+            stream = open_query_export(self.engine, f"SELECT * FROM big LIMIT {rows}")
+            tracemalloc.start()
+            try:
+                size = sum(len(chunk) for chunk in stream.iter_bytes())
+                return size, tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        small_size, small_peak = _peak(2_000)
+        large_size, large_peak = _peak(ROWS)
+        self.assertGreater(large_size, 10 * small_size)
+        self.assertLess(large_peak, small_peak * 2 + 256 * 1024)
+
+
+if __name__ == "__main__":
+    unittest.main()
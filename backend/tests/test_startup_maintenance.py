@@ -0,0 +1,205 @@
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, func, insert, select, text
+from sqlalchemy.orm import sessionmaker
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app import main  # noqa: E402
+from app.database import Base  # noqa: E402
+from app.models import Customer, Order, Station, User  # noqa: E402
+from app.services import maintenance_service  # noqa: E402
+from app.services.maintenance_service import (  # noqa: E402
+    StartupStatus,
+    run_backfills,
+    run_maintenance,
+    sync_schema,
+)
+from app.tasks import reminders  # noqa: E402
+
+LEGACY_ORDERS = 3_000
+STARTUP_LEGACY_ORDERS = 20_000
+STARTUP_BUDGET_SECONDS = 2.0
+
+
+class StartupMaintenanceTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.engine = create_engine(f"sqlite:///{Path(self.tmp.name) / 'startup.db'}")
+        self.addCleanup(self.engine.dispose)
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        Base.metadata.create_all(bind=self.engine)
+        self._seed_orders(0, LEGACY_ORDERS)
+        with self.engine.begin() as conn:
+            conn.execute(
+                insert(Customer),
+                [{"name": f"Müşteri {i}", "phone": f"0532{i:07d}"} for i in range(300)]
+                + [{"name": "Telefonsuz", "phone": None}],
+            )
+
+    def _seed_orders(self, start, stop):
+        # Eski kurulum: token/numara/son hane indeksi olmayan kayıtlar
+        with self.engine.begin() as conn:
+            conn.execute(
+                insert(Order),
+                [{"ts_code": f"TS-{i}", "tracking_token": None, "order_no": None} for i in range(start, stop)],
+            )
+
+    def _null_orders(self):
+        with self.engine.connect() as conn:
+            return conn.execute(
+                select(func.count()).select_from(Order).where(Order.tracking_token.is_(None))
+            ).scalar_one()
+
+    def test_startup_path_stays_within_budget_and_skips_backfill(self):
+        self._seed_orders(LEGACY_ORDERS, STARTUP_LEGACY_ORDERS)
+        with patch.object(main, "engine", self.engine), patch.object(
+            main, "SessionLocal", self.SessionLocal
+        ), patch.object(main, "start_scheduler"):
+            started = time.perf_counter()
+            main._run_startup_tasks()
+            elapsed = time.perf_counter() - started
+
+        self.assertLess(elapsed, STARTUP_BUDGET_SECONDS)
+        self.assertEqual(self._null_orders(), STARTUP_LEGACY_ORDERS)  # Backfill açılış yolunda değil
+        with self.SessionLocal() as db:
+            self.assertEqual(db.query(Station).count(), 5)
+            self.assertEqual(db.query(User).filter(User.username == "admin").count(), 1)
+
+    def test_chunked_backfill_fills_everything(self):
+        background = run_backfills(self.SessionLocal, chunk_size=1000)
+        self.assertNotIn("order_no", background)  # Canlı sipariş numaralandırmasıyla yarışmaz
+        with self.engine.connect() as conn:
+            self.assertEqual(
+                conn.execute(
+                    select(func.count()).select_from(Order).where(Order.order_no.is_(None))
+                ).scalar_one(),
+                LEGACY_ORDERS,
+            )
+
+        counts = run_backfills(self.SessionLocal, chunk_size=1000, order_numbers=True)
+        self.assertEqual(background["tracking_token"], LEGACY_ORDERS)
+        self.assertEqual(counts["order_no"], LEGACY_ORDERS)
+        self.assertEqual(background["phone_suffix"], 300)
+        self.assertEqual(self._null_orders(), 0)
+        with self.engine.connect() as conn:
+            numbers = conn.execute(select(Order.order_no).order_by(Order.id)).scalars().all()
+            suffixes = conn.execute(
+                select(func.count()).select_from(Customer).where(Customer.phone_suffix.is_not(None))
+            ).scalar_one()
+        self.assertEqual(numbers, list(range(1, LEGACY_ORDERS + 1)))
+        self.assertEqual(suffixes, 300)
+        # İkinci çalıştırma iş bulmaz
+        self.assertEqual(
+            run_backfills(self.SessionLocal, chunk_size=1000, order_numbers=True)["order_no"], 0
+        )
+
+    def test_backfill_stops_between_chunks(self):
+        status = StartupStatus()
+        with patch.object(maintenance_service, "BACKFILL_PAUSE_SECONDS", 0.2):
+            worker = threading.Thread(target=status.run_backfill, args=(self.SessionLocal, 500))
+            worker.start()
+            time.sleep(0.3)
+            status.stop_backfill()
+            worker.join(5)
+        self.assertEqual(status.backfill, "stopped")
+        self.assertLess(status.backfilled["tracking_token"], LEGACY_ORDERS)
+        self.assertFalse(status.run_backfill(self.SessionLocal))  # Kapanışta yeniden başlamaz
+
+    def test_scheduled_backfill_waits_for_leader_and_retries_until_done(self):
+        status = StartupStatus()
+        fake_scheduler = MagicMock()
+        real_run_backfills = run_backfills
+        calls = []
+
+        def flaky_run_backfills(*args, **kwargs):
+            calls.append(kwargs.get("order_numbers", False))
+            if len(calls) == 1:
+                raise RuntimeError("veritabanı kilitli")
+            return real_run_backfills(*args, **kwargs)
+
+        with patch.object(maintenance_service, "startup_status", status), patch.object(
+            reminders, "scheduler", fake_scheduler
+        ), patch.object(maintenance_service, "run_backfills", flaky_run_backfills), patch.object(
+            maintenance_service, "BACKFILL_PAUSE_SECONDS", 0
+        ):
+            reminders.schedule_startup_backfill(self.SessionLocal)
+            job = fake_scheduler.add_job.call_args.args[0]
+            self.assertEqual(fake_scheduler.add_job.call_args.kwargs["id"], reminders.STARTUP_BACKFILL_JOB_ID)
+
+            with patch.object(reminders, "is_scheduler_leader", return_value=False):
+                job()  # Bayat kira başka süreçte: bu tur atlanır, iş kayıtlı kalır
+            self.assertEqual((status.backfill, calls), ("pending", []))
+
+            with patch.object(reminders, "is_scheduler_leader", return_value=True):
+                job()
+                self.assertEqual(status.backfill, "failed")
+                fake_scheduler.remove_job.assert_not_called()
+                job()
+
+        self.assertEqual(status.backfill, "done")
+        self.assertEqual(calls, [False, False])
+        fake_scheduler.remove_job.assert_called_once_with(reminders.STARTUP_BACKFILL_JOB_ID)
+        self.assertEqual(self._null_orders(), 0)
+
+    def test_schema_sync_adds_missing_pieces_once(self):
+        with self.engine.begin() as conn:
+            conn.execute(text("DROP TABLE stations"))
+        result = sync_schema(self.engine)
+        self.assertEqual(result["created_tables"], ["stations"])
+        self.assertEqual(sync_schema(self.engine), {"created_tables": [], "added_columns": []})
+
+        full = run_maintenance(self.engine, self.SessionLocal, chunk_size=1000)
+        self.assertEqual(full["stations_created"], 5)
+        self.assertEqual(full["backfilled"]["tracking_token"], LEGACY_ORDERS)
+
+
+class HealthProbeTest(unittest.TestCase):
+    def setUp(self):
+        engine = create_engine("sqlite://")
+        self.addCleanup(engine.dispose)
+        SessionLocal = sessionmaker(bind=engine)
+
+        def override_get_db():
+            db = SessionLocal()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        main.app.dependency_overrides[main.get_db] = override_get_db
+        self.addCleanup(main.app.dependency_overrides.clear)
+        status = StartupStatus()
+        patcher = patch.object(main, "startup_status", status)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.status = status
+        self.client = TestClient(main.app, base_url="http://localhost")  # Lifespan çalışmaz (with bloğu yok)
+
+    def test_liveness_and_readiness_are_separate(self):
+        self.assertEqual(self.client.get("/health/live").status_code, 200)
+        not_ready = self.client.get("/health/ready")
+        self.assertEqual(not_ready.status_code, 503)
+        self.assertEqual(not_ready.json()["status"], "not_ready")
+
+        self.status.mark_ready()
+        self.status.backfill = "running"
+        ready = self.client.get("/health/ready")
+        self.assertEqual(ready.status_code, 200)
+        self.assertEqual(ready.json()["startup"]["backfill"], "running")
+        health = self.client.get("/health").json()
+        self.assertEqual((health["status"], health["ready"]), ("healthy", True))
+
+
+if __name__ == "__main__":
+    unittest.main()
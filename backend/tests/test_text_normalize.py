@@ -12,6 +12,7 @@ from app.utils.text_normalize import (
     normalize_text,
     normalize_material_name,
     normalize_phone,
+    phone_suffix_key,
     sanitize_filename,
 )
 
@@ -126,6 +127,27 @@ class TestNormalizePhone:
         assert normalize_phone(None) == ""
 
 
+class TestPhoneSuffixKey:
+    """Reversed phone digit keys used for indexed suffix lookups."""
+
+    def test_country_code_variants_share_key(self):
+        """Same national number yields the same key in every notation."""
+        expected = "7654321555"
+        assert phone_suffix_key("+90 555 123 45 67") == expected
+        assert phone_suffix_key("905551234567") == expected
+        assert phone_suffix_key("05551234567") == expected
+        assert phone_suffix_key("5551234567") == expected
+
+    def test_last_digits_become_prefix(self):
+        """Last seven digits of the number are the first seven of the key."""
+        assert phone_suffix_key("0212 123 45 67")[:7] == "7654321"
+
+    def test_empty_input(self):
+        """Handle empty phone numbers."""
+        assert phone_suffix_key("") == ""
+        assert phone_suffix_key(None) == ""
+
+
 class TestSanitizeFilename:
     """Filename sanitization tests."""
 
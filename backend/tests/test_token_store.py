@@ -0,0 +1,112 @@
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.database import Base  # noqa: E402
+from app.models import RevokedToken  # noqa: E402
+from app.services.token_store import (  # noqa: E402
+    MAX_AUTH_ATTEMPTS,
+    BloomFilter,
+    TokenRevocationStore,
+)
+
+
+class TokenRevocationStoreTest(unittest.TestCase):
+    """İki ayrı engine, aynı veritabanı dosyasını kullanan iki worker'ı temsil eder."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        url = f"sqlite:///{Path(self.tmpdir.name) / 'tokens.db'}"
+        self.engines = [
+            create_engine(url, connect_args={"check_same_thread": False}) for _ in range(2)
+        ]
+        Base.metadata.create_all(bind=self.engines[0])
+        self.worker_a, self.worker_b = (
+            TokenRevocationStore(sessionmaker(bind=engine), sync_interval=0)
+            for engine in self.engines
+        )
+
+    def tearDown(self):
+        for engine in self.engines:
+            engine.dispose()
+        self.tmpdir.cleanup()
+
+    def _future(self, **kwargs):
+        return datetime.now(timezone.utc) + timedelta(**kwargs)
+
+    def test_revocation_is_visible_to_other_workers(self):
+        self.assertFalse(self.worker_b.is_revoked("jti-1"))
+        self.worker_a.revoke("jti-1", self._future(minutes=30), "access")
+        self.assertTrue(self.worker_a.is_revoked("jti-1"))
+        self.assertTrue(self.worker_b.is_revoked("jti-1"))
+        self.assertFalse(self.worker_b.is_revoked("jti-2"))
+
+    def test_revoking_twice_is_idempotent(self):
+        self.worker_a.revoke("jti-dup", self._future(minutes=5))
+        self.worker_b.revoke("jti-dup", self._future(minutes=5))
+        self.assertTrue(self.worker_a.is_revoked("jti-dup"))
+
+    def test_negative_lookups_do_not_query_revoked_rows(self):
+        self.worker_a.revoke("jti-known", self._future(minutes=5))
+        self.worker_b.sync_interval = 3600
+        self.worker_b.rebuild()
+
+        statements = []
+
+        def _before(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(self.engines[1], "before_cursor_execute", _before)
+        try:
+            for i in range(50):
+                self.assertFalse(self.worker_b.is_revoked(f"unknown-{i}"))
+        finally:
+            event.remove(self.engines[1], "before_cursor_execute", _before)
+        self.assertLessEqual(len(statements), 2)  # yalnız Bloom yanlış pozitifleri
+
+    def test_cleanup_removes_only_expired_entries(self):
+        self.worker_a.revoke("expired", datetime.now(timezone.utc) - timedelta(seconds=1))
+        self.worker_a.revoke("active", self._future(hours=1))
+
+        self.assertEqual(self.worker_b.cleanup_expired(), 1)
+        self.assertFalse(self.worker_b.is_revoked("expired"))
+        self.assertTrue(self.worker_b.is_revoked("active"))
+
+        with sessionmaker(bind=self.engines[0])() as db:
+            self.assertEqual(db.query(RevokedToken).count(), 1)
+
+    def test_auth_lockout_is_shared_between_workers(self):
+        ip = "10.0.0.7"
+        for _ in range(MAX_AUTH_ATTEMPTS - 1):
+            self.worker_a.record_attempt(ip, success=False)
+        self.assertTrue(self.worker_b.check_attempts(ip))
+
+        self.worker_b.record_attempt(ip, success=False)
+        self.assertFalse(self.worker_a.check_attempts(ip))
+
+        self.worker_a.record_attempt(ip, success=True)
+        self.assertTrue(self.worker_b.check_attempts(ip))
+
+
+class BloomFilterTest(unittest.TestCase):
+    def test_no_false_negatives(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        items = [f"jti-{i}" for i in range(1000)]
+        for item in items:
+            bloom.add(item)
+        self.assertTrue(all(item in bloom for item in items))
+        false_positives = sum(f"other-{i}" in bloom for i in range(1000))
+        self.assertLess(false_positives, 50)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.database import Base  # noqa: E402
+from app.models import OptiJob, OptiJobStateEnum  # noqa: E402
+from app.services import tracking_folder_service, tracking_mirror_service  # noqa: E402
+from app.services.tracking_mirror_service import MirrorEvent, TrackingMirror  # noqa: E402
+
+STATES = ("OPTI_IMPORTED", "OPTI_RUNNING", "OPTI_DONE", "XML_READY", "DELIVERED", "FAILED")
+
+
+class TrackingMirrorTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        self.folders = {state: str(self.root / "takip" / state) for state in STATES}
+        self.export = self.root / "export"
+        self.export.mkdir()
+        self.mirror = self._mirror()
+
+    def _mirror(self, coalesce=0.2):
+        mirror = TrackingMirror(
+            self.folders,
+            self.folders["FAILED"],
+            index_path=str(self.root / "takip" / "_index.json"),
+            coalesce_seconds=coalesce,
+            run_async=True,
+        )
+        self.addCleanup(mirror.stop)
+        return mirror
+
+    def _file(self, name, content=b"data"):
+        path = self.export / name
+        path.write_bytes(content)
+        return str(path)
+
+    def _holders(self, name):
+        return [s for s, f in self.folders.items() if os.path.exists(os.path.join(f, name))]
+
+    def test_submit_returns_before_files_move_and_runs_on_mirror_thread(self):
+        src = self._file("job1.xlsx")
+        threads = []
+        real_place = tracking_mirror_service.place_file
+
+        def recording_place(*args):
+            threads.append(threading.current_thread().name)
+            return real_place(*args)
+
+        with patch.object(tracking_mirror_service, "place_file", recording_place):
+            self.mirror.submit(MirrorEvent("job1", state="OPTI_IMPORTED", source=src))
+            self.assertEqual(self._holders("job1.xlsx"), [])
+            self.assertTrue(self.mirror.flush())
+        self.assertEqual(self._holders("job1.xlsx"), ["OPTI_IMPORTED"])
+        self.assertEqual(set(threads), {"tracking-mirror"})
+
+    def test_rapid_transitions_are_coalesced_and_linked(self):
+        src = self._file("job2.xml")
+        self.mirror.submit(MirrorEvent("job2", state="XML_READY", source=src))
+        self.mirror.submit(MirrorEvent("job2", state="DELIVERED", source=src))
+        self.mirror.flush()
+
+        self.assertEqual(self._holders("job2.xml"), ["DELIVERED"])
+        self.assertEqual((self.mirror.stats.coalesced, self.mirror.stats.applied), (1, 1))
+        placed = os.path.join(self.folders["DELIVERED"], "job2.xml")
+        self.assertTrue(os.path.samefile(placed, src))  # Hardlink: kopya yok
+        self.assertEqual(self.mirror.stats.linked, 1)
+
+    def test_copy_fallback_when_links_are_unavailable(self):
+        src = self._file("job3.xlsx")
+        with patch.object(os, "link", side_effect=OSError("EXDEV")):
+            self.mirror.submit(MirrorEvent("job3", state="OPTI_IMPORTED", source=src))
+            self.mirror.flush()
+        placed = os.path.join(self.folders["OPTI_IMPORTED"], "job3.xlsx")
+        self.assertFalse(os.path.samefile(placed, src))
+        self.assertEqual(Path(placed).read_bytes(), b"data")
+        self.assertEqual(self.mirror.stats.copied, 1)
+        self.assertEqual(os.listdir(self.folders["OPTI_IMPORTED"]), ["job3.xlsx"])
+
+    def test_pathless_transition_moves_last_known_file(self):
+        src = self._file("job4.xlsx")
+        self.mirror.submit(MirrorEvent("job4", state="OPTI_RUNNING", source=src))
+        self.mirror.flush()
+        os.remove(src)
+
+        # Yeni süreç: konum bilgisi indeksten gelir
+        mirror = self._mirror(coalesce=0.0)
+        mirror.submit(MirrorEvent("job4", state="FAILED", error_message="Makine hata ACK"))
+        mirror.flush()
+        self.assertEqual(self._holders("job4.xlsx"), ["FAILED"])
+        self.assertEqual(mirror.stats.renamed, 1)
+        error_text = Path(self.folders["FAILED"], "job4_HATA.txt").read_text(encoding="utf-8")
+        self.assertIn("Makine hata ACK", error_text)
+
+    def test_hooks_only_enqueue(self):
+        src = self._file("job5.xlsx")
+        with patch.object(tracking_folder_service, "mirror", self.mirror), patch.object(
+            tracking_folder_service, "OPTIPLANNING_IMPORT", str(self.root / "import")
+        ):
+            tracking_folder_service.on_xlsx_created(src, "job5")
+            tracking_folder_service.on_state_change("OPTI_RUNNING", "job5")
+            tracking_folder_service.on_state_change("HOLD", "job5")  # Takip klasoru yok
+            self.assertEqual(self.mirror.stats.submitted, 2)
+            self.mirror.flush()
+        self.assertTrue((self.root / "import" / "job5.xlsx").exists())
+        self.assertEqual(self._holders("job5.xlsx"), ["OPTI_RUNNING"])
+
+    def test_reconcile_rebuilds_folders_from_db(self):
+        engine = create_engine(
+            "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+        )
+        self.addCleanup(engine.dispose)
+        Base.metadata.create_all(bind=engine)
+        delivered = self._file("a.xml")
+        stray = self._file("b.xlsx")
+        # Dağınık durum: a.xml yanlış klasörde, b.xlsx iki klasörde, c.xml kayıp
+        for state, name in (("XML_READY", "a.xml"), ("OPTI_IMPORTED", "b.xlsx"), ("OPTI_DONE", "b.xlsx")):
+            os.makedirs(self.folders[state], exist_ok=True)
+            Path(self.folders[state], name).write_bytes(b"old")
+        os.remove(stray)
+        self.mirror._load_index()["job-b"] = {"file": "b.xlsx", "state": "OPTI_IMPORTED"}
+
+        with sessionmaker(bind=engine)() as db:
+            db.add_all(
+                [
+                    OptiJob(id="job-a", order_id=1, state=OptiJobStateEnum.DELIVERED, xml_file_path=delivered),
+                    OptiJob(id="job-b", order_id=1, state=OptiJobStateEnum.FAILED),
+                    OptiJob(id="job-c", order_id=1, state=OptiJobStateEnum.DONE, xml_file_path="/yok/c.xml"),
+                    OptiJob(id="job-d", order_id=1, state=OptiJobStateEnum.NEW),
+                ]
+            )
+            db.commit()
+            with patch.object(tracking_folder_service, "mirror", self.mirror), patch.dict(
+                self.folders, {"DONE": str(self.root / "takip" / "DONE")}
+            ):
+                result = tracking_folder_service.reconcile_tracking_folders(db)
+
+        self.assertEqual(self._holders("a.xml"), ["DELIVERED"])
+        self.assertEqual(self._holders("b.xlsx"), ["FAILED"])
+        self.assertEqual(
+            result, {"jobs": 3, "placed": 2, "already_ok": 0, "removed": 3, "missing": 1}
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
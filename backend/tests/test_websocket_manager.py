@@ -0,0 +1,132 @@
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.services.websocket_manager import (  # noqa: E402
+    OVERFLOW_DISCONNECT,
+    ClientConnection,
+    ConnectionManager,
+)
+from app.websockets import ConnectionManager as LiveConnectionManager  # noqa: E402
+
+
+class _FakeSocket:
+    def __init__(self, gate: asyncio.Event = None, fail: bool = False):
+        self.gate = gate
+        self.fail = fail
+        self.received = []
+        self.closed_with = None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        if self.fail:
+            raise RuntimeError("connection reset")
+        if self.gate is not None:
+            await self.gate.wait()
+        self.received.append(text)
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+
+async def _settle(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        await asyncio.sleep(0.005)
+
+
+def test_slow_client_does_not_stall_channel_broadcast():
+    async def _run():
+        manager = ConnectionManager()
+        stuck = _FakeSocket(gate=asyncio.Event())
+        healthy = _FakeSocket()
+        await manager.connect(stuck, "tablet")
+        await manager.connect(healthy, "office")
+        for user_id in ("tablet", "office"):
+            manager.subscribe(user_id, "stations")
+
+        started = time.monotonic()
+        for i in range(50):
+            await manager.broadcast_to_channel("stations", {"type": "station_scan", "n": i})
+        assert time.monotonic() - started < 0.1
+
+        await _settle(lambda: len(healthy.received) == 50)
+        assert [json.loads(t)["n"] for t in healthy.received] == list(range(50))
+        assert stuck.received == []
+
+        stats = {s["client_id"]: s for s in manager.stats()}
+        assert stats["tablet"]["queue_depth"] == 49  # biri send_text içinde bekliyor
+        assert stats["office"]["queue_depth"] == 0
+        assert stats["office"]["sent"] == 50
+
+        stuck.gate.set()
+        await _settle(lambda: len(stuck.received) == 50)
+        manager.disconnect("tablet")
+        manager.disconnect("office")
+
+    asyncio.run(_run())
+
+
+def test_drop_oldest_keeps_newest_messages():
+    async def _run():
+        gate = asyncio.Event()
+        sock = _FakeSocket(gate=gate)
+        conn = ClientConnection(sock, "c1", max_queue=3)
+        conn.start()
+        conn.enqueue("0")
+        await asyncio.sleep(0)  # yazıcı "0"ı alıp send_text'te bekler
+        for i in range(1, 6):
+            assert conn.enqueue(str(i))
+        assert conn.dropped == 2
+        assert conn.stats()["queue_depth"] == 3
+
+        gate.set()
+        await _settle(lambda: len(sock.received) == 4)
+        assert sock.received == ["0", "3", "4", "5"]
+        conn.close()
+        await conn.wait_closed()
+
+    asyncio.run(_run())
+
+
+def test_disconnect_policy_closes_overflowing_client():
+    async def _run():
+        manager = ConnectionManager(max_queue=2, overflow=OVERFLOW_DISCONNECT)
+        sock = _FakeSocket(gate=asyncio.Event())
+        await manager.connect(sock, "tablet")
+        manager.subscribe("tablet", "orders")
+        for i in range(5):
+            await manager.broadcast_to_channel("orders", {"n": i})
+
+        await _settle(lambda: "tablet" not in manager.active_connections)
+        assert "tablet" not in manager.active_connections
+        assert "tablet" not in manager.channels["orders"]
+        assert sock.closed_with == 1013
+
+    asyncio.run(_run())
+
+
+def test_failed_send_removes_live_connection():
+    async def _run():
+        manager = LiveConnectionManager()
+        dead = _FakeSocket(fail=True)
+        alive = _FakeSocket()
+        await manager.connect(dead)
+        await manager.connect(alive)
+
+        await manager.broadcast({"type": "refresh"})
+        await _settle(lambda: len(manager.connections) == 1 and alive.received)
+        assert manager.active_connections == [alive]
+        assert json.loads(alive.received[0]) == {"type": "refresh"}
+        manager.disconnect(alive)
+        assert manager.stats() == []
+
+    asyncio.run(_run())
@@ -0,0 +1,244 @@
+import asyncio
+import json
+import sys
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from uuid import uuid4
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.database import Base  # noqa: E402
+from app.integrations.whatsapp_fake import FakeWhatsAppState, create_app  # noqa: E402
+from app.models import WhatsAppMessage, WhatsAppSetting  # noqa: E402
+from app.services.whatsapp_scheduler import WhatsAppDispatcher  # noqa: E402
+from app.utils import backoff_delay  # noqa: E402
+
+
+class WhatsAppDispatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        Base.metadata.create_all(bind=self.engine)
+        self.SessionLocal = sessionmaker(bind=self.engine)
+        with self.SessionLocal() as db:
+            db.add_all(
+                [
+                    WhatsAppSetting(key="phone_number_id", value="123"),
+                    WhatsAppSetting(key="access_token", value="token"),
+                ]
+            )
+            db.commit()
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def _enqueue(self, count):
+        with self.SessionLocal() as db:
+            for i in range(count):
+                db.add(
+                    WhatsAppMessage(
+                        id=str(uuid4()),
+                        to_phone=f"90555{i:07d}",
+                        message=f"mesaj {i}",
+                        status="PENDING",
+                    )
+                )
+            db.commit()
+
+    def _dispatcher(self, state, **kwargs):
+        options = {
+            "rate_per_second": 1000,
+            "burst": 1000,
+            "backoff_base": 0,
+            "working_hours_only": False,
+            "transport": httpx.ASGITransport(app=create_app(state)),
+        }
+        options.update(kwargs)
+        return WhatsAppDispatcher(self.SessionLocal, base_url="http://fake-wa", **options)
+
+    def _drain(self, dispatcher, rounds=10):
+        async def _run():
+            try:
+                for _ in range(rounds):
+                    if not await dispatcher.drain_once():
+                        break
+            finally:
+                await dispatcher.close()
+
+        asyncio.run(_run())
+
+    def _statuses(self):
+        with self.SessionLocal() as db:
+            return {m.id: (m.status, m.attempts) for m in db.query(WhatsAppMessage).all()}
+
+    def test_sends_queue_concurrently_in_one_pass(self):
+        self._enqueue(40)
+        state = FakeWhatsAppState(latency=0.02)
+        dispatcher = self._dispatcher(state, concurrency=8, batch_size=100)
+
+        started = time.monotonic()
+        self._drain(dispatcher, rounds=1)
+        elapsed = time.monotonic() - started
+
+        self.assertEqual(len(state.delivered), 40)
+        self.assertEqual(state.max_in_flight, 8)
+        self.assertLess(elapsed, 40 * 0.02)
+        self.assertEqual({s for s, _ in self._statuses().values()}, {"SENT"})
+
+    def test_drains_beyond_a_single_batch(self):
+        self._enqueue(25)
+        state = FakeWhatsAppState()
+        self._drain(self._dispatcher(state, batch_size=10))
+        self.assertEqual(len(state.delivered), 25)
+
+    def test_rate_limit_is_respected(self):
+        self._enqueue(30)
+        state = FakeWhatsAppState(max_rps=60)
+        dispatcher = self._dispatcher(state, rate_per_second=50, burst=5)
+
+        started = time.monotonic()
+        self._drain(dispatcher)
+        elapsed = time.monotonic() - started
+
+        self.assertEqual(state.rate_limited, 0)
+        self.assertEqual(len(state.delivered), 30)
+        self.assertGreaterEqual(elapsed, (30 - 5) / 50 * 0.9)
+
+    def test_transient_failures_are_retried_with_backoff(self):
+        self._enqueue(5)
+        state = FakeWhatsAppState(fail_first=2)
+        self._drain(self._dispatcher(state, max_attempts=5))
+
+        self.assertEqual(len(state.delivered), 5)
+        self.assertEqual(set(self._statuses().values()), {("SENT", 3)})
+
+    def test_retry_is_deferred_until_next_attempt_at(self):
+        self._enqueue(1)
+        state = FakeWhatsAppState(fail_first=1, fail_status=429)
+        self._drain(self._dispatcher(state, backoff_base=60))
+
+        with self.SessionLocal() as db:
+            msg = db.query(WhatsAppMessage).one()
+            self.assertEqual((msg.status, msg.attempts), ("PENDING", 1))
+            next_attempt_at = msg.next_attempt_at.replace(tzinfo=timezone.utc)
+        self.assertGreater(next_attempt_at, datetime.now(timezone.utc) + timedelta(seconds=25))
+        self.assertEqual(sum(state.attempts.values()), 1)
+
+    def test_gives_up_after_max_attempts(self):
+        self._enqueue(2)
+        state = FakeWhatsAppState(fail_first=10)
+        self._drain(self._dispatcher(state, max_attempts=3))
+
+        self.assertEqual(set(self._statuses().values()), {("FAILED", 3)})
+        self.assertEqual(sum(state.attempts.values()), 6)
+
+    def test_permanent_client_error_is_not_retried(self):
+        self._enqueue(1)
+        state = FakeWhatsAppState(fail_first=1, fail_status=400)
+        self._drain(self._dispatcher(state))
+        self.assertEqual(list(self._statuses().values()), [("FAILED", 1)])
+
+    def test_expired_sending_lease_is_reclaimed(self):
+        with self.SessionLocal() as db:
+            db.add(
+                WhatsAppMessage(
+                    id="stale",
+                    to_phone="905550000000",
+                    message="takılı kalan",
+                    status="SENDING",
+                    next_attempt_at=datetime.now(timezone.utc) - timedelta(seconds=1),
+                )
+            )
+            db.add(
+                WhatsAppMessage(
+                    id="leased",
+                    to_phone="905550000001",
+                    message="başka worker'da",
+                    status="SENDING",
+                    next_attempt_at=datetime.now(timezone.utc) + timedelta(minutes=2),
+                )
+            )
+            db.commit()
+
+        state = FakeWhatsAppState()
+        self._drain(self._dispatcher(state))
+        statuses = self._statuses()
+        self.assertEqual(statuses["stale"], ("SENT", 1))
+        self.assertEqual(statuses["leased"], ("SENDING", 0))
+
+    def test_unreadable_success_reply_is_not_resent(self):
+        self._enqueue(4)
+        requests = []
+
+        def handler(request):
+            to = json.loads(request.content)["to"]
+            requests.append(to)
+            if to.endswith("0"):
+                return httpx.Response(200, text="OK")  # JSON olmayan gövde
+            if to.endswith("1"):
+                return httpx.Response(200, json={"messages": []})
+            if to.endswith("2"):
+                return httpx.Response(200, json={"messages": [{"id": "wamid.2"}]})
+            raise RuntimeError("beklenmeyen hata")
+
+        # Kilit süresi 0: SENDING'de kalan satır bir sonraki turda yeniden alınırdı
+        dispatcher = self._dispatcher(None, transport=httpx.MockTransport(handler), lease_seconds=0)
+        self._drain(dispatcher, rounds=1)
+        with self.SessionLocal() as db:
+            rows = {m.to_phone[-1]: m for m in db.query(WhatsAppMessage).all()}
+            self.assertEqual(
+                {k: (m.status, m.attempts) for k, m in rows.items()},
+                {"0": ("SENT", 1), "1": ("SENT", 1), "2": ("SENT", 1), "3": ("PENDING", 1)},
+            )
+            self.assertEqual((rows["0"].waba_message_id, rows["2"].waba_message_id), (None, "wamid.2"))
+            self.assertIn("beklenmeyen hata", rows["3"].error)
+
+        self._drain(self._dispatcher(None, transport=httpx.MockTransport(handler), lease_seconds=0), rounds=1)
+        self.assertEqual(sorted(requests), ["905550000000", "905550000001", "905550000002"] + ["905550000003"] * 2)
+
+    def test_background_loop_drains_until_stopped(self):
+        self._enqueue(10)
+        state = FakeWhatsAppState()
+        dispatcher = self._dispatcher(state, poll_interval=0.05)
+
+        async def _run():
+            await dispatcher.start()
+            for _ in range(100):
+                if len(state.delivered) == 10:
+                    break
+                await asyncio.sleep(0.02)
+            self._enqueue(3)
+            dispatcher.notify()
+            for _ in range(100):
+                if len(state.delivered) == 13:
+                    break
+                await asyncio.sleep(0.02)
+            await dispatcher.stop()
+
+        asyncio.run(_run())
+        self.assertEqual(len(state.delivered), 13)
+        self.assertFalse(dispatcher.running)
+
+
+class BackoffDelayTest(unittest.TestCase):
+    def test_grows_exponentially_and_is_capped(self):
+        for attempts, upper in ((1, 30), (2, 60), (3, 120), (10, 3600)):
+            delay = backoff_delay(attempts, 30, 3600)
+            self.assertGreaterEqual(delay, upper / 2)
+            self.assertLessEqual(delay, upper)
+
+
+if __name__ == "__main__":
+    unittest.main()